@@ -0,0 +1 @@
+"""Benchmarks de desempenho do EcoTech (python -m benchmarks)."""
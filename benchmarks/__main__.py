@@ -0,0 +1,65 @@
+"""
+Executa os benchmarks e compara com o baseline.
+
+Uso:
+    python -m benchmarks                    # compara com benchmarks/baseline.json
+    python -m benchmarks --salvar           # grava um novo baseline
+    python -m benchmarks --limite 0.3 --sem-web
+
+As latencias absolutas so fazem sentido na mesma maquina: grave o baseline
+(--salvar) no ambiente onde a comparacao vai rodar (ex. o runner do CI).
+Sem baseline a execucao falha, para uma regressao nunca passar em silencio.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .bench_dominio import cenarios
+from .carga_web import gerar_carga
+from .medicao import carregar_baseline, comparar, medir, salvar_baseline
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO)
+    parser.add_argument("--salvar", action="store_true", help="grava os resultados como baseline")
+    parser.add_argument("--limite", type=float, default=0.25, help="regressao tolerada (0.25 = 25%%)")
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--escala", type=int, default=1)
+    parser.add_argument("--sem-web", action="store_true", help="pula o gerador de carga web")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if not args.salvar:
+        # confere antes de medir: sem baseline nao ha o que comparar
+        baseline = carregar_baseline(args.baseline)
+        if baseline is None:
+            print(f"baseline nao encontrado: {args.baseline} (grave um com --salvar)", file=sys.stderr)
+            return 2
+
+    resultados = [
+        medir(nome, funcao, args.repeticoes)
+        for nome, funcao in cenarios(args.escala)
+    ]
+    if not args.sem_web:
+        resultados.extend(gerar_carga())
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    if args.salvar:
+        salvar_baseline(args.baseline, resultados)
+        print(f"baseline salvo em {args.baseline}")
+        return 0
+
+    regressoes = comparar(resultados, baseline, args.limite)
+    for regressao in regressoes:
+        print(f"REGRESSAO {regressao}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
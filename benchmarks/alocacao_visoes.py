@@ -0,0 +1,104 @@
+"""
+Mede o que custa ler SolicitacaoDescarte.itens em laco: copia a cada acesso
+(como era, list.copy()) contra a visao reaproveitada (tupla refeita so quando
+os itens mudam).
+
+Uso:
+    python -m benchmarks.alocacao_visoes                       # 200 solicitacoes x 200 itens
+    python -m benchmarks.alocacao_visoes --solicitacoes 1000 --itens 500
+
+O relatorio percorre os itens como um template faz (len + indice, varias
+colunas por item). Imprime o tempo, quantas colecoes novas foram criadas
+(e seu tamanho somado) e o pico do tracemalloc de cada lado.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.domain.descarte import ItemDescarte, SolicitacaoDescarte
+from ecotech.domain.usuarios import Cidadao
+
+TIPOS = ("celular", "computador", "eletrodomestico")
+
+
+def _solicitacoes(quantidade: int, itens: int) -> List[SolicitacaoDescarte]:
+    cidadao = Cidadao("1", "Joao", "joao@test.com", "12345678901")
+    metodo = MetodoTratamentoFactory.criar_metodo("reciclagem")
+    solicitacoes = []
+    for i in range(quantidade):
+        solicitacao = SolicitacaoDescarte(f"s{i}", cidadao)
+        for j in range(itens):
+            dispositivo = DispositivoFactory.criar_dispositivo(
+                TIPOS[j % 3], {"id": f"{i}-{j}", "nome": "Dispositivo", "peso_kg": 0.5 + j % 7}
+            )
+            solicitacao.adicionar_item(ItemDescarte(dispositivo, 1 + j % 3))
+        solicitacao.metodo_tratamento = metodo
+        solicitacoes.append(solicitacao)
+    return solicitacoes
+
+
+def _relatorio(solicitacoes: List[SolicitacaoDescarte], itens_de: Callable) -> float:
+    # linhas de um relatorio por item, acessando a colecao a cada coluna
+    total = 0.0
+    for solicitacao in solicitacoes:
+        for posicao in range(len(itens_de(solicitacao))):
+            total += itens_de(solicitacao)[posicao].quantidade
+            total += itens_de(solicitacao)[posicao].dispositivo.peso_kg
+    return total
+
+
+def _medir(nome: str, solicitacoes: List[SolicitacaoDescarte], itens_de: Callable) -> Dict:
+    _relatorio(solicitacoes, itens_de)  # aquecimento (e monta as visoes)
+    inicio = time.perf_counter()
+    _relatorio(solicitacoes, itens_de)
+    duracao = time.perf_counter() - inicio
+
+    # conta as colecoes novas devolvidas (objeto diferente do acesso anterior)
+    novas = [0, 0]
+    anterior = [None]
+
+    def contando(solicitacao):
+        colecao = itens_de(solicitacao)
+        if colecao is not anterior[0]:
+            novas[0] += 1
+            novas[1] += sys.getsizeof(colecao)
+            anterior[0] = colecao
+        return colecao
+
+    tracemalloc.start()
+    _relatorio(solicitacoes, contando)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "nome": nome,
+        "ms": round(duracao * 1000, 2),
+        "colecoes_criadas": novas[0],
+        "kib_alocados": round(novas[1] / 1024, 1),
+        "pico_kib": round(pico / 1024, 1),
+    }
+
+
+def comparar(quantidade: int, itens: int) -> List[Dict]:
+    solicitacoes = _solicitacoes(quantidade, itens)
+    copia = _medir("copia_por_acesso", solicitacoes, lambda s: s._itens.copy())
+    visao = _medir("visao_reaproveitada", solicitacoes, lambda s: s.itens)
+    visao["ganho_tempo"] = round(copia["ms"] / visao["ms"], 1) if visao["ms"] else None
+    return [copia, visao]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.alocacao_visoes")
+    parser.add_argument("--solicitacoes", type=int, default=200)
+    parser.add_argument("--itens", type=int, default=200)
+    args = parser.parse_args(argv)
+    print(json.dumps(comparar(args.solicitacoes, args.itens), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# micro benchmarks dos caminhos quentes do dominio e dos servicos
+
+import random
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from ecotech.application.cubo import CuboIndicadores
+from ecotech.application.metricas import RegistroMetricas
+from ecotech.application.roteirizacao import RoteirizadorColetas
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte, ServicoRelatorio, ServicoUsuario
+from ecotech.domain.descarte import ItemDescarte, PontoColeta, SolicitacaoDescarte
+from ecotech.domain.usuarios import Cidadao
+
+TIPOS = ("celular", "computador", "eletrodomestico")
+
+
+def _solicitacao_com_itens(cidadao: Cidadao, id: str, num_itens: int) -> SolicitacaoDescarte:
+    solicitacao = SolicitacaoDescarte(id, cidadao)
+    for i in range(num_itens):
+        dispositivo = DispositivoFactory.criar_dispositivo(
+            TIPOS[i % 3], {"id": f"{id}-{i}", "nome": "Dispositivo", "peso_kg": 0.5 + i % 7}
+        )
+        solicitacao.adicionar_item(ItemDescarte(dispositivo, 1 + i % 3))
+    return solicitacao
+
+
+def _solicitacoes_finalizadas(cidadao: Cidadao, quantidade: int, itens: int) -> List[SolicitacaoDescarte]:
+    metodos = [MetodoTratamentoFactory.criar_metodo(t) for t in ("reciclagem", "reuso", "descarte_controlado")]
+    solicitacoes = []
+    for i in range(quantidade):
+        solicitacao = _solicitacao_com_itens(cidadao, f"s{i}", itens)
+        solicitacao.metodo_tratamento = metodos[i % 3]
+        for _ in range(3):
+            solicitacao.avancar_estado()
+        solicitacoes.append(solicitacao)
+    return solicitacoes
+
+
+def _solicitacoes_pendentes(cidadao: Cidadao, quantidade: int, num_pontos: int) -> List[SolicitacaoDescarte]:
+    # pontos espalhados num raio de ~30 km, uma solicitacao pequena por vez
+    aleatorio = random.Random(42)
+    pontos = [
+        PontoColeta(f"p{i}", f"Ponto {i}", "Rua", -23.55 + aleatorio.uniform(-0.3, 0.3),
+                    -46.63 + aleatorio.uniform(-0.3, 0.3), capacidade_kg=1e9)
+        for i in range(num_pontos)
+    ]
+    solicitacoes = []
+    for i in range(quantidade):
+        solicitacao = SolicitacaoDescarte(f"r{i}", cidadao, aleatorio.choice(pontos))
+        dispositivo = DispositivoFactory.criar_dispositivo(
+            "celular", {"id": f"r{i}", "nome": "Dispositivo", "peso_kg": aleatorio.uniform(0.1, 3.0)}
+        )
+        solicitacao.adicionar_item(ItemDescarte(dispositivo))
+        solicitacoes.append(solicitacao)
+    return solicitacoes
+
+
+def cenarios(escala: int = 1) -> List[Tuple[str, Callable[[], object]]]:
+    # escala multiplica o tamanho dos dados (1 = rapido, para rodar no dia a dia)
+    cidadao = Cidadao("1", "João", "joao@test.com", "12345678901")
+
+    solicitacao = _solicitacao_com_itens(cidadao, "grande", 100 * escala)
+
+    finalizadas = _solicitacoes_finalizadas(cidadao, 500 * escala, 5)
+    servico_relatorio = ServicoRelatorio()
+
+    def gerar_relatorio():
+        return servico_relatorio.gerar_relatorio_periodo("bench", finalizadas).gerar_relatorio()
+
+    # mesma pergunta pelo cubo: custo nao depende do numero de solicitacoes
+    cubo = CuboIndicadores()
+    cubo.reconstruir(finalizadas)
+
+    def consultar_cubo():
+        return cubo.agregar(("metodo",), tipo="Celular")
+
+    servico_usuario = ServicoUsuario()
+    for i in range(1000 * escala):
+        servico_usuario.criar_usuario("cidadao", {
+            "nome": f"Usuario {i}",
+            "email": f"usuario{i}@example.com",
+            "cpf": "12345678901"
+        })
+    ultimo_email = f"usuario{1000 * escala - 1}@example.com"
+
+    servico_descarte = ServicoDescarte()
+
+    def criar_solicitacao():
+        return servico_descarte.criar_solicitacao(cidadao)
+
+    def criar_dispositivo():
+        return DispositivoFactory.criar_dispositivo(
+            "celular", {"id": "1", "nome": "iPhone", "peso_kg": 0.2}
+        )
+
+    # custo da instrumentacao: p50 deste cenario / 1000 = custo por evento (meta < 1us)
+    histograma = RegistroMetricas().histograma("bench", "bench", rotulos=("op",))
+    rotulos = ("bench",)
+
+    def observar_1000_eventos():
+        observar = histograma.observar
+        for _ in range(1000):
+            observar(0.001, rotulos)
+
+    pendentes = _solicitacoes_pendentes(cidadao, 5000 * escala, 500 * escala)
+    roteirizador = RoteirizadorColetas(-23.55, -46.63)
+
+    def planejar_rotas():
+        return roteirizador.planejar(pendentes, datetime(2026, 1, 5, 8), datetime(2026, 1, 5, 18))
+
+    return [
+        ("calcular_impacto_total", solicitacao.calcular_impacto_total),
+        ("gerar_relatorio", gerar_relatorio),
+        ("consultar_cubo", consultar_cubo),
+        ("autenticar_usuario", lambda: servico_usuario.autenticar_usuario(ultimo_email)),
+        ("criar_solicitacao", criar_solicitacao),
+        ("criar_dispositivo", criar_dispositivo),
+        ("metricas_1000_eventos", observar_1000_eventos),
+        ("planejar_rotas", planejar_rotas),
+    ]
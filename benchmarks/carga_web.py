@@ -0,0 +1,93 @@
+# gerador de carga em processo para as rotas do web.py
+# usa o test client do flask em varias threads, sem abrir porta de rede
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+from ecotech.infrastructure.web import criar_app
+
+from .medicao import resumir
+
+ROTAS_PADRAO = (
+    "/",
+    "/dashboard",
+    "/pontos-coleta",
+    "/nova-solicitacao",
+    "/ultimas-entregas",
+    "/relatorios",
+    "/api/solicitacoes",
+)
+
+
+@contextmanager
+def _ambiente_isolado(diretorio: str):
+    # a carga nunca le nem grava o estado real do shell: sem snapshot, sem
+    # arquivo e com as exportacoes num diretorio temporario
+    nomes = ("ECOTECH_SNAPSHOT", "ECOTECH_ARQUIVO", "ECOTECH_EXPORTACOES")
+    anteriores = {nome: os.environ.pop(nome, None) for nome in nomes}
+    os.environ["ECOTECH_EXPORTACOES"] = diretorio
+    try:
+        yield
+    finally:
+        for nome, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(nome, None)
+            else:
+                os.environ[nome] = valor
+
+
+def gerar_carga(
+    rotas: Iterable[str] = ROTAS_PADRAO,
+    num_threads: int = 4,
+    requisicoes_por_thread: int = 50
+) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="ecotech-carga-") as diretorio:
+        with _ambiente_isolado(diretorio):
+            app = criar_app()
+        try:
+            return _executar(app, rotas, num_threads, requisicoes_por_thread)
+        finally:
+            # fila, liquidacao e exportador param aqui, antes de o diretorio sumir
+            app.extensions["ecotech_desligar"]()
+
+
+def _executar(app, rotas: Iterable[str], num_threads: int, requisicoes_por_thread: int) -> List[Dict]:
+    # cada thread tem seu proprio cliente logado e percorre todas as rotas
+    rotas = list(rotas)
+    latencias: Dict[str, List[float]] = {rota: [] for rota in rotas}
+    falhas: List[str] = []
+    lock = threading.Lock()
+
+    def trabalhar():
+        cliente = app.test_client()
+        cliente.post("/login", data={"tipo": "cidadao"})
+        locais: Dict[str, List[float]] = {rota: [] for rota in rotas}
+        for _ in range(requisicoes_por_thread):
+            for rota in rotas:
+                antes = time.perf_counter()
+                resposta = cliente.get(rota)
+                locais[rota].append(time.perf_counter() - antes)
+                if resposta.status_code >= 400:
+                    with lock:
+                        falhas.append(f"{rota}: {resposta.status_code}")
+        with lock:
+            for rota, valores in locais.items():
+                latencias[rota].extend(valores)
+
+    threads = [threading.Thread(target=trabalhar) for _ in range(num_threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    if falhas:
+        raise RuntimeError(f"rotas com erro durante a carga: {sorted(set(falhas))}")
+
+    # a vazao por rota considera a duracao total do teste
+    return [resumir(f"web {rota}", valores, duracao) for rota, valores in latencias.items()]
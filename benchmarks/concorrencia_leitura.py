@@ -0,0 +1,128 @@
+"""
+Vazao de leitura com escritas concorrentes: MapaVersionado (copy-on-write,
+leitores sem lock) contra um dict protegido por um lock global.
+
+Uso:
+    python -m benchmarks.concorrencia_leitura                 # 4 leitores, 1 escritor, 2 s
+    python -m benchmarks.concorrencia_leitura --leitores 8 --segundos 5
+    python -m benchmarks.concorrencia_leitura --escritas 0   # escritor sem pausa (pior caso)
+
+Cada leitor alterna buscas por id e listagens completas (como listar_usuarios
+e autenticar_usuario); o escritor insere e remove no ritmo pedido (--escritas
+por segundo, 1000 por padrao: nos servicos leitura e bem mais comum). Imprime
+leituras por segundo de cada lado, escritas por segundo e se algum leitor
+pegou "dictionary changed size during iteration".
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from ecotech.application.concorrencia import MapaVersionado
+
+
+class MapaComLock:
+    # o jeito simples: toda leitura e escrita passam pelo mesmo lock
+
+    def __init__(self, inicial: Dict):
+        self._dados = dict(inicial)
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            return self._dados.get(chave, padrao)
+
+    def values(self):
+        with self._lock:
+            return list(self._dados.values())
+
+    def __setitem__(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = valor
+
+    def pop(self, chave, padrao=None):
+        with self._lock:
+            return self._dados.pop(chave, padrao)
+
+
+def _rodar(mapa, tamanho: int, leitores: int, segundos: float, ritmo: float) -> Dict:
+    parar = threading.Event()
+    leituras = [0] * leitores
+    erros: List[str] = []
+    escritas = [0]
+
+    def ler(indice: int):
+        feitas = 0
+        chave = indice
+        try:
+            while not parar.is_set():
+                for _ in range(50):
+                    mapa.get(f"u{chave % tamanho}")
+                    chave += 7
+                feitas += 50
+                # uma listagem completa a cada 50 buscas (conta como uma leitura)
+                sum(1 for _ in mapa.values())
+                feitas += 1
+        except RuntimeError as erro:
+            erros.append(str(erro))
+        leituras[indice] = feitas
+
+    def escrever():
+        i = 0
+        inicio = time.perf_counter()
+        while not parar.is_set():
+            mapa[f"novo{i}"] = i
+            if i >= 100:
+                mapa.pop(f"novo{i - 100}", None)
+            i += 1
+            if ritmo:
+                # dorme o que falta para manter o ritmo
+                atraso = inicio + i / ritmo - time.perf_counter()
+                if atraso > 0:
+                    parar.wait(atraso)
+        escritas[0] = i
+
+    threads = [threading.Thread(target=ler, args=(i,)) for i in range(leitores)]
+    threads.append(threading.Thread(target=escrever))
+    for thread in threads:
+        thread.start()
+    time.sleep(segundos)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "leituras_por_segundo": round(sum(leituras) / segundos),
+        "escritas_por_segundo": round(escritas[0] / segundos),
+        "erros_de_iteracao": len(erros),
+    }
+
+
+def comparar(tamanho: int, leitores: int, segundos: float, ritmo: float = 1000) -> List[Dict]:
+    inicial = {f"u{i}": i for i in range(tamanho)}
+    resultados = []
+    for nome, mapa in (("lock_global", MapaComLock(inicial)), ("copy_on_write", MapaVersionado(inicial))):
+        resultado = _rodar(mapa, tamanho, leitores, segundos, ritmo)
+        resultado["nome"] = nome
+        resultados.append(resultado)
+    base = resultados[0]["leituras_por_segundo"]
+    resultados[1]["ganho_leitura"] = round(resultados[1]["leituras_por_segundo"] / base, 2) if base else None
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.concorrencia_leitura")
+    parser.add_argument("--tamanho", type=int, default=1000)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=2.0)
+    parser.add_argument("--escritas", type=float, default=1000, help="escritas por segundo (0 = sem pausa)")
+    args = parser.parse_args(argv)
+    resultados = comparar(args.tamanho, args.leitores, args.segundos, args.escritas)
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# utilitarios de medicao usados pelos benchmarks
+# mede latencia por chamada, calcula percentis e compara com um baseline salvo em json
+
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def percentil(valores: List[float], p: float) -> float:
+    # percentil por interpolacao linear (valores ja ordenados)
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores) - 1)
+    fracao = posicao - inferior
+    return valores[inferior] + (valores[superior] - valores[inferior]) * fracao
+
+
+def resumir(nome: str, latencias: List[float], duracao_total: float) -> Dict:
+    # latencias em segundos -> resumo em microssegundos
+    latencias = sorted(latencias)
+    return {
+        "nome": nome,
+        "execucoes": len(latencias),
+        "ops_por_segundo": round(len(latencias) / duracao_total, 1) if duracao_total else 0.0,
+        "p50_us": round(percentil(latencias, 50) * 1e6, 2),
+        "p95_us": round(percentil(latencias, 95) * 1e6, 2),
+        "p99_us": round(percentil(latencias, 99) * 1e6, 2),
+    }
+
+
+def medir(
+    nome: str,
+    funcao: Callable[[], object],
+    repeticoes: int = 200,
+    aquecimento: int = 10
+) -> Dict:
+    # executa a funcao varias vezes medindo cada chamada
+    for _ in range(aquecimento):
+        funcao()
+
+    relogio = time.perf_counter
+    latencias = []
+    inicio = relogio()
+    for _ in range(repeticoes):
+        antes = relogio()
+        funcao()
+        latencias.append(relogio() - antes)
+    return resumir(nome, latencias, relogio() - inicio)
+
+
+def carregar_baseline(caminho: str) -> Optional[Dict[str, Dict]]:
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+    except FileNotFoundError:
+        return None
+    return {resultado["nome"]: resultado for resultado in dados["resultados"]}
+
+
+def salvar_baseline(caminho: str, resultados: List[Dict]):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump({"resultados": resultados}, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+
+
+def comparar(
+    resultados: List[Dict],
+    baseline: Dict[str, Dict],
+    limite: float = 0.25
+) -> List[str]:
+    # retorna a lista de regressoes maiores que o limite (0.25 = 25%)
+    # usa p50 e vazao, que oscilam bem menos que p99 entre execucoes
+    regressoes = []
+    for resultado in resultados:
+        anterior = baseline.get(resultado["nome"])
+        if anterior is None:
+            continue
+        if anterior["p50_us"] and resultado["p50_us"] > anterior["p50_us"] * (1 + limite):
+            regressoes.append(
+                f"{resultado['nome']}: p50 {anterior['p50_us']}us -> {resultado['p50_us']}us"
+            )
+        if resultado["ops_por_segundo"] < anterior["ops_por_segundo"] * (1 - limite):
+            regressoes.append(
+                f"{resultado['nome']}: vazao {anterior['ops_por_segundo']} -> "
+                f"{resultado['ops_por_segundo']} ops/s"
+            )
+    return regressoes
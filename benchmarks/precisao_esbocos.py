@@ -0,0 +1,97 @@
+"""
+Compara os esbocos (ecotech.application.esbocos) com as respostas exatas.
+
+Uso:
+    python -m benchmarks.precisao_esbocos                  # 200 mil solicitacoes
+    python -m benchmarks.precisao_esbocos --quantidade 1000000
+
+Para cada pergunta do painel (usuarios distintos, quantis de peso, pontos
+mais usados) imprime o valor exato, o aproximado, o erro e o tempo de
+consulta de cada lado. O exato guarda todos os valores; o esboco, memoria fixa.
+"""
+
+import argparse
+import bisect
+import json
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+from ecotech.application.esbocos import CountMin, HyperLogLog, KLL, SpaceSaving
+
+
+def _cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, round((time.perf_counter() - inicio) * 1e6, 1)
+
+
+def comparar(quantidade: int, semente: int = 42) -> List[Dict]:
+    # fluxo sintetico: usuarios com repeticao, pesos com cauda longa e pontos
+    # com popularidade de Pareto (poucos pontos recebem muito)
+    aleatorio = random.Random(semente)
+    usuarios = [f"u{aleatorio.randrange(quantidade // 3)}" for _ in range(quantidade)]
+    pesos = [aleatorio.lognormvariate(0.5, 1.0) for _ in range(quantidade)]
+    pontos = [f"p{min(int(aleatorio.paretovariate(1.1)), 5000)}" for _ in range(quantidade)]
+
+    hll, kll, cm, ss = HyperLogLog(), KLL(aleatorio=random.Random(semente)), CountMin(), SpaceSaving(64)
+    for usuario, peso, ponto in zip(usuarios, pesos, pontos):
+        hll.adicionar(usuario)
+        kll.adicionar(peso)
+        cm.adicionar(ponto)
+        ss.adicionar(ponto)
+
+    resultados = []
+
+    exato, t_exato = _cronometrar(lambda: len(set(usuarios)))
+    aproximado, t_aprox = _cronometrar(hll.estimar)
+    resultados.append({
+        "pergunta": "usuarios_distintos",
+        "exato": exato,
+        "aproximado": aproximado,
+        "erro_relativo": round(abs(aproximado - exato) / exato, 5),
+        "limite_erro_3_desvios": round(3 * hll.erro_padrao, 5),
+        "us_exato": t_exato,
+        "us_aproximado": t_aprox,
+    })
+
+    ordenados, t_ordenar = _cronometrar(lambda: sorted(pesos))
+    for q in (0.5, 0.9, 0.99):
+        aproximado, t_aprox = _cronometrar(lambda: kll.quantil(q))
+        resultados.append({
+            "pergunta": f"peso_p{int(q * 100)}",
+            "exato": round(ordenados[int(q * (len(ordenados) - 1))], 4),
+            "aproximado": round(aproximado, 4),
+            "erro_rank": round(abs(bisect.bisect_right(ordenados, aproximado) / len(ordenados) - q), 5),
+            "limite_erro_rank": 0.0165,
+            "us_exato": t_ordenar,
+            "us_aproximado": t_aprox,
+        })
+
+    contagem, t_exato = _cronometrar(lambda: Counter(pontos).most_common(5))
+    top, t_aprox = _cronometrar(lambda: ss.mais_frequentes(5))
+    resultados.append({
+        "pergunta": "top5_pontos",
+        "exato": contagem,
+        "aproximado": [(ponto, estimado) for ponto, estimado, _ in top],
+        "erro_maximo_space_saving": quantidade // 64,
+        "erro_maximo_count_min": max(cm.estimar(ponto) - exato for ponto, exato in contagem),
+        "us_exato": t_exato,
+        "us_aproximado": t_aprox,
+    })
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.precisao_esbocos")
+    parser.add_argument("--quantidade", type=int, default=200000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+    print(json.dumps(comparar(args.quantidade, args.semente), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# camada fria das solicitacoes
+# solicitacoes em estado final (Reciclado, Reutilizado, Descartado, Cancelado)
+# nunca mais mudam; depois de uma idade configuravel saem do dicionario do
+# ServicoDescarte e vao para segmentos so de acrescimo em disco, em blocos
+# comprimidos. um indice em memoria (id -> bloco) permite buscar pelo id, e os
+# relatorios podem percorrer o arquivo inteiro
+#
+# formato de um segmento (segmento-000001.arq): uma sequencia de blocos
+#   cabecalho: MAGICO, quantidade, tamanho dos ids, tamanho do corpo, crc32 do corpo
+#   ids:       ids do bloco separados por \n (sem comprimir, para reabrir rapido)
+#   corpo:     zlib(pickle de {"solicitacoes": [...], "terminadas": [...]}), com a
+#              data em que cada solicitacao chegou ao estado final (blocos
+#              antigos guardam so a lista de solicitacoes)
+#
+# usuarios e pontos de coleta vao no corpo so pelo id (persistent_id do
+# pickle): na leitura eles sao buscados nos servicos vivos, entao uma
+# solicitacao arquivada aponta para o mesmo usuario/ponto das ativas, e o
+# bloco nao cresce com o historico de notificacoes de cada usuario
+#
+# o corpo e um pickle, entao so abra arquivos gravados pelo proprio sistema
+
+import io
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..domain.descarte import PontoColeta, SolicitacaoDescarte
+from ..domain.usuarios import Usuario
+
+MAGICO = b"ECOARQ01"
+TAMANHO_SEGMENTO = 64 * 1024 * 1024
+BLOCOS_EM_CACHE = 8
+
+# magico, quantidade, tamanho dos ids, tamanho do corpo, crc32 do corpo
+_CABECALHO = struct.Struct("<8sIIQI")
+
+
+def estado_final(solicitacao: SolicitacaoDescarte) -> bool:
+    estado = solicitacao.estado
+    return not estado.pode_avancar() and not estado.pode_cancelar()
+
+
+class _Gravador(pickle.Pickler):
+    # usuarios e pontos viram referencias ("usuario", id) / ("ponto", id)
+
+    def persistent_id(self, objeto):
+        if isinstance(objeto, Usuario):
+            return ("usuario", objeto.id)
+        if isinstance(objeto, PontoColeta):
+            return ("ponto", objeto.id)
+        return None
+
+
+class _Leitor(pickle.Unpickler):
+
+    def __init__(self, arquivo, resolver: Callable[[str, str], object]):
+        super().__init__(arquivo)
+        self._resolver = resolver
+
+    def persistent_load(self, referencia):
+        tipo, id = referencia
+        return self._resolver(tipo, id)
+
+
+class ArquivoSolicitacoes:
+    # buscar_usuario/buscar_ponto resolvem as referencias na leitura
+    # (normalmente ServicoUsuario.buscar_usuario e ServicoPontoColeta.buscar_ponto)
+
+    def __init__(
+        self,
+        diretorio: str,
+        tamanho_segmento: int = TAMANHO_SEGMENTO,
+        blocos_em_cache: int = BLOCOS_EM_CACHE,
+        buscar_usuario: Optional[Callable[[str], Optional[Usuario]]] = None,
+        buscar_ponto: Optional[Callable[[str], Optional[PontoColeta]]] = None
+    ):
+        self._diretorio = diretorio
+        self._buscar = {"usuario": buscar_usuario, "ponto": buscar_ponto}
+        self._tamanho_segmento = tamanho_segmento
+        self._blocos_em_cache = blocos_em_cache
+        # id -> (segmento, posicao do bloco, posicao dentro do bloco)
+        self._indice: Dict[str, Tuple[int, int, int]] = {}
+        self._blocos: List[Tuple[int, int]] = []  # (segmento, posicao) em ordem de gravacao
+        # blocos lidos: (solicitacoes, data de termino de cada uma)
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[List, List]]" = OrderedDict()
+        self._segmento_atual = 0
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        self._reabrir()
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._indice
+
+    def _resolver(self, tipo: str, id: str):
+        buscar = self._buscar.get(tipo)
+        objeto = buscar(id) if buscar is not None else None
+        if objeto is None:
+            raise ValueError(f"{tipo} {id} do arquivo nao encontrado")
+        return objeto
+
+    def _caminho(self, segmento: int) -> str:
+        return os.path.join(self._diretorio, f"segmento-{segmento:06d}.arq")
+
+    def _reabrir(self):
+        # reconstroi o indice lendo so os cabecalhos e ids de cada bloco;
+        # um bloco cortado no fim (queda no meio da gravacao) e descartado
+        segmentos = sorted(
+            int(nome[9:15]) for nome in os.listdir(self._diretorio)
+            if nome.startswith("segmento-") and nome.endswith(".arq")
+        )
+        for segmento in segmentos:
+            caminho = self._caminho(segmento)
+            with open(caminho, "rb") as arquivo:
+                posicao = 0
+                while True:
+                    cabecalho = arquivo.read(_CABECALHO.size)
+                    if len(cabecalho) < _CABECALHO.size:
+                        break
+                    magico, quantidade, tamanho_ids, tamanho_corpo, _ = _CABECALHO.unpack(cabecalho)
+                    ids = arquivo.read(tamanho_ids)
+                    fim = posicao + _CABECALHO.size + tamanho_ids + tamanho_corpo
+                    if magico != MAGICO or len(ids) < tamanho_ids or fim > os.path.getsize(caminho):
+                        break
+                    for ordem, id in enumerate(ids.decode("utf-8").split("\n")[:quantidade]):
+                        self._indice[id] = (segmento, posicao, ordem)
+                    self._blocos.append((segmento, posicao))
+                    arquivo.seek(fim)
+                    posicao = fim
+            if posicao < os.path.getsize(caminho):
+                with open(caminho, "r+b") as arquivo:
+                    arquivo.truncate(posicao)
+        self._segmento_atual = segmentos[-1] if segmentos else 1
+
+    # ----- escrita -----
+
+    def arquivar(
+        self,
+        solicitacoes: List[SolicitacaoDescarte],
+        terminadas: Optional[Dict[str, datetime]] = None
+    ) -> int:
+        # grava as solicitacoes num bloco novo; so depois do fsync elas entram
+        # no indice (quem chama so deve tirar da memoria depois do retorno)
+        # 'terminadas' e quando cada uma chegou ao estado final (id -> data)
+        novas = [s for s in solicitacoes if s.id not in self._indice]
+        if not novas:
+            return 0
+        terminadas = terminadas or {}
+        ids = "\n".join(s.id for s in novas).encode("utf-8")
+        conteudo = {"solicitacoes": novas, "terminadas": [terminadas.get(s.id) for s in novas]}
+        serializado = io.BytesIO()
+        _Gravador(serializado, protocol=5).dump(conteudo)
+        corpo = zlib.compress(serializado.getbuffer(), 6)
+        bloco = _CABECALHO.pack(MAGICO, len(novas), len(ids), len(corpo), zlib.crc32(corpo)) + ids + corpo
+
+        with self._lock:
+            caminho = self._caminho(self._segmento_atual)
+            if os.path.exists(caminho) and os.path.getsize(caminho) >= self._tamanho_segmento:
+                self._segmento_atual += 1
+                caminho = self._caminho(self._segmento_atual)
+            with open(caminho, "ab") as arquivo:
+                posicao = arquivo.tell()
+                arquivo.write(bloco)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            for ordem, solicitacao in enumerate(novas):
+                self._indice[solicitacao.id] = (self._segmento_atual, posicao, ordem)
+            self._blocos.append((self._segmento_atual, posicao))
+        return len(novas)
+
+    # ----- leitura -----
+
+    def _ler_bloco(self, segmento: int, posicao: int) -> Tuple[List[SolicitacaoDescarte], List]:
+        # chamado com o lock; os blocos lidos por ultimo ficam em cache
+        chave = (segmento, posicao)
+        bloco = self._cache.get(chave)
+        if bloco is not None:
+            self._cache.move_to_end(chave)
+            return bloco
+        with open(self._caminho(segmento), "rb") as arquivo:
+            arquivo.seek(posicao)
+            _, _, tamanho_ids, tamanho_corpo, crc = _CABECALHO.unpack(arquivo.read(_CABECALHO.size))
+            arquivo.seek(tamanho_ids, os.SEEK_CUR)
+            corpo = arquivo.read(tamanho_corpo)
+        if zlib.crc32(corpo) != crc:
+            raise ValueError(f"bloco corrompido no segmento {segmento}")
+        conteudo = _Leitor(io.BytesIO(zlib.decompress(corpo)), self._resolver).load()
+        if isinstance(conteudo, list):
+            # bloco gravado antes das datas de termino
+            bloco = (conteudo, [None] * len(conteudo))
+        else:
+            bloco = (conteudo["solicitacoes"], conteudo["terminadas"])
+        self._cache[chave] = bloco
+        if len(self._cache) > self._blocos_em_cache:
+            self._cache.popitem(last=False)
+        return bloco
+
+    def obter(self, id: str) -> Optional[SolicitacaoDescarte]:
+        with self._lock:
+            local = self._indice.get(id)
+            if local is None:
+                return None
+            segmento, posicao, ordem = local
+            return self._ler_bloco(segmento, posicao)[0][ordem]
+
+    def data_termino(self, id: str) -> Optional[datetime]:
+        # quando a solicitacao arquivada chegou ao estado final (None em blocos antigos)
+        with self._lock:
+            local = self._indice.get(id)
+            if local is None:
+                return None
+            segmento, posicao, ordem = local
+            return self._ler_bloco(segmento, posicao)[1][ordem]
+
+    def iterar(self) -> Iterator[SolicitacaoDescarte]:
+        # todas as arquivadas, na ordem em que foram arquivadas, um bloco por vez
+        with self._lock:
+            blocos = list(self._blocos)
+        for segmento, posicao in blocos:
+            with self._lock:
+                bloco, _ = self._ler_bloco(segmento, posicao)
+            yield from bloco
+
+
+class ArquivamentoPeriodico:
+    # thread que tira do servico, de tempos em tempos, as solicitacoes em
+    # estado final ha mais de 'idade'
+
+    def __init__(self, servico_descarte, idade: timedelta, intervalo_segundos: float = 300.0):
+        self._servico_descarte = servico_descarte
+        self._idade = idade
+        self._intervalo = intervalo_segundos
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="ecotech-arquivamento", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _executar(self):
+        while not self._parar.wait(self._intervalo):
+            self._servico_descarte.arquivar_terminadas(self._idade)
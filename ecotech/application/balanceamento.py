@@ -0,0 +1,151 @@
+# escolha automatica do ponto de coleta para novas solicitacoes
+# mantem uma fila de prioridade dos pontos por capacidade livre, atualizada
+# pelos proprios pontos (observer) a cada mudanca de ocupacao, e pesa a
+# distancia ate o usuario contra a disponibilidade de cada ponto
+#
+# para nao mandar uma rajada inteira para o mesmo ponto, a escolha final e
+# feita entre dois candidatos sorteados dos melhores ("power of two choices")
+
+import heapq
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..domain.descarte import PontoColeta
+from .roteirizacao import distancia_km
+
+
+class BalanceadorPontos:
+
+    def __init__(
+        self,
+        num_candidatos: int = 5,
+        peso_ocupacao: float = 1.0,
+        raio_maximo_km: Optional[float] = None,
+        aleatorio: Optional[random.Random] = None
+    ):
+        # num_candidatos: quantos pontos entram no sorteio
+        # peso_ocupacao: quanto um ponto cheio "parece" mais longe
+        #   (custo = distancia * (1 + peso_ocupacao * fracao ocupada))
+        if num_candidatos < 1:
+            raise ValueError("numero de candidatos deve ser positivo")
+        self._num_candidatos = num_candidatos
+        self._peso_ocupacao = peso_ocupacao
+        self._raio_maximo_km = raio_maximo_km
+        self._aleatorio = aleatorio or random.Random()
+        self._pontos: Dict[str, PontoColeta] = {}
+        # heap de (-kg livre, versao, id); entradas com versao antiga sao ignoradas
+        self._heap: List[Tuple[float, int, str]] = []
+        self._versoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def adicionar_ponto(self, ponto: PontoColeta):
+        with self._lock:
+            self._pontos[ponto.id] = ponto
+            self._atualizar(ponto)
+        ponto.adicionar_observador(self._ao_mudar_ocupacao)
+
+    def remover_ponto(self, ponto: PontoColeta):
+        ponto.remover_observador(self._ao_mudar_ocupacao)
+        with self._lock:
+            self._pontos.pop(ponto.id, None)
+            self._versoes.pop(ponto.id, None)
+
+    def limpar(self):
+        for ponto in list(self._pontos.values()):
+            self.remover_ponto(ponto)
+        with self._lock:
+            self._heap = []
+
+    def _ao_mudar_ocupacao(self, ponto: PontoColeta):
+        with self._lock:
+            if ponto.id in self._pontos:
+                self._atualizar(ponto)
+
+    def _atualizar(self, ponto: PontoColeta):
+        # chamado com o lock; a entrada anterior do ponto fica obsoleta no heap
+        versao = self._versoes.get(ponto.id, 0) + 1
+        self._versoes[ponto.id] = versao
+        livre = ponto.capacidade_kg - ponto.ocupacao_atual_kg
+        heapq.heappush(self._heap, (-livre, versao, ponto.id))
+        if len(self._heap) > 2 * len(self._pontos) + 64:
+            self._compactar()
+
+    def _compactar(self):
+        self._heap = [
+            entrada for entrada in self._heap
+            if self._versoes.get(entrada[2]) == entrada[1]
+        ]
+        heapq.heapify(self._heap)
+
+    def mais_livres(self, quantidade: int, peso_minimo_kg: float = 0.0) -> List[PontoColeta]:
+        # pontos com mais kg livres, do mais livre para o menos livre, parando no
+        # primeiro que nao tem peso_minimo_kg livres. tira do heap so o necessario
+        # (descartando entradas obsoletas pelo caminho) e devolve as validas
+        pontos: List[PontoColeta] = []
+        with self._lock:
+            retiradas = []
+            while self._heap and len(pontos) < quantidade:
+                entrada = heapq.heappop(self._heap)
+                _, versao, id = entrada
+                if self._versoes.get(id) != versao:
+                    continue
+                retiradas.append(entrada)
+                if -entrada[0] < peso_minimo_kg:
+                    break
+                pontos.append(self._pontos[id])
+            for entrada in retiradas:
+                heapq.heappush(self._heap, entrada)
+        return pontos
+
+    def escolher(
+        self,
+        peso_kg: float,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> Optional[PontoColeta]:
+        # sem coordenadas do usuario: sorteia entre os pontos com mais espaco livre
+        # com coordenadas: sorteia entre os mais proximos que comportam o peso,
+        # ficando com o de menor custo distancia x ocupacao
+        if latitude is None or longitude is None:
+            candidatos = self._mais_livres_que_comportam(peso_kg)
+            custos = {ponto.id: -(ponto.capacidade_kg - ponto.ocupacao_atual_kg) for ponto in candidatos}
+        else:
+            candidatos, custos = self._mais_proximos_que_comportam(peso_kg, latitude, longitude)
+
+        if not candidatos:
+            return None
+        if len(candidatos) == 1:
+            return candidatos[0]
+        a, b = self._aleatorio.sample(candidatos, 2)
+        return a if custos[a.id] <= custos[b.id] else b
+
+    def _mais_livres_que_comportam(self, peso_kg: float) -> List[PontoColeta]:
+        # pontos inativos ficam no heap; por isso pede alguns a mais e filtra
+        livres = self.mais_livres(2 * self._num_candidatos, peso_kg)
+        return [ponto for ponto in livres if ponto.pode_receber(peso_kg)][:self._num_candidatos]
+
+    def _mais_proximos_que_comportam(
+        self,
+        peso_kg: float,
+        latitude: float,
+        longitude: float
+    ) -> Tuple[List[PontoColeta], Dict[str, float]]:
+        with self._lock:
+            pontos = list(self._pontos.values())
+        distancias = []
+        for ponto in pontos:
+            if not ponto.pode_receber(peso_kg):
+                continue
+            distancia = distancia_km(latitude, longitude, ponto.latitude, ponto.longitude)
+            if self._raio_maximo_km is not None and distancia > self._raio_maximo_km:
+                continue
+            distancias.append((distancia, ponto.id, ponto))
+        proximos = heapq.nsmallest(self._num_candidatos, distancias)
+
+        custos = {}
+        for distancia, _, ponto in proximos:
+            ocupado = ponto.ocupacao_atual_kg / ponto.capacidade_kg if ponto.capacidade_kg else 1.0
+            # 100 m de piso para um ponto "na porta" nao ignorar a ocupacao
+            custos[ponto.id] = max(distancia, 0.1) * (1 + self._peso_ocupacao * ocupado)
+        return [ponto for _, _, ponto in proximos], custos
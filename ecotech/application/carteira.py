@@ -0,0 +1,310 @@
+# carteira dos usuarios: incentivo em dinheiro por entrega concluida
+# o valor de cada solicitacao vem do valor de revenda dos dispositivos;
+# as entregas concluidas esperam numa fila e sao liquidadas em lotes
+# (cada solicitacao so e paga uma vez, mesmo que a liquidacao rode de novo)
+#
+# o historico fica indexado por usuario em ordem de liquidacao, entao uma
+# pagina do historico custa o tamanho da pagina, nao o total de entregas
+#
+# valores e saldos sao centavos inteiros; valor/saldo/total em reais (Decimal)
+# so existem para a apresentacao
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.dinheiro import para_reais, somar_centavos
+from ..domain.estados import Cancelado, EstadoDescarte, Reciclado, Reutilizado
+
+logger = logging.getLogger(__name__)
+
+STATUS_FINALIZADO = "finalizado"
+STATUS_CANCELADO = "cancelado"
+MAX_LIQUIDACOES_GUARDADAS = 1000
+
+
+def calcular_valor_solicitacao_centavos(solicitacao: SolicitacaoDescarte) -> int:
+    # soma do valor de revenda de cada item (vezes a quantidade)
+    return somar_centavos(
+        item.dispositivo.calcular_valor_revenda_centavos() * item.quantidade
+        for item in solicitacao.itens
+    )
+
+
+def calcular_valor_solicitacao(solicitacao: SolicitacaoDescarte) -> Decimal:
+    return para_reais(calcular_valor_solicitacao_centavos(solicitacao))
+
+
+class Entrega:
+    # uma linha do historico de entregas do usuario
+
+    def __init__(
+        self,
+        id_solicitacao: str,
+        id_usuario: str,
+        valor_centavos: int,
+        local: str,
+        status: str,
+        data: datetime
+    ):
+        self._id_solicitacao = id_solicitacao
+        self._id_usuario = id_usuario
+        self._valor_centavos = valor_centavos
+        self._local = local
+        self._status = status
+        self._data = data
+
+    @property
+    def id_solicitacao(self) -> str:
+        return self._id_solicitacao
+
+    @property
+    def id_usuario(self) -> str:
+        return self._id_usuario
+
+    @property
+    def valor_centavos(self) -> int:
+        return self._valor_centavos
+
+    @property
+    def valor(self) -> Decimal:
+        return para_reais(self._valor_centavos)
+
+    @property
+    def local(self) -> str:
+        return self._local
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def data(self) -> datetime:
+        return self._data
+
+
+class PaginaEntregas:
+
+    def __init__(self, entregas: List[Entrega], pagina: int, por_pagina: int, total: int):
+        self._entregas = entregas
+        self._pagina = pagina
+        self._por_pagina = por_pagina
+        self._total = total
+
+    @property
+    def entregas(self) -> List[Entrega]:
+        return self._entregas
+
+    @property
+    def pagina(self) -> int:
+        return self._pagina
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def tem_anterior(self) -> bool:
+        return self._pagina > 1
+
+    @property
+    def tem_proxima(self) -> bool:
+        return self._pagina * self._por_pagina < self._total
+
+
+class Liquidacao:
+    # resultado de uma rodada de liquidacao
+
+    def __init__(self, id: str, quantidade: int, total_centavos: int):
+        self._id = id
+        self._quantidade = quantidade
+        self._total_centavos = total_centavos
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def quantidade(self) -> int:
+        return self._quantidade
+
+    @property
+    def total_centavos(self) -> int:
+        return self._total_centavos
+
+    @property
+    def total(self) -> Decimal:
+        return para_reais(self._total_centavos)
+
+
+class Carteira:
+
+    def __init__(self, tamanho_lote: int = 256):
+        self._tamanho_lote = tamanho_lote
+        self._saldos: Dict[str, int] = {}  # centavos
+        self._historico: Dict[str, List[Entrega]] = {}  # por usuario, em ordem de liquidacao
+        self._liquidadas: Dict[str, str] = {}  # id da solicitacao -> id da liquidacao
+        # ultimas liquidacoes feitas, pelo id (para repetir uma rodada sem pagar de novo)
+        self._execucoes: "OrderedDict[str, Liquidacao]" = OrderedDict()
+        self._pendentes: List[Entrega] = []
+        self._lock = threading.Lock()
+
+    # ----- entrada -----
+
+    def ao_transicionar(
+        self,
+        solicitacao: SolicitacaoDescarte,
+        anterior: EstadoDescarte,
+        novo: EstadoDescarte
+    ):
+        # observador do ServicoDescarte: entrega paga na conclusao com aproveitamento,
+        # cancelamentos entram no historico sem valor creditado
+        if isinstance(novo, (Reciclado, Reutilizado)):
+            status = STATUS_FINALIZADO
+        elif isinstance(novo, Cancelado):
+            status = STATUS_CANCELADO
+        else:
+            return
+        ponto = solicitacao.ponto_coleta
+        self.agendar(Entrega(
+            solicitacao.id,
+            solicitacao.usuario.id,
+            calcular_valor_solicitacao_centavos(solicitacao),
+            ponto.nome if ponto else "",
+            status,
+            datetime.now()
+        ))
+
+    def agendar(self, entrega: Entrega):
+        with self._lock:
+            self._pendentes.append(entrega)
+            if len(self._pendentes) >= self._tamanho_lote:
+                self._liquidar(str(uuid.uuid4()))
+
+    def liquidar(self, id_liquidacao: Optional[str] = None) -> Liquidacao:
+        # liquida tudo o que esta pendente; repetir o mesmo id devolve o resultado anterior
+        with self._lock:
+            if id_liquidacao is not None and id_liquidacao in self._execucoes:
+                return self._execucoes[id_liquidacao]
+            return self._liquidar(id_liquidacao or str(uuid.uuid4()))
+
+    def _liquidar(self, id_liquidacao: str) -> Liquidacao:
+        # chamado com o lock
+        pendentes, self._pendentes = self._pendentes, []
+        quantidade = 0
+        total = 0
+        for entrega in pendentes:
+            if entrega.id_solicitacao in self._liquidadas:
+                continue
+            self._liquidadas[entrega.id_solicitacao] = id_liquidacao
+            self._historico.setdefault(entrega.id_usuario, []).append(entrega)
+            if entrega.status == STATUS_FINALIZADO:
+                self._saldos[entrega.id_usuario] = self._saldos.get(entrega.id_usuario, 0) + entrega.valor_centavos
+                total += entrega.valor_centavos
+            quantidade += 1
+        liquidacao = Liquidacao(id_liquidacao, quantidade, total)
+        self._execucoes[id_liquidacao] = liquidacao
+        if len(self._execucoes) > MAX_LIQUIDACOES_GUARDADAS:
+            self._execucoes.popitem(last=False)
+        return liquidacao
+
+    # ----- leitura -----
+
+    def saldo_centavos(self, id_usuario: str) -> int:
+        with self._lock:
+            return self._saldos.get(id_usuario, 0)
+
+    def saldo(self, id_usuario: str) -> Decimal:
+        return para_reais(self.saldo_centavos(id_usuario))
+
+    def pendentes(self) -> int:
+        with self._lock:
+            return len(self._pendentes)
+
+    def listar_pendentes(self, id_usuario: str) -> List[Entrega]:
+        # entregas do usuario que ainda esperam a liquidacao, da mais recente
+        # para a mais antiga; so leitura (a fila tem no maximo tamanho_lote itens)
+        with self._lock:
+            return [
+                entrega for entrega in reversed(self._pendentes)
+                if entrega.id_usuario == id_usuario and entrega.id_solicitacao not in self._liquidadas
+            ]
+
+    def saldo_pendente_centavos(self, id_usuario: str) -> int:
+        # quanto o usuario ainda vai receber na proxima liquidacao
+        return sum(
+            entrega.valor_centavos for entrega in self.listar_pendentes(id_usuario)
+            if entrega.status == STATUS_FINALIZADO
+        )
+
+    def listar_entregas(self, id_usuario: str, pagina: int = 1, por_pagina: int = 20) -> PaginaEntregas:
+        # historico do mais recente para o mais antigo
+        if pagina < 1 or por_pagina < 1:
+            raise ValueError("pagina invalida")
+        with self._lock:
+            historico = self._historico.get(id_usuario, [])
+            total = len(historico)
+            fim = total - (pagina - 1) * por_pagina
+            inicio = max(0, fim - por_pagina)
+            entregas = historico[inicio:fim][::-1] if fim > 0 else []
+        return PaginaEntregas(entregas, pagina, por_pagina, total)
+
+    # ----- snapshot -----
+
+    def exportar_estado(self) -> Dict:
+        with self._lock:
+            return {
+                "saldos": dict(self._saldos),
+                "historico": {id: list(entregas) for id, entregas in self._historico.items()},
+                "liquidadas": dict(self._liquidadas),
+                "pendentes": list(self._pendentes),
+            }
+
+    def importar_estado(self, estado: Dict):
+        with self._lock:
+            self._saldos = dict(estado["saldos"])
+            self._historico = {id: list(entregas) for id, entregas in estado["historico"].items()}
+            self._liquidadas = dict(estado["liquidadas"])
+            self._pendentes = list(estado["pendentes"])
+            self._execucoes = OrderedDict()
+
+
+class LiquidacaoPeriodica:
+    # thread que liquida a fila da carteira de tempos em tempos
+    # (as paginas da carteira so leem; nenhuma leitura cria uma Liquidacao)
+
+    def __init__(self, carteira: Carteira, intervalo_segundos: float = 60.0):
+        self._carteira = carteira
+        self._intervalo = intervalo_segundos
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="ecotech-liquidacao", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def executar_uma_vez(self) -> Optional[Liquidacao]:
+        # fila vazia nao gera liquidacao: o historico de execucoes guarda so rodadas reais
+        if not self._carteira.pendentes():
+            return None
+        liquidacao = self._carteira.liquidar()
+        logger.info("liquidacao %s: %d entregas", liquidacao.id, liquidacao.quantidade)
+        return liquidacao
+
+    def _executar(self):
+        while not self._parar.wait(self._intervalo):
+            self.executar_uma_vez()
@@ -0,0 +1,157 @@
+# mapa copy-on-write para os servicos
+# leitores (listar_*, autenticar_usuario, buscas por id) nunca pegam lock:
+# leem uma unica referencia para um estado imutavel. escritores se revezam num
+# lock, montam um estado novo e publicam trocando a referencia (atribuicao
+# atomica). quem esta iterando continua no estado antigo, entao nao existe
+# "dictionary changed size during iteration"
+#
+# copiar o dicionario inteiro a cada escrita custaria O(n); o estado novo so
+# copia o delta (alteracoes desde a ultima compactacao) e o conjunto de chaves
+# removidas. quando o delta passa de ~raiz(n) entradas ele e fundido na base:
+# cada escrita custa O(raiz(n)) amortizado. buscas olham delta e base; listagens
+# usam a base ja fundida com o delta, montada uma vez por versao (em C, via
+# dict.copy/update) e reaproveitada por todos os leitores dessa versao
+
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+DELTA_MINIMO = 32
+_SEM_VALOR = object()
+
+# base, delta, removidas, tamanho, versao, [base fundida com o delta (cache)]
+_Estado = Tuple[Dict, Dict, FrozenSet, int, int, List]
+
+
+class MapaVersionado(MutableMapping):
+
+    def __init__(self, inicial: Optional[Dict[Any, Any]] = None):
+        self._lock = threading.Lock()
+        base = dict(inicial) if inicial else {}
+        self._estado: _Estado = (base, {}, frozenset(), len(base), 0, [base])
+
+    @property
+    def versao(self) -> int:
+        # muda a cada escrita publicada
+        return self._estado[4]
+
+    # ----- leitura (sem lock) -----
+
+    def __getitem__(self, chave) -> Any:
+        valor = self.get(chave, _SEM_VALOR)
+        if valor is _SEM_VALOR:
+            raise KeyError(chave)
+        return valor
+
+    def get(self, chave, padrao=None):
+        base, delta, removidas, _, _, _ = self._estado
+        if delta:
+            valor = delta.get(chave, _SEM_VALOR)
+            if valor is not _SEM_VALOR:
+                return valor
+        if removidas and chave in removidas:
+            return padrao
+        return base.get(chave, padrao)
+
+    def __contains__(self, chave) -> bool:
+        return self.get(chave, _SEM_VALOR) is not _SEM_VALOR
+
+    def __len__(self) -> int:
+        return self._estado[3]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._fundido(self._estado))
+
+    def items(self):
+        return list(self._fundido(self._estado).items())
+
+    def values(self):
+        return list(self._fundido(self._estado).values())
+
+    def keys(self):
+        return list(self._fundido(self._estado))
+
+    def copia(self) -> Dict[Any, Any]:
+        # dict comum com o estado atual (snapshot, pickle)
+        return dict(self._fundido(self._estado))
+
+    @staticmethod
+    def _fundido(estado: _Estado) -> Dict:
+        # base + delta - removidas; o dict devolvido nunca e alterado depois.
+        # dois leitores podem montar ao mesmo tempo: o resultado e o mesmo
+        base, delta, removidas, _, _, cache = estado
+        fundido = cache[0]
+        if fundido is None:
+            fundido = base.copy()
+            fundido.update(delta)
+            for chave in removidas:
+                fundido.pop(chave, None)
+            cache[0] = fundido
+        return fundido
+
+    # ----- escrita (um escritor por vez) -----
+
+    def __setitem__(self, chave, valor):
+        with self._lock:
+            self._gravar(chave, valor)
+
+    def __delitem__(self, chave):
+        if self.pop(chave, _SEM_VALOR) is _SEM_VALOR:
+            raise KeyError(chave)
+
+    def pop(self, chave, padrao=_SEM_VALOR):
+        with self._lock:
+            base, delta, removidas, tamanho, versao, _ = self._estado
+            valor = self.get(chave, _SEM_VALOR)
+            if valor is _SEM_VALOR:
+                if padrao is _SEM_VALOR:
+                    raise KeyError(chave)
+                return padrao
+            if chave in delta:
+                delta = dict(delta)
+                del delta[chave]
+            if chave in base:
+                removidas = removidas | {chave}
+            self._publicar(base, delta, removidas, tamanho - 1, versao)
+            return valor
+
+    def setdefault(self, chave, padrao=None) -> Any:
+        with self._lock:
+            valor = self.get(chave, _SEM_VALOR)
+            if valor is _SEM_VALOR:
+                self._gravar(chave, padrao)
+                valor = padrao
+            return valor
+
+    def _gravar(self, chave, valor):
+        # chamado com o lock
+        base, delta, removidas, tamanho, versao, _ = self._estado
+        if chave not in self:
+            tamanho += 1
+        delta = dict(delta)
+        delta[chave] = valor
+        if chave in removidas:
+            removidas = removidas - {chave}
+        self._publicar(base, delta, removidas, tamanho, versao)
+
+    def substituir(self, novo: Dict[Any, Any]):
+        # troca todo o conteudo de uma vez (importar_estado)
+        base = dict(novo)
+        with self._lock:
+            self._estado = (base, {}, frozenset(), len(base), self._estado[4] + 1, [base])
+
+    def _publicar(self, base: Dict, delta: Dict, removidas: FrozenSet, tamanho: int, versao: int):
+        # chamado com o lock; compacta quando o delta cresce demais
+        if len(delta) + len(removidas) > max(DELTA_MINIMO, int(len(base) ** 0.5)):
+            base = self._fundido((base, delta, removidas, tamanho, versao, [None]))
+            delta, removidas = {}, frozenset()
+        cache = [base] if not delta and not removidas else [None]
+        self._estado = (base, delta, removidas, tamanho, versao + 1, cache)
+
+    # ----- pickle: grava como dict comum -----
+
+    def __reduce__(self):
+        return (MapaVersionado, (self.copia(),))
+
+    def __repr__(self) -> str:
+        return f"MapaVersionado({self.copia()!r})"
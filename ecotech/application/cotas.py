@@ -0,0 +1,233 @@
+# cotas mensais de descarte das empresas
+# uma tabela compacta (arrays) com o uso de cada empresa no mes, em vez do
+# contador dentro de cada objeto Empresa
+#
+# virada de mes e reset geral nao percorrem as empresas: existe uma geracao
+# global, e cada linha guarda a geracao em que o uso foi contado. quando a
+# geracao global muda, o uso de uma linha so e zerado no proximo acesso a ela
+#
+# limites vem do contrato da empresa (alterar o contrato vale para todas as
+# empresas dele) ou de um limite proprio definido para a empresa. os limites
+# dos contratos ficam num arquivo json (ver carregar_contratos):
+# {"padrao": 1000.0, "grande": 5000.0}
+
+import json
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+
+LIMITE_PADRAO_KG = 1000.0
+CONTRATO_PADRAO = "padrao"
+_SEM_LIMITE_PROPRIO = -1.0
+
+
+class CotaExcedida(ValueError):
+    # a empresa passaria do limite mensal com esse descarte
+    pass
+
+
+def carregar_contratos(caminho: str) -> Dict[str, float]:
+    # le os limites mensais (kg) por contrato; levanta ValueError se o formato estiver errado
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if not isinstance(dados, dict):
+        raise ValueError("contratos devem ser um objeto json")
+    contratos = {}
+    for nome, limite in dados.items():
+        if not isinstance(limite, (int, float)) or limite < 0:
+            raise ValueError(f"limite do contrato {nome} deve ser um numero positivo")
+        contratos[str(nome)] = float(limite)
+    return contratos
+
+
+def _periodo(quando: datetime) -> int:
+    # meses desde o ano 0, para comparar periodos com um inteiro
+    return quando.year * 12 + quando.month - 1
+
+
+class MotorCotas:
+
+    def __init__(self, limite_padrao_kg: float = LIMITE_PADRAO_KG, agora: Optional[datetime] = None):
+        self._indices: Dict[str, int] = {}  # id da empresa -> linha da tabela
+        self._usado = array("d")
+        self._geracao_linha = array("q")  # geracao em que _usado foi contado
+        self._contrato_linha = array("i")
+        self._limite_proprio = array("d")
+
+        self._contratos: Dict[str, int] = {CONTRATO_PADRAO: 0}
+        self._limites_contrato: List[float] = [limite_padrao_kg]
+
+        self._periodo = _periodo(agora or datetime.now())
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    @property
+    def periodo(self) -> str:
+        ano, mes = divmod(self._periodo, 12)
+        return f"{ano:04d}-{mes + 1:02d}"
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    # ----- contratos e empresas -----
+
+    def definir_contrato(self, nome: str, limite_kg: float):
+        if limite_kg < 0:
+            raise ValueError("limite deve ser positivo")
+        with self._lock:
+            indice = self._contratos.get(nome)
+            if indice is None:
+                self._contratos[nome] = len(self._limites_contrato)
+                self._limites_contrato.append(limite_kg)
+            else:
+                self._limites_contrato[indice] = limite_kg
+
+    def registrar_empresa(
+        self,
+        id_empresa: str,
+        contrato: str = CONTRATO_PADRAO,
+        limite_kg: Optional[float] = None
+    ):
+        # cadastra (ou atualiza) a empresa na tabela; limite_kg sobrepoe o do contrato
+        with self._lock:
+            indice_contrato = self._indice_contrato(contrato)
+            linha = self._indices.get(id_empresa)
+            if linha is None:
+                linha = self._indices[id_empresa] = len(self._usado)
+                self._usado.append(0.0)
+                self._geracao_linha.append(self._geracao)
+                self._contrato_linha.append(indice_contrato)
+                self._limite_proprio.append(_SEM_LIMITE_PROPRIO)
+            self._contrato_linha[linha] = indice_contrato
+            self._limite_proprio[linha] = _SEM_LIMITE_PROPRIO if limite_kg is None else limite_kg
+
+    def possui(self, id_empresa: str) -> bool:
+        return id_empresa in self._indices
+
+    def possui_contrato(self, nome: str) -> bool:
+        return nome in self._contratos
+
+    def _indice_contrato(self, nome: str) -> int:
+        indice = self._contratos.get(nome)
+        if indice is None:
+            raise ValueError(f"contrato invalido: {nome}")
+        return indice
+
+    def _linha(self, id_empresa: str) -> int:
+        linha = self._indices.get(id_empresa)
+        if linha is None:
+            raise ValueError(f"empresa sem cota cadastrada: {id_empresa}")
+        return linha
+
+    # ----- virada de periodo -----
+
+    def virar_mes(self, agora: Optional[datetime] = None) -> bool:
+        # O(1): so troca o periodo e a geracao; as linhas zeram quando forem acessadas
+        # chamado no inicio de cada operacao, entao a virada acontece sozinha
+        periodo = _periodo(agora or datetime.now())
+        if periodo <= self._periodo:
+            return False
+        with self._lock:
+            if periodo > self._periodo:
+                self._periodo = periodo
+                self._geracao += 1
+                return True
+        return False
+
+    def resetar_todos(self):
+        # reset geral fora da virada (ex. correcao administrativa), tambem O(1)
+        with self._lock:
+            self._geracao += 1
+
+    def _atualizar_linha(self, linha: int):
+        # chamado com o lock: zera o uso se ele e de uma geracao anterior
+        if self._geracao_linha[linha] != self._geracao:
+            self._usado[linha] = 0.0
+            self._geracao_linha[linha] = self._geracao
+
+    # ----- consulta e registro -----
+
+    def _limite_linha(self, linha: int) -> float:
+        proprio = self._limite_proprio[linha]
+        if proprio != _SEM_LIMITE_PROPRIO:
+            return proprio
+        return self._limites_contrato[self._contrato_linha[linha]]
+
+    def limite(self, id_empresa: str) -> float:
+        with self._lock:
+            return self._limite_linha(self._linha(id_empresa))
+
+    def usado(self, id_empresa: str, agora: Optional[datetime] = None) -> float:
+        self.virar_mes(agora)
+        with self._lock:
+            linha = self._linha(id_empresa)
+            self._atualizar_linha(linha)
+            return self._usado[linha]
+
+    def disponivel(self, id_empresa: str, agora: Optional[datetime] = None) -> float:
+        self.virar_mes(agora)
+        with self._lock:
+            linha = self._linha(id_empresa)
+            self._atualizar_linha(linha)
+            return max(0.0, self._limite_linha(linha) - self._usado[linha])
+
+    def pode_registrar(self, id_empresa: str, peso_kg: float, agora: Optional[datetime] = None) -> bool:
+        return peso_kg <= self.disponivel(id_empresa, agora)
+
+    def registrar(self, id_empresa: str, peso_kg: float, agora: Optional[datetime] = None) -> float:
+        # soma o descarte ao uso do mes e devolve o saldo restante
+        if peso_kg <= 0:
+            raise ValueError("peso invalido")
+        self.virar_mes(agora)
+        with self._lock:
+            linha = self._linha(id_empresa)
+            self._atualizar_linha(linha)
+            limite = self._limite_linha(linha)
+            usado = self._usado[linha] + peso_kg
+            if usado > limite:
+                raise CotaExcedida(
+                    f"limite mensal excedido ({self._usado[linha]:.1f} de {limite:.1f} kg usados)"
+                )
+            self._usado[linha] = usado
+            return limite - usado
+
+    def estornar(self, id_empresa: str, peso_kg: float, agora: Optional[datetime] = None) -> float:
+        # devolve um descarte ja registrado (ex. entrega trocada de ponto) e
+        # devolve o saldo; o uso nunca fica negativo (o registro pode ser de um mes anterior)
+        if peso_kg <= 0:
+            raise ValueError("peso invalido")
+        self.virar_mes(agora)
+        with self._lock:
+            linha = self._linha(id_empresa)
+            self._atualizar_linha(linha)
+            self._usado[linha] = max(0.0, self._usado[linha] - peso_kg)
+            return self._limite_linha(linha) - self._usado[linha]
+
+    # ----- snapshot -----
+
+    def exportar_estado(self) -> Dict:
+        with self._lock:
+            return {
+                "indices": dict(self._indices),
+                "usado": array("d", self._usado),
+                "geracao_linha": array("q", self._geracao_linha),
+                "contrato_linha": array("i", self._contrato_linha),
+                "limite_proprio": array("d", self._limite_proprio),
+                "contratos": dict(self._contratos),
+                "limites_contrato": list(self._limites_contrato),
+                "periodo": self._periodo,
+                "geracao": self._geracao,
+            }
+
+    def importar_estado(self, estado: Dict):
+        with self._lock:
+            self._indices = dict(estado["indices"])
+            self._usado = array("d", estado["usado"])
+            self._geracao_linha = array("q", estado["geracao_linha"])
+            self._contrato_linha = array("i", estado["contrato_linha"])
+            self._limite_proprio = array("d", estado["limite_proprio"])
+            self._contratos = dict(estado["contratos"])
+            self._limites_contrato = list(estado["limites_contrato"])
+            self._periodo = estado["periodo"]
+            self._geracao = estado["geracao"]
@@ -0,0 +1,215 @@
+# cubo de indicadores pre-agregado: tipo de dispositivo x metodo x ponto x mes
+# cada celula guarda as medidas somadas (peso, impacto, impacto evitado,
+# custo em centavos, dispositivos e itens) das solicitacoes que terminaram o
+# tratamento. o cubo e atualizado a cada transicao (observador do
+# ServicoDescarte), entao uma consulta percorre so as celulas, nunca o historico
+#
+# consultas: agregar(("metodo",), mes="2026-03") soma as celulas do mes por
+# metodo (roll-up nas outras dimensoes + slice no mes)
+#
+# o cubo vai no snapshot (exportar_estado): o boot nao relê o historico
+#
+# cada solicitacao entra uma vez porque entra na transicao para o estado
+# final, e estados finais nao transicionam mais; o cubo nao guarda ids, entao
+# a memoria depende so do numero de celulas, nao do tamanho do historico
+
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.dinheiro import multiplicar_centavos, ratear_centavos
+from ..domain.estados import Descartado, EstadoDescarte, Reciclado, Reutilizado
+
+DIMENSOES = ("tipo", "metodo", "ponto", "mes")
+MEDIDAS = ("peso_kg", "impacto", "impacto_evitado", "custo_centavos", "dispositivos", "itens")
+SEM_METODO = "sem_metodo"
+SEM_PONTO = "sem_ponto"
+
+
+def _concluida(estado: EstadoDescarte) -> bool:
+    return isinstance(estado, (Reciclado, Reutilizado, Descartado))
+
+
+class CuboIndicadores:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._zerar()
+
+    def _zerar(self):
+        self._celulas: Dict[Tuple[str, str, str, str], int] = {}  # coordenadas -> linha
+        self._coordenadas: List[Tuple[str, str, str, str]] = []
+        # uma coluna por medida, uma linha por celula
+        self._peso = array("d")
+        self._impacto = array("d")
+        self._evitado = array("d")
+        self._custo = array("q")
+        self._dispositivos = array("q")
+        self._itens = array("q")
+        # indice invertido: valor de cada dimensao -> linhas com esse valor
+        self._indices: List[Dict[str, Set[int]]] = [{} for _ in DIMENSOES]
+
+    def __len__(self) -> int:
+        return len(self._coordenadas)
+
+    # ----- atualizacao -----
+
+    def ao_transicionar(
+        self,
+        solicitacao: SolicitacaoDescarte,
+        anterior: EstadoDescarte,
+        novo: EstadoDescarte
+    ):
+        # observador do ServicoDescarte: soma so na entrada do estado final
+        if _concluida(novo) and not _concluida(anterior):
+            self.adicionar_solicitacao(solicitacao)
+
+    def adicionar_solicitacao(self, solicitacao: SolicitacaoDescarte) -> bool:
+        # soma a solicitacao concluida no cubo; devolve se entrou. quem chama
+        # garante que cada uma chega uma vez (transicao ou reconstruir)
+        if not _concluida(solicitacao.estado):
+            return False
+        metodo = solicitacao.metodo_tratamento
+        nome_metodo = metodo.obter_nome() if metodo else SEM_METODO
+        reducao = metodo.reducao_impacto_percentual / 100 if metodo else 0.0
+        tarifa = metodo.custo_base_por_kg if metodo else 0.0
+        ponto = solicitacao.ponto_coleta.id if solicitacao.ponto_coleta else SEM_PONTO
+        mes = f"{solicitacao.data_criacao:%Y-%m}"
+        # as contas saem do lock; dentro dele so as somas
+        pesos = [item.calcular_peso_total() for item in solicitacao.itens]
+        # o custo e arredondado uma vez, na solicitacao inteira (como no
+        # rastreamento), e rateado pelos itens sem arredondar de novo
+        custos = ratear_centavos(multiplicar_centavos(sum(pesos), tarifa), pesos)
+        parcelas = []
+        for item, peso, custo in zip(solicitacao.itens, pesos, custos):
+            impacto = item.calcular_impacto_total()
+            parcelas.append((
+                (item.dispositivo.obter_tipo(), nome_metodo, ponto, mes),
+                peso,
+                impacto,
+                impacto * reducao,
+                custo,
+                item.quantidade,
+            ))
+
+        with self._lock:
+            for coordenadas, peso, impacto, evitado, custo, quantidade in parcelas:
+                linha = self._linha(coordenadas)
+                self._peso[linha] += peso
+                self._impacto[linha] += impacto
+                self._evitado[linha] += evitado
+                self._custo[linha] += custo
+                self._dispositivos[linha] += quantidade
+                self._itens[linha] += 1
+        return True
+
+    def _linha(self, coordenadas: Tuple[str, str, str, str]) -> int:
+        # chamado com o lock; cria a celula na primeira vez
+        linha = self._celulas.get(coordenadas)
+        if linha is None:
+            linha = self._celulas[coordenadas] = len(self._coordenadas)
+            self._coordenadas.append(coordenadas)
+            for coluna in (self._peso, self._impacto, self._evitado):
+                coluna.append(0.0)
+            for coluna in (self._custo, self._dispositivos, self._itens):
+                coluna.append(0)
+            for indice, valor in zip(self._indices, coordenadas):
+                indice.setdefault(valor, set()).add(linha)
+        return linha
+
+    def reconstruir(self, solicitacoes: Iterable[SolicitacaoDescarte]) -> int:
+        # recomeca do zero a partir do historico (ex. depois de carregar um snapshot)
+        with self._lock:
+            self._zerar()
+        return sum(1 for solicitacao in solicitacoes if self.adicionar_solicitacao(solicitacao))
+
+    # ----- snapshot -----
+
+    def exportar_estado(self) -> Dict:
+        # so as colunas; celulas e indices sao refeitos na importacao
+        with self._lock:
+            return {
+                "coordenadas": list(self._coordenadas),
+                "colunas": [
+                    array(coluna.typecode, coluna)
+                    for coluna in (self._peso, self._impacto, self._evitado, self._custo, self._dispositivos, self._itens)
+                ],
+            }
+
+    def importar_estado(self, estado: Dict):
+        with self._lock:
+            self._zerar()
+            self._coordenadas = list(estado["coordenadas"])
+            (self._peso, self._impacto, self._evitado,
+             self._custo, self._dispositivos, self._itens) = (
+                array(coluna.typecode, coluna) for coluna in estado["colunas"]
+            )
+            for linha, coordenadas in enumerate(self._coordenadas):
+                self._celulas[coordenadas] = linha
+                for indice, valor in zip(self._indices, coordenadas):
+                    indice.setdefault(valor, set()).add(linha)
+            # snapshots antigos ainda trazem "contadas" (ids ja somados): ignorado
+
+    # ----- consultas -----
+
+    def valores(self, dimensao: str) -> List[str]:
+        # valores conhecidos de uma dimensao, em ordem
+        posicao = DIMENSOES.index(dimensao)
+        with self._lock:
+            return sorted(self._indices[posicao])
+
+    def agregar(self, agrupar_por: Iterable[str] = (), **filtros: Optional[str]) -> Dict[Tuple, Dict]:
+        # soma as medidas das celulas que passam nos filtros (slice), agrupadas
+        # pelas dimensoes pedidas (roll-up nas demais). filtros None sao ignorados
+        agrupar_por = tuple(agrupar_por)
+        for dimensao in agrupar_por + tuple(filtros):
+            if dimensao not in DIMENSOES:
+                raise ValueError(f"dimensao invalida: {dimensao}")
+        posicoes = [DIMENSOES.index(dimensao) for dimensao in agrupar_por]
+
+        with self._lock:
+            linhas = self._selecionar(filtros)
+            grupos: Dict[Tuple, List] = {}
+            for linha in linhas:
+                coordenadas = self._coordenadas[linha]
+                chave = tuple(coordenadas[p] for p in posicoes)
+                soma = grupos.get(chave)
+                if soma is None:
+                    soma = grupos[chave] = [0.0, 0.0, 0.0, 0, 0, 0]
+                soma[0] += self._peso[linha]
+                soma[1] += self._impacto[linha]
+                soma[2] += self._evitado[linha]
+                soma[3] += self._custo[linha]
+                soma[4] += self._dispositivos[linha]
+                soma[5] += self._itens[linha]
+
+        return {
+            chave: {
+                "peso_kg": round(soma[0], 2),
+                "impacto": round(soma[1], 2),
+                "impacto_evitado": round(soma[2], 2),
+                "custo_centavos": soma[3],
+                "dispositivos": soma[4],
+                "itens": soma[5],
+            }
+            for chave, soma in sorted(grupos.items())
+        }
+
+    def totais(self, **filtros: Optional[str]) -> Dict:
+        return self.agregar((), **filtros).get((), dict.fromkeys(MEDIDAS, 0))
+
+    def _selecionar(self, filtros: Dict[str, Optional[str]]) -> Iterable[int]:
+        # chamado com o lock: intersecao dos indices, comecando pelo menor
+        conjuntos = []
+        for dimensao, valor in filtros.items():
+            if valor is None:
+                continue
+            linhas = self._indices[DIMENSOES.index(dimensao)].get(valor)
+            if not linhas:
+                return []
+            conjuntos.append(linhas)
+        if not conjuntos:
+            return range(len(self._coordenadas))
+        conjuntos.sort(key=len)
+        return sorted(set.intersection(*conjuntos)) if len(conjuntos) > 1 else sorted(conjuntos[0])
@@ -0,0 +1,350 @@
+# esbocos (sketches) para os paineis de escala nacional
+# respostas aproximadas, com memoria fixa e erro conhecido, no lugar de
+# percorrer todas as solicitacoes:
+#
+#   HyperLogLog     usuarios distintos. erro padrao ~1.04/sqrt(2^precisao)
+#                   (precisao 14: 16 KB, ~0.8%)
+#   KLL             quantis de peso. erro de rank ~1.65% (99% de confianca)
+#                   com k=200; a memoria cresce com log(n)
+#   Count-Min       frequencia de qualquer ponto. nunca subestima; superestima
+#                   no maximo e*N/largura com probabilidade 1 - e^-profundidade
+#   Space-Saving    pontos mais frequentes. com k contadores, cada contagem
+#                   passa da real no maximo N/k, e todo ponto com mais de N/k
+#                   ocorrencias esta na lista
+#
+# todos sao mesclaveis (mesclar): esbocos de regioes, anos ou processos
+# diferentes somados dao o esboco do total. o hash e estavel entre processos,
+# entao os esbocos vao no snapshot e continuam de onde pararam
+
+import copy
+import hashlib
+import math
+import random
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.estados import Descartado, EstadoDescarte, Reciclado, Reutilizado
+
+
+def _hash64(valor: str) -> int:
+    # blake2b em vez de hash(): o hash de str do python muda a cada processo
+    return int.from_bytes(hashlib.blake2b(valor.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+
+    def __init__(self, precisao: int = 14):
+        if not 4 <= precisao <= 18:
+            raise ValueError("precisao deve estar entre 4 e 18")
+        self._precisao = precisao
+        self._m = 1 << precisao
+        self._registradores = bytearray(self._m)
+        if self._m >= 128:
+            self._alfa = 0.7213 / (1 + 1.079 / self._m)
+        else:
+            self._alfa = {16: 0.673, 32: 0.697, 64: 0.709}[self._m]
+
+    @property
+    def erro_padrao(self) -> float:
+        return 1.04 / math.sqrt(self._m)
+
+    def adicionar(self, valor: str):
+        h = _hash64(valor)
+        indice = h >> (64 - self._precisao)
+        resto = h & ((1 << (64 - self._precisao)) - 1)
+        # posicao do primeiro bit 1 nos bits restantes
+        rho = (64 - self._precisao) - resto.bit_length() + 1
+        if rho > self._registradores[indice]:
+            self._registradores[indice] = rho
+
+    def estimar(self) -> int:
+        # soma de 2^-registrador agrupada por valor (count em C, sem laco por registrador)
+        registradores = self._registradores
+        soma = sum(registradores.count(v) * 2.0 ** -v for v in range(max(registradores) + 1))
+        estimativa = self._alfa * self._m * self._m / soma
+        vazios = registradores.count(0)
+        if estimativa <= 2.5 * self._m and vazios:
+            # poucos elementos: contagem linear e mais precisa
+            estimativa = self._m * math.log(self._m / vazios)
+        return round(estimativa)
+
+    def mesclar(self, outro: "HyperLogLog"):
+        if outro._precisao != self._precisao:
+            raise ValueError("precisoes diferentes")
+        self._registradores = bytearray(map(max, self._registradores, outro._registradores))
+
+
+class KLL:
+    # quantis aproximados (Karnin, Lang, Liberty). compactadores por nivel: o
+    # nivel h guarda itens de peso 2^h; quando um nivel enche, ele e ordenado e
+    # metade dos itens (os de posicao par ou impar, sorteado) sobe de nivel
+
+    def __init__(self, k: int = 200, aleatorio: Optional[random.Random] = None):
+        if k < 8:
+            raise ValueError("k deve ser pelo menos 8")
+        self._k = k
+        self._aleatorio = aleatorio or random.Random()
+        self._niveis: List[List[float]] = [[]]
+        self._tamanho = 0
+        self._n = 0
+        self._capacidade_total = self._capacidade(0)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _capacidade(self, nivel: int) -> int:
+        # niveis de baixo ficam menores (fator 2/3 por nivel abaixo do topo)
+        altura = len(self._niveis) - nivel - 1
+        return max(2, int(math.ceil(self._k * (2 / 3) ** altura)))
+
+    def adicionar(self, valor: float):
+        self._niveis[0].append(valor)
+        self._tamanho += 1
+        self._n += 1
+        if self._tamanho >= self._capacidade_total:
+            self._compactar()
+
+    def _compactar(self):
+        while self._tamanho >= self._capacidade_total:
+            for nivel, itens in enumerate(self._niveis):
+                if len(itens) >= self._capacidade(nivel):
+                    if nivel + 1 == len(self._niveis):
+                        self._niveis.append([])
+                    itens.sort()
+                    sobra = len(itens) % 2
+                    promovidos = itens[sobra + self._aleatorio.randint(0, 1)::2]
+                    self._niveis[nivel] = itens[:sobra]
+                    self._niveis[nivel + 1].extend(promovidos)
+                    break
+            self._tamanho = sum(len(itens) for itens in self._niveis)
+            self._capacidade_total = sum(self._capacidade(h) for h in range(len(self._niveis)))
+
+    def _pesados(self) -> Tuple[List[Tuple[float, int]], int]:
+        itens = sorted(
+            (valor, 1 << nivel)
+            for nivel, valores in enumerate(self._niveis)
+            for valor in valores
+        )
+        return itens, sum(peso for _, peso in itens)
+
+    def quantil(self, q: float) -> Optional[float]:
+        if not 0 <= q <= 1:
+            raise ValueError("quantil deve estar entre 0 e 1")
+        itens, total = self._pesados()
+        if not itens:
+            return None
+        alvo = q * total
+        acumulado = 0
+        for valor, peso in itens:
+            acumulado += peso
+            if acumulado >= alvo:
+                return valor
+        return itens[-1][0]
+
+    def quantis(self, qs: Iterable[float]) -> List[Optional[float]]:
+        return [self.quantil(q) for q in qs]
+
+    def rank(self, valor: float) -> float:
+        # fracao estimada dos valores <= valor
+        itens, total = self._pesados()
+        if not total:
+            return 0.0
+        return sum(peso for v, peso in itens if v <= valor) / total
+
+    def mesclar(self, outro: "KLL"):
+        while len(self._niveis) < len(outro._niveis):
+            self._niveis.append([])
+        for nivel, itens in enumerate(outro._niveis):
+            self._niveis[nivel].extend(itens)
+        self._n += outro._n
+        self._tamanho = sum(len(itens) for itens in self._niveis)
+        self._capacidade_total = sum(self._capacidade(h) for h in range(len(self._niveis)))
+        self._compactar()
+
+
+class CountMin:
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        # largura e/epsilon, profundidade ln(1/delta)
+        self._largura = int(math.ceil(math.e / epsilon))
+        self._profundidade = int(math.ceil(math.log(1 / delta)))
+        self._linhas = [array("q", bytes(8 * self._largura)) for _ in range(self._profundidade)]
+        self._total = 0
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def _posicoes(self, valor: str):
+        # dois hashes de 32 bits combinados (h1 + i*h2) dao as d posicoes
+        h = _hash64(valor)
+        h1, h2 = h & 0xFFFFFFFF, h >> 32
+        return ((h1 + i * h2) % self._largura for i in range(self._profundidade))
+
+    def adicionar(self, valor: str, quantidade: int = 1):
+        for linha, posicao in zip(self._linhas, self._posicoes(valor)):
+            linha[posicao] += quantidade
+        self._total += quantidade
+
+    def estimar(self, valor: str) -> int:
+        return min(linha[posicao] for linha, posicao in zip(self._linhas, self._posicoes(valor)))
+
+    def mesclar(self, outro: "CountMin"):
+        if (outro._largura, outro._profundidade) != (self._largura, self._profundidade):
+            raise ValueError("dimensoes diferentes")
+        for linha, outra in zip(self._linhas, outro._linhas):
+            for i, valor in enumerate(outra):
+                if valor:
+                    linha[i] += valor
+        self._total += outro._total
+
+
+class SpaceSaving:
+
+    def __init__(self, capacidade: int = 64):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser positiva")
+        self._capacidade = capacidade
+        self._contagens: Dict[str, int] = {}
+        self._erros: Dict[str, int] = {}  # quanto da contagem pode ser herdado
+        self._total = 0
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def adicionar(self, valor: str, quantidade: int = 1):
+        self._total += quantidade
+        if valor in self._contagens:
+            self._contagens[valor] += quantidade
+            return
+        if len(self._contagens) < self._capacidade:
+            self._contagens[valor] = quantidade
+            self._erros[valor] = 0
+            return
+        # substitui o menor contador; o novo herda a contagem dele como erro
+        menor = min(self._contagens, key=self._contagens.__getitem__)
+        minimo = self._contagens.pop(menor)
+        del self._erros[menor]
+        self._contagens[valor] = minimo + quantidade
+        self._erros[valor] = minimo
+
+    def mais_frequentes(self, quantidade: int = 10) -> List[Tuple[str, int, int]]:
+        # (valor, contagem estimada, erro maximo), da maior para a menor contagem
+        ordenados = sorted(self._contagens.items(), key=lambda par: (-par[1], par[0]))
+        return [(valor, contagem, self._erros[valor]) for valor, contagem in ordenados[:quantidade]]
+
+    def mesclar(self, outro: "SpaceSaving"):
+        # quem falta num resumo pode ter ate o menor contador dele
+        minimo_proprio = min(self._contagens.values()) if len(self._contagens) >= self._capacidade else 0
+        minimo_outro = min(outro._contagens.values()) if len(outro._contagens) >= outro._capacidade else 0
+        contagens: Dict[str, int] = {}
+        erros: Dict[str, int] = {}
+        for valor in set(self._contagens) | set(outro._contagens):
+            contagens[valor] = (
+                self._contagens.get(valor, minimo_proprio) + outro._contagens.get(valor, minimo_outro)
+            )
+            erros[valor] = (
+                self._erros.get(valor, minimo_proprio) + outro._erros.get(valor, minimo_outro)
+            )
+        mantidos = sorted(contagens, key=lambda valor: -contagens[valor])[:self._capacidade]
+        self._contagens = {valor: contagens[valor] for valor in mantidos}
+        self._erros = {valor: erros[valor] for valor in mantidos}
+        self._total += outro._total
+
+
+class EsbocosRelatorio:
+    # os esbocos dos paineis, alimentados pelas solicitacoes concluidas (as
+    # mesmas que entram no RelatorioAmbiental): usuarios distintos, quantis de
+    # peso no total e por tipo de dispositivo, e frequencia/ranking de pontos
+
+    def __init__(self, precisao_hll: int = 14, k_quantis: int = 200, capacidade_pontos: int = 64):
+        self._k_quantis = k_quantis
+        self._usuarios = HyperLogLog(precisao_hll)
+        self._pesos = KLL(k_quantis)
+        self._pesos_por_tipo: Dict[str, KLL] = {}
+        self._frequencia_pontos = CountMin()
+        self._ranking_pontos = SpaceSaving(capacidade_pontos)
+        self._lock = threading.Lock()
+
+    def ao_transicionar(
+        self,
+        solicitacao: SolicitacaoDescarte,
+        anterior: EstadoDescarte,
+        novo: EstadoDescarte
+    ):
+        # observador do ServicoDescarte
+        if isinstance(novo, (Reciclado, Reutilizado, Descartado)):
+            self.adicionar_solicitacao(solicitacao)
+
+    def carregar(self, solicitacoes: Iterable[SolicitacaoDescarte]) -> int:
+        # alimenta com o historico (ex. depois de carregar um snapshot)
+        concluidas = 0
+        for solicitacao in solicitacoes:
+            if isinstance(solicitacao.estado, (Reciclado, Reutilizado, Descartado)):
+                self.adicionar_solicitacao(solicitacao)
+                concluidas += 1
+        return concluidas
+
+    def adicionar_solicitacao(self, solicitacao: SolicitacaoDescarte):
+        itens = [(item.dispositivo.obter_tipo(), item.calcular_peso_total()) for item in solicitacao.itens]
+        with self._lock:
+            self._usuarios.adicionar(solicitacao.usuario.id)
+            self._pesos.adicionar(solicitacao.calcular_peso_total())
+            for tipo, peso in itens:
+                kll = self._pesos_por_tipo.get(tipo)
+                if kll is None:
+                    kll = self._pesos_por_tipo[tipo] = KLL(self._k_quantis)
+                kll.adicionar(peso)
+            if solicitacao.ponto_coleta is not None:
+                self._frequencia_pontos.adicionar(solicitacao.ponto_coleta.id)
+                self._ranking_pontos.adicionar(solicitacao.ponto_coleta.id)
+
+    def usuarios_distintos(self) -> int:
+        with self._lock:
+            return self._usuarios.estimar()
+
+    def quantis_peso(self, qs: Iterable[float] = (0.5, 0.9, 0.99), tipo: Optional[str] = None) -> List[Optional[float]]:
+        # tipo=None: peso total por solicitacao; com tipo: peso dos itens daquele tipo
+        with self._lock:
+            kll = self._pesos if tipo is None else self._pesos_por_tipo.get(tipo)
+            return kll.quantis(qs) if kll is not None else [None for _ in qs]
+
+    def frequencia_ponto(self, id_ponto: str) -> int:
+        with self._lock:
+            return self._frequencia_pontos.estimar(id_ponto)
+
+    def pontos_mais_frequentes(self, quantidade: int = 10) -> List[Tuple[str, int, int]]:
+        with self._lock:
+            return self._ranking_pontos.mais_frequentes(quantidade)
+
+    def exportar_estado(self) -> Dict:
+        # copia sob o lock: o snapshot nao pega um esboco no meio de uma atualizacao
+        with self._lock:
+            return copy.deepcopy({
+                "usuarios": self._usuarios,
+                "pesos": self._pesos,
+                "pesos_por_tipo": self._pesos_por_tipo,
+                "frequencia_pontos": self._frequencia_pontos,
+                "ranking_pontos": self._ranking_pontos,
+            })
+
+    def importar_estado(self, estado: Dict):
+        estado = copy.deepcopy(estado)
+        with self._lock:
+            self._usuarios = estado["usuarios"]
+            self._pesos = estado["pesos"]
+            self._pesos_por_tipo = estado["pesos_por_tipo"]
+            self._frequencia_pontos = estado["frequencia_pontos"]
+            self._ranking_pontos = estado["ranking_pontos"]
+
+    def mesclar(self, outro: "EsbocosRelatorio"):
+        with self._lock:
+            self._usuarios.mesclar(outro._usuarios)
+            self._pesos.mesclar(outro._pesos)
+            for tipo, kll in outro._pesos_por_tipo.items():
+                self._pesos_por_tipo.setdefault(tipo, KLL(self._k_quantis)).mesclar(kll)
+            self._frequencia_pontos.mesclar(outro._frequencia_pontos)
+            self._ranking_pontos.mesclar(outro._ranking_pontos)
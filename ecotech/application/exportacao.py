@@ -0,0 +1,449 @@
+# exportacao de relatorios ambientais para pdf e csv
+# os arquivos sao gerados num pool de threads, fora da requisicao http: quem
+# pede recebe um trabalho na hora e acompanha o status ate o arquivo ficar pronto
+#
+# pedidos iguais (formato, titulo, periodo e filtros) sobre a mesma versao dos
+# dados sao o mesmo arquivo: se ja existe no cache vem direto, se esta sendo
+# gerado o pedido novo espera o mesmo trabalho. o cache fica em disco, limitado
+# em bytes, e descarta primeiro os arquivos usados ha mais tempo
+
+import csv
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.relatorio import RelatorioAmbiental
+from .identificadores import id_curto
+from .metricas import REGISTRO
+from .services import ServicoDescarte, ServicoRelatorio
+
+_DURACAO_EXPORTACAO = REGISTRO.histograma(
+    "ecotech_exportacao_duracao_segundos",
+    "Duracao da geracao de relatorios exportados",
+    rotulos=("formato",)
+)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+MAX_BYTES_CACHE = 64 * 1024 * 1024
+PREFIXO_ARTEFATO = "relatorio-"
+
+
+# ----- renderizacao -----
+
+def _linhas_solicitacoes(relatorio: RelatorioAmbiental) -> List[Tuple[str, ...]]:
+    linhas = []
+    for solicitacao in relatorio.solicitacoes:
+        ponto = solicitacao.ponto_coleta
+        metodo = solicitacao.metodo_tratamento
+        linhas.append((
+            solicitacao.id,
+            solicitacao.data_criacao.strftime("%d/%m/%Y"),
+            solicitacao.estado.obter_nome(),
+            f"{solicitacao.calcular_peso_total():.2f}",
+            metodo.obter_nome() if metodo else "",
+            ponto.nome if ponto else "",
+        ))
+    return linhas
+
+
+_CABECALHO_SOLICITACOES = ("id", "data", "estado", "peso_kg", "metodo", "ponto")
+
+
+def renderizar_csv(relatorio: RelatorioAmbiental) -> bytes:
+    # resumo (metrica, valor), uma linha em branco e uma linha por solicitacao
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(("metrica", "valor"))
+    for metrica, valor in relatorio.gerar_relatorio().items():
+        escritor.writerow((metrica, valor))
+    escritor.writerow(())
+    escritor.writerow(_CABECALHO_SOLICITACOES)
+    escritor.writerows(_linhas_solicitacoes(relatorio))
+    return saida.getvalue().encode("utf-8")
+
+
+_LINHAS_POR_PAGINA = 52
+_LARGURA_PAGINA = 595  # A4 em pontos
+_ALTURA_PAGINA = 842
+
+
+def _texto_pdf(texto: str) -> bytes:
+    # string literal do pdf; a fonte usa WinAnsiEncoding (cp1252)
+    dados = texto.encode("cp1252", "replace")
+    return b"(" + dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _montar_pdf(paginas: List[List[str]]) -> bytes:
+    # pdf minimo: catalogo, arvore de paginas, uma fonte padrao (sem embutir)
+    # e uma pagina + um stream de conteudo para cada pagina de texto
+    objetos: List[bytes] = []
+    id_paginas = 2
+    id_fonte = 3
+    filhos = []
+    for i, linhas in enumerate(paginas):
+        id_pagina = 4 + 2 * i
+        conteudo = [b"BT /F1 9 Tf 14 TL 40 800 Td"]
+        for linha in linhas:
+            conteudo.append(_texto_pdf(linha) + b" Tj T*")
+        conteudo.append(b"ET")
+        stream = b"\n".join(conteudo)
+        objetos.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (id_paginas, _LARGURA_PAGINA, _ALTURA_PAGINA, id_fonte, id_pagina + 1)
+        )
+        objetos.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        filhos.append(b"%d 0 R" % id_pagina)
+
+    objetos[0:0] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(filhos), len(paginas)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+    ]
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for numero, objeto in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for posicao in posicoes:
+        saida += b"%010d 00000 n \n" % posicao
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, inicio_xref
+    )
+    return bytes(saida)
+
+
+def renderizar_pdf(relatorio: RelatorioAmbiental) -> bytes:
+    # texto em fonte monoespacada: resumo na primeira pagina e a tabela de
+    # solicitacoes quebrada em paginas de tamanho fixo
+    linhas = [relatorio.titulo, f"Gerado em {relatorio.data_geracao.strftime('%d/%m/%Y %H:%M')}", ""]
+    for metrica, valor in relatorio.gerar_relatorio().items():
+        if metrica not in ("titulo", "data_geracao"):
+            linhas.append(f"{metrica.replace('_', ' '):<30}{valor}")
+    linhas.append("")
+    formato = "{:<10}{:<12}{:<18}{:>9}  {:<20}{}"
+    linhas.append(formato.format("id", "data", "estado", "peso kg", "metodo", "ponto"))
+    for id, data, estado, peso, metodo, ponto in _linhas_solicitacoes(relatorio):
+        linhas.append(formato.format(id_curto(id), data, estado, peso, metodo, ponto[:30]))
+
+    paginas = [
+        linhas[i:i + _LINHAS_POR_PAGINA]
+        for i in range(0, len(linhas), _LINHAS_POR_PAGINA)
+    ]
+    return _montar_pdf(paginas)
+
+
+FORMATOS: Dict[str, Tuple[Callable[[RelatorioAmbiental], bytes], str]] = {
+    "pdf": (renderizar_pdf, "application/pdf"),
+    "csv": (renderizar_csv, "text/csv"),
+}
+
+
+# ----- cache em disco -----
+
+class CacheArtefatos:
+    # arquivos gerados, por nome, com descarte do usado ha mais tempo (LRU)
+    # quando o total passa de max_bytes
+
+    def __init__(self, diretorio: str, max_bytes: int = MAX_BYTES_CACHE):
+        self._diretorio = diretorio
+        self._max_bytes = max_bytes
+        self._entradas: "OrderedDict[str, int]" = OrderedDict()  # nome -> tamanho, mais antigo primeiro
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        # os nomes sao (filtros, versao dos dados) e a versao so identifica os
+        # dados dentro de uma mesma linha de execucao: um processo que cai antes
+        # do snapshot, ou que sobe de um snapshot mais velho (ou dos dados
+        # exemplo), volta a passar pelos mesmos numeros com outros dados. um
+        # arquivo de antes do boot poderia ser entregue para dados diferentes,
+        # entao o cache comeca vazio (e so conta o que este processo gravou)
+        for nome in os.listdir(diretorio):
+            if nome.startswith(PREFIXO_ARTEFATO):
+                os.remove(os.path.join(diretorio, nome))
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obter(self, nome: str) -> Optional[str]:
+        with self._lock:
+            if nome not in self._entradas:
+                return None
+            self._entradas.move_to_end(nome)
+            return os.path.join(self._diretorio, nome)
+
+    def guardar(self, nome: str, conteudo: bytes) -> str:
+        caminho = os.path.join(self._diretorio, nome)
+        temporario = f"{caminho}.{uuid.uuid4().hex}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)  # quem le nunca ve o arquivo pela metade
+        with self._lock:
+            self._total += len(conteudo) - self._entradas.pop(nome, 0)
+            self._entradas[nome] = len(conteudo)
+            # o arquivo recem gerado fica, mesmo que sozinho passe do limite
+            while self._total > self._max_bytes and len(self._entradas) > 1:
+                antigo, tamanho = self._entradas.popitem(last=False)
+                self._total -= tamanho
+                try:
+                    os.remove(os.path.join(self._diretorio, antigo))
+                except FileNotFoundError:
+                    pass
+        return caminho
+
+
+# ----- trabalhos -----
+
+class TrabalhoExportacao:
+
+    def __init__(self, id: str, formato: str, titulo: str):
+        self._id = id
+        self._formato = formato
+        self._titulo = titulo
+        self._status = PENDENTE
+        self._caminho: Optional[str] = None
+        self._erro: Optional[str] = None
+        self._criado_em = datetime.now()
+        self._fim = threading.Event()
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def formato(self) -> str:
+        return self._formato
+
+    @property
+    def titulo(self) -> str:
+        return self._titulo
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def caminho(self) -> Optional[str]:
+        return self._caminho
+
+    @property
+    def erro(self) -> Optional[str]:
+        return self._erro
+
+    @property
+    def criado_em(self) -> datetime:
+        return self._criado_em
+
+    @property
+    def terminado(self) -> bool:
+        return self._fim.is_set()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        return self._fim.wait(timeout)
+
+    def _iniciar(self):
+        self._status = EXECUTANDO
+
+    def _concluir(self, caminho: str):
+        self._caminho = caminho
+        self._status = CONCLUIDO
+        self._fim.set()
+
+    def _falhar(self, erro: str):
+        self._erro = erro
+        self._status = ERRO
+        self._fim.set()
+
+    def obter_resumo(self) -> Dict:
+        return {
+            "id": self._id,
+            "formato": self._formato,
+            "titulo": self._titulo,
+            "status": self._status,
+            "erro": self._erro,
+            "criado_em": self._criado_em.isoformat(),
+        }
+
+
+def _nome_artefato(chave: Tuple, versao: int, formato: str) -> str:
+    resumo = hashlib.sha256(repr((chave, versao)).encode("utf-8")).hexdigest()[:32]
+    return f"{PREFIXO_ARTEFATO}{resumo}.{formato}"
+
+
+def filtrar_solicitacoes(
+    solicitacoes: List[SolicitacaoDescarte],
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    id_ponto: Optional[str] = None,
+    estado: Optional[str] = None
+) -> List[SolicitacaoDescarte]:
+    # periodo pela data de criacao (inclusive nas duas pontas)
+    selecionadas = []
+    for solicitacao in solicitacoes:
+        dia = solicitacao.data_criacao.date()
+        if inicio is not None and dia < inicio:
+            continue
+        if fim is not None and dia > fim:
+            continue
+        if id_ponto is not None and (solicitacao.ponto_coleta is None or solicitacao.ponto_coleta.id != id_ponto):
+            continue
+        if estado is not None and solicitacao.estado.obter_nome() != estado:
+            continue
+        selecionadas.append(solicitacao)
+    return selecionadas
+
+
+def validar_dados_exportacao(dados: Mapping[str, Any]) -> Dict[str, Any]:
+    # valida os campos do formulario de exportacao (mesmo estilo de
+    # validar_dados_solicitacao); levanta ValueError com mensagem amigavel
+    formato = str(dados.get("formato", "pdf")).strip().lower()
+    if formato not in FORMATOS:
+        raise ValueError("formato invalido")
+
+    titulo = str(dados.get("titulo", "")).strip() or "Relatorio Ambiental"
+    if len(titulo) > 200:
+        raise ValueError("titulo muito longo")
+
+    periodo = []
+    for campo in ("inicio", "fim"):
+        valor = str(dados.get(campo, "") or "").strip()
+        try:
+            periodo.append(date.fromisoformat(valor) if valor else None)
+        except ValueError:
+            raise ValueError("data invalida")
+    if periodo[0] is not None and periodo[1] is not None and periodo[0] > periodo[1]:
+        raise ValueError("periodo invalido")
+
+    return {
+        "formato": formato,
+        "titulo": titulo,
+        "inicio": periodo[0],
+        "fim": periodo[1],
+        "id_ponto": str(dados.get("ponto", "") or "").strip() or None,
+        "estado": str(dados.get("estado", "") or "").strip() or None,
+    }
+
+
+class ExportadorRelatorios:
+
+    def __init__(
+        self,
+        servico_descarte: ServicoDescarte,
+        diretorio: str,
+        max_workers: int = 2,
+        max_bytes: int = MAX_BYTES_CACHE,
+        max_trabalhos: int = 200
+    ):
+        self._servico_descarte = servico_descarte
+        self._servico_relatorio = ServicoRelatorio()
+        self._cache = CacheArtefatos(diretorio, max_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ecotech-exportacao")
+        self._max_trabalhos = max_trabalhos
+        self._trabalhos: "OrderedDict[str, TrabalhoExportacao]" = OrderedDict()
+        self._em_andamento: Dict[str, TrabalhoExportacao] = {}  # nome do artefato -> trabalho
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self) -> CacheArtefatos:
+        return self._cache
+
+    def solicitar(
+        self,
+        formato: str,
+        titulo: str,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        id_ponto: Optional[str] = None,
+        estado: Optional[str] = None
+    ) -> TrabalhoExportacao:
+        # devolve na hora: concluido (cache), o trabalho igual em andamento ou um novo
+        if formato not in FORMATOS:
+            raise ValueError(f"formato invalido: {formato}")
+        if inicio is not None and fim is not None and inicio > fim:
+            raise ValueError("periodo invalido")
+        filtros = (inicio, fim, id_ponto, estado)
+        # a versao e lida antes das solicitacoes: o arquivo nunca tem dados mais
+        # velhos que a versao do nome dele
+        versao = self._servico_descarte.versao
+        nome = _nome_artefato((formato, titulo) + filtros, versao, formato)
+
+        with self._lock:
+            em_andamento = self._em_andamento.get(nome)
+            if em_andamento is not None:
+                return em_andamento
+            trabalho = TrabalhoExportacao(str(uuid.uuid4()), formato, titulo)
+            self._guardar_trabalho(trabalho)
+            caminho = self._cache.obter(nome)
+            if caminho is not None:
+                trabalho._concluir(caminho)
+                return trabalho
+            self._em_andamento[nome] = trabalho
+
+        # as solicitacoes (inclusive as do arquivo em disco) sao lidas na
+        # thread da exportacao, fora do lock e da requisicao
+        self._executor.submit(self._executar, trabalho, nome, filtros)
+        return trabalho
+
+    def _guardar_trabalho(self, trabalho: TrabalhoExportacao):
+        # chamado com o lock; esquece primeiro os trabalhos mais antigos ja terminados
+        self._trabalhos[trabalho.id] = trabalho
+        if len(self._trabalhos) > self._max_trabalhos:
+            for id in list(self._trabalhos):
+                if len(self._trabalhos) <= self._max_trabalhos:
+                    break
+                if self._trabalhos[id].terminado:
+                    del self._trabalhos[id]
+
+    def _executar(
+        self,
+        trabalho: TrabalhoExportacao,
+        nome: str,
+        filtros: Tuple
+    ):
+        trabalho._iniciar()
+        inicio = time.perf_counter()
+        try:
+            solicitacoes = self._servico_descarte.listar_solicitacoes(incluir_arquivadas=True)
+            relatorio = self._servico_relatorio.gerar_relatorio_periodo(
+                trabalho.titulo,
+                filtrar_solicitacoes(solicitacoes, *filtros)
+            )
+            renderizar, _ = FORMATOS[trabalho.formato]
+            trabalho._concluir(self._cache.guardar(nome, renderizar(relatorio)))
+        except Exception as erro:
+            trabalho._falhar(str(erro))
+        finally:
+            _DURACAO_EXPORTACAO.observar(time.perf_counter() - inicio, (trabalho.formato,))
+            with self._lock:
+                self._em_andamento.pop(nome, None)
+
+    def obter_trabalho(self, id: str) -> Optional[TrabalhoExportacao]:
+        with self._lock:
+            return self._trabalhos.get(id)
+
+    def listar_trabalhos(self, limite: int = 20) -> List[TrabalhoExportacao]:
+        # mais recentes primeiro
+        with self._lock:
+            return list(self._trabalhos.values())[::-1][:limite]
+
+    def desligar(self, aguardar: bool = True):
+        self._executor.shutdown(wait=aguardar)
@@ -0,0 +1,296 @@
+# exportacao colunar (Parquet ou Arrow IPC) para o armazem de dados dos analistas
+# tres tabelas: solicitacoes, itens e rastreamentos (metodo aplicado), cada uma
+# particionada por mes e ponto de coleta no estilo hive:
+#
+#     <diretorio>/solicitacoes/mes=2026-03/ponto=<id>/parte-<execucao>.parquet
+#
+# as solicitacoes sao percorridas agrupadas por (mes, ponto): uma particao so
+# tem arquivo aberto enquanto o grupo dela esta sendo gravado, e as linhas
+# vao em lotes (record batches) conforme enchem, sem montar a tabela em memoria.
+# no modo incremental so entram as solicitacoes alteradas desde a exportacao
+# anterior (ServicoDescarte.listar_alteradas_desde); a versao exportada fica
+# em <diretorio>/_versao_exportada, entao vale entre execucoes (a versao dos
+# dados vai junto no snapshot). cada execucao grava arquivos novos, e a versao
+# mais recente de uma linha e a do arquivo mais novo
+#
+# depende do pyarrow, que e opcional (pip install ecotech[analise])
+
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # dependencia opcional
+    pa = None
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.dinheiro import multiplicar_centavos
+from ..domain.estados import Descartado, Reciclado, Reutilizado
+from .services import ServicoDescarte
+
+FORMATOS_COLUNARES = ("parquet", "arrow")
+SEM_PONTO = "sem_ponto"
+ARQUIVO_VERSAO = "_versao_exportada"  # leitores hive ignoram nomes com _
+
+
+def pyarrow_disponivel() -> bool:
+    return pa is not None
+
+
+def _esquemas() -> Dict[str, "pa.Schema"]:
+    # tipos explicitos: datas como timestamp, dinheiro em centavos inteiros
+    return {
+        "solicitacoes": pa.schema([
+            ("id", pa.string()),
+            ("id_usuario", pa.string()),
+            ("tipo_usuario", pa.string()),
+            ("estado", pa.string()),
+            ("id_ponto", pa.string()),
+            ("metodo", pa.string()),
+            ("data_criacao", pa.timestamp("us")),
+            ("data_agendamento", pa.timestamp("us")),
+            ("total_itens", pa.int32()),
+            ("peso_total_kg", pa.float64()),
+            ("impacto_total", pa.float64()),
+        ]),
+        "itens": pa.schema([
+            ("id_solicitacao", pa.string()),
+            ("posicao", pa.int32()),
+            ("id_dispositivo", pa.string()),
+            ("tipo", pa.string()),
+            ("nome", pa.string()),
+            ("marca", pa.string()),
+            ("modelo", pa.string()),
+            ("peso_kg", pa.float64()),
+            ("quantidade", pa.int32()),
+            ("valor_revenda_centavos", pa.int64()),
+            ("impacto", pa.float64()),
+        ]),
+        "rastreamentos": pa.schema([
+            ("id_aplicacao", pa.string()),
+            ("metodo", pa.string()),
+            ("peso_total_kg", pa.float64()),
+            ("custo_centavos", pa.int64()),
+            ("reducao_impacto_percentual", pa.float64()),
+            ("data_aplicacao", pa.timestamp("us")),
+        ]),
+    }
+
+
+def _segmento(valor: str) -> str:
+    # valor de particao seguro para nome de diretorio
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", valor) or "_"
+
+
+class ResultadoExportacaoColunar:
+
+    def __init__(self, versao: int):
+        self._versao = versao
+        self._arquivos: List[str] = []
+        self._linhas: Dict[str, int] = {"solicitacoes": 0, "itens": 0, "rastreamentos": 0}
+
+    @property
+    def versao(self) -> int:
+        # versao dos dados ate a qual a exportacao vai
+        return self._versao
+
+    @property
+    def arquivos(self) -> List[str]:
+        return self._arquivos.copy()
+
+    @property
+    def linhas(self) -> Dict[str, int]:
+        return dict(self._linhas)
+
+    def obter_resumo(self) -> Dict:
+        return {"versao": self._versao, "arquivos": len(self._arquivos), "linhas": self.linhas}
+
+
+class _Particao:
+    # colunas pendentes de uma particao e o arquivo (aberto sob demanda) dela
+
+    def __init__(self, caminho: str, esquema: "pa.Schema", formato: str):
+        self.caminho = caminho
+        self.esquema = esquema
+        self.formato = formato
+        self.colunas: List[list] = [[] for _ in esquema.names]
+        self.escritor = None
+
+    def __len__(self) -> int:
+        return len(self.colunas[0])
+
+    def adicionar(self, linha: Tuple):
+        for coluna, valor in zip(self.colunas, linha):
+            coluna.append(valor)
+
+    def gravar_lote(self):
+        if not len(self):
+            return
+        lote = pa.RecordBatch.from_arrays(
+            [pa.array(coluna, type=campo.type) for coluna, campo in zip(self.colunas, self.esquema)],
+            schema=self.esquema
+        )
+        if self.escritor is None:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            if self.formato == "parquet":
+                self.escritor = pq.ParquetWriter(self.caminho, self.esquema, compression="zstd")
+            else:
+                self.escritor = pa.ipc.new_file(self.caminho, self.esquema)
+        self.escritor.write_batch(lote)
+        self.colunas = [[] for _ in self.esquema.names]
+
+    def fechar(self):
+        self.gravar_lote()
+        if self.escritor is not None:
+            self.escritor.close()
+
+
+class ExportadorColunar:
+
+    def __init__(
+        self,
+        servico_descarte: ServicoDescarte,
+        diretorio: str,
+        formato: str = "parquet",
+        tamanho_lote: int = 10000
+    ):
+        if pa is None:
+            raise RuntimeError("exportacao colunar precisa do pyarrow (pip install ecotech[analise])")
+        if formato not in FORMATOS_COLUNARES:
+            raise ValueError(f"formato invalido: {formato}")
+        if tamanho_lote < 1:
+            raise ValueError("tamanho do lote deve ser positivo")
+        self._servico_descarte = servico_descarte
+        self._diretorio = diretorio
+        self._formato = formato
+        self._tamanho_lote = tamanho_lote
+        self._esquemas = _esquemas()
+        self._versao_exportada: Optional[int] = self._ler_versao()
+
+    @property
+    def versao_exportada(self) -> Optional[int]:
+        return self._versao_exportada
+
+    def _caminho_versao(self) -> str:
+        return os.path.join(self._diretorio, ARQUIVO_VERSAO)
+
+    def _ler_versao(self) -> Optional[int]:
+        try:
+            with open(self._caminho_versao(), encoding="utf-8") as arquivo:
+                return int(arquivo.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _gravar_versao(self, versao: int):
+        # troca o arquivo no final: uma exportacao interrompida nao avanca a marca
+        os.makedirs(self._diretorio, exist_ok=True)
+        temporario = f"{self._caminho_versao()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(f"{versao}\n")
+        os.replace(temporario, self._caminho_versao())
+
+    def exportar(self, incremental: bool = True) -> ResultadoExportacaoColunar:
+        # a primeira execucao (ou incremental=False) leva tudo; as seguintes,
+        # so o que mudou. a versao e lida antes: uma alteracao feita durante a
+        # exportacao sai de novo na proxima, nunca se perde
+        versao = self._servico_descarte.versao
+        anterior = self._versao_exportada
+        if incremental and anterior is not None and anterior <= versao:
+            solicitacoes = self._servico_descarte.listar_alteradas_desde(anterior)
+        else:
+            # sem marca, ou marca de dados mais novos que estes (snapshot
+            # antigo restaurado): exporta tudo de novo
+            solicitacoes = self._servico_descarte.listar_solicitacoes(incluir_arquivadas=True)
+
+        resultado = ResultadoExportacaoColunar(versao)
+        self._gravar(solicitacoes, resultado)
+        self._gravar_versao(versao)
+        self._versao_exportada = versao
+        return resultado
+
+    def _gravar(self, solicitacoes: Iterable[SolicitacaoDescarte], resultado: ResultadoExportacaoColunar):
+        execucao = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+        def particao(solicitacao: SolicitacaoDescarte) -> Tuple[str, str]:
+            ponto = solicitacao.ponto_coleta.id if solicitacao.ponto_coleta else SEM_PONTO
+            return f"{solicitacao.data_criacao:%Y-%m}", ponto
+
+        # agrupa por (mes, ponto): so as particoes do grupo atual ficam abertas
+        # (no maximo uma por tabela), e cada uma e fechada quando o grupo acaba
+        grupos: Dict[Tuple[str, str], List[SolicitacaoDescarte]] = {}
+        for solicitacao in solicitacoes:
+            grupos.setdefault(particao(solicitacao), []).append(solicitacao)
+
+        for mes, ponto in sorted(grupos):
+            grupo = grupos.pop((mes, ponto))
+            abertas: Dict[str, _Particao] = {}
+            try:
+                for solicitacao in grupo:
+                    for tabela, linha in self._linhas(solicitacao):
+                        aberta = abertas.get(tabela)
+                        if aberta is None:
+                            caminho = os.path.join(
+                                self._diretorio, tabela, f"mes={mes}", f"ponto={_segmento(ponto)}",
+                                f"parte-{execucao}.{self._formato}"
+                            )
+                            aberta = abertas[tabela] = _Particao(caminho, self._esquemas[tabela], self._formato)
+                        aberta.adicionar(linha)
+                        resultado._linhas[tabela] += 1
+                        if len(aberta) >= self._tamanho_lote:
+                            aberta.gravar_lote()
+            finally:
+                for aberta in abertas.values():
+                    aberta.fechar()
+                    if aberta.escritor is not None:
+                        resultado._arquivos.append(aberta.caminho)
+
+    def _linhas(self, solicitacao: SolicitacaoDescarte):
+        metodo = solicitacao.metodo_tratamento
+        itens = solicitacao.itens
+        yield "solicitacoes", (
+            solicitacao.id,
+            solicitacao.usuario.id,
+            solicitacao.usuario.obter_tipo(),
+            solicitacao.estado.obter_nome(),
+            solicitacao.ponto_coleta.id if solicitacao.ponto_coleta else None,
+            metodo.obter_nome() if metodo else None,
+            solicitacao.data_criacao,
+            solicitacao.data_agendamento,
+            len(itens),
+            solicitacao.calcular_peso_total(),
+            solicitacao.calcular_impacto_total(),
+        )
+        for posicao, item in enumerate(itens):
+            dispositivo = item.dispositivo
+            yield "itens", (
+                solicitacao.id,
+                posicao,
+                dispositivo.id,
+                dispositivo.obter_tipo(),
+                dispositivo.nome,
+                dispositivo.marca,
+                dispositivo.modelo,
+                dispositivo.peso_kg,
+                item.quantidade,
+                dispositivo.calcular_valor_revenda_centavos() * item.quantidade,
+                item.calcular_impacto_total(),
+            )
+        # o metodo conta como aplicado quando a solicitacao chega ao fim do
+        # tratamento: a aplicacao tem o id da solicitacao (uma por solicitacao)
+        # e a data em que ela chegou ao estado final, entao a mesma linha sai
+        # igual em qualquer exportacao
+        if metodo is not None and isinstance(solicitacao.estado, (Reciclado, Reutilizado, Descartado)):
+            peso_total = solicitacao.calcular_peso_total()
+            yield "rastreamentos", (
+                solicitacao.id,
+                metodo.obter_nome(),
+                peso_total,
+                multiplicar_centavos(peso_total, metodo.custo_base_por_kg),
+                metodo.reducao_impacto_percentual,
+                self._servico_descarte.data_termino(solicitacao.id) or solicitacao.data_criacao,
+            )
@@ -1,4 +1,6 @@
-from typing import Dict, Any
+import logging
+import threading
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 
 # A- TODO: adicionar factory para pontos de coleta
 # M- TODO: validar dados antes de criar objetos
@@ -17,6 +19,43 @@ from ..domain.tratamento import (
     DescarteControlado
 )
 from ..domain.descarte import PontoColeta  # abner 10/2
+from .metricas import REGISTRO
+from .tarifas import ConfiguracaoTarifas
+
+logger = logging.getLogger(__name__)
+
+_DISPOSITIVOS_CRIADOS = REGISTRO.contador(
+    "ecotech_dispositivos_criados_total",
+    "Dispositivos criados pela factory",
+    rotulos=("tipo",)
+)
+
+
+class RegistroTipos:
+    # registro chave de tipo -> construtor usado pelas factories
+    # trocou a cadeia de if/elif e permite registrar tipos novos (plugins)
+
+    def __init__(self, descricao: str):
+        self._descricao = descricao
+        self._construtores: Dict[str, Callable[..., Any]] = {}
+
+    def registrar(self, tipo: str, construtor: Callable[..., Any]):
+        self._construtores[tipo.lower()] = construtor
+
+    def remover(self, tipo: str):
+        self._construtores.pop(tipo.lower(), None)
+
+    def possui(self, tipo: str) -> bool:
+        return tipo.lower() in self._construtores
+
+    def tipos(self) -> List[str]:
+        return list(self._construtores)
+
+    def obter(self, tipo: str) -> Callable[..., Any]:
+        construtor = self._construtores.get(tipo.lower())
+        if construtor is None:
+            raise ValueError(f"tipo de {self._descricao} invalido: {tipo}")
+        return construtor
 
 
 class DispositivoFactory:
@@ -24,30 +63,76 @@ class DispositivoFactory:
     # centraliza a criacao e facilita manutencao
 
     @staticmethod
-    def criar_celular(id: str, nome: str, peso_kg: float) -> Celular:
-        return Celular(id, nome, peso_kg)
+    def criar_celular(
+        id: str,
+        nome: str,
+        peso_kg: float,
+        marca: str = "",
+        modelo: str = ""
+    ) -> Celular:
+        return Celular(id, nome, peso_kg, marca, modelo)
+
+    @staticmethod
+    def criar_computador(
+        id: str,
+        nome: str,
+        peso_kg: float,
+        marca: str = "",
+        modelo: str = ""
+    ) -> Computador:
+        return Computador(id, nome, peso_kg, marca, modelo)
 
     @staticmethod
-    def criar_computador(id: str, nome: str, peso_kg: float) -> Computador:
-        return Computador(id, nome, peso_kg)
+    def criar_eletrodomestico(
+        id: str,
+        nome: str,
+        peso_kg: float,
+        marca: str = "",
+        modelo: str = ""
+    ) -> Eletrodomestico:
+        return Eletrodomestico(id, nome, peso_kg, marca, modelo)
+
+    registro = RegistroTipos("dispositivo")
 
     @staticmethod
-    def criar_eletrodomestico(id: str, nome: str, peso_kg: float) -> Eletrodomestico:
-        return Eletrodomestico(id, nome, peso_kg)
+    def registrar_tipo(tipo: str, construtor: Callable[..., DispositivoEletronico]):
+        # A- permite adicionar novos tipos de dispositivo sem mexer na factory
+        DispositivoFactory.registro.registrar(tipo, construtor)
 
     @staticmethod
     def criar_dispositivo(tipo: str, dados: Dict[str, Any]) -> DispositivoEletronico:
         # A- metodo que escolhe qual tipo criar baseado no parametro
-        tipo_lower = tipo.lower()
-        print(f"[DEBUG] criando dispositivo tipo: {tipo_lower}")
-        if tipo_lower == "celular":
-            return DispositivoFactory.criar_celular(**dados)
-        elif tipo_lower == "computador":
-            return DispositivoFactory.criar_computador(**dados)
-        elif tipo_lower == "eletrodomestico":
-            return DispositivoFactory.criar_eletrodomestico(**dados)
-        else:
-            raise ValueError(f"tipo de dispositivo invalido: {tipo}")
+        construtor = DispositivoFactory.registro.obter(tipo)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("criando dispositivo tipo: %s", tipo)
+        dispositivo = construtor(**dados)
+        _DISPOSITIVOS_CRIADOS.incrementar((tipo.lower(),))
+        return dispositivo
+
+    @staticmethod
+    def criar_dispositivos_lote(
+        itens: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> List[DispositivoEletronico]:
+        # A- cria varios dispositivos de uma vez (importacao, coletas corporativas)
+        # so a busca do construtor e feita uma vez por tipo no lote; cada
+        # dispositivo continua validado no proprio construtor. loga um resumo no final
+        obter = DispositivoFactory.registro.obter
+        construtores: Dict[str, Callable[..., DispositivoEletronico]] = {}
+        dispositivos = []
+        por_tipo: Dict[str, int] = {}
+        for tipo, dados in itens:
+            construtor = construtores.get(tipo)
+            if construtor is None:
+                construtor = construtores[tipo] = obter(tipo)
+            dispositivo = construtor(**dados)
+            dispositivos.append(dispositivo)
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+        # um incremento por tipo no lote, e nao um por dispositivo
+        for tipo, quantidade in por_tipo.items():
+            _DISPOSITIVOS_CRIADOS.incrementar((tipo.lower(),), quantidade)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("lote de %d dispositivos criado", len(dispositivos))
+        return dispositivos
 
 
 class UsuarioFactory:
@@ -76,19 +161,19 @@ class UsuarioFactory:
     ) -> Administrador:
         return Administrador(id, nome, email, nivel_acesso)
 
+    registro = RegistroTipos("usuario")
+
+    @staticmethod
+    def registrar_tipo(tipo: str, construtor: Callable[..., Usuario]):
+        UsuarioFactory.registro.registrar(tipo, construtor)
+
     @staticmethod
     def criar_usuario(tipo: str, dados: Dict[str, Any]) -> Usuario:
         # M- metodo que escolhe qual tipo criar (genericao)
-        tipo_lower = tipo.lower()
-
-        if tipo_lower == "cidadao":
-            return UsuarioFactory.criar_cidadao(**dados)
-        elif tipo_lower == "empresa":
-            return UsuarioFactory.criar_empresa(**dados)
-        elif tipo_lower == "administrador":
-            return UsuarioFactory.criar_administrador(**dados)
-        else:
-            raise ValueError(f"tipo de usuario invalido: {tipo}")
+        construtor = UsuarioFactory.registro.obter(tipo)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("criando usuario tipo: %s", tipo)
+        return construtor(**dados)
 
 
 class MetodoTratamentoFactory:
@@ -106,18 +191,74 @@ class MetodoTratamentoFactory:
     def criar_descarte_controlado() -> DescarteControlado:
         return DescarteControlado()
 
+    registro = RegistroTipos("metodo")
+    # as estrategias sao imutaveis, entao cada tipo tem uma instancia compartilhada
+    _instancias: Dict[str, MetodoTratamento] = {}
+    _tarifas: Optional[ConfiguracaoTarifas] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def registrar_metodo(tipo: str, construtor: Callable[..., MetodoTratamento]):
+        # permite plugar novas estrategias de tratamento
+        # o construtor recebe as tarifas configuradas como argumentos nomeados
+        MetodoTratamentoFactory.registro.registrar(tipo, construtor)
+        MetodoTratamentoFactory.limpar_cache()
+
+    @staticmethod
+    def configurar_tarifas(tarifas: Optional[ConfiguracaoTarifas]):
+        # passa a usar as tarifas do arquivo (None volta para os valores padrao)
+        # troca tarifas e cache juntos: quem esta criando um metodo com as
+        # tarifas antigas termina antes, e o que ele guardou e descartado
+        with MetodoTratamentoFactory._lock:
+            MetodoTratamentoFactory._tarifas = tarifas
+            MetodoTratamentoFactory._instancias = {}
+
+    @staticmethod
+    def limpar_cache():
+        # troca o dicionario inteiro, leitores concorrentes nunca veem ele pela metade
+        with MetodoTratamentoFactory._lock:
+            MetodoTratamentoFactory._instancias = {}
+
     @staticmethod
     def criar_metodo(tipo: str) -> MetodoTratamento:
-        tipo_lower = tipo.lower()
-
-        if tipo_lower == "reciclagem":
-            return MetodoTratamentoFactory.criar_reciclagem()
-        elif tipo_lower == "reuso":
-            return MetodoTratamentoFactory.criar_reuso()
-        elif tipo_lower == "descarte_controlado":
-            return MetodoTratamentoFactory.criar_descarte_controlado()
-        else:
-            raise ValueError(f"tipo de metodo invalido: {tipo}")
+        # retorna a instancia compartilhada do metodo, criando so na primeira vez
+        tarifas = MetodoTratamentoFactory._tarifas
+        if tarifas is not None and tarifas.recarregar_se_alterado():
+            MetodoTratamentoFactory.limpar_cache()
+
+        chave = tipo.lower()
+        metodo = MetodoTratamentoFactory._instancias.get(chave)
+        if metodo is not None:
+            return metodo
+
+        construtor = MetodoTratamentoFactory.registro.obter(tipo)
+        with MetodoTratamentoFactory._lock:
+            # tarifas e cache lidos sob o mesmo lock de configurar_tarifas:
+            # uma instancia nunca entra num cache de outras tarifas
+            tarifas = MetodoTratamentoFactory._tarifas
+            instancias = MetodoTratamentoFactory._instancias
+            metodo = instancias.get(chave)
+            if metodo is None:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("criando metodo de tratamento: %s", tipo)
+                parametros = tarifas.obter_tarifa(chave) if tarifas is not None else {}
+                metodo = construtor(**parametros)
+                instancias[chave] = metodo
+        return metodo
+
+
+# tipos padrao do sistema
+DispositivoFactory.registrar_tipo("celular", DispositivoFactory.criar_celular)
+DispositivoFactory.registrar_tipo("computador", DispositivoFactory.criar_computador)
+DispositivoFactory.registrar_tipo("eletrodomestico", DispositivoFactory.criar_eletrodomestico)
+
+UsuarioFactory.registrar_tipo("cidadao", UsuarioFactory.criar_cidadao)
+UsuarioFactory.registrar_tipo("empresa", UsuarioFactory.criar_empresa)
+UsuarioFactory.registrar_tipo("administrador", UsuarioFactory.criar_administrador)
+
+MetodoTratamentoFactory.registrar_metodo("reciclagem", Reciclagem)
+MetodoTratamentoFactory.registrar_metodo("reuso", Reuso)
+MetodoTratamentoFactory.registrar_metodo("descarte_controlado", DescarteControlado)
 
 
 class PontoColetaFactory:  # abner 10/02
@@ -0,0 +1,89 @@
+# ids ordenados pelo tempo (layout do UUIDv7)
+# uuid4 espalha as insercoes por todo o indice e nao serve para paginar; aqui
+# os primeiros 48 bits sao o instante em ms, entao ids novos sempre vao para o
+# fim de qualquer indice ordenado e "as mais recentes" e so andar de tras pra frente
+#
+#   48 bits  instante unix em ms
+#    4 bits  versao (7)
+#   12 bits  sequencia dentro do mesmo ms (mantem a ordem no processo)
+#    2 bits  variante
+#   62 bits  aleatorios (os.urandom: diferem entre processos, inclusive apos fork)
+#
+# internamente a chave e o binario de 16 bytes (ordena igual ao texto); o texto
+# canonico (8-4-4-4-12) e o que aparece nas rotas e nos snapshots
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+_MAXIMO_SEQUENCIA = 0xFFF
+
+
+class GeradorIds:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ultimo_ms = 0
+        self._sequencia = 0
+
+    def novo(self) -> bytes:
+        aleatorio = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+        agora_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if agora_ms > self._ultimo_ms:
+                self._ultimo_ms = agora_ms
+                self._sequencia = 0
+            else:
+                # mesmo ms (ou relogio voltou): segue a sequencia; se esgotar,
+                # pega emprestado o proximo ms para nunca sair fora de ordem
+                self._sequencia += 1
+                if self._sequencia > _MAXIMO_SEQUENCIA:
+                    self._ultimo_ms += 1
+                    self._sequencia = 0
+            ms, sequencia = self._ultimo_ms, self._sequencia
+        valor = (ms << 80) | (0x7 << 76) | (sequencia << 64) | (0b10 << 62) | aleatorio
+        return valor.to_bytes(16, "big")
+
+
+_GERADOR = GeradorIds()
+
+
+def novo_id_binario() -> bytes:
+    return _GERADOR.novo()
+
+
+def novo_id() -> str:
+    return id_para_texto(_GERADOR.novo())
+
+
+def id_curto(id: str) -> str:
+    # forma curta para mensagens e tabelas: o fim do id (bits aleatorios);
+    # o comeco e o instante em ms e se repete entre ids de um mesmo minuto
+    return id[-8:]
+
+
+def id_para_texto(chave: bytes) -> str:
+    return str(uuid.UUID(bytes=chave))
+
+
+def id_para_binario(id: str) -> bytes:
+    # ids antigos (uuid4) tambem viram 16 bytes, so nao ficam em ordem de tempo;
+    # ids que nem sao uuid (ex. vindos de testes ou importacoes) usam o proprio texto
+    try:
+        return uuid.UUID(id).bytes
+    except ValueError:
+        return id.encode("utf-8")
+
+
+def instante_do_id(id: str) -> Optional[datetime]:
+    # quando o id foi gerado (so para ids deste gerador)
+    try:
+        valor = uuid.UUID(id)
+    except ValueError:
+        return None
+    if valor.version != 7:
+        return None
+    return datetime.fromtimestamp((valor.int >> 80) / 1000)
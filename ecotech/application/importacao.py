@@ -0,0 +1,260 @@
+# importacao em lote de dispositivos para coletas corporativas
+# le CSV ou NDJSON em streaming, valida as linhas em blocos e cria
+# dispositivos e itens bloco a bloco, entao a memoria usada depende do
+# tamanho do bloco e nao do tamanho do arquivo
+
+import csv
+import json
+import uuid
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from ..domain.dispositivos import DispositivoEletronico
+from ..domain.descarte import PontoColeta, SolicitacaoDescarte
+from ..domain.usuarios import Usuario
+from .factories import DispositivoFactory
+from .services import ServicoDescarte
+
+FORMATOS = ("csv", "ndjson")
+
+
+class ErroImportacao:
+    # erro de uma linha especifica do arquivo
+
+    def __init__(self, linha: int, mensagem: str):
+        self._linha = linha
+        self._mensagem = mensagem
+
+    @property
+    def linha(self) -> int:
+        return self._linha
+
+    @property
+    def mensagem(self) -> str:
+        return self._mensagem
+
+    def __str__(self) -> str:
+        return f"linha {self._linha}: {self._mensagem}"
+
+
+class ResultadoImportacao:
+    # consolida o que foi importado e os erros por linha
+    # guarda no maximo max_erros mensagens, mas conta todos
+
+    def __init__(self, max_erros: int = 1000):
+        self._max_erros = max_erros
+        self._total_linhas = 0
+        self._importadas = 0
+        self._total_erros = 0
+        self._erros: List[ErroImportacao] = []
+        self._solicitacoes: Dict[str, SolicitacaoDescarte] = {}
+
+    @property
+    def total_linhas(self) -> int:
+        return self._total_linhas
+
+    @property
+    def importadas(self) -> int:
+        return self._importadas
+
+    @property
+    def total_erros(self) -> int:
+        return self._total_erros
+
+    @property
+    def erros(self) -> List[ErroImportacao]:
+        return self._erros.copy()
+
+    @property
+    def solicitacoes(self) -> List[SolicitacaoDescarte]:
+        return list(self._solicitacoes.values())
+
+    def contar_linhas(self, quantidade: int):
+        self._total_linhas += quantidade
+
+    def registrar_importada(self):
+        self._importadas += 1
+
+    def buscar_solicitacao(self, referencia: str) -> Optional[SolicitacaoDescarte]:
+        return self._solicitacoes.get(referencia)
+
+    def registrar_solicitacao(self, referencia: str, solicitacao: SolicitacaoDescarte):
+        self._solicitacoes[referencia] = solicitacao
+
+    def registrar_erro(self, linha: int, mensagem: str):
+        self._total_erros += 1
+        if len(self._erros) < self._max_erros:
+            self._erros.append(ErroImportacao(linha, mensagem))
+
+    def obter_resumo(self) -> Dict:
+        return {
+            "total_linhas": self._total_linhas,
+            "importadas": self._importadas,
+            "total_erros": self._total_erros,
+            "erros": [str(erro) for erro in self._erros],
+            "solicitacoes": [s.id for s in self._solicitacoes.values()]
+        }
+
+
+def ler_linhas(arquivo: TextIO, formato: str = "csv") -> Iterator[Tuple[int, Any]]:
+    # gera (numero_da_linha, dados) sem carregar o arquivo inteiro
+    # linhas de NDJSON mal formadas geram (numero, ValueError) para virar erro da linha
+    if formato == "csv":
+        leitor = csv.DictReader(arquivo)
+        for dados in leitor:
+            yield leitor.line_num, dados
+    elif formato == "ndjson":
+        for numero, texto in enumerate(arquivo, start=1):
+            if not texto.strip():
+                continue
+            try:
+                dados = json.loads(texto)
+            except json.JSONDecodeError as erro:
+                yield numero, ValueError(f"json invalido: {erro.msg}")
+                continue
+            if not isinstance(dados, dict):
+                yield numero, ValueError("cada linha deve ser um objeto json")
+                continue
+            yield numero, dados
+    else:
+        raise ValueError(f"formato de importacao invalido: {formato}")
+
+
+def validar_linha(dados: Dict[str, Any]) -> Dict[str, Any]:
+    # converte e valida uma linha, reaproveitando as regras do dominio
+    tipo = str(dados.get("tipo") or "").strip().lower()
+    if not DispositivoFactory.registro.possui(tipo):
+        raise ValueError(f"tipo de dispositivo invalido: {dados.get('tipo')}")
+
+    nome = str(dados.get("nome") or "").strip()
+    if not nome:
+        raise ValueError("nome obrigatorio")
+
+    try:
+        peso_kg = float(dados.get("peso_kg"))
+    except (TypeError, ValueError):
+        raise ValueError("peso deve ser um numero")
+
+    try:
+        quantidade = int(dados.get("quantidade") or 1)
+    except (TypeError, ValueError):
+        raise ValueError("quantidade deve ser um numero inteiro")
+    if quantidade <= 0:
+        raise ValueError("quantidade deve ser positiva")
+
+    marca = dados.get("marca") or ""
+    modelo = dados.get("modelo") or ""
+    DispositivoEletronico.validar_dados(peso_kg, marca, modelo)
+
+    return {
+        "tipo": tipo,
+        "dados": {
+            "id": str(dados.get("id") or "") or str(uuid.uuid4()),
+            "nome": nome,
+            "peso_kg": peso_kg,
+            "marca": marca,
+            "modelo": modelo
+        },
+        "quantidade": quantidade,
+        "observacoes": str(dados.get("observacoes") or ""),
+        "solicitacao": str(dados.get("solicitacao") or "")
+    }
+
+
+class ImportadorDispositivos:
+    # importa dispositivos em lote para solicitacoes de um usuario
+    # a coluna opcional "solicitacao" agrupa linhas em solicitacoes diferentes
+
+    def __init__(
+        self,
+        servico_descarte: ServicoDescarte,
+        tamanho_bloco: int = 1000,
+        max_erros: int = 1000
+    ):
+        if tamanho_bloco <= 0:
+            raise ValueError("tamanho do bloco deve ser positivo")
+        self._servico_descarte = servico_descarte
+        self._tamanho_bloco = tamanho_bloco
+        self._max_erros = max_erros
+
+    def importar(
+        self,
+        arquivo: TextIO,
+        usuario: Usuario,
+        formato: str = "csv",
+        ponto_coleta: Optional[PontoColeta] = None
+    ) -> ResultadoImportacao:
+        resultado = ResultadoImportacao(self._max_erros)
+        linhas = ler_linhas(arquivo, formato)
+
+        while True:
+            bloco = list(islice(linhas, self._tamanho_bloco))
+            if not bloco:
+                break
+            resultado.contar_linhas(len(bloco))
+            validas = self._validar_bloco(bloco, resultado)
+            self._criar_bloco(validas, usuario, resultado)
+
+        if ponto_coleta is not None:
+            # reserva a capacidade uma vez por solicitacao, no final
+            for solicitacao in resultado.solicitacoes:
+                try:
+                    self._servico_descarte.definir_ponto_coleta(solicitacao, ponto_coleta)
+                except ValueError as erro:
+                    resultado.registrar_erro(0, f"solicitacao {solicitacao.id}: {erro}")
+
+        return resultado
+
+    def importar_arquivo(
+        self,
+        caminho: str,
+        usuario: Usuario,
+        formato: Optional[str] = None,
+        ponto_coleta: Optional[PontoColeta] = None
+    ) -> ResultadoImportacao:
+        # descobre o formato pela extensao quando nao informado
+        if formato is None:
+            formato = "ndjson" if caminho.lower().endswith((".ndjson", ".jsonl")) else "csv"
+        with open(caminho, newline="", encoding="utf-8") as arquivo:
+            return self.importar(arquivo, usuario, formato, ponto_coleta)
+
+    def _validar_bloco(
+        self,
+        bloco: Iterable[Tuple[int, Any]],
+        resultado: ResultadoImportacao
+    ) -> List[Dict[str, Any]]:
+        validas = []
+        for numero, dados in bloco:
+            if isinstance(dados, Exception):
+                resultado.registrar_erro(numero, str(dados))
+                continue
+            try:
+                validas.append(validar_linha(dados))
+            except ValueError as erro:
+                resultado.registrar_erro(numero, str(erro))
+        return validas
+
+    def _criar_bloco(
+        self,
+        validas: List[Dict[str, Any]],
+        usuario: Usuario,
+        resultado: ResultadoImportacao
+    ):
+        dispositivos = DispositivoFactory.criar_dispositivos_lote(
+            (linha["tipo"], linha["dados"]) for linha in validas
+        )
+
+        for linha, dispositivo in zip(validas, dispositivos):
+            referencia = linha["solicitacao"]
+            solicitacao = resultado.buscar_solicitacao(referencia)
+            if solicitacao is None:
+                solicitacao = self._servico_descarte.criar_solicitacao(usuario)
+                resultado.registrar_solicitacao(referencia, solicitacao)
+
+            self._servico_descarte.adicionar_item_solicitacao(
+                solicitacao,
+                dispositivo,
+                linha["quantidade"],
+                linha["observacoes"]
+            )
+            resultado.registrar_importada()
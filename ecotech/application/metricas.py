@@ -0,0 +1,229 @@
+# instrumentacao leve (contadores e histogramas) no estilo prometheus
+# cada thread acumula numa area propria, sem lock no caminho quente;
+# as areas so sao somadas quando alguem le as metricas (/metrics)
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# buckets padrao em segundos, de 100us a 10s
+BUCKETS_PADRAO = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _Metrica:
+    # base comum: nome, ajuda, nomes dos rotulos e areas por thread
+
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self._nome = nome
+        self._ajuda = ajuda
+        self._rotulos = tuple(rotulos)
+        self._local = threading.local()
+        self._areas: List[Dict[Tuple, List[float]]] = []
+        self._aposentada: Dict[Tuple, List[float]] = {}  # soma das threads que ja terminaram
+        self._lock = threading.RLock()  # so para registrar/aposentar areas
+
+    @property
+    def nome(self) -> str:
+        return self._nome
+
+    def _area(self) -> Dict[Tuple, List[float]]:
+        # area da thread atual, criada na primeira observacao da thread
+        try:
+            return self._local.area
+        except AttributeError:
+            area: Dict[Tuple, List[float]] = {}
+            with self._lock:
+                self._areas.append(area)
+            self._local.area = area
+            # quando a thread termina o threading.local solta o marcador
+            # e a area e somada na area aposentada (servidor com uma thread por requisicao)
+            marcador = _Marcador()
+            weakref.finalize(marcador, self._aposentar, area)
+            self._local.marcador = marcador
+            return area
+
+    def _aposentar(self, area: Dict[Tuple, List[float]]):
+        with self._lock:
+            self._areas = [a for a in self._areas if a is not area]
+            _acumular(self._aposentada, area)
+
+    def _somar_areas(self) -> Dict[Tuple, List[float]]:
+        total: Dict[Tuple, List[float]] = {}
+        with self._lock:
+            areas = list(self._areas)
+            _acumular(total, self._aposentada)
+        for area in areas:
+            _acumular(total, area)
+        return total
+
+    def _formatar_rotulos(self, valores: Tuple, extra: str = "") -> str:
+        pares = [f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(self._rotulos, valores)]
+        if extra:
+            pares.append(extra)
+        return "{" + ",".join(pares) + "}" if pares else ""
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self._nome} {self._ajuda}", f"# TYPE {self._nome} {self.tipo}"]
+        linhas.extend(self._exportar_valores())
+        return linhas
+
+    def _exportar_valores(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Contador(_Metrica):
+
+    tipo = "counter"
+
+    def incrementar(self, rotulos: Tuple = (), valor: float = 1.0):
+        area = self._area()
+        atual = area.get(rotulos)
+        if atual is None:
+            area[rotulos] = [valor]
+        else:
+            atual[0] += valor
+
+    def valor(self, rotulos: Tuple = ()) -> float:
+        return self._somar_areas().get(rotulos, [0.0])[0]
+
+    def _exportar_valores(self) -> List[str]:
+        return [
+            f"{self._nome}{self._formatar_rotulos(rotulos)} {_numero(valores[0])}"
+            for rotulos, valores in sorted(self._somar_areas().items())
+        ]
+
+
+class Histograma(_Metrica):
+    # buckets fixos; cada area guarda [contagem por bucket..., +Inf, soma]
+
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS_PADRAO
+    ):
+        super().__init__(nome, ajuda, rotulos)
+        self._buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, rotulos: Tuple = ()):
+        area = self._area()
+        atual = area.get(rotulos)
+        if atual is None:
+            atual = area[rotulos] = [0.0] * (len(self._buckets) + 2)
+        atual[bisect_left(self._buckets, valor)] += 1
+        atual[-1] += valor
+
+    def contagem(self, rotulos: Tuple = ()) -> int:
+        valores = self._somar_areas().get(rotulos)
+        return int(sum(valores[:-1])) if valores else 0
+
+    def _exportar_valores(self) -> List[str]:
+        linhas = []
+        for rotulos, valores in sorted(self._somar_areas().items()):
+            acumulado = 0.0
+            for limite, quantidade in zip(self._buckets, valores):
+                acumulado += quantidade
+                le = self._formatar_rotulos(rotulos, f'le="{_numero(limite)}"')
+                linhas.append(f"{self._nome}_bucket{le} {_numero(acumulado)}")
+            acumulado += valores[len(self._buckets)]
+            le = self._formatar_rotulos(rotulos, 'le="+Inf"')
+            linhas.append(f"{self._nome}_bucket{le} {_numero(acumulado)}")
+            sufixo = self._formatar_rotulos(rotulos)
+            linhas.append(f"{self._nome}_sum{sufixo} {_numero(valores[-1])}")
+            linhas.append(f"{self._nome}_count{sufixo} {_numero(acumulado)}")
+        return linhas
+
+
+class RegistroMetricas:
+    # guarda as metricas pelo nome e gera o texto do /metrics
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(
+        self,
+        nome: str,
+        ajuda: str,
+        rotulos: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS_PADRAO
+    ) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, buckets))
+
+    def _registrar(self, metrica):
+        # registrar o mesmo nome de novo devolve a metrica existente
+        with self._lock:
+            existente = self._metricas.get(metrica.nome)
+            if existente is not None:
+                if type(existente) is not type(metrica):
+                    raise ValueError(f"metrica {metrica.nome} ja registrada com outro tipo")
+                return existente
+            self._metricas[metrica.nome] = metrica
+            return metrica
+
+    def exportar(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas: List[str] = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+def cronometrar(histograma: Histograma, rotulos: Tuple = ()) -> Callable:
+    # decorator que observa a duracao da funcao no histograma
+    def decorator(funcao):
+        relogio = time.perf_counter
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            inicio = relogio()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                histograma.observar(relogio() - inicio, rotulos)
+        return envolvida
+    return decorator
+
+
+class _Marcador:
+    # objeto guardado no threading.local so para saber quando a thread terminou
+    pass
+
+
+def _acumular(total: Dict[Tuple, List[float]], area: Dict[Tuple, List[float]]):
+    for rotulos, valores in list(area.items()):
+        acumulado = total.get(rotulos)
+        if acumulado is None:
+            total[rotulos] = list(valores)
+        else:
+            for i, valor in enumerate(valores):
+                acumulado[i] += valor
+
+
+def _numero(valor: float) -> str:
+    if valor == int(valor) and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(valor)
+
+
+def _escapar(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# registro usado pela aplicacao (servicos, factories e rotas)
+REGISTRO = RegistroMetricas()
@@ -0,0 +1,195 @@
+# central de notificacoes
+# uma mensagem (titulo, corpo, data) e guardada uma vez so; a caixa de cada
+# usuario guarda apenas os ids das mensagens (array de inteiros). um aviso
+# para 100 mil usuarios custa uma mensagem, um datetime.now() e 100 mil
+# inteiros, entregues em lotes para nao segurar o lock muito tempo
+#
+# as mensagens chegam em ordem, entao as nao lidas sao sempre as ultimas da
+# caixa: basta um contador por usuario (O(1) para ler, somar e zerar)
+#
+# cada caixa guarda so as max_por_caixa mensagens mais recentes; cada mensagem
+# conta quantas caixas ainda a referenciam e sai da central quando nenhuma
+# referencia mais (memoria limitada mesmo com avisos gerais frequentes)
+
+import itertools
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .metricas import REGISTRO
+
+TAMANHO_LOTE = 1000
+MAX_POR_CAIXA = 200
+
+_ENTREGUES = REGISTRO.contador(
+    "ecotech_notificacoes_entregues_total",
+    "Notificacoes entregues nas caixas dos usuarios"
+)
+
+
+class Mensagem:
+    __slots__ = ("_id", "_titulo", "_corpo", "_data", "_texto")
+
+    def __init__(self, id: int, titulo: str, corpo: str = "", data: Optional[datetime] = None):
+        self._id = id
+        self._titulo = titulo
+        self._corpo = corpo
+        self._data = data or datetime.now()
+        self._texto: Optional[str] = None
+
+    def __getstate__(self):
+        return (self._id, self._titulo, self._corpo, self._data)
+
+    def __setstate__(self, estado):
+        self._id, self._titulo, self._corpo, self._data = estado
+        self._texto = None
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def titulo(self) -> str:
+        return self._titulo
+
+    @property
+    def corpo(self) -> str:
+        return self._corpo
+
+    @property
+    def data(self) -> datetime:
+        return self._data
+
+    @property
+    def texto(self) -> str:
+        # mesmo formato de Usuario.adicionar_notificacao, montado uma vez por mensagem
+        if self._texto is None:
+            self._texto = f"[{self._data:%d/%m/%Y %H:%M}] {self._titulo}"
+        return self._texto
+
+
+class CentralNotificacoes:
+
+    def __init__(self, tamanho_lote: int = TAMANHO_LOTE, max_por_caixa: int = MAX_POR_CAIXA):
+        if max_por_caixa <= 0:
+            raise ValueError("max_por_caixa deve ser positivo")
+        self._tamanho_lote = tamanho_lote
+        self._max_por_caixa = max_por_caixa
+        self._lock = threading.Lock()
+        self._zerar()
+
+    def _zerar(self):
+        self._contador = itertools.count()
+        self._mensagens: Dict[int, Mensagem] = {}
+        self._referencias: Dict[int, int] = {}  # id da mensagem -> caixas que a guardam
+        self._caixas: Dict[str, array] = {}  # id do usuario -> ids das mensagens, em ordem
+        self._nao_lidas: Dict[str, int] = {}
+
+    # ----- envio -----
+
+    def enviar(self, id_usuario: str, titulo: str, corpo: str = "") -> Mensagem:
+        return self.transmitir((id_usuario,), titulo, corpo)
+
+    def transmitir(self, ids_usuarios: Iterable[str], titulo: str, corpo: str = "") -> Mensagem:
+        # a mesma mensagem para todos; cada destinatario recebe so a referencia
+        mensagem = Mensagem(next(self._contador), titulo, corpo)
+        destinatarios = list(dict.fromkeys(ids_usuarios))  # sem repetidos, na ordem
+        if not destinatarios:
+            return mensagem
+        with self._lock:
+            # referencias contadas antes da entrega: uma caixa aparada no meio
+            # dos lotes nunca derruba a mensagem que ainda falta entregar
+            self._mensagens[mensagem.id] = mensagem
+            self._referencias[mensagem.id] = len(destinatarios)
+        for inicio in range(0, len(destinatarios), self._tamanho_lote):
+            self._entregar(mensagem.id, destinatarios[inicio:inicio + self._tamanho_lote])
+        _ENTREGUES.incrementar(valor=len(destinatarios))
+        return mensagem
+
+    def _entregar(self, id_mensagem: int, lote: List[str]):
+        caixas = self._caixas
+        nao_lidas = self._nao_lidas
+        with self._lock:
+            for id_usuario in lote:
+                caixa = caixas.get(id_usuario)
+                if caixa is None:
+                    caixa = caixas[id_usuario] = array("q")
+                caixa.append(id_mensagem)
+                nao_lidas[id_usuario] = nao_lidas.get(id_usuario, 0) + 1
+                if len(caixa) > self._max_por_caixa:
+                    self._aparar(id_usuario, caixa)
+
+    def _aparar(self, id_usuario: str, caixa: array):
+        # chamado com o lock: descarta as mais antigas da caixa e as mensagens
+        # que ficaram sem nenhuma caixa
+        excedentes = len(caixa) - self._max_por_caixa
+        referencias = self._referencias
+        for id_mensagem in caixa[:excedentes]:
+            restantes = referencias.get(id_mensagem, 0) - 1
+            if restantes > 0:
+                referencias[id_mensagem] = restantes
+            else:
+                referencias.pop(id_mensagem, None)
+                self._mensagens.pop(id_mensagem, None)
+        del caixa[:excedentes]
+        if self._nao_lidas.get(id_usuario, 0) > len(caixa):
+            self._nao_lidas[id_usuario] = len(caixa)
+
+    # ----- leitura -----
+
+    def nao_lidas(self, id_usuario: str) -> int:
+        return self._nao_lidas.get(id_usuario, 0)
+
+    def listar(self, id_usuario: str, limite: int = 50) -> List[Tuple[Mensagem, bool]]:
+        # (mensagem, lida), das mais recentes para as mais antigas
+        with self._lock:
+            caixa = self._caixas.get(id_usuario)
+            if not caixa:
+                return []
+            primeira_nao_lida = len(caixa) - self._nao_lidas.get(id_usuario, 0)
+            inicio = max(0, len(caixa) - limite)
+            return [
+                (self._mensagens[caixa[posicao]], posicao < primeira_nao_lida)
+                for posicao in range(len(caixa) - 1, inicio - 1, -1)
+            ]
+
+    def marcar_lidas(self, id_usuario: str):
+        with self._lock:
+            if id_usuario in self._nao_lidas:
+                self._nao_lidas[id_usuario] = 0
+
+    # ----- snapshot -----
+
+    def exportar_estado(self) -> Dict:
+        with self._lock:
+            return {
+                "mensagens": list(self._mensagens.values()),
+                "caixas": {id: caixa.tobytes() for id, caixa in self._caixas.items()},
+                "nao_lidas": dict(self._nao_lidas),
+            }
+
+    def importar_estado(self, estado: Dict):
+        # troca o conteudo no lugar: os servicos guardam a referencia da central
+        with self._lock:
+            self._zerar()
+            for mensagem in estado["mensagens"]:
+                self._mensagens[mensagem.id] = mensagem
+            for id_usuario, dados in estado["caixas"].items():
+                caixa = array("q")
+                caixa.frombytes(dados)
+                self._caixas[id_usuario] = caixa
+            self._nao_lidas = dict(estado["nao_lidas"])
+            # referencias refeitas das caixas; snapshots antigos (sem limite)
+            # sao aparados aqui e as mensagens sem caixa ficam de fora
+            for id_usuario, caixa in self._caixas.items():
+                if len(caixa) > self._max_por_caixa:
+                    del caixa[:len(caixa) - self._max_por_caixa]
+                    self._nao_lidas[id_usuario] = min(self._nao_lidas.get(id_usuario, 0), len(caixa))
+                for id_mensagem in caixa:
+                    self._referencias[id_mensagem] = self._referencias.get(id_mensagem, 0) + 1
+            ultimo = max(self._mensagens, default=-1)
+            self._mensagens = {
+                id: mensagem for id, mensagem in self._mensagens.items() if id in self._referencias
+            }
+            self._contador = itertools.count(ultimo + 1)
@@ -0,0 +1,214 @@
+# livro de pontos dos cidadaos
+# cada credito e um lancamento imutavel (usuario, solicitacao, pontos, data)
+# guardado em colunas (arrays); o saldo de cada usuario e um total acumulado
+# em cache, que pode ser reconstruido do livro a qualquer momento
+#
+# os creditos nascem quando uma solicitacao chega em Reciclado/Reutilizado
+# (observador do ServicoDescarte) e entram no livro em lotes
+
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..domain.descarte import SolicitacaoDescarte
+from ..domain.estados import EstadoDescarte, Reciclado, Reutilizado
+from ..domain.usuarios import Cidadao
+
+PONTOS_POR_KG = 10
+
+
+def calcular_pontos(solicitacao: SolicitacaoDescarte) -> int:
+    # pontos pelo peso entregue, no minimo 1 por solicitacao concluida
+    return max(1, round(solicitacao.calcular_peso_total() * PONTOS_POR_KG))
+
+
+class Lancamento:
+
+    def __init__(self, id_usuario: str, id_solicitacao: str, pontos: int, data: float):
+        self._id_usuario = id_usuario
+        self._id_solicitacao = id_solicitacao
+        self._pontos = pontos
+        self._data = data
+
+    @property
+    def id_usuario(self) -> str:
+        return self._id_usuario
+
+    @property
+    def id_solicitacao(self) -> str:
+        return self._id_solicitacao
+
+    @property
+    def pontos(self) -> int:
+        return self._pontos
+
+    @property
+    def data(self) -> float:
+        # timestamp (segundos desde a epoch)
+        return self._data
+
+
+class LivroPontos:
+
+    def __init__(self, tamanho_lote: int = 256):
+        self._tamanho_lote = tamanho_lote
+        # ids viram indices inteiros para caber nas colunas
+        self._usuarios: List[str] = []
+        self._indice_usuario: Dict[str, int] = {}
+        self._creditadas: Dict[str, int] = {}  # id da solicitacao -> linha do livro
+
+        # colunas do livro (uma linha por lancamento)
+        self._col_usuario = array("i")
+        self._col_solicitacao: List[str] = []  # cada solicitacao aparece uma vez so
+        self._col_pontos = array("q")
+        self._col_data = array("d")
+
+        self._saldos = array("q")  # saldo por indice de usuario
+        self._linhas_usuario: List[array] = []  # linhas do livro de cada usuario, para o extrato
+        self._pendentes: List[Tuple[str, str, int]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._col_pontos)
+
+    # ----- entrada -----
+
+    def ao_transicionar(
+        self,
+        solicitacao: SolicitacaoDescarte,
+        anterior: EstadoDescarte,
+        novo: EstadoDescarte
+    ):
+        # observador do ServicoDescarte: so cidadaos pontuam, e so na conclusao com aproveitamento
+        if not isinstance(novo, (Reciclado, Reutilizado)):
+            return
+        if not isinstance(solicitacao.usuario, Cidadao):
+            return
+        self.agendar_credito(solicitacao.usuario.id, solicitacao.id, calcular_pontos(solicitacao))
+
+    def agendar_credito(self, id_usuario: str, id_solicitacao: str, pontos: int):
+        # guarda o credito e so grava no livro quando o lote enche (ou na proxima leitura)
+        with self._lock:
+            self._pendentes.append((id_usuario, id_solicitacao, pontos))
+            if len(self._pendentes) >= self._tamanho_lote:
+                self._gravar_pendentes()
+
+    def creditar_lote(self, creditos: Iterable[Tuple[str, str, int]], data: Optional[float] = None) -> int:
+        # grava varios creditos de uma vez; devolve quantos entraram
+        with self._lock:
+            self._gravar_pendentes()
+            return self._gravar(creditos, data)
+
+    def gravar_pendentes(self) -> int:
+        with self._lock:
+            return self._gravar_pendentes()
+
+    def _gravar_pendentes(self) -> int:
+        if not self._pendentes:
+            return 0
+        pendentes, self._pendentes = self._pendentes, []
+        return self._gravar(pendentes, None)
+
+    def _gravar(self, creditos: Iterable[Tuple[str, str, int]], data: Optional[float]) -> int:
+        # chamado com o lock. uma solicitacao so credita uma vez (reprocessar e seguro)
+        data = time.time() if data is None else data
+        gravados = 0
+        for id_usuario, id_solicitacao, pontos in creditos:
+            if id_solicitacao in self._creditadas:
+                continue
+            usuario = self._indice(id_usuario)
+            self._creditadas[id_solicitacao] = len(self._col_pontos)
+            self._col_usuario.append(usuario)
+            self._col_solicitacao.append(id_solicitacao)
+            self._col_pontos.append(pontos)
+            self._col_data.append(data)
+            self._saldos[usuario] += pontos
+            self._linhas_usuario[usuario].append(len(self._col_pontos) - 1)
+            gravados += 1
+        return gravados
+
+    def _indice(self, id_usuario: str) -> int:
+        indice = self._indice_usuario.get(id_usuario)
+        if indice is None:
+            indice = self._indice_usuario[id_usuario] = len(self._usuarios)
+            self._usuarios.append(id_usuario)
+            self._saldos.append(0)
+            self._linhas_usuario.append(array("i"))
+        return indice
+
+    # ----- leitura -----
+
+    def saldo(self, id_usuario: str) -> int:
+        with self._lock:
+            self._gravar_pendentes()
+            indice = self._indice_usuario.get(id_usuario)
+            return 0 if indice is None else self._saldos[indice]
+
+    def creditada(self, id_solicitacao: str) -> bool:
+        with self._lock:
+            self._gravar_pendentes()
+            return id_solicitacao in self._creditadas
+
+    def extrato(self, id_usuario: str, limite: int = 50) -> List[Lancamento]:
+        # lancamentos mais recentes do usuario
+        with self._lock:
+            self._gravar_pendentes()
+            indice = self._indice_usuario.get(id_usuario)
+            if indice is None:
+                return []
+            linhas = self._linhas_usuario[indice]
+            return [
+                Lancamento(
+                    id_usuario,
+                    self._col_solicitacao[linha],
+                    self._col_pontos[linha],
+                    self._col_data[linha]
+                )
+                for linha in reversed(linhas[-limite:])
+            ]
+
+    def recalcular_saldos(self) -> Dict[str, int]:
+        # reconstroi todos os saldos do livro numa unica passada pelas colunas
+        # e devolve os usuarios cujo saldo em cache estava diferente
+        with self._lock:
+            self._gravar_pendentes()
+            saldos = array("q", bytes(8 * len(self._usuarios)))
+            for usuario, pontos in zip(self._col_usuario, self._col_pontos):
+                saldos[usuario] += pontos
+            divergentes = {
+                self._usuarios[i]: saldos[i]
+                for i in range(len(saldos)) if saldos[i] != self._saldos[i]
+            }
+            self._saldos = saldos
+            return divergentes
+
+    # ----- snapshot -----
+
+    def exportar_estado(self) -> Dict:
+        with self._lock:
+            self._gravar_pendentes()
+            return {
+                "usuarios": list(self._usuarios),
+                "usuario": array("i", self._col_usuario),
+                "solicitacao": list(self._col_solicitacao),
+                "pontos": array("q", self._col_pontos),
+                "data": array("d", self._col_data),
+            }
+
+    def importar_estado(self, estado: Dict):
+        # so as colunas vao para o snapshot; indices e saldos sao reconstruidos
+        with self._lock:
+            self._pendentes = []
+            self._usuarios = list(estado["usuarios"])
+            self._indice_usuario = {id: i for i, id in enumerate(self._usuarios)}
+            self._col_usuario = array("i", estado["usuario"])
+            self._col_solicitacao = list(estado["solicitacao"])
+            self._col_pontos = array("q", estado["pontos"])
+            self._col_data = array("d", estado["data"])
+            self._creditadas = {id: linha for linha, id in enumerate(self._col_solicitacao)}
+            self._saldos = array("q", bytes(8 * len(self._usuarios)))
+            self._linhas_usuario = [array("i") for _ in self._usuarios]
+            for linha, usuario in enumerate(self._col_usuario):
+                self._linhas_usuario[usuario].append(linha)
+        self.recalcular_saldos()
@@ -0,0 +1,317 @@
+# fila de processamento de novas solicitacoes
+# o handler http so valida os dados e enfileira, devolvendo o id na hora
+# os workers criam a solicitacao, adicionam o item, reservam capacidade
+# no ponto de coleta e notificam o usuario, tudo em lotes
+
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Mapping
+
+from ..domain.usuarios import Usuario
+from ..domain.descarte import PontoColeta
+from .cotas import CotaExcedida
+from .factories import DispositivoFactory
+from .identificadores import id_curto, novo_id
+from .services import ServicoDescarte
+
+# quantos pedidos ja concluidos ficam disponiveis para consulta do status
+LIMITE_STATUS = 10000
+
+
+def validar_dados_solicitacao(dados: Mapping[str, Any]) -> Dict[str, Any]:
+    # valida e converte os campos do formulario de nova solicitacao
+    # levanta ValueError com mensagem amigavel se algo estiver errado
+    tipo = str(dados.get("tipo_dispositivo", "")).strip().lower()
+    if not DispositivoFactory.registro.possui(tipo):
+        raise ValueError("tipo de dispositivo invalido")
+
+    nome = str(dados.get("nome", "")).strip()
+    if not nome:
+        raise ValueError("informe o modelo/nome do dispositivo")
+
+    try:
+        peso_kg = float(dados.get("peso_kg", ""))
+    except (TypeError, ValueError):
+        raise ValueError("peso deve ser um numero")
+    if peso_kg <= 0:
+        raise ValueError("peso deve ser positivo")
+
+    try:
+        quantidade = int(dados.get("quantidade", 1))
+    except (TypeError, ValueError):
+        raise ValueError("quantidade deve ser um numero inteiro")
+    if quantidade <= 0:
+        raise ValueError("quantidade deve ser positiva")
+
+    # coordenadas do usuario, usadas so na escolha automatica do ponto
+    coordenadas = []
+    for campo in ("latitude", "longitude"):
+        valor = str(dados.get(campo, "") or "").strip()
+        try:
+            coordenadas.append(float(valor) if valor else None)
+        except ValueError:
+            raise ValueError("localizacao invalida")
+    if None in coordenadas:
+        coordenadas = [None, None]
+
+    return {
+        "tipo_dispositivo": tipo,
+        "nome": nome,
+        "peso_kg": peso_kg,
+        "quantidade": quantidade,
+        "observacoes": str(dados.get("observacoes", "")).strip(),
+        "ponto_coleta": str(dados.get("ponto_coleta", "")).strip() or None,
+        "latitude": coordenadas[0],
+        "longitude": coordenadas[1]
+    }
+
+
+class PedidoSolicitacao:
+    # pedido ja validado esperando na fila
+
+    def __init__(
+        self,
+        id: str,
+        usuario: Usuario,
+        tipo_dispositivo: str,
+        dados_dispositivo: Dict[str, Any],
+        quantidade: int = 1,
+        observacoes: str = "",
+        ponto_coleta: Optional[PontoColeta] = None
+    ):
+        self._id = id
+        self._usuario = usuario
+        self._tipo_dispositivo = tipo_dispositivo
+        self._dados_dispositivo = dados_dispositivo
+        self._quantidade = quantidade
+        self._observacoes = observacoes
+        self._ponto_coleta = ponto_coleta
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def usuario(self) -> Usuario:
+        return self._usuario
+
+    @property
+    def tipo_dispositivo(self) -> str:
+        return self._tipo_dispositivo
+
+    @property
+    def dados_dispositivo(self) -> Dict[str, Any]:
+        return self._dados_dispositivo
+
+    @property
+    def quantidade(self) -> int:
+        return self._quantidade
+
+    @property
+    def observacoes(self) -> str:
+        return self._observacoes
+
+    @property
+    def ponto_coleta(self) -> Optional[PontoColeta]:
+        return self._ponto_coleta
+
+
+class FilaSolicitacoes:
+    # pool de workers que consome os pedidos em lotes
+    # o status de cada pedido fica disponivel para consulta pelo id; dos
+    # concluidos so os ultimos 'limite_status' sao lembrados
+
+    PENDENTE = "pendente"
+    PROCESSADO = "processado"
+    ERRO = "erro"
+
+    _PARAR = object()  # sentinela para encerrar os workers
+
+    def __init__(
+        self,
+        servico_descarte: ServicoDescarte,
+        num_workers: int = 2,
+        tamanho_lote: int = 32,
+        limite_status: int = LIMITE_STATUS
+    ):
+        if num_workers <= 0:
+            raise ValueError("numero de workers deve ser positivo")
+        if tamanho_lote <= 0:
+            raise ValueError("tamanho do lote deve ser positivo")
+
+        self._servico_descarte = servico_descarte
+        self._num_workers = num_workers
+        self._tamanho_lote = tamanho_lote
+        self._fila: "queue.Queue" = queue.Queue()
+        self._limite_status = limite_status
+        # pendentes no comeco, concluidos no fim na ordem em que terminaram
+        self._status: "OrderedDict[str, str]" = OrderedDict()
+        self._erros: Dict[str, str] = {}
+        self._donos: Dict[str, str] = {}  # id do pedido -> id do usuario
+        self._lock_status = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    @property
+    def ativa(self) -> bool:
+        return any(worker.is_alive() for worker in self._workers)
+
+    def iniciar(self):
+        if self.ativa:
+            return
+        self._workers = [
+            threading.Thread(
+                target=self._executar,
+                name=f"ecotech-fila-{i}",
+                daemon=True
+            )
+            for i in range(self._num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def parar(self, timeout: Optional[float] = None):
+        # termina o que ja foi enfileirado e encerra os workers
+        for _ in self._workers:
+            self._fila.put(self._PARAR)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def enfileirar(
+        self,
+        usuario: Usuario,
+        tipo_dispositivo: str,
+        dados_dispositivo: Dict[str, Any],
+        quantidade: int = 1,
+        observacoes: str = "",
+        ponto_coleta: Optional[PontoColeta] = None
+    ) -> str:
+        # so registra o pedido, o id ja e o id final da solicitacao
+        id_solicitacao = novo_id()
+        pedido = PedidoSolicitacao(
+            id_solicitacao,
+            usuario,
+            tipo_dispositivo,
+            dados_dispositivo,
+            quantidade,
+            observacoes,
+            ponto_coleta
+        )
+        with self._lock_status:
+            self._status[id_solicitacao] = self.PENDENTE
+            self._donos[id_solicitacao] = usuario.id
+        self._fila.put(pedido)
+        return id_solicitacao
+
+    def obter_status(self, id: str) -> Optional[str]:
+        return self._status.get(id)
+
+    def obter_erro(self, id: str) -> Optional[str]:
+        return self._erros.get(id)
+
+    def obter_dono(self, id: str) -> Optional[str]:
+        # id do usuario que enfileirou o pedido
+        return self._donos.get(id)
+
+    def _concluir(self, id: str, status: str, erro: Optional[str] = None):
+        with self._lock_status:
+            self._status[id] = status
+            self._status.move_to_end(id)
+            if erro is not None:
+                self._erros[id] = erro
+            # esquece os concluidos mais antigos; pendentes ficam ate terminar
+            while len(self._status) > self._limite_status:
+                antigo, situacao = next(iter(self._status.items()))
+                if situacao == self.PENDENTE:
+                    break
+                del self._status[antigo]
+                self._erros.pop(antigo, None)
+                self._donos.pop(antigo, None)
+
+    def aguardar(self):
+        # bloqueia ate todos os pedidos enfileirados serem processados
+        self._fila.join()
+
+    def _executar(self):
+        while True:
+            lote = [self._fila.get()]
+            # junta o que ja estiver na fila ate o tamanho do lote
+            while len(lote) < self._tamanho_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            pedidos = [p for p in lote if p is not self._PARAR]
+            try:
+                if pedidos:
+                    self._processar_lote(pedidos)
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+            parar = len(pedidos) != len(lote)
+            if parar:
+                # devolve os sentinelas extras para os outros workers
+                for _ in range(len(lote) - len(pedidos) - 1):
+                    self._fila.put(self._PARAR)
+                return
+
+    def _processar_lote(self, pedidos: List[PedidoSolicitacao]):
+        # uma notificacao por usuario por lote, e nao uma por pedido
+        criadas: Dict[str, List[str]] = {}
+        usuarios: Dict[str, Usuario] = {}
+
+        for pedido in pedidos:
+            try:
+                aviso = self._processar(pedido)
+            except Exception as erro:
+                self._concluir(pedido.id, self.ERRO, str(erro))
+                continue
+
+            self._concluir(pedido.id, self.PROCESSADO)
+            usuarios[pedido.usuario.id] = pedido.usuario
+            criadas.setdefault(pedido.usuario.id, []).append(aviso)
+
+        for id_usuario, avisos in criadas.items():
+            usuario = usuarios[id_usuario]
+            if len(avisos) == 1:
+                usuario.adicionar_notificacao(avisos[0])
+            else:
+                usuario.adicionar_notificacao(
+                    f"{len(avisos)} solicitacoes registradas: " + "; ".join(avisos)
+                )
+
+    def _processar(self, pedido: PedidoSolicitacao) -> str:
+        # cria o dispositivo antes da solicitacao para nao deixar solicitacao vazia
+        dados = dict(pedido.dados_dispositivo)
+        dados.setdefault("id", str(uuid.uuid4()))
+        dispositivo = DispositivoFactory.criar_dispositivo(pedido.tipo_dispositivo, dados)
+
+        solicitacao = self._servico_descarte.criar_solicitacao(
+            pedido.usuario,
+            id_solicitacao=pedido.id
+        )
+        self._servico_descarte.adicionar_item_solicitacao(
+            solicitacao,
+            dispositivo,
+            pedido.quantidade,
+            pedido.observacoes
+        )
+
+        if pedido.ponto_coleta is None:
+            return f"Solicitacao {id_curto(pedido.id)} registrada"
+
+        try:
+            self._servico_descarte.definir_ponto_coleta(solicitacao, pedido.ponto_coleta)
+        except CotaExcedida as erro:
+            return f"Solicitacao {id_curto(pedido.id)} registrada, mas sem entrega: {erro}"
+        except ValueError:
+            # a solicitacao continua valida, o usuario escolhe outro ponto depois
+            return (
+                f"Solicitacao {id_curto(pedido.id)} registrada, mas o ponto "
+                f"{pedido.ponto_coleta.nome} esta sem capacidade"
+            )
+        return f"Solicitacao {id_curto(pedido.id)} registrada em {pedido.ponto_coleta.nome}"
@@ -0,0 +1,380 @@
+# roteirizacao das coletas nos pontos de coleta
+# agrupa as solicitacoes em estado Solicitado por ponto, monta rotas com
+# vizinho mais proximo (busca numa grade espacial) respeitando a capacidade
+# do veiculo e a janela do turno, e melhora cada rota com 2-opt
+#
+# data_agendamento da solicitacao e tratada como "nao coletar antes de"
+#
+# as coordenadas sao projetadas num plano local em km (equiretangular,
+# centrado no deposito); na escala de uma cidade o erro e desprezivel e
+# a distancia vira um hypot. a distancia final de cada rota usa haversine
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..domain.descarte import PontoColeta, SolicitacaoDescarte
+from ..domain.estados import Solicitado
+
+RAIO_TERRA_KM = 6371.0
+
+
+def distancia_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # distancia em linha reta (haversine)
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    dfi = fi2 - fi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dfi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(a))
+
+
+class Parada:
+    # uma visita a um ponto de coleta levando um grupo de solicitacoes
+
+    def __init__(self, ponto: PontoColeta, solicitacoes: List[SolicitacaoDescarte], peso_kg: float):
+        self._ponto = ponto
+        self._solicitacoes = solicitacoes
+        self._peso_kg = peso_kg
+        # a parada so pode acontecer depois do agendamento mais tardio do grupo
+        agendamentos = [s.data_agendamento for s in solicitacoes if s.data_agendamento]
+        self._disponivel_em: Optional[datetime] = max(agendamentos) if agendamentos else None
+        self.chegada: Optional[datetime] = None
+
+    @property
+    def ponto(self) -> PontoColeta:
+        return self._ponto
+
+    @property
+    def solicitacoes(self) -> List[SolicitacaoDescarte]:
+        return self._solicitacoes
+
+    @property
+    def peso_kg(self) -> float:
+        return self._peso_kg
+
+    @property
+    def disponivel_em(self) -> Optional[datetime]:
+        return self._disponivel_em
+
+
+class Rota:
+
+    def __init__(self, paradas: List[Parada], distancia_km: float, saida: datetime, retorno: datetime):
+        self._paradas = paradas
+        self._distancia_km = distancia_km
+        self._saida = saida
+        self._retorno = retorno
+
+    @property
+    def paradas(self) -> List[Parada]:
+        return self._paradas
+
+    @property
+    def distancia_km(self) -> float:
+        return self._distancia_km
+
+    @property
+    def peso_kg(self) -> float:
+        return sum(parada.peso_kg for parada in self._paradas)
+
+    @property
+    def saida(self) -> datetime:
+        return self._saida
+
+    @property
+    def retorno(self) -> datetime:
+        return self._retorno
+
+    def obter_resumo(self) -> Dict:
+        return {
+            "paradas": [parada.ponto.id for parada in self._paradas],
+            "solicitacoes": sum(len(parada.solicitacoes) for parada in self._paradas),
+            "peso_kg": round(self.peso_kg, 2),
+            "distancia_km": round(self._distancia_km, 2),
+            "saida": self._saida.isoformat(),
+            "retorno": self._retorno.isoformat(),
+        }
+
+
+class _No:
+    # uma parada no formato usado pelo planejamento: posicao no plano (km),
+    # distancia ate o deposito e horario minimo em horas desde o inicio do turno
+    __slots__ = ("parada", "x", "y", "volta_km", "peso", "disponivel_h", "alocado")
+
+    def __init__(self, parada: Parada, x: float, y: float, disponivel_h: float):
+        self.parada = parada
+        self.x = x
+        self.y = y
+        self.volta_km = math.hypot(x, y)
+        self.peso = parada.peso_kg
+        self.disponivel_h = disponivel_h
+        self.alocado = False
+
+
+class _GradeEspacial:
+    # indice dos nos por celula quadrada (km) para achar o vizinho mais proximo
+    # sem comparar com todos os nos
+
+    def __init__(self, nos: Iterable[_No], tamanho_celula_km: float):
+        self._tamanho = tamanho_celula_km
+        self._celulas: Dict[Tuple[int, int], List[_No]] = {}
+        self._total = 0
+        for no in nos:
+            self._celulas.setdefault(self._celula(no.x, no.y), []).append(no)
+            self._total += 1
+        # nos so saem da grade, entao a caixa calculada aqui continua valida
+        linhas = [c[0] for c in self._celulas] or [0]
+        colunas = [c[1] for c in self._celulas] or [0]
+        self._caixa = (min(linhas), max(linhas), min(colunas), max(colunas))
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _celula(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self._tamanho)), int(math.floor(y / self._tamanho))
+
+    def remover(self, no: _No):
+        celula = self._celula(no.x, no.y)
+        lista = self._celulas[celula]
+        lista.remove(no)
+        if not lista:
+            del self._celulas[celula]
+        self._total -= 1
+        no.alocado = True
+
+    def mais_proximo(
+        self,
+        x: float,
+        y: float,
+        raio_km: float,
+        carga_livre: float,
+        relogio_h: float,
+        limite_h: float,
+        velocidade: float
+    ) -> Optional[Tuple[_No, float]]:
+        # vizinho mais proximo que cabe no veiculo e ainda deixa voltar ao deposito
+        # ate limite_h (que ja desconta o tempo de parada). procura em aneis de celulas
+        # cada vez maiores e para quando o anel passa da melhor distancia ou do raio alcancavel
+        if not self._celulas:
+            return None
+        linha, coluna = self._celula(x, y)
+        l0, l1, c0, c1 = self._caixa
+        alcance = max(abs(linha - l0), abs(linha - l1), abs(coluna - c0), abs(coluna - c1))
+        alcance = min(alcance, int(raio_km / self._tamanho) + 1)
+
+        melhor: Optional[_No] = None
+        melhor_distancia = raio_km
+        celulas = self._celulas
+        hypot = math.hypot
+        for raio in range(alcance + 1):
+            if (raio - 1) * self._tamanho > melhor_distancia:
+                break
+            for celula in self._anel(linha, coluna, raio):
+                for no in celulas.get(celula, ()):
+                    if no.peso > carga_livre:
+                        continue
+                    distancia = hypot(no.x - x, no.y - y)
+                    if distancia > melhor_distancia or (melhor is not None and distancia == melhor_distancia):
+                        continue
+                    chegada = max(relogio_h + distancia / velocidade, no.disponivel_h)
+                    if chegada + no.volta_km / velocidade > limite_h:
+                        continue
+                    melhor, melhor_distancia = no, distancia
+        return (melhor, melhor_distancia) if melhor is not None else None
+
+    @staticmethod
+    def _anel(linha: int, coluna: int, raio: int) -> Iterable[Tuple[int, int]]:
+        if raio == 0:
+            yield linha, coluna
+            return
+        for d in range(-raio, raio + 1):
+            yield linha - raio, coluna + d
+            yield linha + raio, coluna + d
+        for d in range(-raio + 1, raio):
+            yield linha + d, coluna - raio
+            yield linha + d, coluna + raio
+
+
+class RoteirizadorColetas:
+    # planeja as rotas de um turno a partir de um deposito
+
+    def __init__(
+        self,
+        latitude_deposito: float,
+        longitude_deposito: float,
+        capacidade_veiculo_kg: float = 1000.0,
+        velocidade_kmh: float = 30.0,
+        minutos_por_parada: float = 10.0,
+        tamanho_celula_km: float = 2.0,
+        iteracoes_2opt: int = 50
+    ):
+        if capacidade_veiculo_kg <= 0:
+            raise ValueError("capacidade do veiculo deve ser positiva")
+        if velocidade_kmh <= 0:
+            raise ValueError("velocidade deve ser positiva")
+        self._deposito = (latitude_deposito, longitude_deposito)
+        self._capacidade = capacidade_veiculo_kg
+        self._velocidade = velocidade_kmh
+        self._horas_parada = minutos_por_parada / 60
+        self._tamanho_celula = tamanho_celula_km
+        self._iteracoes_2opt = iteracoes_2opt
+        self._km_por_grau_lat = RAIO_TERRA_KM * math.radians(1)
+        self._km_por_grau_lon = self._km_por_grau_lat * math.cos(math.radians(latitude_deposito))
+
+    def montar_paradas(self, solicitacoes: Iterable[SolicitacaoDescarte], fim_turno: datetime) -> List[Parada]:
+        # agrupa por ponto as solicitacoes pendentes que podem ser coletadas no turno
+        # pontos com mais peso que o veiculo viram varias paradas
+        por_ponto: Dict[str, List[SolicitacaoDescarte]] = {}
+        pontos: Dict[str, PontoColeta] = {}
+        for solicitacao in solicitacoes:
+            ponto = solicitacao.ponto_coleta
+            if ponto is None or not isinstance(solicitacao.estado, Solicitado):
+                continue
+            if solicitacao.data_agendamento and solicitacao.data_agendamento > fim_turno:
+                continue
+            por_ponto.setdefault(ponto.id, []).append(solicitacao)
+            pontos[ponto.id] = ponto
+
+        paradas = []
+        for id_ponto, grupo in por_ponto.items():
+            atual: List[SolicitacaoDescarte] = []
+            peso_atual = 0.0
+            for solicitacao in grupo:
+                peso = solicitacao.calcular_peso_total()
+                if peso > self._capacidade:
+                    # nao cabe em nenhum veiculo, fica para planejamento manual
+                    continue
+                if peso_atual + peso > self._capacidade:
+                    paradas.append(Parada(pontos[id_ponto], atual, peso_atual))
+                    atual, peso_atual = [], 0.0
+                atual.append(solicitacao)
+                peso_atual += peso
+            if atual:
+                paradas.append(Parada(pontos[id_ponto], atual, peso_atual))
+        return paradas
+
+    def planejar(
+        self,
+        solicitacoes: Iterable[SolicitacaoDescarte],
+        inicio_turno: datetime,
+        fim_turno: datetime,
+        max_rotas: Optional[int] = None
+    ) -> List[Rota]:
+        if fim_turno <= inicio_turno:
+            raise ValueError("fim do turno deve ser depois do inicio")
+
+        nos = [self._no(parada, inicio_turno) for parada in self.montar_paradas(solicitacoes, fim_turno)]
+        duracao_h = (fim_turno - inicio_turno).total_seconds() / 3600
+        grade = _GradeEspacial(nos, self._tamanho_celula)
+        # do mais pesado para o mais leve: o fim da lista e o no mais leve ainda livre,
+        # e se nem ele cabe no veiculo a rota fecha sem varrer a grade
+        por_peso = sorted(nos, key=lambda no: no.peso, reverse=True)
+        rotas: List[Rota] = []
+        while len(grade) and (max_rotas is None or len(rotas) < max_rotas):
+            rota = self._vizinho_mais_proximo(grade, por_peso, duracao_h)
+            if not rota:
+                # nada restante cabe no turno
+                break
+            rota = self._dois_opt(rota, duracao_h)
+            rotas.append(self._fechar_rota(rota, inicio_turno))
+        return rotas
+
+    def _no(self, parada: Parada, inicio: datetime) -> _No:
+        x = (parada.ponto.longitude - self._deposito[1]) * self._km_por_grau_lon
+        y = (parada.ponto.latitude - self._deposito[0]) * self._km_por_grau_lat
+        disponivel_h = 0.0
+        if parada.disponivel_em and parada.disponivel_em > inicio:
+            disponivel_h = (parada.disponivel_em - inicio).total_seconds() / 3600
+        return _No(parada, x, y, disponivel_h)
+
+    def _vizinho_mais_proximo(self, grade: _GradeEspacial, por_peso: List[_No], duracao_h: float) -> List[_No]:
+        x = y = 0.0
+        relogio = 0.0
+        carga = 0.0
+        rota: List[_No] = []
+        limite = duracao_h - self._horas_parada
+
+        while True:
+            while por_peso and por_peso[-1].alocado:
+                por_peso.pop()
+            if not por_peso or carga + por_peso[-1].peso > self._capacidade:
+                return rota
+            raio = (limite - relogio) * self._velocidade
+            encontrado = grade.mais_proximo(
+                x, y, raio, self._capacidade - carga, relogio, limite, self._velocidade
+            )
+            if encontrado is None:
+                return rota
+            no, distancia = encontrado
+            grade.remover(no)
+            relogio = max(relogio + distancia / self._velocidade, no.disponivel_h) + self._horas_parada
+            carga += no.peso
+            x, y = no.x, no.y
+            rota.append(no)
+
+    def _respeita_turno(self, rota: List[_No], duracao_h: float) -> bool:
+        x = y = 0.0
+        relogio = 0.0
+        for no in rota:
+            relogio = max(relogio + math.hypot(no.x - x, no.y - y) / self._velocidade, no.disponivel_h)
+            relogio += self._horas_parada
+            x, y = no.x, no.y
+        return relogio + math.hypot(x, y) / self._velocidade <= duracao_h
+
+    def _dois_opt(self, rota: List[_No], duracao_h: float) -> List[_No]:
+        # inverte trechos da rota enquanto isso encurtar o caminho (e respeitar o turno)
+        if len(rota) < 3:
+            return rota
+        hypot = math.hypot
+        pontos = [(0.0, 0.0)] + [(no.x, no.y) for no in rota] + [(0.0, 0.0)]
+        n = len(pontos)
+        melhorou = True
+        iteracoes = 0
+        while melhorou and iteracoes < self._iteracoes_2opt:
+            melhorou = False
+            iteracoes += 1
+            for i in range(1, n - 2):
+                ax, ay = pontos[i - 1]
+                bx, by = pontos[i]
+                ab = hypot(bx - ax, by - ay)
+                for j in range(i + 1, n - 1):
+                    cx, cy = pontos[j]
+                    dx, dy = pontos[j + 1]
+                    ganho = ab + hypot(dx - cx, dy - cy) - hypot(cx - ax, cy - ay) - hypot(dx - bx, dy - by)
+                    if ganho <= 1e-9:
+                        continue
+                    candidata = rota[:i - 1] + rota[i - 1:j][::-1] + rota[j:]
+                    if not self._respeita_turno(candidata, duracao_h):
+                        continue
+                    rota = candidata
+                    pontos[i:j + 1] = pontos[i:j + 1][::-1]
+                    bx, by = pontos[i]
+                    ab = hypot(bx - ax, by - ay)
+                    melhorou = True
+        return rota
+
+    def _fechar_rota(self, rota: List[_No], inicio: datetime) -> Rota:
+        # calcula os horarios de chegada definitivos e a distancia real da rota
+        x = y = 0.0
+        relogio = 0.0
+        lat, lon = self._deposito
+        distancia_total = 0.0
+        for no in rota:
+            chegada = max(relogio + math.hypot(no.x - x, no.y - y) / self._velocidade, no.disponivel_h)
+            no.parada.chegada = inicio + timedelta(hours=chegada)
+            relogio = chegada + self._horas_parada
+            x, y = no.x, no.y
+            ponto = no.parada.ponto
+            distancia_total += distancia_km(lat, lon, ponto.latitude, ponto.longitude)
+            lat, lon = ponto.latitude, ponto.longitude
+        distancia_total += distancia_km(lat, lon, *self._deposito)
+        retorno = inicio + timedelta(hours=relogio + math.hypot(x, y) / self._velocidade)
+        return Rota([no.parada for no in rota], distancia_total, inicio, retorno)
+
+
+def agendar_rotas(rotas: Iterable[Rota]):
+    # grava o horario previsto de coleta em cada solicitacao das rotas
+    for rota in rotas:
+        for parada in rota.paradas:
+            for solicitacao in parada.solicitacoes:
+                solicitacao.data_agendamento = parada.chegada
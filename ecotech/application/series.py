@@ -0,0 +1,202 @@
+# series temporais de peso por ponto de coleta
+# guarda kg por hora num buffer circular; quando uma hora sai da janela
+# ela e somada no bucket do dia, que tambem fica num buffer circular.
+# com isso da para ver a taxa de enchimento e prever quando o ponto lota
+
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..domain.descarte import PontoColeta
+
+SEGUNDOS_HORA = 3600
+
+
+def _hora(quando: datetime) -> int:
+    # indice absoluto da hora (horas desde a epoch)
+    return int(quando.timestamp() // SEGUNDOS_HORA)
+
+
+def _data_da_hora(hora: int) -> datetime:
+    return datetime.fromtimestamp(hora * SEGUNDOS_HORA)
+
+
+class SerieTemporal:
+    # buckets horarios das ultimas horas_retencao horas e diarios dos ultimos dias_retencao dias
+    # memoria fixa: (horas_retencao + dias_retencao) doubles por serie
+    # registros chegam dos workers da fila e das requisicoes web ao mesmo
+    # tempo: o += nos buckets e o avanco da janela acontecem sob um lock
+
+    def __init__(self, horas_retencao: int = 24 * 7, dias_retencao: int = 365):
+        if horas_retencao < 24:
+            raise ValueError("retencao horaria deve ser de pelo menos 24 horas")
+        if dias_retencao <= 0:
+            raise ValueError("retencao diaria deve ser positiva")
+        self._horas_retencao = horas_retencao
+        self._dias_retencao = dias_retencao
+        self._horas = array("d", bytes(8 * horas_retencao))
+        self._dias = array("d", bytes(8 * dias_retencao))
+        self._hora_atual: Optional[int] = None  # hora mais recente ja registrada
+        self._dia_atual: Optional[int] = None  # dia mais recente no buffer diario
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # o lock nao vai para o snapshot; os buffers sao copiados sob ele
+        with self._lock:
+            estado = self.__dict__.copy()
+            estado["_horas"] = array("d", self._horas)
+            estado["_dias"] = array("d", self._dias)
+        del estado["_lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    @property
+    def horas_retencao(self) -> int:
+        return self._horas_retencao
+
+    def registrar(self, kg: float, quando: Optional[datetime] = None):
+        hora = _hora(quando or datetime.now())
+        with self._lock:
+            self._registrar(hora, kg)
+
+    def _registrar(self, hora: int, kg: float):
+        # chamado com o lock
+        if self._hora_atual is None:
+            self._hora_atual = hora
+        elif hora > self._hora_atual:
+            self._avancar_para(hora)
+
+        if hora > self._hora_atual - self._horas_retencao:
+            self._horas[hora % self._horas_retencao] += kg
+        else:
+            # registro atrasado, ja fora da janela horaria
+            self._somar_dia(hora // 24, kg)
+
+    def _avancar_para(self, hora: int):
+        # as horas que saem da janela descem para o bucket diario
+        # (no maximo horas_retencao iteracoes, mesmo depois de muito tempo parado)
+        primeira = self._hora_atual - self._horas_retencao + 1
+        ultima = min(hora - self._horas_retencao, self._hora_atual)
+        for antiga in range(primeira, ultima + 1):
+            self._descer_hora(antiga)
+        self._hora_atual = hora
+        # dias velhos demais expiram mesmo sem dado novo descendo
+        self._avancar_dia((hora - self._horas_retencao) // 24)
+
+    def _descer_hora(self, hora_antiga: int):
+        indice = hora_antiga % self._horas_retencao
+        valor = self._horas[indice]
+        if valor:
+            self._somar_dia(hora_antiga // 24, valor)
+            self._horas[indice] = 0.0
+
+    def _avancar_dia(self, dia: int):
+        if self._dia_atual is None:
+            self._dia_atual = dia
+        elif dia > self._dia_atual:
+            # limpa os dias que estao sendo reaproveitados no buffer
+            for antigo in range(max(self._dia_atual + 1, dia - self._dias_retencao + 1), dia + 1):
+                self._dias[antigo % self._dias_retencao] = 0.0
+            self._dia_atual = dia
+
+    def _somar_dia(self, dia: int, kg: float):
+        self._avancar_dia(dia)
+        if dia > self._dia_atual - self._dias_retencao:
+            self._dias[dia % self._dias_retencao] += kg
+
+    def consultar(self, inicio: datetime, fim: datetime) -> List[Tuple[datetime, float]]:
+        # pontos (inicio do bucket, kg) no intervalo [inicio, fim)
+        # horas dentro da janela horaria vem por hora, o resto vem por dia
+        with self._lock:
+            return self._consultar(inicio, fim)
+
+    def _consultar(self, inicio: datetime, fim: datetime) -> List[Tuple[datetime, float]]:
+        if self._hora_atual is None:
+            return []
+        hora_inicio, hora_fim = _hora(inicio), _hora(fim)
+        primeira_horaria = self._hora_atual - self._horas_retencao + 1
+
+        pontos = []
+        if hora_inicio < primeira_horaria:
+            ultimo_dia = (min(hora_fim, primeira_horaria) - 1) // 24
+            for dia in range(hora_inicio // 24, ultimo_dia + 1):
+                if self._dia_atual is not None and self._dia_atual - self._dias_retencao < dia <= self._dia_atual:
+                    pontos.append((_data_da_hora(dia * 24), self._dias[dia % self._dias_retencao]))
+
+        for hora in range(max(hora_inicio, primeira_horaria), min(hora_fim, self._hora_atual + 1)):
+            pontos.append((_data_da_hora(hora), self._horas[hora % self._horas_retencao]))
+        return pontos
+
+    def total(self, inicio: datetime, fim: datetime) -> float:
+        return sum(kg for _, kg in self.consultar(inicio, fim))
+
+
+class SeriesPontos:
+    # series de kg recebido e kg coletado (retirado pelo caminhao) por ponto
+
+    def __init__(self, horas_retencao: int = 24 * 7, dias_retencao: int = 365):
+        self._horas_retencao = horas_retencao
+        self._dias_retencao = dias_retencao
+        self._recebido: Dict[str, SerieTemporal] = {}
+        self._coletado: Dict[str, SerieTemporal] = {}
+
+    def _serie(self, series: Dict[str, SerieTemporal], id_ponto: str) -> SerieTemporal:
+        serie = series.get(id_ponto)
+        if serie is None:
+            # setdefault e atomico: duas threads no mesmo ponto novo ficam com a mesma serie
+            serie = series.setdefault(id_ponto, SerieTemporal(self._horas_retencao, self._dias_retencao))
+        return serie
+
+    def registrar_recebimento(self, ponto: PontoColeta, kg: float, quando: Optional[datetime] = None):
+        self._serie(self._recebido, ponto.id).registrar(kg, quando)
+
+    def registrar_coleta(self, ponto: PontoColeta, kg: float, quando: Optional[datetime] = None):
+        self._serie(self._coletado, ponto.id).registrar(kg, quando)
+
+    def consultar_recebido(self, id_ponto: str, inicio: datetime, fim: datetime) -> List[Tuple[datetime, float]]:
+        serie = self._recebido.get(id_ponto)
+        return serie.consultar(inicio, fim) if serie else []
+
+    def consultar_coletado(self, id_ponto: str, inicio: datetime, fim: datetime) -> List[Tuple[datetime, float]]:
+        serie = self._coletado.get(id_ponto)
+        return serie.consultar(inicio, fim) if serie else []
+
+    def taxa_liquida_kg_hora(self, id_ponto: str, janela_horas: int = 72, agora: Optional[datetime] = None) -> float:
+        # (recebido - coletado) por hora na janela recente
+        agora = agora or datetime.now()
+        inicio = agora - timedelta(hours=janela_horas)
+        fim = agora + timedelta(hours=1)
+        recebido = self._recebido.get(id_ponto)
+        coletado = self._coletado.get(id_ponto)
+        liquido = (recebido.total(inicio, fim) if recebido else 0.0) - (
+            coletado.total(inicio, fim) if coletado else 0.0
+        )
+        return liquido / janela_horas
+
+    def prever_saturacao(
+        self,
+        ponto: PontoColeta,
+        janela_horas: int = 72,
+        agora: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        # quando o ponto deve lotar no ritmo atual (None se nao esta enchendo)
+        agora = agora or datetime.now()
+        taxa = self.taxa_liquida_kg_hora(ponto.id, janela_horas, agora)
+        if taxa <= 0:
+            return None
+        livre = ponto.capacidade_kg - ponto.ocupacao_atual_kg
+        if livre <= 0:
+            return agora
+        return agora + timedelta(hours=livre / taxa)
+
+    def exportar_estado(self) -> Dict:
+        return {"recebido": dict(self._recebido), "coletado": dict(self._coletado)}
+
+    def importar_estado(self, estado: Dict):
+        # troca o conteudo no lugar: quem ja tem a referencia continua valido
+        self._recebido = dict(estado.get("recebido", {}))
+        self._coletado = dict(estado.get("coletado", {}))
@@ -1,6 +1,9 @@
-from typing import List, Optional, Dict
-from datetime import datetime
-import uuid
+from typing import Callable, List, Optional, Dict, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import bisect
+import itertools
+import threading
 
 # temporario - melhorar validacoes depois
 
@@ -9,30 +12,259 @@ from ..domain.dispositivos import DispositivoEletronico
 from ..domain.descarte import (
     SolicitacaoDescarte, 
     ItemDescarte, 
-    PontoColeta
+    PontoColeta,
+    ColetaPonto
 )
 from ..domain.tratamento import MetodoTratamento
 from ..domain.relatorio import RelatorioAmbiental
+from ..domain.estados import EstadoDescarte, Solicitado, Coletado
+from .series import SeriesPontos
+from .balanceamento import BalanceadorPontos
+from .cotas import CONTRATO_PADRAO, MotorCotas
+from .pontuacao import LivroPontos
+from .carteira import Carteira
+from .cubo import CuboIndicadores
+from .esbocos import EsbocosRelatorio
+from .arquivamento import ArquivoSolicitacoes, estado_final
+from .identificadores import id_para_binario, novo_id
+from .notificacoes import CentralNotificacoes
+from .roteirizacao import RoteirizadorColetas, Rota, agendar_rotas
+from .concorrencia import MapaVersionado
+from .metricas import REGISTRO, cronometrar
+
+# metricas dos servicos (expostas em /metrics)
+_DURACAO = REGISTRO.histograma(
+    "ecotech_servico_duracao_segundos",
+    "Duracao das operacoes dos servicos",
+    rotulos=("operacao",)
+)
+_TRANSICOES = REGISTRO.contador(
+    "ecotech_transicoes_estado_total",
+    "Transicoes de estado das solicitacoes",
+    rotulos=("de", "para")
+)
+_ARQUIVADAS = REGISTRO.contador(
+    "ecotech_solicitacoes_arquivadas_total",
+    "Solicitacoes em estado final movidas para o arquivo"
+)
 
 
 class ServicoDescarte:
     # camada de aplicacao para gerenciar solicitacoes de descarte
     # orquestra as regras de negocio do dominio
     
-    def __init__(self):
-        self._solicitacoes: Dict[str, SolicitacaoDescarte] = {}
+    def __init__(
+        self,
+        series: Optional[SeriesPontos] = None,
+        cotas: Optional[MotorCotas] = None,
+        arquivo: Optional[ArquivoSolicitacoes] = None,
+        notificacoes: Optional[CentralNotificacoes] = None
+    ):
+        # copy-on-write: listagens e buscas nao travam nem veem o mapa mudando
+        # no meio (ver concorrencia.py); escritas se revezam dentro do mapa
+        self._solicitacoes: MapaVersionado = MapaVersionado()
+        # series de peso por ponto (normalmente as do ServicoPontoColeta)
+        self._series = series
+        # cotas mensais das empresas (normalmente as do ServicoUsuario)
+        self._cotas = cotas
+        # avisos em lote (normalmente a central do ServicoUsuario); sem ela os
+        # avisos vao um a um para Usuario.adicionar_notificacao
+        self._notificacoes = notificacoes
+        # M- observer: avisados a cada mudanca de estado (solicitacao, anterior, novo)
+        self._observadores: List[Callable[[SolicitacaoDescarte, EstadoDescarte, EstadoDescarte], None]] = []
+        # versao dos dados: muda a cada alteracao (chave dos caches de exportacao)
+        # next() de um itertools.count e atomico, entao threads nao perdem versoes
+        self._contador_versao = itertools.count(1)
+        self._versao = 0
+        # ultima versao em que cada solicitacao mudou, da mais antiga para a mais recente
+        # (so das que estao em memoria: as arquivadas saem daqui)
+        self._alteracoes: "OrderedDict[str, int]" = OrderedDict()
+        # maior versao de alteracao ja tirada da lista; a lista so responde
+        # "o que mudou desde v" para v a partir dela
+        self._alteracoes_descartadas_ate = 0
+        self._lock_alteracoes = threading.Lock()
+        # camada fria: solicitacoes em estado final saem do dicionario depois
+        # de uma idade (ver arquivar_terminadas). sem arquivo ficam para sempre
+        self._arquivo = arquivo
+        # quando cada solicitacao chegou ao estado final, da mais antiga para a mais recente
+        self._terminadas: "OrderedDict[str, datetime]" = OrderedDict()
+        self._lock_terminadas = threading.Lock()
+        self._lock_arquivamento = threading.Lock()
+        # (id binario, id) em ordem: ids novos sao ordenados pelo tempo, entao
+        # quase sempre entram no fim; serve a paginacao por chave (listar_recentes)
+        self._ordem: List[Tuple[bytes, str]] = []
+        # a mesma ordem separada por usuario: a pagina de um usuario nao
+        # percorre as solicitacoes dos outros
+        self._ordem_por_usuario: Dict[str, List[Tuple[bytes, str]]] = {}
+        self._lock_ordem = threading.Lock()
+        # ids das solicitacoes ainda em Solicitado em cada ponto (coleta em lote)
+        self._pendentes_por_ponto: Dict[str, set] = {}
+        self._lock_pendentes = threading.Lock()
+        # um registro por coleta em lote (ver coletar_ponto)
+        self._coletas: List[ColetaPonto] = []
+        self._lock_coleta = threading.Lock()
+        # um lock por ponto: conferir a capacidade e reservar sao um passo so
+        # (os workers da fila definem pontos ao mesmo tempo)
+        self._locks_pontos: Dict[str, threading.Lock] = {}
+
+    @property
+    def arquivo(self) -> Optional[ArquivoSolicitacoes]:
+        return self._arquivo
+
+    def _lock_ponto(self, ponto: PontoColeta) -> threading.Lock:
+        lock = self._locks_pontos.get(ponto.id)
+        if lock is None:
+            # setdefault e atomico: duas threads acabam com o mesmo lock
+            lock = self._locks_pontos.setdefault(ponto.id, threading.Lock())
+        return lock
 
+    @property
+    def versao(self) -> int:
+        return self._versao
+
+    def _nova_versao(self, solicitacao: Optional[SolicitacaoDescarte] = None):
+        self._nova_versao_lote([solicitacao] if solicitacao is not None else [])
+
+    def _nova_versao_lote(self, solicitacoes: List[SolicitacaoDescarte]):
+        # uma versao so para todas as solicitacoes alteradas juntas
+        versao = next(self._contador_versao)
+        if solicitacoes:
+            with self._lock_alteracoes:
+                for solicitacao in solicitacoes:
+                    self._alteracoes[solicitacao.id] = versao
+                    self._alteracoes.move_to_end(solicitacao.id)
+        self._versao = versao
+
+    def listar_alteradas_desde(self, versao: int) -> List[SolicitacaoDescarte]:
+        # solicitacoes que mudaram depois de 'versao', lendo so o fim da lista
+        # de alteracoes (custa o numero de alteradas, nao o total)
+        ids = []
+        with self._lock_alteracoes:
+            if versao < self._alteracoes_descartadas_ate:
+                # alguma alteracao depois de 'versao' ja saiu da lista (foi
+                # arquivada): so a varredura completa garante que nada falta
+                completa = True
+            else:
+                completa = False
+                for id, alterada_em in reversed(self._alteracoes.items()):
+                    if alterada_em <= versao:
+                        break
+                    ids.append(id)
+        if completa:
+            return self.listar_solicitacoes(incluir_arquivadas=True)
+        ids.reverse()
+        # as arquivadas durante a leitura vem do arquivo
+        solicitacoes = (self.obter_solicitacao(id) for id in ids)
+        return [solicitacao for solicitacao in solicitacoes if solicitacao is not None]
+
+    def adicionar_observador(
+        self,
+        observador: Callable[[SolicitacaoDescarte, EstadoDescarte, EstadoDescarte], None]
+    ):
+        if observador not in self._observadores:
+            self._observadores.append(observador)
+
+    def _notificar_transicao(
+        self,
+        solicitacao: SolicitacaoDescarte,
+        anterior: EstadoDescarte,
+        novo: EstadoDescarte
+    ):
+        _TRANSICOES.incrementar((anterior.obter_nome(), novo.obter_nome()))
+        self._nova_versao(solicitacao)
+        if isinstance(anterior, Solicitado):
+            self._tirar_pendente(solicitacao)
+        if estado_final(solicitacao):
+            with self._lock_terminadas:
+                self._terminadas[solicitacao.id] = datetime.now()
+        for observador in self._observadores:
+            observador(solicitacao, anterior, novo)
+
+    def _incluir_pendente(self, solicitacao: SolicitacaoDescarte):
+        ponto = solicitacao.ponto_coleta
+        if ponto is not None and isinstance(solicitacao.estado, Solicitado):
+            with self._lock_pendentes:
+                self._pendentes_por_ponto.setdefault(ponto.id, set()).add(solicitacao.id)
+
+    def _tirar_pendente(self, solicitacao: SolicitacaoDescarte):
+        ponto = solicitacao.ponto_coleta
+        if ponto is not None:
+            with self._lock_pendentes:
+                pendentes = self._pendentes_por_ponto.get(ponto.id)
+                if pendentes is not None:
+                    pendentes.discard(solicitacao.id)
+
+    @cronometrar(_DURACAO, ("criar_solicitacao",))
     def criar_solicitacao(
         self,
         usuario: Usuario,
-        ponto_coleta: Optional[PontoColeta] = None
+        ponto_coleta: Optional[PontoColeta] = None,
+        id_solicitacao: Optional[str] = None
     ) -> SolicitacaoDescarte:
         # cria uma nova solicitacao com id unico
-        id_solicitacao = str(uuid.uuid4())
+        # o id pode vir pronto quando a solicitacao foi enfileirada antes (ver processamento.py)
+        if id_solicitacao is None:
+            id_solicitacao = novo_id()
         solicitacao = SolicitacaoDescarte(id_solicitacao, usuario, ponto_coleta)
         self._solicitacoes[id_solicitacao] = solicitacao
+        self._indexar(id_solicitacao, usuario.id)
+        self._incluir_pendente(solicitacao)
+        self._nova_versao(solicitacao)
         return solicitacao
 
+    def _indexar(self, id: str, id_usuario: str):
+        entrada = (id_para_binario(id), id)
+        with self._lock_ordem:
+            ordem_usuario = self._ordem_por_usuario.setdefault(id_usuario, [])
+            for ordem in (self._ordem, ordem_usuario):
+                if not ordem or ordem[-1] < entrada:
+                    ordem.append(entrada)
+                else:
+                    # id de outro processo/gerado antes (fila) ou antigo (uuid4)
+                    bisect.insort(ordem, entrada)
+
+    def _desindexar(self, solicitacoes: List[SolicitacaoDescarte]):
+        with self._lock_ordem:
+            for solicitacao in solicitacoes:
+                entrada = (id_para_binario(solicitacao.id), solicitacao.id)
+                ordem_usuario = self._ordem_por_usuario.get(solicitacao.usuario.id, [])
+                for ordem in (self._ordem, ordem_usuario):
+                    posicao = bisect.bisect_left(ordem, entrada)
+                    if posicao < len(ordem) and ordem[posicao] == entrada:
+                        del ordem[posicao]
+                if not ordem_usuario:
+                    self._ordem_por_usuario.pop(solicitacao.usuario.id, None)
+
+    def listar_recentes(
+        self,
+        limite: int = 20,
+        antes_de: Optional[str] = None,
+        id_usuario: Optional[str] = None
+    ) -> List[SolicitacaoDescarte]:
+        # as mais recentes primeiro, paginando pela chave: a proxima pagina e
+        # listar_recentes(antes_de=<id da ultima>); nao depende de offset nem
+        # de ordenar tudo. so as da memoria (as arquivadas sao antigas)
+        # com id_usuario le o indice do usuario; o lock so cobre copiar a
+        # fatia de candidatos, a busca das solicitacoes fica fora dele
+        resultado: List[SolicitacaoDescarte] = []
+        chave = (id_para_binario(antes_de),) if antes_de is not None else None
+        while len(resultado) < limite:
+            with self._lock_ordem:
+                ordem = self._ordem if id_usuario is None else self._ordem_por_usuario.get(id_usuario, [])
+                fim = len(ordem) if chave is None else bisect.bisect_left(ordem, chave)
+                candidatos = ordem[max(0, fim - (limite - len(resultado))):fim]
+            if not candidatos:
+                break
+            for _, id in reversed(candidatos):
+                # None: arquivada entre a copia e a busca
+                solicitacao = self._solicitacoes.get(id)
+                if solicitacao is not None:
+                    resultado.append(solicitacao)
+            # a proxima fatia continua antes da chave, mesmo que algo entre no meio
+            chave = candidatos[0]
+        return resultado
+
+    @cronometrar(_DURACAO, ("adicionar_item_solicitacao",))
     def adicionar_item_solicitacao(
         self,
         solicitacao: SolicitacaoDescarte,
@@ -43,23 +275,53 @@ class ServicoDescarte:
         # adiciona um dispositivo a solicitacao
         item = ItemDescarte(dispositivo, quantidade, observacoes)
         solicitacao.adicionar_item(item)
+        self._nova_versao(solicitacao)
         return item
 
+    @cronometrar(_DURACAO, ("definir_ponto_coleta",))
     def definir_ponto_coleta(
         self,
         solicitacao: SolicitacaoDescarte,
         ponto_coleta: PontoColeta
     ):
         # define onde sera entregue e verifica capacidade
+        # trocar de ponto devolve a cota cobrada e a ocupacao do ponto anterior
+        anterior = solicitacao.ponto_coleta
+        if anterior is ponto_coleta:
+            return
         peso_total = solicitacao.calcular_peso_total()
+        usuario = solicitacao.usuario
+        # sem peso (sem itens) nao ha o que cobrar nem estornar
+        cobrar = (
+            peso_total > 0
+            and self._cotas is not None
+            and isinstance(usuario, Empresa)
+            and self._cotas.possui(usuario.id)
+        )
         
-        if not ponto_coleta.pode_receber(peso_total):
-            raise ValueError(
-                f"ponto de coleta {ponto_coleta.nome} nao tem capacidade"
-            )
+        with self._lock_ponto(ponto_coleta):
+            if not ponto_coleta.pode_receber(peso_total):
+                raise ValueError(
+                    f"ponto de coleta {ponto_coleta.nome} nao tem capacidade"
+                )
+
+            # empresas consomem a cota do mes ao entregar (levanta CotaExcedida)
+            if cobrar:
+                if anterior is not None:
+                    self._cotas.estornar(usuario.id, peso_total)
+                self._cotas.registrar(usuario.id, peso_total)
+            ponto_coleta.adicionar_ocupacao(peso_total)
+        if anterior is not None:
+            # um lock de ponto por vez: duas trocas cruzadas nao se travam
+            with self._lock_ponto(anterior):
+                anterior.liberar_ocupacao(peso_total)
             
+        self._tirar_pendente(solicitacao)
         solicitacao.ponto_coleta = ponto_coleta
-        ponto_coleta.adicionar_ocupacao(peso_total)
+        self._incluir_pendente(solicitacao)
+        if self._series is not None:
+            self._series.registrar_recebimento(ponto_coleta, peso_total)
+        self._nova_versao(solicitacao)
 
     def definir_metodo_tratamento(
         self,
@@ -68,24 +330,288 @@ class ServicoDescarte:
     ):
         # define qual metodo de tratamento sera usado (reciclagem etc)
         solicitacao.metodo_tratamento = metodo
+        self._nova_versao(solicitacao)
 
+    @cronometrar(_DURACAO, ("avancar_estado_solicitacao",))
     def avancar_estado_solicitacao(self, solicitacao: SolicitacaoDescarte):
         # avanca pro proximo estado (padrao state)
+        anterior = solicitacao.estado
         solicitacao.avancar_estado()
 
+        if isinstance(anterior, Solicitado) and isinstance(solicitacao.estado, Coletado):
+            self._registrar_coleta(solicitacao)
+        self._notificar_transicao(solicitacao, anterior, solicitacao.estado)
+
+    def _registrar_coleta(self, solicitacao: SolicitacaoDescarte):
+        # o caminhao retirou o material: libera espaco no ponto
+        ponto = solicitacao.ponto_coleta
+        if ponto is None:
+            return
+        peso = solicitacao.calcular_peso_total()
+        with self._lock_ponto(ponto):
+            ponto.liberar_ocupacao(peso)
+        if self._series is not None:
+            self._series.registrar_coleta(ponto, peso)
+
+    @cronometrar(_DURACAO, ("coletar_ponto",))
+    def coletar_ponto(self, ponto: PontoColeta) -> Optional[ColetaPonto]:
+        # o caminhao esvaziou o ponto: todas as solicitacoes em Solicitado ali
+        # viram Coletado de uma vez. a ocupacao e liberada numa conta so, a
+        # coleta vira um registro so (com uma versao e uma contagem de
+        # transicoes) e cada usuario recebe um aviso so. ponto sem nada
+        # pendente nao gera registro (devolve None)
+        with self._lock_coleta:
+            with self._lock_pendentes:
+                ids = self._pendentes_por_ponto.pop(ponto.id, set())
+            coletadas: List[SolicitacaoDescarte] = []
+            anteriores: List[EstadoDescarte] = []
+            for id in sorted(ids, key=id_para_binario):
+                solicitacao = self._solicitacoes.get(id)
+                if solicitacao is None or not isinstance(solicitacao.estado, Solicitado):
+                    continue
+                anteriores.append(solicitacao.estado)
+                solicitacao.avancar_estado()
+                coletadas.append(solicitacao)
+
+            if not coletadas:
+                return None
+            peso = sum(solicitacao.calcular_peso_total() for solicitacao in coletadas)
+            with self._lock_ponto(ponto):
+                ponto.liberar_ocupacao(peso)
+            if self._series is not None:
+                self._series.registrar_coleta(ponto, peso)
+            coleta = ColetaPonto(novo_id(), ponto.id, tuple(s.id for s in coletadas), peso)
+            self._coletas.append(coleta)
+
+        _TRANSICOES.incrementar(("Solicitado", "Coletado"), valor=len(coletadas))
+        self._nova_versao_lote(coletadas)
+        for solicitacao, anterior in zip(coletadas, anteriores):
+            for observador in self._observadores:
+                observador(solicitacao, anterior, solicitacao.estado)
+        self._avisar_coleta(ponto, coletadas)
+        return coleta
+
+    def _avisar_coleta(self, ponto: PontoColeta, coletadas: List[SolicitacaoDescarte]):
+        # um aviso por usuario, com quantas solicitacoes dele foram coletadas
+        por_usuario: Dict[str, List] = {}
+        for solicitacao in coletadas:
+            usuario = solicitacao.usuario
+            por_usuario.setdefault(usuario.id, [usuario, 0])[1] += 1
+        if self._notificacoes is not None:
+            # com a central, uma mensagem por quantidade distinta (e nao por usuario)
+            por_quantidade: Dict[int, List[str]] = {}
+            for id_usuario, (_, quantidade) in por_usuario.items():
+                por_quantidade.setdefault(quantidade, []).append(id_usuario)
+            for quantidade, ids in por_quantidade.items():
+                self._notificacoes.transmitir(ids, self._texto_coleta(ponto, quantidade))
+            return
+        for usuario, quantidade in por_usuario.values():
+            usuario.adicionar_notificacao(self._texto_coleta(ponto, quantidade))
+
+    @staticmethod
+    def _texto_coleta(ponto: PontoColeta, quantidade: int) -> str:
+        if quantidade == 1:
+            return f"Sua solicitacao foi coletada no ponto {ponto.nome}"
+        return f"{quantidade} solicitacoes suas foram coletadas no ponto {ponto.nome}"
+
+    def listar_coletas(self, id_ponto: Optional[str] = None) -> List[ColetaPonto]:
+        return [coleta for coleta in self._coletas if id_ponto is None or coleta.id_ponto == id_ponto]
+
+    @cronometrar(_DURACAO, ("planejar_coletas",))
+    def planejar_coletas(
+        self,
+        roteirizador: RoteirizadorColetas,
+        inicio_turno: datetime,
+        fim_turno: datetime,
+        max_rotas: Optional[int] = None
+    ) -> List[Rota]:
+        # monta as rotas do turno com as solicitacoes pendentes nos pontos
+        # (ver roteirizacao.py) e grava a chegada prevista em cada uma
+        with self._lock_pendentes:
+            ids = [id for pendentes in self._pendentes_por_ponto.values() for id in pendentes]
+        pendentes = [self._solicitacoes.get(id) for id in sorted(ids, key=id_para_binario)]
+        rotas = roteirizador.planejar(
+            [solicitacao for solicitacao in pendentes if solicitacao is not None],
+            inicio_turno,
+            fim_turno,
+            max_rotas
+        )
+        agendar_rotas(rotas)
+        agendadas = [s for rota in rotas for parada in rota.paradas for s in parada.solicitacoes]
+        if agendadas:
+            self._nova_versao_lote(agendadas)
+        return rotas
+
+    @cronometrar(_DURACAO, ("cancelar_solicitacao",))
     def cancelar_solicitacao(self, solicitacao: SolicitacaoDescarte, motivo: str = ""):
+        anterior = solicitacao.estado
         solicitacao.cancelar(motivo)
+        self._notificar_transicao(solicitacao, anterior, solicitacao.estado)
 
-    def listar_solicitacoes(self) -> List[SolicitacaoDescarte]:
-        return list(self._solicitacoes.values())
+    def listar_solicitacoes(self, incluir_arquivadas: bool = False) -> List[SolicitacaoDescarte]:
+        # por padrao so as da memoria; relatorios pedem tambem as arquivadas
+        solicitacoes = list(self._solicitacoes.values())
+        if incluir_arquivadas and self._arquivo is not None:
+            ativas = self._solicitacoes
+            solicitacoes.extend(s for s in self._arquivo.iterar() if s.id not in ativas)
+        return solicitacoes
+
+    def data_termino(self, id: str) -> Optional[datetime]:
+        # quando a solicitacao chegou ao estado final (None se ainda nao chegou
+        # ou se foi arquivada antes de o arquivo guardar essa data)
+        with self._lock_terminadas:
+            terminada_em = self._terminadas.get(id)
+        if terminada_em is None and self._arquivo is not None:
+            terminada_em = self._arquivo.data_termino(id)
+        return terminada_em
 
     def obter_solicitacao(self, id: str) -> Optional[SolicitacaoDescarte]:
-        return self._solicitacoes.get(id)
+        solicitacao = self._solicitacoes.get(id)
+        if solicitacao is None and self._arquivo is not None:
+            # copia lida do arquivo: estado final, nao muda mais
+            solicitacao = self._arquivo.obter(id)
+        return solicitacao
+
+    @cronometrar(_DURACAO, ("arquivar_terminadas",))
+    def arquivar_terminadas(self, idade_minima: timedelta, agora: Optional[datetime] = None) -> int:
+        # move para o arquivo as solicitacoes em estado final ha mais de
+        # 'idade_minima'; nao muda a versao (os dados sao os mesmos)
+        if self._arquivo is None:
+            return 0
+        limite = (agora or datetime.now()) - idade_minima
+        with self._lock_arquivamento:
+            terminadas = {}
+            with self._lock_terminadas:
+                for id, terminada_em in self._terminadas.items():
+                    if terminada_em > limite:
+                        break
+                    terminadas[id] = terminada_em
+            ids = list(terminadas)
+            lote = [self._solicitacoes[id] for id in ids if id in self._solicitacoes]
+            # grava antes de tirar da memoria: uma falha no disco nao perde nada
+            self._arquivo.arquivar(lote, terminadas)
+            for id in ids:
+                self._solicitacoes.pop(id, None)
+            with self._lock_terminadas:
+                for id in ids:
+                    self._terminadas.pop(id, None)
+            self._desindexar(lote)
+            self._descartar_alteracoes(ids)
+        if lote:
+            _ARQUIVADAS.incrementar(valor=len(lote))
+        return len(lote)
+
+    def _descartar_alteracoes(self, ids: List[str]):
+        # as arquivadas nao mudam mais: saem da lista de alteracoes, que fica
+        # do tamanho das solicitacoes em memoria
+        with self._lock_alteracoes:
+            for id in ids:
+                alterada_em = self._alteracoes.pop(id, None)
+                if alterada_em is not None and alterada_em > self._alteracoes_descartadas_ate:
+                    self._alteracoes_descartadas_ate = alterada_em
+
+    def exportar_estado(self) -> Dict:
+        # estado completo do servico, usado pelo snapshot (ver snapshot.py)
+        # as arquivadas ja estao no disco e nao entram
+        with self._lock_terminadas:
+            terminadas = OrderedDict(self._terminadas)
+        with self._lock_alteracoes:
+            alteracoes = OrderedDict(self._alteracoes)
+            descartadas_ate = self._alteracoes_descartadas_ate
+            versao = self._versao
+        return {
+            "solicitacoes": self._solicitacoes.copia(),
+            "terminadas": terminadas,
+            "coletas": list(self._coletas),
+            # a versao continua de onde parou: exportacoes incrementais de
+            # outro processo (ex. exportar-colunar) comparam com ela
+            "versao": versao,
+            "alteracoes": alteracoes,
+            "alteracoes_descartadas_ate": descartadas_ate
+        }
+
+    def importar_estado(self, estado: Dict):
+        self._solicitacoes.substituir(estado["solicitacoes"])
+        # snapshots antigos nao tem a data de termino: conta a de criacao
+        terminadas = estado.get("terminadas")
+        if terminadas is None:
+            terminadas = {
+                s.id: s.data_criacao for s in self._solicitacoes.values() if estado_final(s)
+            }
+        terminadas = OrderedDict(
+            sorted(
+                ((id, quando) for id, quando in terminadas.items() if id in self._solicitacoes),
+                key=lambda par: par[1]
+            )
+        )
+        with self._lock_terminadas:
+            self._terminadas = terminadas
+        ordem = sorted((id_para_binario(id), id) for id in self._solicitacoes)
+        ordem_por_usuario: Dict[str, List[Tuple[bytes, str]]] = {}
+        for entrada in ordem:
+            ordem_por_usuario.setdefault(self._solicitacoes[entrada[1]].usuario.id, []).append(entrada)
+        with self._lock_ordem:
+            self._ordem = ordem
+            self._ordem_por_usuario = ordem_por_usuario
+        with self._lock_pendentes:
+            self._pendentes_por_ponto = {}
+        for solicitacao in self._solicitacoes.values():
+            self._incluir_pendente(solicitacao)
+        self._coletas = list(estado.get("coletas", []))
+        if estado.get("versao", -1) >= self._versao:
+            # a versao nunca volta dentro do processo (chave dos caches)
+            versao = estado["versao"]
+            self._contador_versao = itertools.count(versao + 1)
+            with self._lock_alteracoes:
+                self._alteracoes = OrderedDict(estado["alteracoes"])
+                self._alteracoes_descartadas_ate = estado.get("alteracoes_descartadas_ate", 0)
+            # snapshots de antes do descarte ainda guardam ids ja arquivados
+            self._descartar_alteracoes(
+                [id for id in estado["alteracoes"] if id not in self._solicitacoes]
+            )
+            self._versao = versao
+            return
+        # snapshot sem versao (ou atras deste processo): tudo conta como
+        # alterado, a proxima exportacao incremental leva o estado importado
+        versao = next(self._contador_versao)
+        with self._lock_alteracoes:
+            self._alteracoes = OrderedDict((id, versao) for id in self._solicitacoes)
+            # o que ficou de fora (arquivado) sai numa varredura completa
+            self._alteracoes_descartadas_ate = versao
+        self._versao = versao
 
 
 class ServicoRelatorio:
     # M- servico pra gerar relatorios ambientais
+
+    def __init__(self):
+        self._cubo = CuboIndicadores()
+        self._esbocos = EsbocosRelatorio()
+
+    @property
+    def cubo(self) -> CuboIndicadores:
+        # totais pre-agregados por tipo x metodo x ponto x mes (ver cubo.py)
+        return self._cubo
+
+    @property
+    def esbocos(self) -> EsbocosRelatorio:
+        # contagens e quantis aproximados para os paineis (ver esbocos.py)
+        return self._esbocos
+
+    def reconstruir(self, solicitacoes: List[SolicitacaoDescarte]):
+        # refaz cubo e esbocos a partir do historico; so para snapshots
+        # gravados antes de eles irem junto (ver snapshot.py)
+        self._cubo.reconstruir(solicitacoes)
+        self._esbocos.carregar(solicitacoes)
+
+    def exportar_estado(self) -> Dict:
+        return {"cubo": self._cubo.exportar_estado(), "esbocos": self._esbocos.exportar_estado()}
+
+    def importar_estado(self, estado: Dict):
+        self._cubo.importar_estado(estado["cubo"])
+        self._esbocos.importar_estado(estado["esbocos"])
     
+    @cronometrar(_DURACAO, ("gerar_relatorio_periodo",))
     def gerar_relatorio_periodo(
         self,
         titulo: str,
@@ -104,8 +630,11 @@ class ServicoPontoColeta:
     # M- servico pra gerenciar pontos de coleta
     
     def __init__(self):
-        self._pontos: Dict[str, PontoColeta] = {}
+        self._pontos: MapaVersionado = MapaVersionado()  # copy-on-write (ver concorrencia.py)
+        self._series = SeriesPontos()
+        self._balanceador = BalanceadorPontos()
     
+    @cronometrar(_DURACAO, ("criar_ponto_coleta",))
     def criar_ponto_coleta(
         self,
         nome: str,
@@ -114,13 +643,14 @@ class ServicoPontoColeta:
         longitude: float,
         capacidade_kg: float = 1000.0
     ) -> PontoColeta:
-        id_ponto = str(uuid.uuid4())
+        id_ponto = novo_id()
         ponto = PontoColeta(id_ponto, nome, endereco, latitude, longitude, capacidade_kg)
-        self._pontos[id_ponto] = ponto
+        self.adicionar_ponto(ponto)
         return ponto
     
     def adicionar_ponto(self, ponto: PontoColeta):
         self._pontos[ponto.id] = ponto
+        self._balanceador.adicionar_ponto(ponto)
     
     def listar_pontos(self) -> List[PontoColeta]:
         return list(self._pontos.values())
@@ -128,23 +658,74 @@ class ServicoPontoColeta:
     def buscar_ponto(self, id: str) -> Optional[PontoColeta]:
         return self._pontos.get(id)
 
+    @property
+    def series(self) -> SeriesPontos:
+        # kg recebido/coletado por hora em cada ponto
+        return self._series
+
+    @property
+    def balanceador(self) -> BalanceadorPontos:
+        # escolha automatica de ponto para novas solicitacoes
+        return self._balanceador
+
+    def escolher_ponto(
+        self,
+        peso_kg: float,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
+    ) -> Optional[PontoColeta]:
+        return self._balanceador.escolher(peso_kg, latitude, longitude)
+
+    def prever_saturacao(self, id: str) -> Optional[datetime]:
+        ponto = self._pontos.get(id)
+        if ponto is None:
+            return None
+        return self._series.prever_saturacao(ponto)
+
+    def exportar_estado(self) -> Dict:
+        return {"pontos": self._pontos.copia(), "series": self._series.exportar_estado()}
+
+    def importar_estado(self, estado: Dict):
+        self._pontos.substituir(estado["pontos"])
+        self._series.importar_estado(estado.get("series", {}))
+        self._balanceador.limpar()
+        for ponto in self._pontos.values():
+            self._balanceador.adicionar_ponto(ponto)
+
 
 class ServicoUsuario:
     
-    def __init__(self):
-        self._usuarios: Dict[str, Usuario] = {}
+    def __init__(self, contratos: Optional[Dict[str, float]] = None):
+        self._usuarios: MapaVersionado = MapaVersionado()  # copy-on-write (ver concorrencia.py)
+        self._cotas = MotorCotas()
+        # limites mensais por contrato vindos da configuracao (ver cotas.carregar_contratos)
+        self._contratos = dict(contratos or {})
+        self._aplicar_contratos()
+        self._pontos = LivroPontos()
+        self._carteira = Carteira()
+        self._notificacoes = CentralNotificacoes()
     
+    @cronometrar(_DURACAO, ("criar_usuario",))
     def criar_usuario(self, tipo: str, dados: Dict) -> Usuario:
         from .factories import UsuarioFactory
-        id_usuario = str(uuid.uuid4())
+        id_usuario = novo_id()
         dados['id'] = id_usuario
+        # empresas podem informar o contrato; o limite mensal vem dele
+        contrato = dados.pop('contrato', None) or CONTRATO_PADRAO
         usuario = UsuarioFactory.criar_usuario(tipo, dados)
+        if isinstance(usuario, Empresa):
+            self._cotas.registrar_empresa(id_usuario, contrato=contrato)
         self._usuarios[id_usuario] = usuario
         return usuario
+
+    def _aplicar_contratos(self):
+        for nome, limite in self._contratos.items():
+            self._cotas.definir_contrato(nome, limite)
     
     def buscar_usuario(self, id: str) -> Optional[Usuario]:
         return self._usuarios.get(id)
     
+    @cronometrar(_DURACAO, ("autenticar_usuario",))
     def autenticar_usuario(self, email: str) -> Optional[Usuario]:
         for usuario in self._usuarios.values():
             if usuario.email == email:
@@ -154,3 +735,59 @@ class ServicoUsuario:
     def listar_usuarios(self) -> List[Usuario]:
         return list(self._usuarios.values())
 
+    @property
+    def cotas(self) -> MotorCotas:
+        # uso mensal e limites das empresas
+        return self._cotas
+
+    @property
+    def pontos(self) -> LivroPontos:
+        # livro de pontos dos cidadaos (creditado pelas transicoes do ServicoDescarte)
+        return self._pontos
+
+    @property
+    def carteira(self) -> Carteira:
+        # saldo em dinheiro e historico de entregas (tambem alimentada pelas transicoes)
+        return self._carteira
+
+    @property
+    def notificacoes(self) -> CentralNotificacoes:
+        # caixas de entrada com mensagens compartilhadas (avisos em lote)
+        return self._notificacoes
+
+    def avisar_todos(self, titulo: str, corpo: str = "", tipo: Optional[type] = None):
+        # aviso geral (ex. ponto lotado): uma mensagem, entregue em lotes
+        ids = (
+            id for id, usuario in self._usuarios.items()
+            if tipo is None or isinstance(usuario, tipo)
+        )
+        return self._notificacoes.transmitir(ids, titulo, corpo)
+
+    def exportar_estado(self) -> Dict:
+        return {
+            "usuarios": self._usuarios.copia(),
+            "cotas": self._cotas.exportar_estado(),
+            "pontos": self._pontos.exportar_estado(),
+            "carteira": self._carteira.exportar_estado(),
+            "notificacoes": self._notificacoes.exportar_estado()
+        }
+
+    def importar_estado(self, estado: Dict):
+        self._usuarios.substituir(estado["usuarios"])
+        self._pontos.importar_estado(estado.get("pontos") or LivroPontos().exportar_estado())
+        self._carteira.importar_estado(estado.get("carteira") or Carteira().exportar_estado())
+        self._notificacoes.importar_estado(
+            estado.get("notificacoes") or CentralNotificacoes().exportar_estado()
+        )
+        if "cotas" in estado:
+            self._cotas.importar_estado(estado["cotas"])
+        else:
+            # snapshot de antes das cotas: comeca o mes zerado no contrato padrao
+            # (troca no lugar, o ServicoDescarte guarda a referencia)
+            self._cotas.importar_estado(MotorCotas().exportar_estado())
+            for usuario in self._usuarios.values():
+                if isinstance(usuario, Empresa):
+                    self._cotas.registrar_empresa(usuario.id)
+        # a configuracao atual vale sobre os limites gravados no snapshot
+        self._aplicar_contratos()
+
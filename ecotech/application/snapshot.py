@@ -0,0 +1,143 @@
+# snapshot binario do estado em memoria dos servicos
+# grava usuarios, pontos de coleta e solicitacoes num unico arquivo e
+# restaura no boot, sem precisar reprocessar nada
+#
+# formato do arquivo:
+#   cabecalho fixo (MAGICO, versao do schema, flags, tamanho e crc32 do corpo)
+#   corpo: pickle (protocolo 5) do estado exportado pelos servicos,
+#          opcionalmente comprimido com zlib
+#
+# o corpo e um pickle, entao so carregue snapshots gerados pelo proprio sistema
+#
+# snapshots de versoes anteriores do schema sao convertidos na leitura
+# (_MIGRACOES, uma funcao por versao, aplicadas em sequencia)
+
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from typing import Callable, Dict, Optional
+
+from ..domain.dinheiro import para_centavos
+from .services import ServicoDescarte, ServicoPontoColeta, ServicoRelatorio, ServicoUsuario
+
+MAGICO = b"ECOSNAP\x00"
+VERSAO_SCHEMA = 2  # 2: valores da carteira em centavos
+FLAG_COMPRIMIDO = 1
+
+# magico, versao, flags, tamanho do corpo, crc32 do corpo
+_CABECALHO = struct.Struct("<8sHHQI")
+
+
+def _migrar_v1(estado: Dict) -> Dict:
+    # v1 -> v2: a carteira guardava saldos e valores das entregas em reais (float)
+    carteira = estado.get("usuarios", {}).get("carteira")
+    if not carteira:
+        return estado
+    carteira["saldos"] = {
+        id_usuario: para_centavos(saldo) for id_usuario, saldo in carteira["saldos"].items()
+    }
+    # a mesma Entrega pode estar no historico e na fila; converte cada objeto uma vez
+    for entregas in list(carteira["historico"].values()) + [carteira["pendentes"]]:
+        for entrega in entregas:
+            atributos = vars(entrega)
+            if "_valor" in atributos:
+                atributos["_valor_centavos"] = para_centavos(atributos.pop("_valor"))
+    return estado
+
+
+# versao de origem -> conversao para a versao seguinte
+_MIGRACOES: Dict[int, Callable[[Dict], Dict]] = {
+    1: _migrar_v1,
+}
+
+
+def migrar_estado(estado: Dict, versao: int) -> Dict:
+    while versao < VERSAO_SCHEMA:
+        estado = _MIGRACOES[versao](estado)
+        versao += 1
+    return estado
+
+
+def salvar_snapshot(
+    caminho: str,
+    servico_usuario: ServicoUsuario,
+    servico_ponto: ServicoPontoColeta,
+    servico_descarte: ServicoDescarte,
+    comprimir: bool = False,
+    servico_relatorio: Optional[ServicoRelatorio] = None
+):
+    # grava num arquivo temporario e troca no final: um snapshot
+    # interrompido no meio nunca substitui o anterior
+    estado = {
+        "usuarios": servico_usuario.exportar_estado(),
+        "pontos": servico_ponto.exportar_estado(),
+        "descarte": servico_descarte.exportar_estado(),
+    }
+    if servico_relatorio is not None:
+        # cubo e esbocos vao junto: o boot nao precisa reler o historico (nem o arquivo)
+        estado["relatorio"] = servico_relatorio.exportar_estado()
+    corpo = pickle.dumps(estado, protocol=5)
+    flags = 0
+    if comprimir:
+        corpo = zlib.compress(corpo, 1)
+        flags |= FLAG_COMPRIMIDO
+
+    cabecalho = _CABECALHO.pack(MAGICO, VERSAO_SCHEMA, flags, len(corpo), zlib.crc32(corpo))
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.write(corpo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def ler_snapshot(caminho: str) -> Dict:
+    # le o arquivo via mmap: sem compressao, o pickle le direto das paginas
+    # mapeadas, sem copiar o corpo para um bytes intermediario
+    with open(caminho, "rb") as arquivo:
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            if len(mapa) < _CABECALHO.size:
+                raise ValueError("snapshot truncado")
+            magico, versao, flags, tamanho, crc = _CABECALHO.unpack_from(mapa, 0)
+            if magico != MAGICO:
+                raise ValueError("arquivo nao e um snapshot do ecotech")
+            if versao > VERSAO_SCHEMA or (versao < VERSAO_SCHEMA and versao not in _MIGRACOES):
+                raise ValueError(f"versao de snapshot nao suportada: {versao}")
+            if len(mapa) - _CABECALHO.size != tamanho:
+                raise ValueError("snapshot truncado")
+
+            with memoryview(mapa) as visao:
+                corpo = visao[_CABECALHO.size:]
+                try:
+                    if zlib.crc32(corpo) != crc:
+                        raise ValueError("snapshot corrompido (crc invalido)")
+                    if flags & FLAG_COMPRIMIDO:
+                        estado = pickle.loads(zlib.decompress(corpo))
+                    else:
+                        estado = pickle.loads(corpo)
+                finally:
+                    corpo.release()
+    return migrar_estado(estado, versao)
+
+
+def carregar_snapshot(
+    caminho: str,
+    servico_usuario: ServicoUsuario,
+    servico_ponto: ServicoPontoColeta,
+    servico_descarte: ServicoDescarte,
+    servico_relatorio: Optional[ServicoRelatorio] = None
+):
+    estado = ler_snapshot(caminho)
+    servico_usuario.importar_estado(estado["usuarios"])
+    servico_ponto.importar_estado(estado["pontos"])
+    servico_descarte.importar_estado(estado["descarte"])
+    if servico_relatorio is None:
+        return
+    if "relatorio" in estado:
+        servico_relatorio.importar_estado(estado["relatorio"])
+    else:
+        # snapshot gravado sem o relatorio: refaz uma vez a partir do historico
+        servico_relatorio.reconstruir(servico_descarte.listar_solicitacoes(incluir_arquivadas=True))
@@ -0,0 +1,97 @@
+# configuracao das tarifas dos metodos de tratamento
+# as tarifas ficam num arquivo json, carregado uma vez e recarregado
+# quando o arquivo muda, sem precisar reiniciar a aplicacao
+#
+# formato do arquivo:
+# {
+#     "reciclagem": {"custo_base_por_kg": 15.0, "reducao_impacto_percentual": 80.0},
+#     "reuso": {"custo_base_por_kg": 8.0}
+# }
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+CAMPOS_TARIFA = ("custo_base_por_kg", "reducao_impacto_percentual")
+
+
+def validar_tarifas(dados: Dict) -> Dict[str, Dict[str, float]]:
+    # levanta ValueError se o conteudo nao estiver no formato esperado
+    if not isinstance(dados, dict):
+        raise ValueError("tarifas devem ser um objeto json")
+
+    tarifas = {}
+    for metodo, valores in dados.items():
+        if not isinstance(valores, dict):
+            raise ValueError(f"tarifa de {metodo} deve ser um objeto")
+        tarifa = {}
+        for campo, valor in valores.items():
+            if campo not in CAMPOS_TARIFA:
+                raise ValueError(f"campo de tarifa invalido: {campo}")
+            if not isinstance(valor, (int, float)) or valor < 0:
+                raise ValueError(f"{campo} de {metodo} deve ser um numero positivo")
+            tarifa[campo] = float(valor)
+        if tarifa.get("reducao_impacto_percentual", 0.0) > 100:
+            raise ValueError(f"reducao de impacto de {metodo} nao pode passar de 100%")
+        tarifas[metodo.lower()] = tarifa
+    return tarifas
+
+
+class ConfiguracaoTarifas:
+    # le as tarifas de um arquivo e acompanha as alteracoes
+    # o arquivo so e consultado (os.stat) no maximo uma vez por intervalo
+
+    def __init__(self, caminho: str, intervalo_verificacao: float = 5.0):
+        self._caminho = caminho
+        self._intervalo_verificacao = intervalo_verificacao
+        self._lock = threading.Lock()
+        self._tarifas: Dict[str, Dict[str, float]] = {}
+        self._mtime: Optional[float] = None
+        self._ultima_verificacao = 0.0
+        self._versao = 0
+        self.recarregar()
+
+    @property
+    def caminho(self) -> str:
+        return self._caminho
+
+    @property
+    def versao(self) -> int:
+        # muda a cada recarga bem sucedida
+        return self._versao
+
+    def obter_tarifa(self, metodo: str) -> Dict[str, float]:
+        return self._tarifas.get(metodo.lower(), {})
+
+    def recarregar(self):
+        with open(self._caminho, encoding="utf-8") as arquivo:
+            tarifas = validar_tarifas(json.load(arquivo))
+        with self._lock:
+            self._tarifas = tarifas
+            self._mtime = os.stat(self._caminho).st_mtime
+            self._ultima_verificacao = time.monotonic()
+            self._versao += 1
+
+    def recarregar_se_alterado(self) -> bool:
+        # retorna True quando as tarifas mudaram desde a ultima chamada
+        agora = time.monotonic()
+        if agora - self._ultima_verificacao < self._intervalo_verificacao:
+            return False
+        self._ultima_verificacao = agora
+
+        try:
+            mtime = os.stat(self._caminho).st_mtime
+        except OSError:
+            # arquivo sumiu: mantem as ultimas tarifas validas
+            return False
+        if mtime == self._mtime:
+            return False
+
+        try:
+            self.recarregar()
+        except (OSError, ValueError):
+            # arquivo invalido ou pela metade: tenta de novo na proxima verificacao
+            return False
+        return True
@@ -3,7 +3,7 @@
 # usa composicao para relacionar usuarios, dispositivos e pontos de coleta
 
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Tuple
 from .dispositivos import DispositivoEletronico
 from .usuarios import Usuario
 from .estados import EstadoDescarte, Solicitado, Cancelado
@@ -80,6 +80,7 @@ class PontoColeta:
         self._ativo = True
         self._capacidade_kg = capacidade_kg  # capacidade maxima em kg
         self._ocupacao_atual_kg = 0.0  # quanto ja esta ocupado
+        self._observadores: List[Callable[['PontoColeta'], None]] = []  # avisados quando a ocupacao muda
 
     @property
     def id(self) -> str:
@@ -93,6 +94,14 @@ class PontoColeta:
     def endereco(self) -> str:
         return self._endereco
 
+    @property
+    def latitude(self) -> float:
+        return self._latitude
+
+    @property
+    def longitude(self) -> float:
+        return self._longitude
+
     @property
     def ativo(self) -> bool:
         return self._ativo
@@ -113,6 +122,27 @@ class PontoColeta:
         if not self.pode_receber(peso_kg):
             raise ValueError("ponto de coleta sem capacidade")
         self._ocupacao_atual_kg += peso_kg
+        self._notificar_observadores()
+
+    def liberar_ocupacao(self, peso_kg: float):
+        # M- chamado quando o caminhao retira o material do ponto
+        if peso_kg < 0:
+            raise ValueError("peso deve ser positivo")
+        self._ocupacao_atual_kg = max(0.0, self._ocupacao_atual_kg - peso_kg)
+        self._notificar_observadores()
+
+    def adicionar_observador(self, observador: Callable[['PontoColeta'], None]):
+        # M- observer: quem precisa acompanhar a ocupacao (ex. balanceamento) se registra aqui
+        if observador not in self._observadores:
+            self._observadores.append(observador)
+
+    def remover_observador(self, observador: Callable[['PontoColeta'], None]):
+        if observador in self._observadores:
+            self._observadores.remove(observador)
+
+    def _notificar_observadores(self):
+        for observador in self._observadores:
+            observador(self)
     
     def calcular_disponibilidade_percentual(self) -> float:
         if self._capacidade_kg == 0:
@@ -120,6 +150,16 @@ class PontoColeta:
         ocupacao_percentual = (self._ocupacao_atual_kg / self._capacidade_kg) * 100
         return round(100 - ocupacao_percentual, 1)
 
+    def __getstate__(self) -> Dict:
+        # observadores sao ligacoes em memoria e nao vao para o snapshot
+        estado = self.__dict__.copy()
+        estado["_observadores"] = []
+        return estado
+
+    def __setstate__(self, estado: Dict):
+        estado.setdefault("_observadores", [])
+        self.__dict__.update(estado)
+
     def __str__(self) -> str:
         return f"{self._nome} - {self._endereco}"
 
@@ -139,6 +179,7 @@ class SolicitacaoDescarte:
         self._usuario = usuario  # M- quem fez a solicitacao
         self._ponto_coleta = ponto_coleta  # M- onde sera entregue
         self._itens: List[ItemDescarte] = []  # A- lista de itens a descartar
+        self._visao_itens: Optional[Tuple[ItemDescarte, ...]] = None  # refeita so quando os itens mudam
         self._estado: EstadoDescarte = Solicitado()  # estado inicial
         self._metodo_tratamento: Optional[MetodoTratamento] = None  # definido depois
         self._data_criacao = datetime.now()
@@ -161,8 +202,13 @@ class SolicitacaoDescarte:
         self._ponto_coleta = valor
 
     @property
-    def itens(self) -> List[ItemDescarte]:
-        return self._itens.copy()
+    def itens(self) -> Tuple[ItemDescarte, ...]:
+        # tupla so de leitura, a mesma ate o proximo adicionar/remover
+        # (relatorios e templates acessam isso em laco)
+        visao = self._visao_itens
+        if visao is None:
+            visao = self._visao_itens = tuple(self._itens)
+        return visao
 
     @property
     def estado(self) -> EstadoDescarte:
@@ -191,10 +237,12 @@ class SolicitacaoDescarte:
     def adicionar_item(self, item: ItemDescarte):
         # A- adiciona um dispositivo a solicitacao
         self._itens.append(item)
+        self._visao_itens = None
 
     def remover_item(self, item: ItemDescarte):
         if item in self._itens:
             self._itens.remove(item)
+            self._visao_itens = None
 
     def calcular_peso_total(self) -> float:
         # A- soma o peso de todos os itens
@@ -224,5 +272,63 @@ class SolicitacaoDescarte:
             "data_criacao": self._data_criacao.isoformat()
         }
 
+    def __getstate__(self) -> Dict:
+        # a visao dos itens e refeita sob demanda e nao vai para o snapshot/arquivo
+        estado = self.__dict__.copy()
+        estado["_visao_itens"] = None
+        return estado
+
+    def __setstate__(self, estado: Dict):
+        estado.setdefault("_visao_itens", None)
+        self.__dict__.update(estado)
+
     def __str__(self) -> str:
         return f"Solicitacao {self._id} - {self._estado.obter_nome()}"
+
+
+class ColetaPonto:
+    # registro unico de uma coleta em lote: o caminhao esvaziou o ponto e todas
+    # as solicitacoes que estavam la passaram de Solicitado para Coletado juntas
+
+    def __init__(
+        self,
+        id: str,
+        id_ponto: str,
+        ids_solicitacoes: Tuple[str, ...],
+        peso_kg: float,
+        data: Optional[datetime] = None
+    ):
+        self._id = id
+        self._id_ponto = id_ponto
+        self._ids_solicitacoes = tuple(ids_solicitacoes)
+        self._peso_kg = peso_kg
+        self._data = data or datetime.now()
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def id_ponto(self) -> str:
+        return self._id_ponto
+
+    @property
+    def ids_solicitacoes(self) -> Tuple[str, ...]:
+        return self._ids_solicitacoes
+
+    @property
+    def peso_kg(self) -> float:
+        return self._peso_kg
+
+    @property
+    def data(self) -> datetime:
+        return self._data
+
+    def obter_resumo(self) -> Dict:
+        return {
+            "id": self._id,
+            "ponto": self._id_ponto,
+            "solicitacoes": len(self._ids_solicitacoes),
+            "peso_kg": round(self._peso_kg, 2),
+            "data": self._data.isoformat()
+        }
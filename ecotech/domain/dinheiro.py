@@ -0,0 +1,64 @@
+# valores em dinheiro
+# os calculos trabalham com centavos inteiros: soma de centavos e exata, entao
+# um total nao depende da ordem nem de quantas parcelas foram somadas.
+# o arredondamento acontece uma vez so, quando um valor em reais (float ou
+# Decimal) vira centavos, e a volta para reais so e feita na apresentacao
+
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP
+from typing import Iterable, List, Sequence, Union
+
+Numero = Union[int, float, Decimal, str]
+
+_UM = Decimal(1)
+
+
+def _decimal(valor: Numero) -> Decimal:
+    # str() evita carregar o erro binario do float para o Decimal
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def para_centavos(reais: Numero) -> int:
+    # reais -> centavos, arredondando meio centavo para cima
+    return int((_decimal(reais) * 100).quantize(_UM, rounding=ROUND_HALF_UP))
+
+
+def multiplicar_centavos(quantidade: Numero, reais_por_unidade: Numero) -> int:
+    # quantidade x preco unitario (ex. kg x tarifa por kg), com o produto
+    # calculado exato em Decimal e arredondado uma vez
+    return para_centavos(_decimal(quantidade) * _decimal(reais_por_unidade))
+
+
+def para_reais(centavos: int) -> Decimal:
+    return Decimal(centavos).scaleb(-2)
+
+
+def somar_centavos(valores: Iterable[int]) -> int:
+    # soma de inteiros: exata, sem arredondar nada no caminho
+    return sum(valores)
+
+
+def ratear_centavos(total: int, pesos: Sequence[Numero]) -> List[int]:
+    # divide um valor ja arredondado em parcelas proporcionais aos pesos; as
+    # parcelas somam exatamente o total (os centavos que sobram do piso vao
+    # para as maiores fracoes), entao o rateio nao arredonda de novo
+    pesos_exatos = [_decimal(peso) for peso in pesos]
+    soma = sum(pesos_exatos)
+    if not pesos_exatos:
+        return []
+    if soma <= 0:
+        # sem peso para ratear: tudo na primeira parcela
+        return [total] + [0] * (len(pesos_exatos) - 1)
+    cotas = [total * peso / soma for peso in pesos_exatos]
+    parcelas = [int(cota.to_integral_value(rounding=ROUND_FLOOR)) for cota in cotas]
+    sobra = total - sum(parcelas)
+    por_fracao = sorted(range(len(cotas)), key=lambda i: cotas[i] - parcelas[i], reverse=True)
+    for i in por_fracao[:sobra]:
+        parcelas[i] += 1
+    return parcelas
+
+
+def formatar_reais(centavos: int) -> str:
+    # formato brasileiro, sem o simbolo: 1234567 -> "12.345,67"
+    sinal = "-" if centavos < 0 else ""
+    inteiro, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{inteiro:,}".replace(",", ".") + f",{resto:02d}"
@@ -3,6 +3,7 @@
 # importante rpra herança e polimorfismo
 
 from abc import ABC, abstractmethod
+from .dinheiro import para_centavos
 
 # A- Validacoes de marca e modelo implementadas no __init__  # ABNER 24/02
 # A- Calculo de valor de revenda implementado em cada subclasse  # ABNER 24/02
@@ -14,6 +15,19 @@ class DispositivoEletronico(ABC):
 
     def __init__(self, id: str, nome: str, peso_kg: float, marca: str = "", modelo: str = ""):  # abner 10/02
         # A- validacoes basicas dos parametros
+        DispositivoEletronico.validar_dados(peso_kg, marca, modelo)
+
+        # A- atributos privados (encapsulamento)
+        self._id = id
+        self._nome = nome
+        self._peso_kg = peso_kg
+        self._marca = marca  # abner 10/02
+        self._modelo = modelo  # abner 10/02
+
+    @staticmethod
+    def validar_dados(peso_kg: float, marca: str = "", modelo: str = ""):
+        # A- regras de peso, marca e modelo compartilhadas com a importacao em lote
+        # levanta ValueError na primeira regra violada
         if peso_kg <= 0:
             raise ValueError("peso deve ser positivo")
 
@@ -36,13 +50,6 @@ class DispositivoEletronico(ABC):
             raise ValueError(
                 "modelo nao pode ter mais de 100 caracteres")  # ABNER 24/02
 
-        # A- atributos privados (encapsulamento)
-        self._id = id
-        self._nome = nome
-        self._peso_kg = peso_kg
-        self._marca = marca  # abner 10/02
-        self._modelo = modelo  # abner 10/02
-
     # A- properties para acesso controlado aos atributos
     @property
     def id(self) -> str:
@@ -79,6 +86,10 @@ class DispositivoEletronico(ABC):
         # A- calcula o valor de revenda baseado no tipo e condicao do dispositivo
         pass
 
+    def calcular_valor_revenda_centavos(self) -> int:
+        # valor de revenda em centavos inteiros, para somar sem erro de arredondamento
+        return para_centavos(self.calcular_valor_revenda())
+
     def __str__(self) -> str:
         return f"{self.obter_tipo()}: {self._nome} ({self._peso_kg}kg)"
 
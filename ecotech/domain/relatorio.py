@@ -7,7 +7,7 @@ from datetime import datetime
 from .descarte import SolicitacaoDescarte
 from .estados import Reciclado, Reutilizado, Descartado
 
-# M- em desenvolvimento - falta exportar para pdf (se der tempo e vcs quiserem, existe uma api que facilita isso)
+# exportacao para pdf/csv em application/exportacao.py
 # M- adicionar graficos de impacto (opcional tbm)
 
 class RelatorioAmbiental:
@@ -27,6 +27,10 @@ class RelatorioAmbiental:
     def data_geracao(self) -> datetime:
         return self._data_geracao
 
+    @property
+    def solicitacoes(self) -> List[SolicitacaoDescarte]:
+        return self._solicitacoes.copy()
+
     def adicionar_solicitacao(self, solicitacao: SolicitacaoDescarte):
         self._solicitacoes.append(solicitacao)
 
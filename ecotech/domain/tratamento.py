@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
 from datetime import datetime
+from .dinheiro import multiplicar_centavos, para_reais
 from .dispositivos import DispositivoEletronico
 
 # Rastreamento de metodo aplicado - ABNER 24/02
@@ -12,6 +13,8 @@ class MetodoTratamento(ABC):
     # permite trocar algoritmo de tratamento em tempo de execucao
 
     def __init__(self, custo_base_por_kg: float, reducao_impacto_percentual: float):
+        # instancias sao imutaveis e compartilhadas entre solicitacoes
+        # cada subclasse tem tarifas padrao, que podem vir da configuracao (tarifas.py)
         self._custo_base_por_kg = custo_base_por_kg
         self._reducao_impacto_percentual = reducao_impacto_percentual
 
@@ -31,6 +34,11 @@ class MetodoTratamento(ABC):
     def calcular_custo(self, dispositivos: List[DispositivoEletronico]) -> float:
         pass
 
+    def calcular_custo_centavos(self, dispositivos: List[DispositivoEletronico]) -> int:
+        # custo em centavos inteiros: peso total * tarifa, arredondado uma vez so
+        peso_total = sum(d.peso_kg for d in dispositivos)
+        return multiplicar_centavos(peso_total, self._custo_base_por_kg)
+
     @abstractmethod
     def calcular_impacto_ambiental(
         self,
@@ -45,16 +53,19 @@ class MetodoTratamento(ABC):
 class Reciclagem(MetodoTratamento):
     # metodo de reciclagem (desmonta e recupera os materiais que ainda tem utilidade) dai reduz impacto ambiental
 
-    def __init__(self):
-        super().__init__(custo_base_por_kg=15.0, reducao_impacto_percentual=80.0)
+    def __init__(
+        self,
+        custo_base_por_kg: float = 15.0,
+        reducao_impacto_percentual: float = 80.0
+    ):
+        super().__init__(custo_base_por_kg, reducao_impacto_percentual)
 
     def obter_nome(self) -> str:
         return "Reciclagem"
 
     def calcular_custo(self, dispositivos: List[DispositivoEletronico]) -> float:
         # custo baseado no peso total * custo por kg
-        peso_total = sum(d.peso_kg for d in dispositivos)
-        return round(peso_total * self._custo_base_por_kg, 2)
+        return float(para_reais(self.calcular_custo_centavos(dispositivos)))
 
     def calcular_impacto_ambiental(
         self,
@@ -71,16 +82,19 @@ class Reciclagem(MetodoTratamento):
 class Reuso(MetodoTratamento):
     # metodo de reuso (recondiciona pra usar novamente)
 
-    def __init__(self):
-        super().__init__(custo_base_por_kg=8.0, reducao_impacto_percentual=95.0)
+    def __init__(
+        self,
+        custo_base_por_kg: float = 8.0,
+        reducao_impacto_percentual: float = 95.0
+    ):
+        super().__init__(custo_base_por_kg, reducao_impacto_percentual)
 
     def obter_nome(self) -> str:
         return "Reuso"
 
     def calcular_custo(self, dispositivos: List[DispositivoEletronico]) -> float:
         # reuso é mais barato que reciclagem
-        peso_total = sum(d.peso_kg for d in dispositivos)
-        return round(peso_total * self._custo_base_por_kg, 2)
+        return float(para_reais(self.calcular_custo_centavos(dispositivos)))
 
     def calcular_impacto_ambiental(
         self,
@@ -97,16 +111,19 @@ class Reuso(MetodoTratamento):
 class DescarteControlado(MetodoTratamento):
     # metodo de descarte controlado (vai pra um aterro especializado, diferente de um lixao etc)
 
-    def __init__(self):
-        super().__init__(custo_base_por_kg=25.0, reducao_impacto_percentual=40.0)
+    def __init__(
+        self,
+        custo_base_por_kg: float = 25.0,
+        reducao_impacto_percentual: float = 40.0
+    ):
+        super().__init__(custo_base_por_kg, reducao_impacto_percentual)
 
     def obter_nome(self) -> str:
         return "Descarte Controlado"
 
     def calcular_custo(self, dispositivos: List[DispositivoEletronico]) -> float:
         # descarte controlado é mais caro que os outros
-        peso_total = sum(d.peso_kg for d in dispositivos)
-        return round(peso_total * self._custo_base_por_kg, 2)
+        return float(para_reais(self.calcular_custo_centavos(dispositivos)))
 
     def calcular_impacto_ambiental(
         self,
@@ -129,7 +146,9 @@ class RastreamentoMetodo:  # ABNER 24/02 - Rastreamento de metodo aplicado
         self._metodo = metodo  # ABNER 24/02
         self._peso_total_kg = peso_total_kg  # ABNER 24/02
         self._data_aplicacao = datetime.now()  # ABNER 24/02
-        self._custo = metodo.custo_base_por_kg * peso_total_kg  # ABNER 24/02
+        # custo guardado em centavos; so vira reais na leitura
+        self._custo_centavos = multiplicar_centavos(
+            peso_total_kg, metodo.custo_base_por_kg)  # ABNER 24/02
         self._impacto_evitado = (
             metodo.reducao_impacto_percentual / 100) * 100  # ABNER 24/02
 
@@ -149,9 +168,13 @@ class RastreamentoMetodo:  # ABNER 24/02 - Rastreamento de metodo aplicado
     def data_aplicacao(self) -> datetime:
         return self._data_aplicacao
 
+    @property
+    def custo_centavos(self) -> int:
+        return self._custo_centavos
+
     @property
     def custo(self) -> float:
-        return round(self._custo, 2)
+        return float(para_reais(self._custo_centavos))
 
     @property
     def impacto_evitado(self) -> float:
@@ -203,16 +226,21 @@ class RelatorioImpactoPorMetodo:  # ABNER 24/02 - Relatorio de impacto por metod
             totais[nome_metodo] += rastr.peso_total_kg
         return {k: round(v, 2) for k, v in totais.items()}
 
+    def calcular_custo_total_centavos_por_metodo(self) -> Dict[str, int]:
+        # soma os custos (centavos inteiros, ja arredondados por rastreamento) por metodo
+        totais: Dict[str, int] = {}
+        for rastr in self._rastreamentos:
+            nome_metodo = rastr.metodo.obter_nome()
+            totais[nome_metodo] = totais.get(nome_metodo, 0) + rastr.custo_centavos
+        return totais
+
     # ABNER 24/02
     def calcular_custo_total_por_metodo(self) -> Dict[str, float]:
         # ABNER 24/02 - calcula custo total por metodo
-        totais = {}
-        for rastr in self._rastreamentos:
-            nome_metodo = rastr.metodo.obter_nome()
-            if nome_metodo not in totais:
-                totais[nome_metodo] = 0.0
-            totais[nome_metodo] += rastr.custo
-        return {k: round(v, 2) for k, v in totais.items()}
+        return {
+            k: float(para_reais(v))
+            for k, v in self.calcular_custo_total_centavos_por_metodo().items()
+        }
 
     # ABNER 24/02
     def calcular_impacto_evitado_por_metodo(self) -> Dict[str, float]:
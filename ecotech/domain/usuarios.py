@@ -8,7 +8,7 @@ incluindo cidadãos, empresas e administradores.
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, List, Optional, Tuple
 import re
 
 class Usuario(ABC):
@@ -39,6 +39,10 @@ class Usuario(ABC):
         # Sistema de histórico
         self._historico_acoes: List[Dict] = []
 
+        # Visões só de leitura das listas acima, refeitas só depois de mudanças
+        self._visao_notificacoes: Optional[Tuple[str, ...]] = None
+        self._visao_historico: Optional[Tuple[Dict, ...]] = None
+
         self._registrar_acao("Usuário criado")
 
     # -------------------
@@ -85,14 +89,20 @@ class Usuario(ABC):
         return self._data_cadastro
 
     @property
-    def notificacoes(self) -> List[str]:
-        """Retorna todas as notificações."""
-        return self._notificacoes.copy()
+    def notificacoes(self) -> Tuple[str, ...]:
+        """Retorna todas as notificações (tupla reaproveitada até a próxima mudança)."""
+        visao = self._visao_notificacoes
+        if visao is None:
+            visao = self._visao_notificacoes = tuple(self._notificacoes)
+        return visao
 
     @property
-    def historico_acoes(self) -> List[Dict]:
-        """Retorna o histórico de ações."""
-        return self._historico_acoes.copy()
+    def historico_acoes(self) -> Tuple[Dict, ...]:
+        """Retorna o histórico de ações (tupla reaproveitada até a próxima mudança)."""
+        visao = self._visao_historico
+        if visao is None:
+            visao = self._visao_historico = tuple(self._historico_acoes)
+        return visao
 
     # -------------------
     # CONTROLE DE STATUS
@@ -121,11 +131,13 @@ class Usuario(ABC):
         notificacao = f"[{timestamp}] {mensagem}"
 
         self._notificacoes.append(notificacao)
+        self._visao_notificacoes = None
         self._registrar_acao("Notificação recebida")
 
     def limpar_notificacoes(self) -> None:
         """Remove todas as notificações."""
         self._notificacoes.clear()
+        self._visao_notificacoes = None
         self._registrar_acao("Notificações limpas")
 
     # ------------
@@ -143,6 +155,24 @@ class Usuario(ABC):
                 "data": datetime.now(),
             }
         )
+        self._visao_historico = None
+
+    # ------------
+    # SERIALIZAÇÃO
+    # ------------
+
+    def __getstate__(self) -> Dict:
+        """As visões são refeitas sob demanda e não vão para o snapshot."""
+        estado = self.__dict__.copy()
+        estado["_visao_notificacoes"] = None
+        estado["_visao_historico"] = None
+        return estado
+
+    def __setstate__(self, estado: Dict) -> None:
+        """Aceita snapshots gravados antes das visões existirem."""
+        estado.setdefault("_visao_notificacoes", None)
+        estado.setdefault("_visao_historico", None)
+        self.__dict__.update(estado)
 
     # ------------
     # VALIDAÇÕES
@@ -0,0 +1,127 @@
+"""
+Linha de comando do EcoTech.
+
+Uso:
+    python -m ecotech.infrastructure.cli importar dispositivos.csv --email contato@ecotech.com \
+        --snapshot estado.snap [--ponto <id do ponto>]
+    python -m ecotech.infrastructure.cli exportar-colunar estado.snap armazem/ --formato parquet \
+        [--arquivo arquivo/]
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from ..application.importacao import FORMATOS, ImportadorDispositivos
+from .servicos import montar_servicos
+
+
+def _comando_importar(args: argparse.Namespace) -> int:
+    """Importa um arquivo CSV/NDJSON de dispositivos para o snapshot e imprime o resumo."""
+    caminho_snapshot = args.snapshot or os.environ.get("ECOTECH_SNAPSHOT")
+    if not caminho_snapshot:
+        print("informe --snapshot ou ECOTECH_SNAPSHOT", file=sys.stderr)
+        return 2
+    if not os.path.exists(caminho_snapshot):
+        print(f"snapshot nao encontrado: {caminho_snapshot}", file=sys.stderr)
+        return 2
+
+    # o mesmo grafo da aplicacao web: o snapshot regravado nao perde relatorios,
+    # notificacoes nem as referencias ao arquivo
+    servicos = montar_servicos(os.environ.get("ECOTECH_CONTRATOS"), os.environ.get("ECOTECH_ARQUIVO"))
+    servicos.carregar_snapshot(caminho_snapshot)
+    servico_usuario = servicos.usuario
+    servico_ponto = servicos.ponto
+    servico_descarte = servicos.descarte
+
+    usuario = servico_usuario.autenticar_usuario(args.email)
+    if usuario is None:
+        print(f"usuario nao encontrado: {args.email}", file=sys.stderr)
+        return 2
+
+    ponto = None
+    if args.ponto:
+        ponto = servico_ponto.buscar_ponto(args.ponto)
+        if ponto is None:
+            print(f"ponto de coleta nao encontrado: {args.ponto}", file=sys.stderr)
+            return 2
+
+    importador = ImportadorDispositivos(servico_descarte, tamanho_bloco=args.bloco)
+    resultado = importador.importar_arquivo(args.arquivo, usuario, args.formato, ponto)
+
+    # grava o que foi importado; linhas com erro ficam so no resumo
+    if resultado.importadas:
+        servicos.salvar_snapshot(caminho_snapshot)
+
+    print(json.dumps(resultado.obter_resumo(), ensure_ascii=False, indent=2))
+    return 1 if resultado.total_erros else 0
+
+
+def _comando_exportar_colunar(args: argparse.Namespace) -> int:
+    """Exporta as solicitacoes de um snapshot para Parquet/Arrow particionado."""
+    from ..application.exportacao_colunar import ExportadorColunar, pyarrow_disponivel
+
+    if not pyarrow_disponivel():
+        print("exportacao colunar precisa do pyarrow (pip install ecotech[analise])", file=sys.stderr)
+        return 2
+
+    # com o arquivo aberto, as solicitacoes ja arquivadas tambem sao exportadas
+    servicos = montar_servicos(
+        os.environ.get("ECOTECH_CONTRATOS"),
+        args.arquivo or os.environ.get("ECOTECH_ARQUIVO")
+    )
+    servicos.carregar_snapshot(args.snapshot)
+
+    exportador = ExportadorColunar(servicos.descarte, args.destino, args.formato, args.lote)
+    # incremental por padrao: a versao exportada fica gravada no destino
+    resultado = exportador.exportar(incremental=not args.completa)
+
+    print(json.dumps(resultado.obter_resumo(), ensure_ascii=False, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(prog="ecotech")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    importar = subcomandos.add_parser(
+        "importar",
+        help="importa dispositivos em lote de um arquivo CSV ou NDJSON"
+    )
+    importar.add_argument("arquivo")
+    importar.add_argument("--email", required=True, help="email do usuario dono da coleta")
+    importar.add_argument("--snapshot", default=None, help="snapshot lido e regravado (padrao: ECOTECH_SNAPSHOT)")
+    importar.add_argument("--ponto", default=None, help="id do ponto de coleta que recebe as solicitacoes")
+    importar.add_argument("--formato", choices=FORMATOS, default=None)
+    importar.add_argument("--bloco", type=int, default=1000, help="linhas validadas por bloco")
+    importar.set_defaults(funcao=_comando_importar)
+
+    exportar_colunar = subcomandos.add_parser(
+        "exportar-colunar",
+        help="exporta as solicitacoes de um snapshot em Parquet/Arrow, por mes e ponto"
+    )
+    exportar_colunar.add_argument("snapshot")
+    exportar_colunar.add_argument("destino")
+    exportar_colunar.add_argument("--formato", choices=("parquet", "arrow"), default="parquet")
+    exportar_colunar.add_argument("--lote", type=int, default=10000, help="linhas por record batch")
+    exportar_colunar.add_argument(
+        "--completa",
+        action="store_true",
+        help="exporta tudo, ignorando a versao ja exportada no destino"
+    )
+    exportar_colunar.add_argument(
+        "--arquivo",
+        default=None,
+        help="diretorio do arquivo de solicitacoes antigas (padrao: ECOTECH_ARQUIVO)"
+    )
+    exportar_colunar.set_defaults(funcao=_comando_exportar_colunar)
+
+    args = parser.parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
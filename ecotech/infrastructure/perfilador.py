@@ -0,0 +1,225 @@
+"""
+Perfilador opcional de requisições.
+
+Perfila uma requisição quando ela chega com o cabeçalho X-Ecotech-Profile
+(com o token configurado) ou por amostragem aleatória. Para cada
+requisição perfilada guarda as pilhas amostradas (formato colapsado, pronto
+para flamegraph.pl/speedscope) e as funções com maior tempo próprio do
+cProfile, separadas por rota.
+
+Só uma requisição é perfilada por vez no processo: o cProfile usa um hook
+global do interpretador (no Python 3.12+ um segundo perfil ativo falha com
+"Another profiling tool is already active"). Requisições que chegam durante
+um perfil seguem sem perfil.
+"""
+
+import cProfile
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from flask import Flask, g, request
+
+CABECALHO = 'X-Ecotech-Profile'
+
+# uma sessao de perfil por processo (compartilhada entre apps e perfiladores)
+_SESSAO = threading.Lock()
+
+
+class AmostradorPilhas:
+    """Thread que amostra a pilha de outra thread em intervalos fixos."""
+
+    def __init__(self, id_thread: int, intervalo: float = 0.001):
+        self._id_thread = id_thread
+        self._intervalo = intervalo
+        self._pilhas: Dict[str, int] = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name='ecotech-perfil', daemon=True)
+
+    @property
+    def pilhas(self) -> Dict[str, int]:
+        return self._pilhas
+
+    def iniciar(self) -> None:
+        self._thread.start()
+
+    def parar(self) -> Dict[str, int]:
+        self._parar.set()
+        self._thread.join()
+        return self._pilhas
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self._intervalo):
+            frame = sys._current_frames().get(self._id_thread)
+            if frame is None:
+                continue
+            quadros = []
+            while frame is not None:
+                codigo = frame.f_code
+                quadros.append(f"{codigo.co_name} ({codigo.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            chave = ';'.join(reversed(quadros))
+            self._pilhas[chave] = self._pilhas.get(chave, 0) + 1
+
+
+class PerfilRequisicao:
+    """Resultado do perfil de uma requisição."""
+
+    def __init__(
+        self,
+        rota: str,
+        metodo: str,
+        duracao: float,
+        pilhas: Dict[str, int],
+        principais: List[Tuple[str, int, float, float]]
+    ):
+        self._rota = rota
+        self._metodo = metodo
+        self._duracao = duracao
+        self._pilhas = pilhas
+        self._principais = principais
+        self._data = datetime.now()
+
+    @property
+    def rota(self) -> str:
+        return self._rota
+
+    @property
+    def metodo(self) -> str:
+        return self._metodo
+
+    @property
+    def duracao(self) -> float:
+        return self._duracao
+
+    @property
+    def data(self) -> datetime:
+        return self._data
+
+    @property
+    def pilhas(self) -> Dict[str, int]:
+        return self._pilhas
+
+    @property
+    def principais(self) -> List[Tuple[str, int, float, float]]:
+        """(função, chamadas, tempo próprio, tempo acumulado) por tempo próprio."""
+        return self._principais
+
+
+class PerfiladorRequisicoes:
+    """
+    Hook de perfil para a aplicação Flask.
+
+    Args:
+        taxa_amostragem: fração das requisições perfiladas sem cabeçalho (0 desliga)
+        token: valor esperado no cabeçalho X-Ecotech-Profile (None desliga o cabeçalho)
+        max_por_rota: quantos perfis recentes são guardados por rota
+    """
+
+    def __init__(
+        self,
+        taxa_amostragem: float = 0.0,
+        token: Optional[str] = None,
+        intervalo_amostragem: float = 0.001,
+        max_por_rota: int = 20,
+        num_funcoes: int = 15
+    ):
+        if not 0.0 <= taxa_amostragem <= 1.0:
+            raise ValueError("taxa de amostragem deve estar entre 0 e 1")
+        self._taxa_amostragem = taxa_amostragem
+        self._token = token
+        self._intervalo_amostragem = intervalo_amostragem
+        self._max_por_rota = max_por_rota
+        self._num_funcoes = num_funcoes
+        self._perfis: Dict[str, Deque[PerfilRequisicao]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._taxa_amostragem > 0 or bool(self._token)
+
+    def instalar(self, app: Flask) -> None:
+        """Registra os hooks de início e fim de requisição no app."""
+        app.before_request(self._iniciar)
+        # teardown roda mesmo quando a view levanta excecao (after_request nao)
+        app.teardown_request(self._finalizar)
+
+    def deve_perfilar(self) -> bool:
+        if self._token and request.headers.get(CABECALHO) == self._token:
+            return True
+        return self._taxa_amostragem > 0 and random.random() < self._taxa_amostragem
+
+    def _iniciar(self) -> None:
+        if not self.ativo or not self.deve_perfilar():
+            return
+        if not _SESSAO.acquire(blocking=False):
+            # outra requisicao ja esta sendo perfilada
+            return
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # outra ferramenta de perfil ativa (ex. cobertura de testes)
+            _SESSAO.release()
+            return
+        amostrador = AmostradorPilhas(threading.get_ident(), self._intervalo_amostragem)
+        g.perfil_ecotech = (perfil, amostrador, time.perf_counter())
+        amostrador.iniciar()
+
+    def _finalizar(self, erro: Optional[BaseException] = None) -> None:
+        dados = g.pop('perfil_ecotech', None)
+        if dados is None:
+            return
+        perfil, amostrador, inicio = dados
+        try:
+            perfil.disable()
+            duracao = time.perf_counter() - inicio
+            pilhas = amostrador.parar()
+        finally:
+            _SESSAO.release()
+
+        rota = request.url_rule.rule if request.url_rule else request.path
+        self.registrar(PerfilRequisicao(
+            rota,
+            request.method,
+            duracao,
+            pilhas,
+            self._principais(perfil)
+        ))
+
+    def _principais(self, perfil: cProfile.Profile) -> List[Tuple[str, int, float, float]]:
+        estatisticas = pstats.Stats(perfil).stats
+        linhas = []
+        for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in estatisticas.items():
+            linhas.append((f"{funcao} ({arquivo}:{linha})", chamadas, proprio, acumulado))
+        linhas.sort(key=lambda item: item[2], reverse=True)
+        return linhas[:self._num_funcoes]
+
+    def registrar(self, perfil: PerfilRequisicao) -> None:
+        with self._lock:
+            fila = self._perfis.get(perfil.rota)
+            if fila is None:
+                fila = self._perfis[perfil.rota] = deque(maxlen=self._max_por_rota)
+            fila.append(perfil)
+
+    def mais_lentos(self, limite: int = 20) -> List[PerfilRequisicao]:
+        """Perfis recentes de todas as rotas, do mais lento para o mais rápido."""
+        with self._lock:
+            todos = [perfil for fila in self._perfis.values() for perfil in fila]
+        todos.sort(key=lambda perfil: perfil.duracao, reverse=True)
+        return todos[:limite]
+
+    def pilhas_colapsadas(self, rota: str) -> str:
+        """Soma as pilhas dos perfis guardados da rota no formato colapsado."""
+        with self._lock:
+            perfis = list(self._perfis.get(rota, ()))
+        total: Dict[str, int] = {}
+        for perfil in perfis:
+            for pilha, amostras in perfil.pilhas.items():
+                total[pilha] = total.get(pilha, 0) + amostras
+        return ''.join(f"{pilha} {amostras}\n" for pilha, amostras in sorted(total.items()))
@@ -0,0 +1,79 @@
+"""
+Montagem dos serviços do EcoTech.
+
+A aplicação web e a linha de comando montam o mesmo grafo de serviços
+(arquivo, central de notificações, observadores e relatórios), para que um
+snapshot lido e regravado por qualquer uma delas não perca estado.
+"""
+
+from typing import Optional
+
+from ..application.arquivamento import ArquivoSolicitacoes
+from ..application.cotas import carregar_contratos
+from ..application.services import (
+    ServicoDescarte,
+    ServicoRelatorio,
+    ServicoPontoColeta,
+    ServicoUsuario
+)
+from ..application.snapshot import carregar_snapshot, salvar_snapshot
+
+
+class Servicos:
+    """Serviços ligados entre si, com leitura e gravação do snapshot completo."""
+
+    def __init__(
+        self,
+        usuario: ServicoUsuario,
+        ponto: ServicoPontoColeta,
+        descarte: ServicoDescarte,
+        relatorio: ServicoRelatorio,
+        arquivo: Optional[ArquivoSolicitacoes] = None
+    ):
+        self.usuario = usuario
+        self.ponto = ponto
+        self.descarte = descarte
+        self.relatorio = relatorio
+        self.arquivo = arquivo
+
+    def carregar_snapshot(self, caminho: str):
+        # cubo e esbocos dos relatorios vem junto, sem reler o historico
+        carregar_snapshot(caminho, self.usuario, self.ponto, self.descarte, servico_relatorio=self.relatorio)
+
+    def salvar_snapshot(self, caminho: str):
+        salvar_snapshot(caminho, self.usuario, self.ponto, self.descarte, servico_relatorio=self.relatorio)
+
+
+def montar_servicos(
+    caminho_contratos: Optional[str] = None,
+    diretorio_arquivo: Optional[str] = None
+) -> Servicos:
+    """
+    Cria os serviços e liga as dependências entre eles.
+
+    Args:
+        caminho_contratos: json com os limites mensais por contrato (ECOTECH_CONTRATOS)
+        diretorio_arquivo: diretório do arquivo de solicitações terminadas (ECOTECH_ARQUIVO)
+    """
+    servico_ponto = ServicoPontoColeta()
+    # limites mensais das empresas por contrato (arquivo json)
+    servico_usuario = ServicoUsuario(carregar_contratos(caminho_contratos) if caminho_contratos else None)
+    # solicitacoes em estado final ha mais de N dias vao para o arquivo em disco
+    # (usuarios e pontos das arquivadas sao buscados nos servicos, pelo id)
+    arquivo = ArquivoSolicitacoes(
+        diretorio_arquivo,
+        buscar_usuario=servico_usuario.buscar_usuario,
+        buscar_ponto=servico_ponto.buscar_ponto
+    ) if diretorio_arquivo else None
+    servico_descarte = ServicoDescarte(
+        series=servico_ponto.series,
+        cotas=servico_usuario.cotas,
+        arquivo=arquivo,
+        notificacoes=servico_usuario.notificacoes
+    )
+    servico_descarte.adicionar_observador(servico_usuario.pontos.ao_transicionar)
+    servico_descarte.adicionar_observador(servico_usuario.carteira.ao_transicionar)
+    servico_relatorio = ServicoRelatorio()
+    servico_descarte.adicionar_observador(servico_relatorio.cubo.ao_transicionar)
+    servico_descarte.adicionar_observador(servico_relatorio.esbocos.ao_transicionar)
+    return Servicos(servico_usuario, servico_ponto, servico_descarte, servico_relatorio, arquivo)
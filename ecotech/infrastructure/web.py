@@ -8,21 +8,45 @@ baseada no design mobile fornecido.
 # sistema web ainda em desenvolvimento
 # algumas rotas precisam de ajustes
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from datetime import datetime
+from flask import (
+    Flask, render_template, request, redirect, url_for, session, flash, jsonify, g, Response, send_file
+)
+from datetime import datetime, timedelta
 from typing import Optional
+import atexit
+import os
+import tempfile
+import time
 
-from ..application.services import (
-    ServicoDescarte,
-    ServicoRelatorio,
-    ServicoPontoColeta,
-    ServicoUsuario
-)
 from ..application.factories import (
     DispositivoFactory,
     MetodoTratamentoFactory
 )
-from ..domain.usuarios import Usuario
+from ..application.metricas import REGISTRO
+from ..application.tarifas import ConfiguracaoTarifas
+from ..application.processamento import FilaSolicitacoes, validar_dados_solicitacao
+from ..application.identificadores import id_curto
+from ..application.exportacao import FORMATOS, ExportadorRelatorios, validar_dados_exportacao
+from ..application.arquivamento import ArquivamentoPeriodico
+from ..application.carteira import LiquidacaoPeriodica
+from ..application.roteirizacao import RoteirizadorColetas
+from ..domain.dinheiro import formatar_reais
+from ..domain.usuarios import Usuario, Administrador
+from .perfilador import PerfiladorRequisicoes
+from .servicos import montar_servicos
+
+
+# metricas das rotas (expostas em /metrics)
+_DURACAO_ROTA = REGISTRO.histograma(
+    'ecotech_http_duracao_segundos',
+    'Latencia das rotas HTTP',
+    rotulos=('rota', 'metodo')
+)
+_REQUISICOES = REGISTRO.contador(
+    'ecotech_http_requisicoes_total',
+    'Requisicoes HTTP por rota e status',
+    rotulos=('rota', 'metodo', 'status')
+)
 
 
 def criar_app() -> Flask:
@@ -35,14 +59,72 @@ def criar_app() -> Flask:
     app = Flask(__name__)
     app.secret_key = "ecotech-secret-key-2026"
     
-    # servicos
-    servico_descarte = ServicoDescarte()
-    servico_relatorio = ServicoRelatorio()
-    servico_ponto = ServicoPontoColeta()
-    servico_usuario = ServicoUsuario()
+    # tarifas dos metodos de tratamento (recarregadas quando o arquivo muda)
+    caminho_tarifas = os.environ.get('ECOTECH_TARIFAS')
+    if caminho_tarifas:
+        MetodoTratamentoFactory.configurar_tarifas(ConfiguracaoTarifas(caminho_tarifas))
+    
+    # servicos (o mesmo grafo da linha de comando)
+    servicos = montar_servicos(os.environ.get('ECOTECH_CONTRATOS'), os.environ.get('ECOTECH_ARQUIVO'))
+    servico_usuario = servicos.usuario
+    servico_ponto = servicos.ponto
+    servico_descarte = servicos.descarte
+    servico_relatorio = servicos.relatorio
+    arquivo = servicos.arquivo
+    
+    # restaura o ultimo snapshot, se houver; senao usa os dados exemplo
+    caminho_snapshot = os.environ.get('ECOTECH_SNAPSHOT')
+    if caminho_snapshot and os.path.exists(caminho_snapshot):
+        servicos.carregar_snapshot(caminho_snapshot)
+    else:
+        _inicializar_dados_exemplo(servico_usuario, servico_ponto)
+    
+    if caminho_snapshot:
+        # grava o estado ao encerrar o processo
+        atexit.register(servicos.salvar_snapshot, caminho_snapshot)
+    
+    arquivamento = None
+    if arquivo is not None:
+        arquivamento = ArquivamentoPeriodico(
+            servico_descarte,
+            timedelta(days=float(os.environ.get('ECOTECH_ARQUIVO_IDADE_DIAS', '30')))
+        )
+        arquivamento.iniciar()
+        atexit.register(arquivamento.parar)
+    
+    # liquidacao da carteira em rodadas periodicas; as paginas so leem
+    liquidacao = LiquidacaoPeriodica(
+        servico_usuario.carteira,
+        float(os.environ.get('ECOTECH_LIQUIDACAO_SEGUNDOS', '60'))
+    )
+    liquidacao.iniciar()
+    atexit.register(liquidacao.parar)
+    
+    # fila de novas solicitacoes (processadas em background)
+    fila_solicitacoes = FilaSolicitacoes(servico_descarte)
+    fila_solicitacoes.iniciar()
+    # drena os pedidos ja confirmados ao encerrar; o atexit roda na ordem
+    # inversa, entao isso acontece antes do snapshot registrado acima
+    atexit.register(fila_solicitacoes.parar)
+    app.extensions['ecotech_fila'] = fila_solicitacoes
+    
+    # exportacao de relatorios (pdf/csv gerados em background, com cache em disco)
+    exportador = ExportadorRelatorios(
+        servico_descarte,
+        os.environ.get('ECOTECH_EXPORTACOES') or tempfile.mkdtemp(prefix='ecotech-exportacoes-')
+    )
+    atexit.register(exportador.desligar, False)
+    app.extensions['ecotech_exportador'] = exportador
+    
+    def desligar():
+        """Para os serviços em background antes do fim do processo (ex. testes de carga)."""
+        fila_solicitacoes.parar()
+        liquidacao.parar()
+        if arquivamento is not None:
+            arquivamento.parar()
+        exportador.desligar(False)
     
-    # dados exemplo
-    _inicializar_dados_exemplo(servico_usuario, servico_ponto)
+    app.extensions['ecotech_desligar'] = desligar
     
     # verifica login
     def usuario_logado():
@@ -59,8 +141,49 @@ def criar_app() -> Flask:
             }
         return None
     
+    def usuario_sessao() -> Optional[Usuario]:
+        """Retorna o objeto Usuario da sessão (usuários demo pelo tipo)."""
+        usuario = servico_usuario.buscar_usuario(session.get('user_id', ''))
+        if usuario is not None:
+            return usuario
+        email = EMAILS_DEMO.get(session.get('user_tipo', 'cidadao'))
+        return servico_usuario.autenticar_usuario(email) if email else None
+    
+    def usuario_administrador() -> bool:
+        """Retorna True se o usuário da sessão é um Administrador."""
+        return usuario_logado() and isinstance(usuario_sessao(), Administrador)
+    
+    # perfil opcional de requisicoes (desligado por padrao)
+    perfilador = PerfiladorRequisicoes(
+        taxa_amostragem=float(os.environ.get('ECOTECH_PERFIL_TAXA', '0')),
+        token=os.environ.get('ECOTECH_PERFIL_TOKEN') or None
+    )
+    perfilador.instalar(app)
+    app.extensions['ecotech_perfilador'] = perfilador
+    
+    # instrumentacao das rotas
+    
+    @app.before_request
+    def iniciar_cronometro():
+        g.inicio_requisicao = time.perf_counter()
+    
+    @app.after_request
+    def registrar_metricas(resposta):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            # usa o padrao da rota (/api/solicitacoes/<id>/status) para nao explodir rotulos
+            rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+            _DURACAO_ROTA.observar(time.perf_counter() - inicio, (rota, request.method))
+            _REQUISICOES.incrementar((rota, request.method, str(resposta.status_code)))
+        return resposta
+    
     # rotas
     
+    @app.route('/metrics')
+    def metrics():
+        """Métricas no formato texto do Prometheus."""
+        return Response(REGISTRO.exportar(), mimetype='text/plain; version=0.0.4')
+    
     @app.route('/')
     def index():
         """Página inicial / Hero visual."""
@@ -78,6 +201,8 @@ def criar_app() -> Flask:
             
             if tipo == 'cidadao':
                 session['user_nome'] = 'João Silva'
+            elif tipo == 'administrador':
+                session['user_nome'] = 'Administrador'
             else:
                 session['user_nome'] = 'EcoTech Reciclável'
             
@@ -116,6 +241,8 @@ def criar_app() -> Flask:
             return redirect(url_for('login'))
         
         usuario = dados_usuario()
+        usuario_obj = usuario_sessao()
+        pontos = servico_usuario.pontos.saldo(usuario_obj.id) if usuario_obj else 0
         
         return render_template(
             'dashboard.html',
@@ -123,7 +250,7 @@ def criar_app() -> Flask:
             solicitacoes=[],
             total_descartado=45.8,
             impacto_evitado=125.3,
-            pontos_acumulados=1250
+            pontos_acumulados=pontos
         )
     
     @app.route('/nova-solicitacao', methods=['GET', 'POST'])
@@ -135,7 +262,42 @@ def criar_app() -> Flask:
         usuario = dados_usuario()
         
         if request.method == 'POST':
-            # redireciona dashboard
+            # so valida e enfileira, o processamento acontece na fila
+            try:
+                dados = validar_dados_solicitacao(request.form)
+            except ValueError as erro:
+                flash(str(erro), 'error')
+                return redirect(url_for('nova_solicitacao'))
+            
+            usuario_obj = usuario_sessao()
+            if usuario_obj is None:
+                flash('Usuário não encontrado', 'error')
+                return redirect(url_for('login'))
+            
+            ponto = None
+            if dados['ponto_coleta'] == 'auto':
+                ponto = servico_ponto.escolher_ponto(
+                    dados['peso_kg'] * dados['quantidade'],
+                    dados['latitude'],
+                    dados['longitude']
+                )
+                if ponto is None:
+                    flash('Nenhum ponto com capacidade disponível, escolha um depois', 'warning')
+            elif dados['ponto_coleta']:
+                ponto = servico_ponto.buscar_ponto(dados['ponto_coleta'])
+                if ponto is None:
+                    flash('Ponto de coleta inválido', 'error')
+                    return redirect(url_for('nova_solicitacao'))
+            
+            id_solicitacao = fila_solicitacoes.enfileirar(
+                usuario_obj,
+                dados['tipo_dispositivo'],
+                {'nome': dados['nome'], 'peso_kg': dados['peso_kg']},
+                dados['quantidade'],
+                dados['observacoes'],
+                ponto
+            )
+            flash(f'Solicitação {id_curto(id_solicitacao)} recebida', 'success')
             return redirect(url_for('dashboard'))
         
         pontos = servico_ponto.listar_pontos()
@@ -153,6 +315,90 @@ def criar_app() -> Flask:
             pontos=pontos
         )
     
+    @app.route('/api/pontos/<id>/serie')
+    def api_serie_ponto(id):
+        """Kg recebido/coletado por hora e previsão de lotação do ponto."""
+        ponto = servico_ponto.buscar_ponto(id)
+        if ponto is None:
+            return jsonify({'error': 'Not found'}), 404
+        
+        horas = min(max(request.args.get('horas', 48, type=int), 1), 24 * 365)
+        fim = datetime.now()
+        inicio = fim - timedelta(hours=horas)
+        series = servico_ponto.series
+        previsao = servico_ponto.prever_saturacao(id)
+        
+        return jsonify({
+            'id': ponto.id,
+            'ocupacao_atual_kg': ponto.ocupacao_atual_kg,
+            'capacidade_kg': ponto.capacidade_kg,
+            'recebido': [
+                {'inicio': quando.isoformat(), 'kg': kg}
+                for quando, kg in series.consultar_recebido(id, inicio, fim + timedelta(hours=1))
+            ],
+            'coletado': [
+                {'inicio': quando.isoformat(), 'kg': kg}
+                for quando, kg in series.consultar_coletado(id, inicio, fim + timedelta(hours=1))
+            ],
+            'previsao_lotacao': previsao.isoformat() if previsao else None
+        })
+    
+    @app.route('/api/pontos/<id>/coletar', methods=['POST'])
+    def api_coletar_ponto(id):
+        """Coleta em lote: todas as solicitações pendentes no ponto viram coletadas."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        # quem registra a passagem do caminhao e a operacao, nao o cidadao
+        if not usuario_administrador():
+            return jsonify({'error': 'Forbidden'}), 403
+
+        ponto = servico_ponto.buscar_ponto(id)
+        if ponto is None:
+            return jsonify({'error': 'Not found'}), 404
+
+        coleta = servico_descarte.coletar_ponto(ponto)
+        if coleta is None:
+            # nada pendente no ponto: nenhum registro de coleta
+            return jsonify({'ponto': ponto.id, 'solicitacoes': 0, 'peso_kg': 0})
+        return jsonify(coleta.obter_resumo())
+
+    @app.route('/api/rotas/planejar', methods=['POST'])
+    def api_planejar_rotas():
+        """Planeja as rotas do turno e agenda as solicitações pendentes nos pontos."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        if not usuario_administrador():
+            return jsonify({'error': 'Forbidden'}), 403
+        
+        pontos = servico_ponto.listar_pontos()
+        if not pontos:
+            return jsonify({'rotas': []})
+        # deposito configurado ou, sem ele, o centro dos pontos
+        deposito = os.environ.get('ECOTECH_DEPOSITO')
+        try:
+            if deposito:
+                latitude, longitude = (float(valor) for valor in deposito.split(','))
+            else:
+                latitude = sum(ponto.latitude for ponto in pontos) / len(pontos)
+                longitude = sum(ponto.longitude for ponto in pontos) / len(pontos)
+            inicio = datetime.fromisoformat(request.form['inicio']) if request.form.get('inicio') else datetime.now()
+            horas = float(request.form.get('horas', 8))
+            max_rotas = request.form.get('max_rotas', type=int)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros inválidos'}), 400
+        if horas <= 0:
+            return jsonify({'error': 'Parâmetros inválidos'}), 400
+        
+        roteirizador = RoteirizadorColetas(
+            latitude,
+            longitude,
+            capacidade_veiculo_kg=float(os.environ.get('ECOTECH_VEICULO_KG', '1000'))
+        )
+        rotas = servico_descarte.planejar_coletas(
+            roteirizador, inicio, inicio + timedelta(hours=horas), max_rotas
+        )
+        return jsonify({'rotas': [rota.obter_resumo() for rota in rotas]})
+    
     @app.route('/notificacoes')
     def notificacoes():
         """Página de notificações."""
@@ -160,22 +406,56 @@ def criar_app() -> Flask:
             return redirect(url_for('login'))
         
         usuario = dados_usuario()
+        usuario_obj = usuario_sessao()
         
-        notificacoes = [
-            {
-                'titulo': 'Seus valores foram finalizados',
-                'mensagem': 'Você recebeu R$ 13,95',
-                'data': datetime.now(),
-                'lida': False
-            }
-        ]
+        notificacoes = []
+        if usuario_obj is not None:
+            # avisos da central (compartilhados) e os avisos individuais do usuario
+            notificacoes = [
+                {
+                    'titulo': mensagem.titulo,
+                    'mensagem': mensagem.corpo,
+                    'data': mensagem.data,
+                    'lida': lida
+                }
+                for mensagem, lida in servico_usuario.notificacoes.listar(usuario_obj.id)
+            ]
+            notificacoes.extend(
+                {'titulo': texto, 'mensagem': '', 'data': None, 'lida': True}
+                for texto in reversed(usuario_obj.notificacoes)
+            )
         
         return render_template(
             'notificacoes.html',
             usuario=usuario,
-            notificacoes=notificacoes
+            notificacoes=notificacoes,
+            nao_lidas=servico_usuario.notificacoes.nao_lidas(usuario_obj.id) if usuario_obj else 0
         )
     
+    @app.route('/notificacoes/lidas', methods=['POST'])
+    def marcar_notificacoes_lidas():
+        """Marca as notificações da central como lidas."""
+        if not usuario_logado():
+            return redirect(url_for('login'))
+        
+        usuario_obj = usuario_sessao()
+        if usuario_obj is not None:
+            servico_usuario.notificacoes.marcar_lidas(usuario_obj.id)
+        
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({'nao_lidas': 0})
+        return redirect(url_for('notificacoes'))
+    
+    @app.route('/api/notificacoes/nao-lidas')
+    def api_notificacoes_nao_lidas():
+        """Quantidade de notificações não lidas (para o contador do menu)."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        usuario_obj = usuario_sessao()
+        total = servico_usuario.notificacoes.nao_lidas(usuario_obj.id) if usuario_obj else 0
+        return jsonify({'nao_lidas': total})
+    
     @app.route('/ultimas-entregas')
     def ultimas_entregas():
         """Página de últimas entregas (histórico completo)."""
@@ -184,54 +464,35 @@ def criar_app() -> Flask:
         
         usuario = dados_usuario()
         
-        # dados de exemplo das entregas (talvez alterar dps)
+        usuario_obj = usuario_sessao()
+        if usuario_obj is None:
+            return redirect(url_for('login'))
+        
+        carteira = servico_usuario.carteira
+        try:
+            pagina = carteira.listar_entregas(usuario_obj.id, request.args.get('pagina', 1, type=int))
+        except ValueError:
+            return redirect(url_for('ultimas_entregas'))
+        # o que ainda espera a liquidacao aparece no topo da primeira pagina, sem liquidar
+        pendentes = carteira.listar_pendentes(usuario_obj.id) if pagina.pagina == 1 else []
         entregas = [
             {
-                'valor': 13.95,
-                'empresa': 'Ecotech - Reciclagem Cariri',
-                'id': '56492574920',
-                'data': '13 Set 2025',
-                'hora': '13:02',
-                'status': 'finalizado'
-            },
-            {
-                'valor': 8.19,
-                'empresa': 'Ecotech - Reciclagem Cariri',
-                'id': '58293049159',
-                'data': '10 Set 2025',
-                'hora': '08:55',
-                'status': 'finalizado'
-            },
-            {
-                'valor': 6.41,
-                'empresa': 'Ecotech - Reciclagem Cariri',
-                'id': '98358259431',
-                'data': '08 Set 2025',
-                'hora': '15:31',
-                'status': 'cancelado'
-            },
-            {
-                'valor': 27.65,
-                'empresa': 'Ecotech - Reciclagem Cariri',
-                'id': '47389088043',
-                'data': '03 Set 2025',
-                'hora': '16:44',
-                'status': 'finalizado'
-            },
-            {
-                'valor': 12.53,
-                'empresa': 'Ecotech - Reciclagem Cariri',
-                'id': '57463968973',
-                'data': '02 Set 2025',
-                'hora': '08:21',
-                'status': 'finalizado'
+                'valor': formatar_reais(entrega.valor_centavos),
+                'empresa': entrega.local or 'Ecotech',
+                'id': entrega.id_solicitacao,
+                'data': _formatar_data(entrega.data),
+                'hora': entrega.data.strftime('%H:%M'),
+                'status': 'pendente' if pendente else entrega.status
             }
+            for pendente, lista in ((True, pendentes), (False, pagina.entregas))
+            for entrega in lista
         ]
         
         return render_template(
             'ultimas_entregas.html',
             usuario=usuario,
-            entregas=entregas
+            entregas=entregas,
+            pagina=pagina
         )
     
     @app.route('/saque')
@@ -241,12 +502,35 @@ def criar_app() -> Flask:
             return redirect(url_for('login'))
         
         usuario = dados_usuario()
+        usuario_obj = usuario_sessao()
+        saldo = 0
+        a_liquidar = 0
+        if usuario_obj is not None:
+            saldo = servico_usuario.carteira.saldo_centavos(usuario_obj.id)
+            a_liquidar = servico_usuario.carteira.saldo_pendente_centavos(usuario_obj.id)
         
         return render_template(
             'saque.html',
-            usuario=usuario
+            usuario=usuario,
+            saldo=formatar_reais(saldo),
+            a_liquidar=formatar_reais(a_liquidar) if a_liquidar else None
         )
     
+    @app.route('/api/carteira/liquidar', methods=['POST'])
+    def api_liquidar_carteira():
+        """Liquida agora a fila da carteira (repetir o mesmo id não paga de novo)."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        if not usuario_administrador():
+            return jsonify({'error': 'Forbidden'}), 403
+        
+        liquidacao = servico_usuario.carteira.liquidar(request.form.get('id') or None)
+        return jsonify({
+            'id': liquidacao.id,
+            'quantidade': liquidacao.quantidade,
+            'total': formatar_reais(liquidacao.total_centavos)
+        })
+    
     @app.route('/perfil')
     def perfil():
         """Página de perfil do usuário."""
@@ -254,12 +538,14 @@ def criar_app() -> Flask:
             return redirect(url_for('login'))
         
         usuario = dados_usuario()
+        usuario_obj = usuario_sessao()
+        pontos = servico_usuario.pontos.saldo(usuario_obj.id) if usuario_obj else 0
         
         return render_template(
             'perfil.html',
             usuario=usuario,
             total_solicitacoes=5,
-            pontos=1250
+            pontos=pontos
         )
     
     @app.route('/operacoes')
@@ -273,12 +559,103 @@ def criar_app() -> Flask:
     
     @app.route('/relatorios')
     def relatorios():
-        """Página de relatórios (placeholder)."""
+        """Página de relatórios: exportação em PDF/CSV e trabalhos recentes."""
         if not usuario_logado():
             return redirect(url_for('login'))
         
         usuario = dados_usuario()
-        return render_template('relatorios.html', usuario=usuario)
+        cubo = servico_relatorio.cubo
+        filtros = {
+            'mes': request.args.get('mes') or None,
+            'ponto': request.args.get('ponto') or None
+        }
+        pontos = servico_ponto.listar_pontos()
+        nomes_pontos = {ponto.id: ponto.nome for ponto in pontos}
+        return render_template(
+            'relatorios.html',
+            usuario=usuario,
+            pontos=pontos,
+            meses=cubo.valores('mes'),
+            filtros=filtros,
+            totais=cubo.totais(**filtros),
+            por_metodo=cubo.agregar(('metodo',), **filtros),
+            por_tipo=cubo.agregar(('tipo',), **filtros),
+            por_mes=cubo.agregar(('mes',), ponto=filtros['ponto']),
+            formatar_reais=formatar_reais,
+            usuarios_distintos=servico_relatorio.esbocos.usuarios_distintos(),
+            quantis_peso=servico_relatorio.esbocos.quantis_peso((0.5, 0.9, 0.99)),
+            pontos_frequentes=[
+                (nomes_pontos.get(id, id), contagem)
+                for id, contagem, _ in servico_relatorio.esbocos.pontos_mais_frequentes(5)
+            ],
+            trabalhos=exportador.listar_trabalhos()
+        )
+    
+    @app.route('/api/relatorios/cubo')
+    def api_cubo():
+        """Consulta ao cubo: ?agrupar=metodo,mes&ponto=...&mes=...&tipo=..."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        agrupar = [d for d in request.args.get('agrupar', '').split(',') if d]
+        filtros = {d: request.args[d] for d in ('tipo', 'metodo', 'ponto', 'mes') if request.args.get(d)}
+        try:
+            grupos = servico_relatorio.cubo.agregar(agrupar, **filtros)
+        except ValueError as erro:
+            return jsonify({'error': str(erro)}), 400
+        return jsonify([
+            {**dict(zip(agrupar, chave)), **medidas}
+            for chave, medidas in grupos.items()
+        ])
+    
+    @app.route('/relatorios/exportar', methods=['POST'])
+    def exportar_relatorio():
+        """Agenda a exportação; o arquivo é gerado em background."""
+        if not usuario_logado():
+            return redirect(url_for('login'))
+        
+        try:
+            trabalho = exportador.solicitar(**validar_dados_exportacao(request.form))
+        except ValueError as erro:
+            flash(str(erro), 'error')
+            return redirect(url_for('relatorios'))
+        
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(trabalho.obter_resumo()), 202
+        flash(f'Exportação {trabalho.id[:8]} agendada', 'success')
+        return redirect(url_for('relatorios'))
+    
+    @app.route('/relatorios/trabalhos/<id_trabalho>')
+    def status_exportacao(id_trabalho):
+        """Status de um trabalho de exportação (consultado pela página)."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        trabalho = exportador.obter_trabalho(id_trabalho)
+        if trabalho is None:
+            return jsonify({'error': 'Not found'}), 404
+        return jsonify(trabalho.obter_resumo())
+    
+    @app.route('/relatorios/trabalhos/<id_trabalho>/arquivo')
+    def baixar_exportacao(id_trabalho):
+        """Download do arquivo de um trabalho concluído."""
+        if not usuario_logado():
+            return redirect(url_for('login'))
+        
+        trabalho = exportador.obter_trabalho(id_trabalho)
+        if trabalho is None or trabalho.caminho is None:
+            return jsonify({'error': 'Not found'}), 404
+        try:
+            arquivo = open(trabalho.caminho, 'rb')
+        except FileNotFoundError:
+            # saiu do cache; basta pedir a exportacao de novo
+            return jsonify({'error': 'Expired'}), 410
+        return send_file(
+            arquivo,
+            mimetype=FORMATOS[trabalho.formato][1],
+            as_attachment=True,
+            download_name=f'relatorio-{trabalho.id[:8]}.{trabalho.formato}'
+        )
     
     @app.route('/usuarios')
     def usuarios():
@@ -289,17 +666,92 @@ def criar_app() -> Flask:
         usuario = dados_usuario()
         return render_template('usuarios.html', usuario=usuario)
     
+    @app.route('/admin/perfis')
+    def admin_perfis():
+        """Requisições perfiladas mais lentas e suas funções principais."""
+        if not usuario_logado():
+            return redirect(url_for('login'))
+        if not usuario_administrador():
+            return jsonify({'error': 'Forbidden'}), 403
+        
+        usuario = dados_usuario()
+        return render_template(
+            'perfis.html',
+            usuario=usuario,
+            ativo=perfilador.ativo,
+            perfis=perfilador.mais_lentos()
+        )
+    
+    @app.route('/admin/perfis/pilhas')
+    def admin_perfis_pilhas():
+        """Pilhas colapsadas de uma rota (entrada para flamegraph)."""
+        if not usuario_logado():
+            return redirect(url_for('login'))
+        if not usuario_administrador():
+            return jsonify({'error': 'Forbidden'}), 403
+        
+        rota = request.args.get('rota', '')
+        return Response(perfilador.pilhas_colapsadas(rota), mimetype='text/plain')
+    
     @app.route('/api/solicitacoes')
     def api_solicitacoes():
-        """API para listar solicitações."""
+        """API para listar solicitações (mais recentes primeiro, paginadas por id)."""
         if not usuario_logado():
             return jsonify({'error': 'Not authenticated'}), 401
         
-        return jsonify([])
+        usuario_obj = usuario_sessao()
+        if usuario_obj is None:
+            return jsonify({'solicitacoes': [], 'proxima': None})
+        limite = min(max(request.args.get('limite', 20, type=int), 1), 100)
+        solicitacoes = servico_descarte.listar_recentes(
+            limite,
+            antes_de=request.args.get('antes') or None,
+            id_usuario=usuario_obj.id
+        )
+        # cursor da proxima pagina: o id da ultima devolvida
+        proxima = solicitacoes[-1].id if len(solicitacoes) == limite else None
+        return jsonify({
+            'solicitacoes': [solicitacao.obter_resumo() for solicitacao in solicitacoes],
+            'proxima': proxima
+        })
+    
+    @app.route('/api/solicitacoes/<id>/status')
+    def api_status_solicitacao(id):
+        """API para acompanhar uma solicitação enfileirada."""
+        if not usuario_logado():
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        # so o dono acompanha o pedido; para os outros ele nao existe
+        usuario_obj = usuario_sessao()
+        status = fila_solicitacoes.obter_status(id)
+        if status is None or usuario_obj is None or fila_solicitacoes.obter_dono(id) != usuario_obj.id:
+            return jsonify({'error': 'Not found'}), 404
+        
+        return jsonify({
+            'id': id,
+            'status': status,
+            'erro': fila_solicitacoes.obter_erro(id)
+        })
     
     return app
 
 
+# emails dos usuarios de exemplo usados pelo login demo
+EMAILS_DEMO = {
+    'cidadao': 'joao@example.com',
+    'empresa': 'contato@ecotech.com',
+    'administrador': 'admin@ecotech.com'
+}
+
+
+MESES = ('Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez')
+
+
+def _formatar_data(data: datetime) -> str:
+    """Data no formato das telas, ex.: 13 Set 2025."""
+    return f"{data.day:02d} {MESES[data.month - 1]} {data.year}"
+
+
 def _inicializar_dados_exemplo(servico_usuario, servico_ponto):
     """Inicializa dados de exemplo para demonstração."""
     # Usuários de exemplo
@@ -318,6 +770,13 @@ def _inicializar_dados_exemplo(servico_usuario, servico_ponto):
         'razao_social': 'EcoTech Recicláveis LTDA'
     })
     
+    servico_usuario.criar_usuario('administrador', {
+        'id': 'user-3',
+        'nome': 'Administrador',
+        'email': 'admin@ecotech.com',
+        'nivel_acesso': 3
+    })
+    
     servico_ponto.criar_ponto_coleta(
         'R. Dr. Morato Saraiva, 1100 - Lagoa Seca',
         'Juazeiro do Norte, CE',
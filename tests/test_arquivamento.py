@@ -0,0 +1,167 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from ecotech.application.arquivamento import ArquivoSolicitacoes
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+DEPOIS = datetime.now() + timedelta(days=31)
+CIDADAO = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+PONTO = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1000.0)
+
+
+def _arquivo(diretorio, **opcoes):
+    # usuarios e pontos do arquivo sao resolvidos nos objetos vivos
+    return ArquivoSolicitacoes(
+        str(diretorio),
+        buscar_usuario={CIDADAO.id: CIDADAO}.get,
+        buscar_ponto={PONTO.id: PONTO}.get,
+        **opcoes
+    )
+
+
+def _criar(servico, cidadao, peso=1.0):
+    solicitacao = servico.criar_solicitacao(cidadao)
+    dispositivo = DispositivoFactory.criar_dispositivo("celular", {"id": "d", "nome": "Cel", "peso_kg": peso})
+    servico.adicionar_item_solicitacao(solicitacao, dispositivo)
+    return solicitacao
+
+
+def _concluir(servico, cidadao, peso=1.0):
+    solicitacao = _criar(servico, cidadao, peso)
+    servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reciclagem"))
+    for _ in range(3):
+        servico.avancar_estado_solicitacao(solicitacao)
+    return solicitacao
+
+
+def _cenario(tmp_path):
+    servico = ServicoDescarte(arquivo=_arquivo(tmp_path))
+    cidadao = CIDADAO
+    concluida = _concluir(servico, cidadao, 2.0)
+    cancelada = _criar(servico, cidadao)
+    servico.cancelar_solicitacao(cancelada, "desistiu")
+    ativa = _criar(servico, cidadao)
+    return servico, concluida, cancelada, ativa
+
+
+class TestArquivoSolicitacoes:
+
+    def test_grava_e_busca_por_id(self, tmp_path):
+        servico, concluida, cancelada, _ = _cenario(tmp_path)
+        arquivo = _arquivo(tmp_path / "outro")
+        assert arquivo.arquivar([concluida, cancelada]) == 2
+        assert arquivo.arquivar([concluida]) == 0  # ja arquivada
+
+        copia = arquivo.obter(cancelada.id)
+        assert copia.estado.obter_nome() == cancelada.estado.obter_nome()
+        assert arquivo.obter(concluida.id).calcular_peso_total() == 2.0
+        assert arquivo.obter("inexistente") is None
+        assert [s.id for s in arquivo.iterar()] == [concluida.id, cancelada.id]
+
+    def test_usuario_e_ponto_vao_so_pelo_id(self, tmp_path):
+        servico = ServicoDescarte()
+        solicitacao = _criar(servico, CIDADAO)
+        servico.definir_ponto_coleta(solicitacao, PONTO)
+        servico.cancelar_solicitacao(solicitacao, "desistiu")
+        arquivo = _arquivo(tmp_path)
+        arquivo.arquivar([solicitacao])
+        tamanho = os.path.getsize(tmp_path / "segmento-000001.arq")
+
+        # o historico do usuario nao entra no bloco
+        for i in range(200):
+            CIDADAO.adicionar_notificacao(f"aviso {i} " + "x" * 100)
+        outra = _criar(servico, CIDADAO)
+        servico.cancelar_solicitacao(outra, "desistiu")
+        arquivo.arquivar([outra])
+        assert os.path.getsize(tmp_path / "segmento-000001.arq") < 2 * tamanho + 200
+
+        lida = _arquivo(tmp_path).obter(solicitacao.id)
+        assert lida.usuario is CIDADAO
+        assert lida.ponto_coleta is PONTO
+
+        sem_servicos = ArquivoSolicitacoes(str(tmp_path))
+        with pytest.raises(ValueError, match="nao encontrado"):
+            sem_servicos.obter(solicitacao.id)
+
+    def test_reabre_reconstroi_indice_e_rotaciona_segmentos(self, tmp_path):
+        servico, concluida, cancelada, _ = _cenario(tmp_path / "servico")
+        arquivo = _arquivo(tmp_path, tamanho_segmento=1)
+        arquivo.arquivar([concluida])
+        arquivo.arquivar([cancelada])
+        assert len([n for n in os.listdir(tmp_path) if n.endswith(".arq")]) == 2
+
+        reaberto = _arquivo(tmp_path)
+        assert len(reaberto) == 2
+        assert cancelada.id in reaberto
+        assert reaberto.obter(concluida.id).id == concluida.id
+
+    def test_bloco_cortado_no_fim_e_descartado(self, tmp_path):
+        servico, concluida, cancelada, _ = _cenario(tmp_path / "servico")
+        arquivo = _arquivo(tmp_path)
+        arquivo.arquivar([concluida])
+        arquivo.arquivar([cancelada])
+        caminho = tmp_path / "segmento-000001.arq"
+        with open(caminho, "r+b") as segmento:
+            segmento.truncate(os.path.getsize(caminho) - 5)
+
+        reaberto = _arquivo(tmp_path)
+        assert concluida.id in reaberto
+        assert cancelada.id not in reaberto
+        assert reaberto.arquivar([cancelada]) == 1
+        assert _arquivo(tmp_path).obter(cancelada.id).id == cancelada.id
+
+
+class TestArquivamentoServico:
+
+    def test_so_estados_finais_com_idade_saem_da_memoria(self, tmp_path):
+        servico, concluida, cancelada, ativa = _cenario(tmp_path)
+        versao = servico.versao
+        assert servico.arquivar_terminadas(timedelta(days=30)) == 0
+
+        assert servico.arquivar_terminadas(timedelta(days=30), agora=DEPOIS) == 2
+        assert [s.id for s in servico.listar_solicitacoes()] == [ativa.id]
+        assert len(servico.listar_solicitacoes(incluir_arquivadas=True)) == 3
+        assert servico.obter_solicitacao(concluida.id).estado.obter_nome() == concluida.estado.obter_nome()
+        assert servico.versao == versao
+
+    def test_data_de_termino_vai_para_o_arquivo(self, tmp_path):
+        servico, concluida, cancelada, ativa = _cenario(tmp_path)
+        terminada_em = servico.data_termino(concluida.id)
+        assert terminada_em is not None
+        assert servico.data_termino(ativa.id) is None
+
+        servico.arquivar_terminadas(timedelta(days=30), agora=DEPOIS)
+        assert servico.data_termino(concluida.id) == terminada_em
+        assert _arquivo(tmp_path).data_termino(concluida.id) == terminada_em
+
+    def test_relatorios_e_alteradas_incluem_arquivadas(self, tmp_path):
+        servico, concluida, cancelada, ativa = _cenario(tmp_path)
+        servico.arquivar_terminadas(timedelta(days=30), agora=DEPOIS)
+        alteradas = servico.listar_alteradas_desde(0)
+        assert {s.id for s in alteradas} == {concluida.id, cancelada.id, ativa.id}
+
+    def test_arquivadas_saem_da_lista_de_alteracoes(self, tmp_path):
+        servico, concluida, cancelada, ativa = _cenario(tmp_path)
+        antes = servico.versao
+        servico.arquivar_terminadas(timedelta(days=30), agora=DEPOIS)
+        assert list(servico._alteracoes) == [ativa.id]
+
+        servico.definir_ponto_coleta(ativa, PONTO)
+        # marca depois do arquivamento: continua incremental
+        assert [s.id for s in servico.listar_alteradas_desde(antes)] == [ativa.id]
+
+        copia = ServicoDescarte(arquivo=_arquivo(tmp_path))
+        copia.importar_estado(servico.exportar_estado())
+        # marca de antes: a varredura completa inclui as arquivadas
+        assert len(copia.listar_alteradas_desde(0)) == 3
+        assert list(copia._alteracoes) == [ativa.id]
+
+    def test_snapshot_antigo_usa_data_de_criacao(self, tmp_path):
+        servico, concluida, cancelada, ativa = _cenario(tmp_path)
+        outro = ServicoDescarte(arquivo=_arquivo(tmp_path / "outro"))
+        outro.importar_estado({"solicitacoes": servico.exportar_estado()["solicitacoes"]})
+        assert outro.arquivar_terminadas(timedelta(days=30), agora=DEPOIS) == 2
+        assert [s.id for s in outro.listar_solicitacoes()] == [ativa.id]
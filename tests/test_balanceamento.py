@@ -0,0 +1,110 @@
+import pickle
+import pytest
+import random
+from collections import Counter
+from ecotech.application.balanceamento import BalanceadorPontos
+from ecotech.application.processamento import validar_dados_solicitacao
+from ecotech.application.services import ServicoPontoColeta
+from ecotech.domain.descarte import PontoColeta
+
+
+def _ponto(id, lat=-23.55, lon=-46.63, capacidade_kg=100.0):
+    return PontoColeta(id, f"Ponto {id}", "Rua X", lat, lon, capacidade_kg)
+
+
+class TestBalanceadorPontos:
+
+    def test_heap_acompanha_a_ocupacao(self):
+        balanceador = BalanceadorPontos()
+        a, b = _ponto("A"), _ponto("B")
+        balanceador.adicionar_ponto(a)
+        balanceador.adicionar_ponto(b)
+
+        a.adicionar_ocupacao(60.0)
+        assert [p.id for p in balanceador.mais_livres(2)] == ["B", "A"]
+
+        b.adicionar_ocupacao(90.0)
+        a.liberar_ocupacao(60.0)
+        assert [p.id for p in balanceador.mais_livres(2)] == ["A", "B"]
+
+    def test_sem_coordenadas_escolhe_entre_os_mais_livres(self):
+        balanceador = BalanceadorPontos(num_candidatos=2, aleatorio=random.Random(1))
+        pontos = [_ponto(str(i)) for i in range(4)]
+        for i, ponto in enumerate(pontos):
+            ponto.adicionar_ocupacao(10.0 * i)
+            balanceador.adicionar_ponto(ponto)
+
+        # com dois candidatos, o sorteio sempre fica com o mais livre dos dois
+        assert balanceador.escolher(5.0).id == "0"
+
+    def test_ignora_pontos_sem_capacidade_ou_inativos(self):
+        balanceador = BalanceadorPontos()
+        cheio = _ponto("cheio")
+        cheio.adicionar_ocupacao(95.0)
+        balanceador.adicionar_ponto(cheio)
+        assert balanceador.escolher(10.0) is None
+        assert balanceador.escolher(10.0, -23.55, -46.63) is None
+
+    def test_com_coordenadas_prefere_o_proximo(self):
+        balanceador = BalanceadorPontos(num_candidatos=2, aleatorio=random.Random(1))
+        perto = _ponto("perto", -23.551, -46.631)
+        longe = _ponto("longe", -23.65, -46.73)
+        balanceador.adicionar_ponto(perto)
+        balanceador.adicionar_ponto(longe)
+        assert balanceador.escolher(5.0, -23.55, -46.63).id == "perto"
+
+    def test_ocupacao_pesa_contra_a_distancia(self):
+        balanceador = BalanceadorPontos(num_candidatos=2, peso_ocupacao=10.0, aleatorio=random.Random(1))
+        perto = _ponto("perto", -23.56, -46.63)
+        um_pouco_mais_longe = _ponto("outro", -23.57, -46.63)
+        perto.adicionar_ocupacao(90.0)
+        balanceador.adicionar_ponto(perto)
+        balanceador.adicionar_ponto(um_pouco_mais_longe)
+        assert balanceador.escolher(5.0, -23.55, -46.63).id == "outro"
+
+    def test_rajada_nao_vai_toda_para_o_mesmo_ponto(self):
+        # sem reservar capacidade entre as escolhas (como numa rajada na fila),
+        # o sorteio entre dois candidatos espalha os pedidos
+        balanceador = BalanceadorPontos(num_candidatos=4, aleatorio=random.Random(7))
+        for i in range(4):
+            balanceador.adicionar_ponto(_ponto(str(i), -23.55 + i * 0.001, -46.63))
+
+        escolhas = Counter(balanceador.escolher(1.0, -23.55, -46.63).id for _ in range(200))
+        assert len(escolhas) > 1
+        assert escolhas.most_common(1)[0][1] < 200
+
+    def test_remover_ponto_para_de_observar(self):
+        balanceador = BalanceadorPontos()
+        ponto = _ponto("A")
+        balanceador.adicionar_ponto(ponto)
+        balanceador.remover_ponto(ponto)
+        ponto.adicionar_ocupacao(10.0)
+        assert balanceador.mais_livres(5) == []
+
+
+class TestIntegracaoServico:
+
+    def test_servico_registra_pontos_no_balanceador(self):
+        servico = ServicoPontoColeta()
+        ponto = servico.criar_ponto_coleta("Centro", "Rua A", -23.55, -46.63, 100.0)
+        assert servico.escolher_ponto(10.0) is ponto
+
+    def test_observadores_nao_vao_para_o_pickle(self):
+        servico = ServicoPontoColeta()
+        ponto = servico.criar_ponto_coleta("Centro", "Rua A", -23.55, -46.63, 100.0)
+        copia = pickle.loads(pickle.dumps(ponto))
+        copia.adicionar_ocupacao(10.0)  # nao avisa o balanceador do original
+
+        servico.importar_estado({"pontos": {copia.id: copia}})
+        copia.adicionar_ocupacao(50.0)
+        assert servico.balanceador.mais_livres(1)[0].ocupacao_atual_kg == 60.0
+        assert servico.escolher_ponto(50.0) is None
+
+    def test_validar_coordenadas(self):
+        base = {"tipo_dispositivo": "celular", "nome": "X", "peso_kg": "1", "ponto_coleta": "auto"}
+        dados = validar_dados_solicitacao({**base, "latitude": "-23.5", "longitude": "-46.6"})
+        assert (dados["latitude"], dados["longitude"]) == (-23.5, -46.6)
+        dados = validar_dados_solicitacao({**base, "latitude": "-23.5"})
+        assert (dados["latitude"], dados["longitude"]) == (None, None)
+        with pytest.raises(ValueError):
+            validar_dados_solicitacao({**base, "latitude": "abc", "longitude": "1"})
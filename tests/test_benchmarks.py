@@ -0,0 +1,62 @@
+from benchmarks.medicao import comparar, medir, percentil
+
+
+class TestMedicao:
+
+    def test_percentil(self):
+        valores = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentil(valores, 50) == 3.0
+        assert percentil(valores, 100) == 5.0
+        assert percentil([], 99) == 0.0
+
+    def test_medir_retorna_percentis(self):
+        resultado = medir("soma", lambda: sum(range(100)), repeticoes=20, aquecimento=1)
+        assert resultado["execucoes"] == 20
+        assert resultado["p50_us"] <= resultado["p99_us"]
+        assert resultado["ops_por_segundo"] > 0
+
+
+class TestComparacaoBaseline:
+
+    def setup_method(self):
+        self.baseline = {
+            "gerar_relatorio": {"nome": "gerar_relatorio", "p50_us": 100.0, "ops_por_segundo": 1000.0}
+        }
+
+    def test_dentro_do_limite(self):
+        atual = [{"nome": "gerar_relatorio", "p50_us": 110.0, "ops_por_segundo": 950.0}]
+        assert comparar(atual, self.baseline, limite=0.25) == []
+
+    def test_regressao_de_latencia_e_vazao(self):
+        atual = [{"nome": "gerar_relatorio", "p50_us": 200.0, "ops_por_segundo": 500.0}]
+        regressoes = comparar(atual, self.baseline, limite=0.25)
+        assert len(regressoes) == 2
+
+    def test_cenario_novo_nao_e_regressao(self):
+        atual = [{"nome": "novo", "p50_us": 1.0, "ops_por_segundo": 1.0}]
+        assert comparar(atual, self.baseline) == []
+
+    def test_sem_baseline_falha(self, tmp_path):
+        from benchmarks.__main__ import main
+        assert main(["--baseline", str(tmp_path / "nao-existe.json"), "--sem-web"]) == 2
+
+
+class TestCargaWeb:
+
+    def test_nao_toca_no_estado_real(self, tmp_path, monkeypatch):
+        import os
+        import threading
+        from benchmarks.carga_web import gerar_carga
+
+        snapshot = tmp_path / "estado.snap"
+        monkeypatch.setenv("ECOTECH_SNAPSHOT", str(snapshot))
+        monkeypatch.delenv("ECOTECH_EXPORTACOES", raising=False)
+        antes = {thread.name for thread in threading.enumerate()}
+
+        resultados = gerar_carga(rotas=("/",), num_threads=1, requisicoes_por_thread=2)
+
+        assert resultados[0]["execucoes"] == 2
+        assert os.environ["ECOTECH_SNAPSHOT"] == str(snapshot)
+        assert "ECOTECH_EXPORTACOES" not in os.environ
+        # nenhum servico em background ficou rodando
+        assert {thread.name for thread in threading.enumerate()} <= antes
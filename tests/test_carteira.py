@@ -0,0 +1,153 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from ecotech.application.carteira import (
+    Carteira,
+    Entrega,
+    LiquidacaoPeriodica,
+    STATUS_CANCELADO,
+    STATUS_FINALIZADO,
+    calcular_valor_solicitacao,
+)
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.usuarios import Cidadao
+
+
+def _entrega(id, usuario="u1", valor=1000, status=STATUS_FINALIZADO):
+    return Entrega(id, usuario, valor, "Centro", status, datetime(2026, 3, 1, 10, 0))
+
+
+class TestCarteira:
+
+    def test_liquidacao_credita_saldo_uma_vez(self):
+        carteira = Carteira()
+        carteira.agendar(_entrega("s1", valor=1000))
+        carteira.agendar(_entrega("s2", valor=550))
+        carteira.agendar(_entrega("s3", valor=700, status=STATUS_CANCELADO))
+        assert carteira.saldo_centavos("u1") == 0
+
+        liquidacao = carteira.liquidar("rodada-1")
+        assert liquidacao.quantidade == 3
+        assert liquidacao.total_centavos == 1550
+        assert liquidacao.total == Decimal("15.50")
+        assert carteira.saldo("u1") == Decimal("15.50")
+
+        # a mesma entrega de novo (ex. reprocessamento) nao paga outra vez
+        carteira.agendar(_entrega("s1", valor=1000))
+        assert carteira.liquidar().quantidade == 0
+        assert carteira.saldo_centavos("u1") == 1550
+
+    def test_repetir_a_rodada_devolve_o_mesmo_resultado(self):
+        carteira = Carteira()
+        carteira.agendar(_entrega("s1"))
+        primeira = carteira.liquidar("rodada-1")
+        carteira.agendar(_entrega("s2"))
+        assert carteira.liquidar("rodada-1") is primeira
+        assert carteira.pendentes() == 1
+
+    def test_lote_cheio_liquida_sozinho(self):
+        carteira = Carteira(tamanho_lote=2)
+        carteira.agendar(_entrega("s1"))
+        carteira.agendar(_entrega("s2"))
+        assert carteira.pendentes() == 0
+        assert carteira.saldo_centavos("u1") == 2000
+
+    def test_historico_paginado_do_mais_recente(self):
+        carteira = Carteira()
+        for i in range(5000):
+            carteira.agendar(_entrega(f"s{i}", valor=100))
+        carteira.liquidar()
+
+        primeira = carteira.listar_entregas("u1", pagina=1, por_pagina=20)
+        assert [e.id_solicitacao for e in primeira.entregas[:2]] == ["s4999", "s4998"]
+        assert primeira.total == 5000
+        assert primeira.tem_proxima and not primeira.tem_anterior
+
+        ultima = carteira.listar_entregas("u1", pagina=250, por_pagina=20)
+        assert ultima.entregas[-1].id_solicitacao == "s0"
+        assert not ultima.tem_proxima
+        assert carteira.listar_entregas("u1", pagina=251, por_pagina=20).entregas == []
+        with pytest.raises(ValueError):
+            carteira.listar_entregas("u1", pagina=0)
+
+    def test_exportar_e_importar(self):
+        carteira = Carteira()
+        carteira.agendar(_entrega("s1"))
+        carteira.liquidar()
+        carteira.agendar(_entrega("s2"))
+        copia = Carteira()
+        copia.importar_estado(carteira.exportar_estado())
+        copia.liquidar()
+        assert copia.saldo_centavos("u1") == 2000
+
+    def test_pendentes_sao_lidos_sem_liquidar(self):
+        carteira = Carteira()
+        carteira.agendar(_entrega("s1", valor=1000))
+        carteira.agendar(_entrega("s2", usuario="u2", valor=300))
+        carteira.agendar(_entrega("s3", valor=700, status=STATUS_CANCELADO))
+
+        assert [e.id_solicitacao for e in carteira.listar_pendentes("u1")] == ["s3", "s1"]
+        assert carteira.saldo_pendente_centavos("u1") == 1000
+        # nada foi liquidado pela leitura
+        assert carteira.pendentes() == 3
+        assert carteira.saldo_centavos("u1") == 0
+        assert carteira.listar_entregas("u1").total == 0
+
+    def test_liquidacao_periodica_ignora_fila_vazia(self):
+        carteira = Carteira()
+        periodica = LiquidacaoPeriodica(carteira)
+        assert periodica.executar_uma_vez() is None
+        assert not carteira._execucoes
+
+        carteira.agendar(_entrega("s1"))
+        liquidacao = periodica.executar_uma_vez()
+        assert liquidacao.quantidade == 1
+        assert carteira.saldo_centavos("u1") == 1000
+        assert carteira.listar_pendentes("u1") == []
+
+
+class TestCarteiraNasTransicoes:
+
+    def test_valor_vem_da_revenda_dos_dispositivos(self):
+        carteira = Carteira()
+        servico = ServicoDescarte()
+        servico.adicionar_observador(carteira.ao_transicionar)
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+
+        solicitacao = servico.criar_solicitacao(cidadao)
+        computador = DispositivoFactory.criar_dispositivo(
+            "computador", {"id": "d1", "nome": "PC", "peso_kg": 2.0}
+        )
+        servico.adicionar_item_solicitacao(solicitacao, computador, quantidade=2)
+        servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reuso"))
+        for _ in range(3):
+            servico.avancar_estado_solicitacao(solicitacao)
+
+        cancelada = servico.criar_solicitacao(cidadao)
+        servico.cancelar_solicitacao(cancelada)
+
+        carteira.liquidar()
+        assert calcular_valor_solicitacao(solicitacao) == Decimal("100.00")
+        assert carteira.saldo_centavos("c1") == 10000
+        assert [e.status for e in carteira.listar_entregas("c1").entregas] == [
+            STATUS_CANCELADO, STATUS_FINALIZADO
+        ]
+
+    def test_centavos_nao_acumulam_erro(self):
+        # 0.1 kg de celular = R$ 1,00; mil deles em float daria 999.9999...
+        carteira = Carteira()
+        servico = ServicoDescarte()
+        servico.adicionar_observador(carteira.ao_transicionar)
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        for i in range(1000):
+            solicitacao = servico.criar_solicitacao(cidadao)
+            celular = DispositivoFactory.criar_dispositivo(
+                "celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 0.1}
+            )
+            servico.adicionar_item_solicitacao(solicitacao, celular)
+            servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reuso"))
+            for _ in range(3):
+                servico.avancar_estado_solicitacao(solicitacao)
+        carteira.liquidar()
+        assert carteira.saldo("c1") == Decimal("1000.00")
@@ -0,0 +1,77 @@
+import time
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.services import ServicoDescarte, ServicoPontoColeta
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.estados import Coletado, Solicitado
+from ecotech.domain.usuarios import Cidadao
+
+
+def _cenario(quantidade=6):
+    servico_ponto = ServicoPontoColeta()
+    servico = ServicoDescarte(series=servico_ponto.series)
+    ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1e9)
+    outro = PontoColeta("p2", "Norte", "Rua B", -23.4, -46.6, 1e9)
+    joao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+    maria = Cidadao("c2", "Maria", "maria@example.com", "10987654321")
+    solicitacoes = []
+    for i in range(quantidade):
+        solicitacao = servico.criar_solicitacao(joao if i % 3 else maria)
+        celular = DispositivoFactory.criar_dispositivo("celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 1.0})
+        servico.adicionar_item_solicitacao(solicitacao, celular)
+        servico.definir_ponto_coleta(solicitacao, ponto)
+        solicitacoes.append(solicitacao)
+    return servico, servico_ponto, ponto, outro, joao, maria, solicitacoes
+
+
+class TestColetarPonto:
+
+    def test_coleta_todas_as_pendentes_do_ponto(self):
+        servico, servico_ponto, ponto, outro, joao, maria, solicitacoes = _cenario()
+        em_outro = servico.criar_solicitacao(joao)
+        servico.definir_ponto_coleta(em_outro, outro)
+        servico.cancelar_solicitacao(solicitacoes[0])
+        transicoes = []
+        servico.adicionar_observador(lambda s, anterior, novo: transicoes.append((s.id, anterior, novo)))
+        versao = servico.versao
+
+        coleta = servico.coletar_ponto(ponto)
+
+        assert coleta.ids_solicitacoes == tuple(s.id for s in solicitacoes[1:])
+        assert coleta.peso_kg == 5.0
+        assert all(isinstance(s.estado, Coletado) for s in solicitacoes[1:])
+        assert isinstance(em_outro.estado, Solicitado)
+        assert ponto.ocupacao_atual_kg == 1.0  # so a cancelada continua ocupando
+        assert [id for id, _, _ in transicoes] == list(coleta.ids_solicitacoes)
+        assert servico.versao == versao + 1
+        assert servico.listar_coletas("p1") == [coleta]
+
+    def test_um_aviso_por_usuario(self):
+        servico, _, ponto, _, joao, maria, _ = _cenario()
+        servico.coletar_ponto(ponto)
+        assert len(joao.notificacoes) == 1
+        assert "4 solicitacoes" in joao.notificacoes[0]
+        assert len(maria.notificacoes) == 1
+
+    def test_segunda_coleta_vazia(self):
+        servico, _, ponto, _, _, _, solicitacoes = _cenario()
+        servico.avancar_estado_solicitacao(solicitacoes[0])  # coletada sozinha antes
+        assert len(servico.coletar_ponto(ponto).ids_solicitacoes) == 5
+        versao = servico.versao
+        # nada pendente: sem registro, sem id novo e sem nova versao
+        assert servico.coletar_ponto(ponto) is None
+        assert len(servico.listar_coletas(ponto.id)) == 1
+        assert servico.versao == versao
+
+    def test_snapshot_reconstroi_pendentes(self):
+        servico, _, ponto, _, _, _, solicitacoes = _cenario()
+        copia = ServicoDescarte()
+        copia.importar_estado(servico.exportar_estado())
+        ponto_copia = copia.obter_solicitacao(solicitacoes[0].id).ponto_coleta
+        assert len(copia.coletar_ponto(ponto_copia).ids_solicitacoes) == 6
+
+    def test_milhares_de_solicitacoes_em_milissegundos(self):
+        servico, _, ponto, _, _, _, _ = _cenario(5000)
+        inicio = time.perf_counter()
+        coleta = servico.coletar_ponto(ponto)
+        assert len(coleta.ids_solicitacoes) == 5000
+        assert time.perf_counter() - inicio < 1.0  # folga para maquinas lentas de CI
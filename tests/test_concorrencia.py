@@ -0,0 +1,90 @@
+import pickle
+import threading
+import pytest
+from ecotech.application.concorrencia import MapaVersionado
+from ecotech.application.services import ServicoUsuario
+
+
+class TestMapaVersionado:
+
+    def test_comporta_como_dict(self):
+        mapa = MapaVersionado({"a": 1, "b": 2})
+        mapa["c"] = 3
+        mapa["a"] = 10
+        del mapa["b"]
+
+        assert mapa.get("a") == 10 and mapa["c"] == 3
+        assert "b" not in mapa and mapa.get("b") is None
+        assert len(mapa) == 2
+        assert mapa.items() == [("a", 10), ("c", 3)]
+        assert mapa.pop("c") == 3 and mapa.pop("c", None) is None
+        assert mapa.setdefault("d", 4) == 4 and mapa.setdefault("d", 5) == 4
+        with pytest.raises(KeyError):
+            mapa["b"]
+        with pytest.raises(KeyError):
+            del mapa["b"]
+
+    def test_compacta_sem_perder_nada(self):
+        mapa = MapaVersionado()
+        esperado = {}
+        for i in range(2000):
+            mapa[i] = i
+            esperado[i] = i
+            if i % 3 == 0:
+                mapa.pop(i // 2, None)
+                esperado.pop(i // 2, None)
+        assert mapa.copia() == esperado
+        assert len(mapa) == len(esperado)
+        assert len(mapa._estado[1]) <= max(32, int(len(esperado) ** 0.5)) + 1
+
+    def test_leitor_continua_na_versao_que_pegou(self):
+        mapa = MapaVersionado({i: i for i in range(100)})
+        iterador = iter(mapa)
+        primeiro = next(iterador)
+        mapa[1000] = 1000
+        del mapa[50]
+        assert [primeiro] + list(iterador) == list(range(100))
+        assert 1000 in mapa and 50 not in mapa
+
+    def test_pickle_vira_dict_e_volta(self):
+        mapa = MapaVersionado({"a": 1})
+        mapa["b"] = 2
+        copia = pickle.loads(pickle.dumps(mapa))
+        assert isinstance(copia, MapaVersionado)
+        assert copia.copia() == {"a": 1, "b": 2}
+
+
+class TestEstresseServicos:
+
+    def test_leitores_e_escritores_ao_mesmo_tempo(self):
+        servico = ServicoUsuario()
+        for i in range(200):
+            servico.criar_usuario("cidadao", {"nome": f"Usuario {i}", "email": f"u{i}@example.com", "cpf": "12345678901"})
+        erros = []
+        parar = threading.Event()
+
+        def escrever(inicio):
+            for i in range(inicio, inicio + 300):
+                servico.criar_usuario("cidadao", {"nome": f"Usuario {i}", "email": f"u{i}@example.com", "cpf": "12345678901"})
+
+        def ler():
+            try:
+                while not parar.is_set():
+                    assert servico.autenticar_usuario("u10@example.com") is not None
+                    usuarios = servico.listar_usuarios()
+                    assert len({usuario.id for usuario in usuarios}) == len(usuarios)
+            except Exception as erro:  # noqa: BLE001 - qualquer erro do leitor reprova
+                erros.append(erro)
+
+        leitores = [threading.Thread(target=ler) for _ in range(4)]
+        escritores = [threading.Thread(target=escrever, args=(1000 * (n + 1),)) for n in range(2)]
+        for thread in leitores + escritores:
+            thread.start()
+        for thread in escritores:
+            thread.join()
+        parar.set()
+        for thread in leitores:
+            thread.join()
+
+        assert erros == []
+        assert len(servico.listar_usuarios()) == 800
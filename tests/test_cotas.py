@@ -0,0 +1,187 @@
+import pytest
+from datetime import datetime
+from ecotech.application.cotas import CotaExcedida, MotorCotas
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.services import ServicoDescarte, ServicoUsuario
+from ecotech.domain.descarte import PontoColeta
+
+MARCO = datetime(2026, 3, 15)
+ABRIL = datetime(2026, 4, 1)
+
+
+class TestMotorCotas:
+
+    def test_registra_ate_o_limite(self):
+        cotas = MotorCotas(limite_padrao_kg=100.0, agora=MARCO)
+        cotas.registrar_empresa("e1")
+        assert cotas.registrar("e1", 60.0, MARCO) == pytest.approx(40.0)
+        with pytest.raises(CotaExcedida):
+            cotas.registrar("e1", 50.0, MARCO)
+        assert cotas.usado("e1", MARCO) == pytest.approx(60.0)
+        assert cotas.pode_registrar("e1", 40.0, MARCO)
+
+    def test_virada_de_mes_preguicosa(self):
+        cotas = MotorCotas(limite_padrao_kg=100.0, agora=MARCO)
+        cotas.registrar_empresa("e1")
+        cotas.registrar("e1", 90.0, MARCO)
+        assert cotas.disponivel("e1", ABRIL) == pytest.approx(100.0)
+        assert cotas.periodo == "2026-04"
+        # datas antigas nao voltam o periodo
+        assert cotas.usado("e1", MARCO) == 0.0
+
+    def test_reset_geral_nao_percorre_as_empresas(self):
+        cotas = MotorCotas(agora=MARCO)
+        for i in range(100_000):
+            cotas.registrar_empresa(f"e{i}")
+        cotas.registrar("e0", 10.0, MARCO)
+        cotas.registrar("e99999", 20.0, MARCO)
+
+        cotas.resetar_todos()
+        assert cotas.usado("e0", MARCO) == 0.0
+        assert cotas.usado("e99999", MARCO) == 0.0
+        assert len(cotas) == 100_000
+
+    def test_limites_por_contrato(self):
+        cotas = MotorCotas(agora=MARCO)
+        cotas.definir_contrato("grande", 5000.0)
+        cotas.registrar_empresa("e1", contrato="grande")
+        cotas.registrar_empresa("e2", contrato="grande", limite_kg=50.0)
+        assert cotas.limite("e1") == 5000.0
+        assert cotas.limite("e2") == 50.0
+
+        # mudar o contrato vale para todas as empresas sem limite proprio
+        cotas.definir_contrato("grande", 8000.0)
+        assert cotas.limite("e1") == 8000.0
+        assert cotas.limite("e2") == 50.0
+
+        with pytest.raises(ValueError):
+            cotas.registrar_empresa("e3", contrato="inexistente")
+
+    def test_empresa_desconhecida(self):
+        with pytest.raises(ValueError):
+            MotorCotas().registrar("nada", 1.0)
+
+    def test_exportar_e_importar(self):
+        cotas = MotorCotas(agora=MARCO)
+        cotas.registrar_empresa("e1")
+        cotas.registrar("e1", 30.0, MARCO)
+        copia = MotorCotas(agora=MARCO)
+        copia.importar_estado(cotas.exportar_estado())
+        assert copia.usado("e1", MARCO) == pytest.approx(30.0)
+
+
+class TestCotasNoServico:
+
+    def test_entrega_de_empresa_consome_a_cota(self):
+        servico_usuario = ServicoUsuario()
+        empresa = servico_usuario.criar_usuario("empresa", {
+            "nome": "Empresa X",
+            "email": "contato@x.com",
+            "cnpj": "12345678000190",
+            "razao_social": "Empresa X LTDA"
+        })
+        servico_usuario.cotas.registrar_empresa(empresa.id, limite_kg=15.0)
+        servico = ServicoDescarte(cotas=servico_usuario.cotas)
+        ponto = PontoColeta("p1", "Centro", "Rua A", 0.0, 0.0, 1000.0)
+
+        def solicitacao_de(peso):
+            solicitacao = servico.criar_solicitacao(empresa)
+            dispositivo = DispositivoFactory.criar_dispositivo(
+                "computador", {"id": "d", "nome": "PC", "peso_kg": peso}
+            )
+            servico.adicionar_item_solicitacao(solicitacao, dispositivo)
+            return solicitacao
+
+        servico.definir_ponto_coleta(solicitacao_de(10.0), ponto)
+        recusada = solicitacao_de(10.0)
+        with pytest.raises(CotaExcedida):
+            servico.definir_ponto_coleta(recusada, ponto)
+        assert recusada.ponto_coleta is None
+        assert ponto.ocupacao_atual_kg == pytest.approx(10.0)
+
+    def test_solicitacao_sem_peso_recebe_ponto_sem_cobrar(self):
+        servico_usuario = ServicoUsuario()
+        empresa = servico_usuario.criar_usuario("empresa", {
+            "nome": "XYZ",
+            "email": "contato@xyz.com",
+            "cnpj": "12345678000190",
+            "razao_social": "XYZ Ltda"
+        })
+        servico = ServicoDescarte(cotas=servico_usuario.cotas)
+        centro = PontoColeta("p1", "Centro", "Rua A", 0.0, 0.0, 1000.0)
+        bairro = PontoColeta("p2", "Bairro", "Rua B", 0.0, 0.0, 1000.0)
+        solicitacao = servico.criar_solicitacao(empresa)
+
+        servico.definir_ponto_coleta(solicitacao, centro)
+        servico.definir_ponto_coleta(solicitacao, bairro)
+        assert solicitacao.ponto_coleta is bairro
+        assert servico_usuario.cotas.usado(empresa.id) == 0.0
+
+    def test_limite_vem_do_contrato_configurado(self, tmp_path):
+        from ecotech.application.cotas import carregar_contratos
+
+        arquivo = tmp_path / "contratos.json"
+        arquivo.write_text('{"padrao": 200, "grande": 5000}')
+        servico_usuario = ServicoUsuario(carregar_contratos(str(arquivo)))
+        dados = {"nome": "Empresa X", "email": "x@x.com", "cnpj": "12345678000190", "razao_social": "X LTDA"}
+
+        pequena = servico_usuario.criar_usuario("empresa", dict(dados))
+        grande = servico_usuario.criar_usuario("empresa", dict(dados, contrato="grande"))
+        assert servico_usuario.cotas.limite(pequena.id) == 200.0
+        assert servico_usuario.cotas.limite(grande.id) == 5000.0
+
+        with pytest.raises(ValueError):
+            servico_usuario.criar_usuario("empresa", dict(dados, contrato="inexistente"))
+        assert len(servico_usuario.listar_usuarios()) == 2
+
+        # o snapshot guarda os limites, mas a configuracao atual prevalece
+        estado = servico_usuario.exportar_estado()
+        copia = ServicoUsuario({"padrao": 200, "grande": 8000})
+        copia.importar_estado(estado)
+        assert copia.cotas.limite(grande.id) == 8000.0
+
+    def test_contratos_invalidos(self, tmp_path):
+        from ecotech.application.cotas import carregar_contratos
+
+        arquivo = tmp_path / "contratos.json"
+        arquivo.write_text('{"padrao": -1}')
+        with pytest.raises(ValueError):
+            carregar_contratos(str(arquivo))
+
+    def test_trocar_de_ponto_devolve_cota_e_ocupacao(self):
+        servico_usuario = ServicoUsuario()
+        empresa = servico_usuario.criar_usuario("empresa", {
+            "nome": "Empresa X",
+            "email": "contato@x.com",
+            "cnpj": "12345678000190",
+            "razao_social": "Empresa X LTDA"
+        })
+        servico_usuario.cotas.registrar_empresa(empresa.id, limite_kg=15.0)
+        servico = ServicoDescarte(cotas=servico_usuario.cotas)
+        centro = PontoColeta("p1", "Centro", "Rua A", 0.0, 0.0, 1000.0)
+        bairro = PontoColeta("p2", "Bairro", "Rua B", 0.0, 0.0, 1000.0)
+        solicitacao = servico.criar_solicitacao(empresa)
+        servico.adicionar_item_solicitacao(solicitacao, DispositivoFactory.criar_dispositivo(
+            "computador", {"id": "d", "nome": "PC", "peso_kg": 10.0}
+        ))
+
+        servico.definir_ponto_coleta(solicitacao, centro)
+        servico.definir_ponto_coleta(solicitacao, bairro)
+
+        assert solicitacao.ponto_coleta is bairro
+        assert servico_usuario.cotas.usado(empresa.id) == pytest.approx(10.0)
+        assert centro.ocupacao_atual_kg == 0.0
+        assert bairro.ocupacao_atual_kg == pytest.approx(10.0)
+        assert servico.listar_solicitacoes()[0] is solicitacao
+        assert servico.coletar_ponto(bairro).ids_solicitacoes == (solicitacao.id,)
+
+
+class TestEstorno:
+
+    def test_estorno_nao_fica_negativo(self):
+        cotas = MotorCotas(limite_padrao_kg=100.0, agora=MARCO)
+        cotas.registrar_empresa("e1")
+        cotas.registrar("e1", 30.0, MARCO)
+        assert cotas.estornar("e1", 10.0, MARCO) == pytest.approx(80.0)
+        # registro de marco estornado em abril: o uso do mes novo continua zero
+        assert cotas.estornar("e1", 20.0, ABRIL) == pytest.approx(100.0)
@@ -0,0 +1,93 @@
+import pytest
+from ecotech.application.cubo import CuboIndicadores, SEM_PONTO
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+
+def _concluir(servico, cidadao, tipo, peso, metodo, ponto=None, quantidade=1):
+    solicitacao = servico.criar_solicitacao(cidadao)
+    dispositivo = DispositivoFactory.criar_dispositivo(tipo, {"id": "d", "nome": "X", "peso_kg": peso})
+    servico.adicionar_item_solicitacao(solicitacao, dispositivo, quantidade)
+    if ponto is not None:
+        servico.definir_ponto_coleta(solicitacao, ponto)
+    servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo(metodo))
+    for _ in range(3):
+        servico.avancar_estado_solicitacao(solicitacao)
+    return solicitacao
+
+
+@pytest.fixture
+def cenario():
+    servico = ServicoDescarte()
+    cubo = CuboIndicadores()
+    servico.adicionar_observador(cubo.ao_transicionar)
+    cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+    ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1000.0)
+    _concluir(servico, cidadao, "celular", 0.5, "reciclagem", ponto, quantidade=2)
+    _concluir(servico, cidadao, "computador", 2.0, "reciclagem")
+    _concluir(servico, cidadao, "celular", 1.0, "reuso", ponto)
+    return servico, cubo, ponto
+
+
+class TestCuboIndicadores:
+
+    def test_roll_up_por_metodo(self, cenario):
+        _, cubo, _ = cenario
+        por_metodo = cubo.agregar(("metodo",))
+        assert por_metodo[("Reciclagem",)]["peso_kg"] == 3.0
+        assert por_metodo[("Reciclagem",)]["dispositivos"] == 3
+        assert por_metodo[("Reciclagem",)]["custo_centavos"] == 4500
+        assert por_metodo[("Reuso",)]["custo_centavos"] == 800
+        assert cubo.totais()["itens"] == 3
+
+    def test_custo_arredondado_uma_vez_por_solicitacao(self):
+        servico = ServicoDescarte()
+        cubo = CuboIndicadores()
+        servico.adicionar_observador(cubo.ao_transicionar)
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        solicitacao = servico.criar_solicitacao(cidadao)
+        for tipo in ("celular", "computador", "eletrodomestico"):
+            dispositivo = DispositivoFactory.criar_dispositivo(tipo, {"id": tipo, "nome": "X", "peso_kg": 0.001})
+            servico.adicionar_item_solicitacao(solicitacao, dispositivo, 1)
+        metodo = MetodoTratamentoFactory.criar_metodo("reciclagem")
+        servico.definir_metodo_tratamento(solicitacao, metodo)
+        for _ in range(3):
+            servico.avancar_estado_solicitacao(solicitacao)
+
+        # 3 x 0,015 arredondados um a um dariam 6 centavos; 0,045 de uma vez da 5
+        assert cubo.totais()["custo_centavos"] == metodo.calcular_custo_centavos(
+            [item.dispositivo for item in solicitacao.itens]
+        ) == 5
+        assert sum(celula["custo_centavos"] for celula in cubo.agregar(("tipo",)).values()) == 5
+
+    def test_slice_por_ponto_e_tipo(self, cenario):
+        _, cubo, ponto = cenario
+        assert cubo.totais(ponto=ponto.id)["peso_kg"] == 2.0
+        assert cubo.totais(ponto=SEM_PONTO, tipo="Computador")["peso_kg"] == 2.0
+        assert cubo.totais(ponto=ponto.id, tipo="Computador") == cubo.totais(ponto="inexistente")
+        assert cubo.agregar(("tipo", "metodo"), ponto=ponto.id) == {
+            ("Celular", "Reciclagem"): cubo.totais(ponto=ponto.id, metodo="Reciclagem"),
+            ("Celular", "Reuso"): cubo.totais(ponto=ponto.id, metodo="Reuso"),
+        }
+        with pytest.raises(ValueError):
+            cubo.agregar(("cor",))
+
+    def test_so_conta_concluidas_uma_vez(self, cenario):
+        servico, cubo, _ = cenario
+        pendente = servico.criar_solicitacao(Cidadao("c2", "Maria", "maria@example.com", "10987654321"))
+        assert not cubo.adicionar_solicitacao(pendente)
+        antes = cubo.totais()
+        # so a entrada no estado final soma; nada de ids guardados
+        for solicitacao in servico.listar_solicitacoes():
+            cubo.ao_transicionar(solicitacao, solicitacao.estado, solicitacao.estado)
+        assert cubo.totais() == antes
+        assert "contadas" not in cubo.exportar_estado()
+
+    def test_reconstruir_do_historico(self, cenario):
+        servico, cubo, _ = cenario
+        novo = CuboIndicadores()
+        assert novo.reconstruir(servico.listar_solicitacoes()) == 3
+        assert novo.agregar(("tipo", "metodo", "ponto", "mes")) == cubo.agregar(("tipo", "metodo", "ponto", "mes"))
+        assert len(novo) == 3
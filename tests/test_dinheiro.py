@@ -0,0 +1,37 @@
+from decimal import Decimal
+from ecotech.domain.dinheiro import (
+    formatar_reais,
+    multiplicar_centavos,
+    para_centavos,
+    para_reais,
+    ratear_centavos,
+    somar_centavos,
+)
+
+
+class TestDinheiro:
+
+    def test_para_centavos_arredonda_meio_para_cima(self):
+        assert para_centavos(1.005) == 101
+        assert para_centavos("2.345") == 235
+        assert para_centavos(Decimal("0.004")) == 0
+
+    def test_multiplicar_sem_erro_de_float(self):
+        # 1.15 * 100 em float e 114.99999999999999
+        assert multiplicar_centavos(1.15, 1) == 115
+        assert multiplicar_centavos(0.1 + 0.2, 10) == 300
+
+    def test_soma_e_volta_para_reais(self):
+        assert somar_centavos([10] * 1000) == 10000
+        assert para_reais(10000) == Decimal("100.00")
+
+    def test_rateio_soma_o_total(self):
+        assert ratear_centavos(100, [1, 1, 1]) == [34, 33, 33]
+        assert sum(ratear_centavos(1001, [0.3, 1.7, 2.2])) == 1001
+        assert ratear_centavos(50, [0, 0]) == [50, 0]
+        assert ratear_centavos(0, []) == []
+
+    def test_formatar(self):
+        assert formatar_reais(0) == "0,00"
+        assert formatar_reais(123456789) == "1.234.567,89"
+        assert formatar_reais(-5) == "-0,05"
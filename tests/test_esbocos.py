@@ -0,0 +1,116 @@
+import bisect
+import random
+import pytest
+from collections import Counter
+from ecotech.application.esbocos import CountMin, EsbocosRelatorio, HyperLogLog, KLL, SpaceSaving
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+
+class TestHyperLogLog:
+
+    def test_erro_dentro_de_tres_desvios(self):
+        hll = HyperLogLog(precisao=12)
+        for i in range(50000):
+            hll.adicionar(f"usuario-{i % 20000}")
+        assert abs(hll.estimar() - 20000) / 20000 < 3 * hll.erro_padrao
+
+    def test_poucos_elementos_e_mescla(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(100):
+            a.adicionar(f"u{i}")
+            b.adicionar(f"u{i + 50}")
+        assert a.estimar() == 100
+        a.mesclar(b)
+        assert abs(a.estimar() - 150) <= 2
+        with pytest.raises(ValueError):
+            a.mesclar(HyperLogLog(precisao=10))
+
+
+class TestKLL:
+
+    def test_quantis_com_erro_de_rank_pequeno(self):
+        aleatorio = random.Random(3)
+        valores = [aleatorio.expovariate(0.5) for _ in range(100000)]
+        kll = KLL(k=200, aleatorio=random.Random(1))
+        for valor in valores:
+            kll.adicionar(valor)
+        ordenados = sorted(valores)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            rank_real = bisect.bisect_right(ordenados, kll.quantil(q)) / len(ordenados)
+            assert abs(rank_real - q) < 0.0165
+        assert len(kll) == 100000
+
+    def test_mesclar_equivale_a_um_so(self):
+        a, b = KLL(aleatorio=random.Random(1)), KLL(aleatorio=random.Random(2))
+        for i in range(5000):
+            (a if i % 2 else b).adicionar(float(i))
+        a.mesclar(b)
+        assert len(a) == 5000
+        assert abs(a.quantil(0.5) - 2500) < 5000 * 0.0165
+        assert KLL().quantil(0.5) is None
+
+
+class TestFrequencias:
+
+    def _fluxo(self):
+        # poucos pontos muito usados e uma cauda longa
+        aleatorio = random.Random(5)
+        return [f"p{min(int(aleatorio.paretovariate(1.2)), 2000)}" for _ in range(30000)]
+
+    def test_count_min_nunca_subestima(self):
+        fluxo = self._fluxo()
+        exato = Counter(fluxo)
+        cm = CountMin(epsilon=0.001, delta=0.01)
+        for ponto in fluxo:
+            cm.adicionar(ponto)
+        for ponto, contagem in exato.items():
+            assert contagem <= cm.estimar(ponto) <= contagem + 0.003 * len(fluxo)
+
+    def test_space_saving_acha_os_mais_frequentes(self):
+        fluxo = self._fluxo()
+        exato = Counter(fluxo)
+        metade = len(fluxo) // 2
+        a, b = SpaceSaving(32), SpaceSaving(32)
+        for ponto in fluxo[:metade]:
+            a.adicionar(ponto)
+        for ponto in fluxo[metade:]:
+            b.adicionar(ponto)
+        a.mesclar(b)
+        top = a.mais_frequentes(3)
+        assert [ponto for ponto, _, _ in top] == [ponto for ponto, _ in exato.most_common(3)]
+        for ponto, contagem, erro in top:
+            assert contagem - erro <= exato[ponto] <= contagem
+
+
+class TestEsbocosRelatorio:
+
+    def test_alimentado_pelas_transicoes(self):
+        servico = ServicoDescarte()
+        esbocos = EsbocosRelatorio()
+        servico.adicionar_observador(esbocos.ao_transicionar)
+        ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1e6)
+        for i in range(10):
+            cidadao = Cidadao(f"c{i % 4}", "Joao", "joao@example.com", "12345678901")
+            solicitacao = servico.criar_solicitacao(cidadao)
+            celular = DispositivoFactory.criar_dispositivo("celular", {"id": "d", "nome": "X", "peso_kg": 1.0 + i})
+            servico.adicionar_item_solicitacao(solicitacao, celular)
+            servico.definir_ponto_coleta(solicitacao, ponto)
+            servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reuso"))
+            for _ in range(3):
+                servico.avancar_estado_solicitacao(solicitacao)
+
+        assert esbocos.usuarios_distintos() == 4
+        assert esbocos.quantis_peso((0.0, 1.0)) == [1.0, 10.0]
+        assert esbocos.quantis_peso((0.5,), tipo="Celular") == [5.0]
+        assert esbocos.quantis_peso((0.5,), tipo="Computador") == [None]
+        assert esbocos.frequencia_ponto("p1") == 10
+        assert esbocos.pontos_mais_frequentes(1) == [("p1", 10, 0)]
+
+        copia = EsbocosRelatorio()
+        assert copia.carregar(servico.listar_solicitacoes()) == 10
+        copia.mesclar(esbocos)
+        assert copia.usuarios_distintos() == 4
+        assert copia.frequencia_ponto("p1") == 20
@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import Mock
 from ecotech.domain.estados import Solicitado, Coletado, EmProcessamento
-from ecotech.domain.descarte import SolicitacaoDescarte
+from ecotech.application.factories import DispositivoFactory
+from ecotech.domain.descarte import ItemDescarte, SolicitacaoDescarte
 from ecotech.domain.usuarios import Cidadao
 
 # TODO: testar todas as transicoes possiveis
@@ -28,3 +29,21 @@ class TestEstados:
         assert isinstance(solicitacao.estado, Solicitado)
         solicitacao.avancar_estado()
         assert isinstance(solicitacao.estado, Coletado)
+
+
+class TestItensSolicitacao:
+
+    def test_itens_e_uma_visao_refeita_so_quando_muda(self):
+        cidadao = Cidadao("1", "João", "joao@test.com", "12345678901")
+        solicitacao = SolicitacaoDescarte("1", cidadao)
+        celular = DispositivoFactory.criar_dispositivo("celular", {"id": "d1", "nome": "Cel", "peso_kg": 0.2})
+        item = ItemDescarte(celular)
+        solicitacao.adicionar_item(item)
+
+        itens = solicitacao.itens
+        assert solicitacao.itens is itens
+        assert itens == (item,)
+
+        solicitacao.remover_item(item)
+        assert itens == (item,)
+        assert solicitacao.itens == ()
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import pytest
+from datetime import date, timedelta
+from ecotech.application import exportacao
+from ecotech.application.exportacao import (
+    CONCLUIDO,
+    CacheArtefatos,
+    ExportadorRelatorios,
+    renderizar_csv,
+    renderizar_pdf,
+    validar_dados_exportacao,
+)
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.services import ServicoDescarte, ServicoRelatorio
+from ecotech.domain.usuarios import Cidadao
+
+
+def _servico_com_solicitacoes(quantidade):
+    servico = ServicoDescarte()
+    cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+    for i in range(quantidade):
+        solicitacao = servico.criar_solicitacao(cidadao)
+        celular = DispositivoFactory.criar_dispositivo("celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 0.5})
+        servico.adicionar_item_solicitacao(solicitacao, celular)
+    return servico, cidadao
+
+
+class TestRenderizacao:
+
+    def test_csv_tem_resumo_e_solicitacoes(self):
+        servico, _ = _servico_com_solicitacoes(3)
+        relatorio = ServicoRelatorio().gerar_relatorio_periodo("Marco", servico.listar_solicitacoes())
+        linhas = renderizar_csv(relatorio).decode("utf-8").splitlines()
+        assert linhas[0] == "metrica,valor"
+        assert "total_solicitacoes,3" in linhas
+        assert linhas.index("id,data,estado,peso_kg,metodo,ponto") == len(linhas) - 4
+
+    def test_pdf_pagina_e_aponta_os_objetos(self):
+        servico, _ = _servico_com_solicitacoes(200)
+        relatorio = ServicoRelatorio().gerar_relatorio_periodo("Regiao (Sul)", servico.listar_solicitacoes())
+        pdf = renderizar_pdf(relatorio)
+        assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+        assert b"/Count 5" in pdf
+        assert b"(Regiao \\(Sul\\))" in pdf
+
+        # cada entrada do xref aponta para o inicio do objeto correspondente
+        inicio_xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        entradas = re.findall(rb"(\d{10}) 00000 n", pdf[inicio_xref:])
+        for numero, posicao in enumerate(entradas, 1):
+            assert pdf[int(posicao):].startswith(b"%d 0 obj" % numero)
+
+
+class TestCacheArtefatos:
+
+    def test_descarta_o_usado_ha_mais_tempo(self, tmp_path):
+        cache = CacheArtefatos(str(tmp_path), max_bytes=25)
+        cache.guardar("relatorio-a.csv", b"x" * 10)
+        cache.guardar("relatorio-b.csv", b"x" * 10)
+        assert cache.obter("relatorio-a.csv") is not None  # a vira o mais recente
+        cache.guardar("relatorio-c.csv", b"x" * 10)
+        assert cache.obter("relatorio-b.csv") is None
+        assert not os.path.exists(tmp_path / "relatorio-b.csv")
+        assert cache.total_bytes == 20
+
+    def test_limpa_artefatos_de_outra_execucao(self, tmp_path):
+        (tmp_path / "relatorio-velho.pdf").write_bytes(b"x")
+        (tmp_path / "outro.txt").write_bytes(b"x")
+        CacheArtefatos(str(tmp_path))
+        assert sorted(os.listdir(tmp_path)) == ["outro.txt"]
+
+
+class TestExportador:
+
+    def test_pedidos_iguais_dividem_o_trabalho_e_o_cache(self, tmp_path, monkeypatch):
+        liberar = threading.Event()
+        chamadas = []
+
+        def renderizar_lento(relatorio):
+            chamadas.append(relatorio.titulo)
+            liberar.wait(5)
+            return b"conteudo"
+
+        monkeypatch.setitem(exportacao.FORMATOS, "csv", (renderizar_lento, "text/csv"))
+        servico, _ = _servico_com_solicitacoes(2)
+        exportador = ExportadorRelatorios(servico, str(tmp_path))
+        try:
+            primeiro = exportador.solicitar("csv", "Mensal")
+            assert exportador.solicitar("csv", "Mensal") is primeiro
+            liberar.set()
+            assert primeiro.aguardar(5) and primeiro.status == CONCLUIDO
+
+            # mesma versao dos dados: vem do cache, sem renderizar de novo
+            do_cache = exportador.solicitar("csv", "Mensal")
+            assert do_cache.status == CONCLUIDO and do_cache.caminho == primeiro.caminho
+
+            # dados mudaram: novo arquivo
+            servico.criar_solicitacao(Cidadao("c2", "Maria", "maria@example.com", "10987654321"))
+            novo = exportador.solicitar("csv", "Mensal")
+            assert novo.aguardar(5) and novo.caminho != primeiro.caminho
+            assert chamadas == ["Mensal", "Mensal"]
+        finally:
+            exportador.desligar()
+
+    def test_solicitacoes_sao_lidas_na_thread_da_exportacao(self, tmp_path, monkeypatch):
+        servico, _ = _servico_com_solicitacoes(2)
+        listar = servico.listar_solicitacoes
+        threads = []
+
+        def listar_registrando(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return listar(*args, **kwargs)
+
+        monkeypatch.setattr(servico, "listar_solicitacoes", listar_registrando)
+        exportador = ExportadorRelatorios(servico, str(tmp_path))
+        try:
+            trabalho = exportador.solicitar("csv", "Mensal")
+            assert trabalho.aguardar(5) and trabalho.status == CONCLUIDO
+            assert len(threads) == 1 and threads[0].startswith("ecotech-exportacao")
+        finally:
+            exportador.desligar()
+
+    def test_filtros_e_erro(self, tmp_path):
+        servico, _ = _servico_com_solicitacoes(3)
+        exportador = ExportadorRelatorios(servico, str(tmp_path))
+        try:
+            amanha = date.today() + timedelta(days=1)
+            trabalho = exportador.solicitar("csv", "Futuro", inicio=amanha)
+            assert trabalho.aguardar(5)
+            with open(trabalho.caminho, encoding="utf-8") as arquivo:
+                assert "total_solicitacoes,0" in arquivo.read()
+            assert exportador.obter_trabalho(trabalho.id) is trabalho
+            with pytest.raises(ValueError):
+                exportador.solicitar("docx", "X")
+        finally:
+            exportador.desligar()
+
+    def test_validar_formulario(self):
+        dados = validar_dados_exportacao({"formato": "CSV", "inicio": "2026-03-01", "ponto": ""})
+        assert dados["formato"] == "csv" and dados["inicio"] == date(2026, 3, 1)
+        assert dados["id_ponto"] is None and dados["titulo"] == "Relatorio Ambiental"
+        with pytest.raises(ValueError):
+            validar_dados_exportacao({"inicio": "2026-03-02", "fim": "2026-03-01"})
+        with pytest.raises(ValueError):
+            validar_dados_exportacao({"inicio": "ontem"})
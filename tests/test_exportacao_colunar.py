@@ -0,0 +1,132 @@
+import os
+import pytest
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds  # noqa: E402
+from ecotech.application.exportacao_colunar import ExportadorColunar  # noqa: E402
+
+
+def _servico(quantidade, ponto=None):
+    servico = ServicoDescarte()
+    cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+    solicitacoes = []
+    for i in range(quantidade):
+        solicitacao = servico.criar_solicitacao(cidadao)
+        celular = DispositivoFactory.criar_dispositivo("celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 0.5})
+        servico.adicionar_item_solicitacao(solicitacao, celular, quantidade=2)
+        if ponto is not None and i % 2 == 0:
+            servico.definir_ponto_coleta(solicitacao, ponto)
+        solicitacoes.append(solicitacao)
+    return servico, solicitacoes
+
+
+def _ler(diretorio, tabela, formato="parquet"):
+    return ds.dataset(os.path.join(diretorio, tabela), format=formato, partitioning="hive").to_table()
+
+
+class TestExportadorColunar:
+
+    def test_particiona_por_mes_e_ponto(self, tmp_path):
+        ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1000.0)
+        servico, _ = _servico(10, ponto)
+        resultado = ExportadorColunar(servico, str(tmp_path), tamanho_lote=3).exportar()
+
+        assert resultado.linhas == {"solicitacoes": 10, "itens": 10, "rastreamentos": 0}
+        pontos = sorted(os.listdir(next((tmp_path / "solicitacoes").iterdir())))
+        assert pontos == ["ponto=p1", "ponto=sem_ponto"]
+
+        itens = _ler(str(tmp_path), "itens")
+        assert itens.num_rows == 10
+        assert itens.schema.field("valor_revenda_centavos").type == pa.int64()
+        assert set(itens.column("valor_revenda_centavos").to_pylist()) == {1000}
+
+    def test_incremental_so_leva_o_que_mudou(self, tmp_path):
+        servico, solicitacoes = _servico(5)
+        exportador = ExportadorColunar(servico, str(tmp_path), formato="arrow")
+        exportador.exportar()
+        assert exportador.exportar().linhas["solicitacoes"] == 0
+
+        alterada = solicitacoes[1]
+        servico.definir_metodo_tratamento(alterada, MetodoTratamentoFactory.criar_metodo("reciclagem"))
+        for _ in range(3):
+            servico.avancar_estado_solicitacao(alterada)
+        resultado = exportador.exportar()
+        assert resultado.linhas == {"solicitacoes": 1, "itens": 1, "rastreamentos": 1}
+
+        rastreamentos = _ler(str(tmp_path), "rastreamentos", "arrow")
+        assert rastreamentos.column("id_aplicacao").to_pylist() == [alterada.id]
+        assert rastreamentos.column("custo_centavos").to_pylist() == [1500]
+        assert _ler(str(tmp_path), "solicitacoes", "arrow").num_rows == 6
+
+    def test_formato_invalido(self, tmp_path):
+        with pytest.raises(ValueError):
+            ExportadorColunar(ServicoDescarte(), str(tmp_path), formato="xlsx")
+
+    def test_versao_exportada_vale_entre_execucoes(self, tmp_path):
+        servico, solicitacoes = _servico(3)
+        ExportadorColunar(servico, str(tmp_path)).exportar()
+
+        novo = ExportadorColunar(servico, str(tmp_path))
+        assert novo.versao_exportada == servico.versao
+        assert novo.exportar().linhas["solicitacoes"] == 0
+        assert novo.exportar(incremental=False).linhas["solicitacoes"] == 3
+
+    def test_rastreamento_estavel_com_data_de_termino(self, tmp_path):
+        servico, solicitacoes = _servico(1)
+        concluida = solicitacoes[0]
+        servico.definir_metodo_tratamento(concluida, MetodoTratamentoFactory.criar_metodo("reciclagem"))
+        for _ in range(3):
+            servico.avancar_estado_solicitacao(concluida)
+
+        exportador = ExportadorColunar(servico, str(tmp_path / "a"))
+        exportador.exportar()
+        ExportadorColunar(servico, str(tmp_path / "b")).exportar()
+        primeira = _ler(str(tmp_path / "a"), "rastreamentos").to_pylist()
+        segunda = _ler(str(tmp_path / "b"), "rastreamentos").to_pylist()
+        assert primeira == segunda
+        assert primeira[0]["id_aplicacao"] == concluida.id
+        assert primeira[0]["data_aplicacao"] == servico.data_termino(concluida.id)
+
+    def test_uma_particao_por_grupo(self, tmp_path):
+        ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1000.0)
+        servico, _ = _servico(6, ponto)
+        resultado = ExportadorColunar(servico, str(tmp_path), tamanho_lote=1).exportar()
+        # dois grupos (p1 e sem ponto) x duas tabelas com linhas, um arquivo cada
+        assert len(resultado.arquivos) == 4
+        assert len(set(resultado.arquivos)) == 4
+
+
+class TestComandoExportarColunar:
+
+    def test_completa_inclui_as_arquivadas(self, tmp_path, monkeypatch):
+        from datetime import datetime, timedelta
+        from ecotech.infrastructure.cli import main
+        from ecotech.infrastructure.servicos import montar_servicos
+
+        monkeypatch.delenv("ECOTECH_ARQUIVO", raising=False)
+        monkeypatch.delenv("ECOTECH_CONTRATOS", raising=False)
+        arquivo = str(tmp_path / "arquivo")
+        servicos = montar_servicos(diretorio_arquivo=arquivo)
+        cidadao = servicos.usuario.criar_usuario("cidadao", {
+            "nome": "Joao", "email": "joao@example.com", "cpf": "12345678901"
+        })
+        for i in range(3):
+            solicitacao = servicos.descarte.criar_solicitacao(cidadao)
+            celular = DispositivoFactory.criar_dispositivo("celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 0.5})
+            servicos.descarte.adicionar_item_solicitacao(solicitacao, celular)
+            if i < 2:
+                servicos.descarte.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reciclagem"))
+                for _ in range(3):
+                    servicos.descarte.avancar_estado_solicitacao(solicitacao)
+        assert servicos.descarte.arquivar_terminadas(timedelta(0), agora=datetime.now() + timedelta(seconds=1)) == 2
+        snapshot = str(tmp_path / "estado.snap")
+        servicos.salvar_snapshot(snapshot)
+
+        destino = str(tmp_path / "armazem")
+        assert main(["exportar-colunar", snapshot, destino, "--completa", "--arquivo", arquivo]) == 0
+        assert _ler(destino, "solicitacoes").num_rows == 3
+        assert _ler(destino, "rastreamentos").num_rows == 2
@@ -1,7 +1,13 @@
+import os
 import pytest
 from unittest.mock import Mock
-from ecotech.application.factories import DispositivoFactory, UsuarioFactory
+from ecotech.application.factories import (
+    DispositivoFactory,
+    UsuarioFactory,
+    MetodoTratamentoFactory
+)
 from ecotech.application.services import ServicoDescarte
+from ecotech.application.tarifas import ConfiguracaoTarifas
 from ecotech.domain.usuarios import Cidadao
 
 
@@ -37,3 +43,113 @@ class TestServicos:
         
         solicitacoes = servico.listar_solicitacoes()
         assert len(solicitacoes) == 2
+
+
+class TestRegistroFactories:
+
+    def test_criar_dispositivo_por_tipo(self):
+        dispositivo = DispositivoFactory.criar_dispositivo(
+            "Computador", {"id": "1", "nome": "Dell", "peso_kg": 2.5}
+        )
+        assert dispositivo.obter_tipo() == "Computador"
+
+    def test_tipo_invalido(self):
+        with pytest.raises(ValueError, match="tipo de dispositivo invalido"):
+            DispositivoFactory.criar_dispositivo("tablet", {})
+
+    def test_registrar_novo_tipo(self):
+        # plugin: tablets sao tratados como celulares maiores
+        DispositivoFactory.registrar_tipo("tablet", DispositivoFactory.criar_celular)
+        try:
+            tablet = DispositivoFactory.criar_dispositivo(
+                "tablet", {"id": "1", "nome": "iPad", "peso_kg": 0.5}
+            )
+            assert tablet.peso_kg == 0.5
+        finally:
+            DispositivoFactory.registro.remover("tablet")
+
+    def test_criar_dispositivos_lote(self):
+        dispositivos = DispositivoFactory.criar_dispositivos_lote([
+            ("celular", {"id": "1", "nome": "iPhone", "peso_kg": 0.2}),
+            ("computador", {"id": "2", "nome": "Dell", "peso_kg": 2.5}),
+            ("celular", {"id": "3", "nome": "Moto", "peso_kg": 0.1}),
+        ])
+        assert [d.obter_tipo() for d in dispositivos] == ["Celular", "Computador", "Celular"]
+
+    def test_sem_print_de_debug(self, capsys):
+        DispositivoFactory.criar_dispositivo("celular", {"id": "1", "nome": "iPhone", "peso_kg": 0.2})
+        assert capsys.readouterr().out == ""
+
+    def test_criar_metodo_e_usuario_por_tipo(self):
+        assert MetodoTratamentoFactory.criar_metodo("reuso").obter_nome() == "Reuso"
+        empresa = UsuarioFactory.criar_usuario("empresa", {
+            "id": "1",
+            "nome": "Tech",
+            "email": "tech@email.com",
+            "cnpj": "12345678901234",
+            "razao_social": "Tech LTDA"
+        })
+        assert empresa.obter_tipo() == "Empresa"
+
+
+class TestMetodosCompartilhados:
+
+    def teardown_method(self):
+        MetodoTratamentoFactory.configurar_tarifas(None)
+
+    def test_mesma_instancia_por_tipo(self):
+        primeiro = MetodoTratamentoFactory.criar_metodo("reciclagem")
+        segundo = MetodoTratamentoFactory.criar_metodo("Reciclagem")
+        assert primeiro is segundo
+        assert primeiro.custo_base_por_kg == 15.0
+
+    def test_tarifas_do_arquivo_e_recarga(self, tmp_path):
+        arquivo = tmp_path / "tarifas.json"
+        arquivo.write_text('{"reciclagem": {"custo_base_por_kg": 20.0}}')
+        tarifas = ConfiguracaoTarifas(str(arquivo), intervalo_verificacao=0)
+        MetodoTratamentoFactory.configurar_tarifas(tarifas)
+
+        antigo = MetodoTratamentoFactory.criar_metodo("reciclagem")
+        assert antigo.custo_base_por_kg == 20.0
+        assert antigo.reducao_impacto_percentual == 80.0
+
+        arquivo.write_text('{"reciclagem": {"custo_base_por_kg": 30.0}}')
+        os.utime(arquivo, (0, os.stat(arquivo).st_mtime + 10))
+
+        novo = MetodoTratamentoFactory.criar_metodo("reciclagem")
+        assert novo.custo_base_por_kg == 30.0
+        # quem ja tinha o metodo continua com a tarifa antiga
+        assert antigo.custo_base_por_kg == 20.0
+
+    def test_arquivo_invalido_mantem_tarifas(self, tmp_path):
+        arquivo = tmp_path / "tarifas.json"
+        arquivo.write_text('{"reuso": {"custo_base_por_kg": 5.0}}')
+        tarifas = ConfiguracaoTarifas(str(arquivo), intervalo_verificacao=0)
+
+        arquivo.write_text('{"reuso": {"custo_base_por_kg": -1}}')
+        os.utime(arquivo, (0, os.stat(arquivo).st_mtime + 10))
+
+        assert tarifas.recarregar_se_alterado() is False
+        assert tarifas.obter_tarifa("reuso") == {"custo_base_por_kg": 5.0}
+
+    def test_troca_de_tarifas_durante_a_criacao(self, tmp_path):
+        import threading
+        import time
+
+        arquivo = tmp_path / "tarifas.json"
+        arquivo.write_text('{"reciclagem": {"custo_base_por_kg": 20.0}}')
+        MetodoTratamentoFactory.configurar_tarifas(ConfiguracaoTarifas(str(arquivo), intervalo_verificacao=60))
+
+        # segura o lock para a criacao e a troca de tarifas ficarem esperando juntas
+        with MetodoTratamentoFactory._lock:
+            criacao = threading.Thread(target=MetodoTratamentoFactory.criar_metodo, args=("reciclagem",))
+            criacao.start()
+            time.sleep(0.05)
+            troca = threading.Thread(target=MetodoTratamentoFactory.configurar_tarifas, args=(None,))
+            troca.start()
+            time.sleep(0.05)
+        criacao.join(5)
+        troca.join(5)
+
+        # nenhuma instancia das tarifas antigas ficou no cache das novas
+        assert MetodoTratamentoFactory.criar_metodo("reciclagem").custo_base_por_kg == 15.0
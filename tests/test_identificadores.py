@@ -0,0 +1,107 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+from ecotech.application.identificadores import (
+    GeradorIds,
+    id_curto,
+    id_para_binario,
+    id_para_texto,
+    instante_do_id,
+    novo_id
+)
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.usuarios import Cidadao
+
+
+class TestGeradorIds:
+
+    def test_formato_uuid_v7(self):
+        id = novo_id()
+        valor = uuid.UUID(id)
+        assert valor.version == 7
+        assert valor.variant == uuid.RFC_4122
+        assert abs(instante_do_id(id) - datetime.now()) < timedelta(seconds=5)
+        assert id_para_texto(id_para_binario(id)) == id
+
+    def test_ids_crescem_mesmo_no_mesmo_ms(self):
+        gerador = GeradorIds()
+        ids = [gerador.novo() for _ in range(20000)]  # esgota a sequencia de varios ms
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        texto = [id_para_texto(i) for i in ids]
+        assert texto == sorted(texto)  # binario e texto ordenam igual
+
+    def test_unicos_entre_threads(self):
+        gerador = GeradorIds()
+        resultados = [[] for _ in range(8)]
+
+        def gerar(saida):
+            for _ in range(2000):
+                saida.append(gerador.novo())
+
+        threads = [threading.Thread(target=gerar, args=(saida,)) for saida in resultados]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        todos = [id for saida in resultados for id in saida]
+        assert len(set(todos)) == len(todos)
+        assert all(saida == sorted(saida) for saida in resultados)
+
+    def test_forma_curta_distingue_ids_seguidos(self):
+        primeiro, segundo = novo_id(), novo_id()
+        assert id_curto(primeiro) != id_curto(segundo)
+        assert len(id_curto(primeiro)) == 8
+
+    def test_ids_antigos_e_livres(self):
+        antigo = str(uuid.uuid4())
+        assert id_para_binario(antigo) == uuid.UUID(antigo).bytes
+        assert instante_do_id(antigo) is None
+        assert id_para_binario("s1") == b"s1"
+
+
+class TestListarRecentes:
+
+    def test_paginacao_por_chave(self):
+        servico = ServicoDescarte()
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        outro = Cidadao("c2", "Maria", "maria@example.com", "10987654321")
+        criadas = [servico.criar_solicitacao(cidadao if i % 3 else outro) for i in range(25)]
+        do_cidadao = [s for s in reversed(criadas) if s.usuario is cidadao]
+
+        primeira = servico.listar_recentes(10, id_usuario="c1")
+        segunda = servico.listar_recentes(10, antes_de=primeira[-1].id, id_usuario="c1")
+        assert primeira + segunda == do_cidadao[:20]
+        assert servico.listar_recentes(10, antes_de=segunda[-1].id, id_usuario="c1") == do_cidadao[20:]
+        assert servico.listar_recentes(3) == list(reversed(criadas))[:3]
+
+    def test_ids_fora_de_ordem_sao_encaixados(self):
+        servico = ServicoDescarte()
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        reservado = novo_id()  # como a fila: id gerado antes, solicitacao criada depois
+        depois = servico.criar_solicitacao(cidadao)
+        antes = servico.criar_solicitacao(cidadao, id_solicitacao=reservado)
+        assert servico.listar_recentes() == [depois, antes]
+
+        copia = ServicoDescarte()
+        copia.importar_estado(servico.exportar_estado())
+        assert [s.id for s in copia.listar_recentes()] == [depois.id, antes.id]
+
+    def test_usuario_com_solicitacoes_antigas_nao_percorre_as_dos_outros(self, monkeypatch):
+        servico = ServicoDescarte()
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        outro = Cidadao("c2", "Maria", "maria@example.com", "10987654321")
+        antigas = [servico.criar_solicitacao(cidadao) for _ in range(3)]
+        for _ in range(2000):
+            servico.criar_solicitacao(outro)
+
+        buscadas = []
+        obter = servico._solicitacoes.get
+        monkeypatch.setattr(servico._solicitacoes, "get", lambda id: buscadas.append(id) or obter(id))
+        assert servico.listar_recentes(10, id_usuario="c1") == list(reversed(antigas))
+        assert len(buscadas) == 3
+        assert servico.listar_recentes(10, id_usuario="ninguem") == []
+
+        copia = ServicoDescarte()
+        copia.importar_estado(servico.exportar_estado())
+        assert [s.id for s in copia.listar_recentes(2, id_usuario="c1")] == [antigas[2].id, antigas[1].id]
@@ -0,0 +1,148 @@
+import io
+import pytest
+from ecotech.application.importacao import ImportadorDispositivos, ler_linhas
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Empresa
+
+
+CSV_VALIDO = """tipo,nome,peso_kg,marca,modelo,quantidade,solicitacao
+celular,Galaxy S20,0.2,Samsung,S20,10,lote-1
+computador,Optiplex,8.5,Dell,,2,lote-1
+eletrodomestico,Microondas,15,,,1,lote-2
+"""
+
+
+class TestImportacao:
+
+    def setup_method(self):
+        self.servico = ServicoDescarte()
+        self.empresa = Empresa("1", "Tech", "tech@email.com", "12345678901234", "Tech LTDA")
+        self.importador = ImportadorDispositivos(self.servico, tamanho_bloco=2)
+
+    def test_importa_csv_agrupando_solicitacoes(self):
+        resultado = self.importador.importar(io.StringIO(CSV_VALIDO), self.empresa)
+
+        assert resultado.total_linhas == 3
+        assert resultado.importadas == 3
+        assert resultado.total_erros == 0
+        assert len(resultado.solicitacoes) == 2
+        pesos = sorted(s.calcular_peso_total() for s in resultado.solicitacoes)
+        assert pesos == pytest.approx([15.0, 0.2 * 10 + 8.5 * 2])
+
+    def test_erros_por_linha(self):
+        conteudo = (
+            "tipo,nome,peso_kg,marca\n"
+            "celular,iPhone,0.2,Apple\n"
+            "tablet,iPad,0.5,Apple\n"
+            "celular,Moto,-1,Motorola\n"
+            "celular,Moto,0.2,   \n"
+        )
+        resultado = self.importador.importar(io.StringIO(conteudo), self.empresa)
+
+        assert resultado.importadas == 1
+        assert resultado.total_erros == 3
+        linhas = [erro.linha for erro in resultado.erros]
+        assert linhas == [3, 4, 5]
+        assert "marca nao pode conter apenas espacos" in resultado.erros[2].mensagem
+
+    def test_importa_ndjson(self):
+        conteudo = (
+            '{"tipo": "celular", "nome": "iPhone", "peso_kg": 0.2}\n'
+            'nao e json\n'
+            '{"tipo": "computador", "nome": "Dell", "peso_kg": 2.5, "quantidade": 3}\n'
+        )
+        resultado = self.importador.importar(io.StringIO(conteudo), self.empresa, "ndjson")
+
+        assert resultado.importadas == 2
+        assert resultado.erros[0].linha == 2
+
+    def test_reserva_capacidade_no_ponto(self):
+        ponto = PontoColeta("p1", "Ponto", "Rua A", -7.2, -39.3, 10.0)
+        resultado = self.importador.importar(
+            io.StringIO(CSV_VALIDO), self.empresa, ponto_coleta=ponto
+        )
+
+        # lote-1 (19kg) e lote-2 (15kg) passam da capacidade de 10kg
+        assert resultado.total_erros == 2
+        assert ponto.ocupacao_atual_kg == 0.0
+
+    def test_leitura_em_streaming(self):
+        linhas = ler_linhas(io.StringIO(CSV_VALIDO))
+        numero, dados = next(linhas)
+        assert numero == 2
+        assert dados["nome"] == "Galaxy S20"
+
+
+class TestComandoImportar:
+
+    def test_importa_para_o_snapshot(self, tmp_path):
+        from ecotech.application.services import ServicoPontoColeta, ServicoUsuario
+        from ecotech.application.snapshot import carregar_snapshot, salvar_snapshot
+        from ecotech.infrastructure.cli import main
+
+        servico_usuario = ServicoUsuario()
+        servico_ponto = ServicoPontoColeta()
+        servico_usuario.criar_usuario("empresa", {
+            "nome": "Tech", "email": "tech@email.com", "cnpj": "12345678901234", "razao_social": "Tech LTDA"
+        })
+        ponto = servico_ponto.criar_ponto_coleta("Centro", "Rua A", -7.2, -39.3, 500.0)
+        snapshot = tmp_path / "estado.snap"
+        salvar_snapshot(str(snapshot), servico_usuario, servico_ponto, ServicoDescarte())
+        arquivo = tmp_path / "dispositivos.csv"
+        arquivo.write_text(CSV_VALIDO, encoding="utf-8")
+
+        codigo = main([
+            "importar", str(arquivo), "--email", "tech@email.com",
+            "--snapshot", str(snapshot), "--ponto", ponto.id
+        ])
+
+        assert codigo == 0
+        servico_ponto = ServicoPontoColeta()
+        servico_descarte = ServicoDescarte()
+        carregar_snapshot(str(snapshot), ServicoUsuario(), servico_ponto, servico_descarte)
+        solicitacoes = servico_descarte.listar_solicitacoes()
+        assert len(solicitacoes) == 2
+        assert all(s.ponto_coleta.id == ponto.id for s in solicitacoes)
+        assert servico_ponto.buscar_ponto(ponto.id).ocupacao_atual_kg == pytest.approx(15.0 + 0.2 * 10 + 8.5 * 2)
+
+    def test_regrava_relatorios_e_notificacoes(self, tmp_path, monkeypatch):
+        from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+        from ecotech.application.snapshot import ler_snapshot
+        from ecotech.infrastructure.cli import main
+        from ecotech.infrastructure.servicos import montar_servicos
+
+        monkeypatch.delenv("ECOTECH_ARQUIVO", raising=False)
+        monkeypatch.delenv("ECOTECH_CONTRATOS", raising=False)
+        servicos = montar_servicos()
+        empresa = servicos.usuario.criar_usuario("empresa", {
+            "nome": "Tech", "email": "tech@email.com", "cnpj": "12345678901234", "razao_social": "Tech LTDA"
+        })
+        servicos.usuario.notificacoes.enviar(empresa.id, "bem-vinda")
+        solicitacao = servicos.descarte.criar_solicitacao(empresa)
+        servicos.descarte.adicionar_item_solicitacao(solicitacao, DispositivoFactory.criar_dispositivo(
+            "celular", {"id": "d", "nome": "Cel", "peso_kg": 1.0}
+        ))
+        servicos.descarte.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo("reciclagem"))
+        for _ in range(3):
+            servicos.descarte.avancar_estado_solicitacao(solicitacao)
+        snapshot = tmp_path / "estado.snap"
+        servicos.salvar_snapshot(str(snapshot))
+        arquivo = tmp_path / "dispositivos.csv"
+        arquivo.write_text(CSV_VALIDO, encoding="utf-8")
+
+        assert main(["importar", str(arquivo), "--email", "tech@email.com", "--snapshot", str(snapshot)]) == 0
+
+        estado = ler_snapshot(str(snapshot))
+        assert estado["relatorio"]["cubo"] == servicos.relatorio.cubo.exportar_estado()
+        copia = montar_servicos()
+        copia.carregar_snapshot(str(snapshot))
+        assert copia.relatorio.cubo.totais()["itens"] == 1
+        assert copia.usuario.notificacoes.nao_lidas(empresa.id) == 1
+
+    def test_sem_snapshot_falha(self, tmp_path, monkeypatch):
+        from ecotech.infrastructure.cli import main
+
+        monkeypatch.delenv("ECOTECH_SNAPSHOT", raising=False)
+        assert main(["importar", str(tmp_path / "x.csv"), "--email", "a@b.com"]) == 2
+        assert main(["importar", str(tmp_path / "x.csv"), "--email", "a@b.com", "--snapshot", str(tmp_path / "nao.snap")]) == 2
@@ -0,0 +1,53 @@
+import threading
+import pytest
+from ecotech.application.metricas import RegistroMetricas, cronometrar
+
+
+class TestMetricas:
+
+    def setup_method(self):
+        self.registro = RegistroMetricas()
+
+    def test_contador_soma_todas_as_threads(self):
+        contador = self.registro.contador("teste_total", "teste", rotulos=("tipo",))
+
+        def trabalhar():
+            for _ in range(1000):
+                contador.incrementar(("a",))
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert contador.valor(("a",)) == 8000
+        assert contador.valor(("b",)) == 0
+
+    def test_histograma_buckets_fixos(self):
+        histograma = self.registro.histograma("lat", "latencia", buckets=(0.1, 1.0))
+        for valor in (0.05, 0.5, 0.5, 5.0):
+            histograma.observar(valor)
+
+        texto = self.registro.exportar()
+        assert 'lat_bucket{le="0.1"} 1' in texto
+        assert 'lat_bucket{le="1"} 3' in texto
+        assert 'lat_bucket{le="+Inf"} 4' in texto
+        assert "lat_count 4" in texto
+        assert "# TYPE lat histogram" in texto
+
+    def test_cronometrar(self):
+        histograma = self.registro.histograma("op", "operacao", rotulos=("nome",))
+
+        @cronometrar(histograma, ("soma",))
+        def somar(a, b):
+            return a + b
+
+        assert somar(1, 2) == 3
+        assert histograma.contagem(("soma",)) == 1
+
+    def test_mesmo_nome_devolve_mesma_metrica(self):
+        primeiro = self.registro.contador("x_total", "x")
+        assert self.registro.contador("x_total", "x") is primeiro
+        with pytest.raises(ValueError):
+            self.registro.histograma("x_total", "x")
@@ -0,0 +1,116 @@
+import pickle
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.notificacoes import CentralNotificacoes
+from ecotech.application.services import ServicoDescarte, ServicoUsuario
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+
+class TestCentralNotificacoes:
+
+    def test_mensagem_compartilhada_em_lotes(self):
+        central = CentralNotificacoes(tamanho_lote=7)
+        ids = [f"u{i}" for i in range(100)]
+        mensagem = central.transmitir(ids + ["u0"], "Ponto Centro lotado")
+
+        assert all(central.nao_lidas(id) == 1 for id in ids)
+        assert central.nao_lidas("u0") == 1  # repetido recebe uma vez
+        assert central.listar("u5")[0][0] is central.listar("u99")[0][0] is mensagem
+        assert mensagem.texto.endswith("Ponto Centro lotado")
+        assert central.nao_lidas("ninguem") == 0
+
+    def test_lidas_e_nao_lidas(self):
+        central = CentralNotificacoes()
+        central.enviar("u1", "primeira")
+        central.marcar_lidas("u1")
+        central.transmitir(["u1", "u2"], "segunda")
+        central.enviar("u1", "terceira")
+
+        assert central.nao_lidas("u1") == 2
+        assert [(m.titulo, lida) for m, lida in central.listar("u1")] == [
+            ("terceira", False), ("segunda", False), ("primeira", True)
+        ]
+        assert [m.titulo for m, _ in central.listar("u1", limite=1)] == ["terceira"]
+        central.marcar_lidas("u1")
+        assert central.nao_lidas("u1") == 0
+        assert central.nao_lidas("u2") == 1
+
+    def test_caixa_limitada_e_mensagens_sem_caixa_descartadas(self):
+        central = CentralNotificacoes(max_por_caixa=3)
+        antiga = central.transmitir(["u1", "u2"], "antiga")
+        for i in range(3):
+            central.enviar("u1", f"u1-{i}")
+
+        assert [m.titulo for m, _ in central.listar("u1")] == ["u1-2", "u1-1", "u1-0"]
+        assert central.nao_lidas("u1") == 3
+        # u2 ainda guarda a mensagem compartilhada
+        assert central.listar("u2")[0][0] is antiga
+        for i in range(3):
+            central.enviar("u2", f"u2-{i}")
+        assert antiga.id not in central._mensagens
+        assert len(central._mensagens) == 6
+
+    def test_snapshot_antigo_e_aparado(self):
+        central = CentralNotificacoes()
+        for i in range(5):
+            central.enviar("u1", f"m{i}")
+        central.transmitir([], "ninguem")
+        estado = pickle.loads(pickle.dumps(central.exportar_estado()))
+
+        copia = CentralNotificacoes(max_por_caixa=2)
+        copia.importar_estado(estado)
+        assert [m.titulo for m, _ in copia.listar("u1")] == ["m4", "m3"]
+        assert copia.nao_lidas("u1") == 2
+        assert sorted(copia._mensagens) == [3, 4]
+        assert copia.enviar("u1", "nova").id == 5
+
+    def test_snapshot(self):
+        central = CentralNotificacoes()
+        central.transmitir(["u1", "u2"], "aviso", "detalhes")
+        central.marcar_lidas("u2")
+        estado = pickle.loads(pickle.dumps(central.exportar_estado()))
+
+        copia = CentralNotificacoes()
+        copia.importar_estado(estado)
+        assert copia.nao_lidas("u1") == 1 and copia.nao_lidas("u2") == 0
+        assert copia.listar("u2")[0][0].corpo == "detalhes"
+        assert copia.enviar("u1", "nova").id == 1
+
+
+class TestIntegracaoServicos:
+
+    def test_avisar_todos_por_tipo(self):
+        servico = ServicoUsuario()
+        cidadao = servico.criar_usuario("cidadao", {"nome": "Joao", "email": "joao@example.com", "cpf": "12345678901"})
+        empresa = servico.criar_usuario("empresa", {
+            "nome": "Empresa X", "email": "x@example.com", "cnpj": "12345678000199", "razao_social": "X Ltda"
+        })
+        servico.avisar_todos("Ponto Centro lotado", tipo=Cidadao)
+
+        assert servico.notificacoes.nao_lidas(cidadao.id) == 1
+        assert servico.notificacoes.nao_lidas(empresa.id) == 0
+        assert cidadao.notificacoes == ()  # nao passa por Usuario.adicionar_notificacao
+
+    def test_coleta_em_lote_usa_a_central(self):
+        servico_usuario = ServicoUsuario()
+        servico = ServicoDescarte(notificacoes=servico_usuario.notificacoes)
+        ponto = PontoColeta("p1", "Centro", "Rua A", -23.5, -46.6, 1000.0)
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        for i in range(3):
+            solicitacao = servico.criar_solicitacao(cidadao)
+            celular = DispositivoFactory.criar_dispositivo("celular", {"id": f"d{i}", "nome": "Cel", "peso_kg": 1.0})
+            servico.adicionar_item_solicitacao(solicitacao, celular)
+            servico.definir_ponto_coleta(solicitacao, ponto)
+
+        maria = Cidadao("c2", "Maria", "maria@example.com", "10987654321")
+        solicitacao = servico.criar_solicitacao(maria)
+        celular = DispositivoFactory.criar_dispositivo("celular", {"id": "d9", "nome": "Cel", "peso_kg": 1.0})
+        servico.adicionar_item_solicitacao(solicitacao, celular)
+        servico.definir_ponto_coleta(solicitacao, ponto)
+
+        servico.coletar_ponto(ponto)
+        central = servico_usuario.notificacoes
+        assert central.nao_lidas("c1") == 1 and central.nao_lidas("c2") == 1
+        assert central.listar("c1")[0][0].titulo.startswith("3 solicitacoes suas")
+        assert central.listar("c2")[0][0].titulo == "Sua solicitacao foi coletada no ponto Centro"
+        assert cidadao.notificacoes == ()
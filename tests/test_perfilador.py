@@ -0,0 +1,87 @@
+import threading
+import time
+import pytest
+from flask import Flask, g
+from ecotech.infrastructure.perfilador import PerfiladorRequisicoes, CABECALHO
+
+
+def criar_app_teste(perfilador):
+    app = Flask(__name__)
+    perfilador.instalar(app)
+
+    @app.route('/lenta')
+    def lenta():
+        time.sleep(0.02)
+        return 'ok'
+
+    @app.route('/rapida')
+    def rapida():
+        return 'ok'
+
+    @app.route('/falha')
+    def falha():
+        raise RuntimeError('falhou')
+
+    return app
+
+
+class TestPerfilador:
+
+    def test_desligado_por_padrao(self):
+        perfilador = PerfiladorRequisicoes()
+        cliente = criar_app_teste(perfilador).test_client()
+        cliente.get('/lenta', headers={CABECALHO: 'qualquer'})
+        assert perfilador.mais_lentos() == []
+
+    def test_perfila_com_token(self):
+        perfilador = PerfiladorRequisicoes(token='segredo')
+        cliente = criar_app_teste(perfilador).test_client()
+
+        cliente.get('/rapida', headers={CABECALHO: 'segredo'})
+        cliente.get('/lenta', headers={CABECALHO: 'segredo'})
+        cliente.get('/lenta', headers={CABECALHO: 'errado'})
+
+        perfis = perfilador.mais_lentos()
+        assert [p.rota for p in perfis] == ['/lenta', '/rapida']
+        assert perfis[0].duracao >= 0.02
+        assert perfis[0].principais
+
+    def test_pilhas_colapsadas(self):
+        perfilador = PerfiladorRequisicoes(taxa_amostragem=1.0)
+        cliente = criar_app_teste(perfilador).test_client()
+        cliente.get('/lenta')
+
+        pilhas = perfilador.pilhas_colapsadas('/lenta')
+        assert 'lenta (' in pilhas
+        linha = pilhas.splitlines()[0]
+        assert int(linha.rsplit(' ', 1)[1]) > 0
+
+    def test_excecao_na_view_encerra_o_perfil(self):
+        perfilador = PerfiladorRequisicoes(taxa_amostragem=1.0)
+        app = criar_app_teste(perfilador)
+        app.config['PROPAGATE_EXCEPTIONS'] = True
+        cliente = app.test_client()
+
+        with pytest.raises(RuntimeError):
+            cliente.get('/falha')
+        # a sessao foi liberada: a proxima requisicao e perfilada normalmente
+        cliente.get('/rapida')
+
+        assert {p.rota for p in perfilador.mais_lentos()} == {'/falha', '/rapida'}
+        assert not any(t.name == 'ecotech-perfil' for t in threading.enumerate())
+
+    def test_um_perfil_por_vez(self):
+        perfilador = PerfiladorRequisicoes(taxa_amostragem=1.0)
+        app = criar_app_teste(perfilador)
+        outra = criar_app_teste(perfilador)
+
+        with app.test_request_context('/lenta'):
+            perfilador._iniciar()
+            with outra.test_request_context('/rapida'):
+                perfilador._iniciar()
+                assert 'perfil_ecotech' not in g
+                perfilador._finalizar()
+            perfilador._finalizar()
+
+        assert [p.rota for p in perfilador.mais_lentos()] == ['/lenta']
+
@@ -0,0 +1,95 @@
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.pontuacao import LivroPontos, PONTOS_POR_KG
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.usuarios import Cidadao, Empresa
+
+
+def _concluir(servico, usuario, peso_kg, metodo="reciclagem"):
+    solicitacao = servico.criar_solicitacao(usuario)
+    dispositivo = DispositivoFactory.criar_dispositivo(
+        "celular", {"id": "d", "nome": "Celular", "peso_kg": peso_kg}
+    )
+    servico.adicionar_item_solicitacao(solicitacao, dispositivo)
+    servico.definir_metodo_tratamento(solicitacao, MetodoTratamentoFactory.criar_metodo(metodo))
+    for _ in range(3):
+        servico.avancar_estado_solicitacao(solicitacao)
+    return solicitacao
+
+
+class TestLivroPontos:
+
+    def test_credita_uma_vez_por_solicitacao(self):
+        livro = LivroPontos()
+        assert livro.creditar_lote([("u1", "s1", 10), ("u1", "s2", 5), ("u2", "s3", 7)]) == 3
+        assert livro.creditar_lote([("u1", "s1", 10)]) == 0
+        assert livro.saldo("u1") == 15
+        assert livro.saldo("u2") == 7
+        assert livro.saldo("ninguem") == 0
+        assert len(livro) == 3
+
+    def test_creditos_agendados_entram_em_lote(self):
+        livro = LivroPontos(tamanho_lote=3)
+        livro.agendar_credito("u1", "s1", 1)
+        livro.agendar_credito("u1", "s2", 1)
+        assert len(livro) == 0
+        livro.agendar_credito("u1", "s3", 1)
+        assert len(livro) == 3
+        # leituras gravam o que estiver pendente
+        livro.agendar_credito("u1", "s4", 1)
+        assert livro.saldo("u1") == 4
+
+    def test_extrato_do_mais_recente_para_o_mais_antigo(self):
+        livro = LivroPontos()
+        livro.creditar_lote([("u1", f"s{i}", i + 1) for i in range(5)])
+        livro.creditar_lote([("u2", "x", 100)])
+        extrato = livro.extrato("u1", limite=2)
+        assert [l.id_solicitacao for l in extrato] == ["s4", "s3"]
+        assert [l.pontos for l in extrato] == [5, 4]
+
+    def test_recalcular_corrige_saldo_em_cache(self):
+        livro = LivroPontos()
+        livro.creditar_lote([("u1", "s1", 10), ("u2", "s2", 20)])
+        livro._saldos[0] = 999  # simula cache corrompido
+        assert livro.recalcular_saldos() == {"u1": 10}
+        assert livro.saldo("u1") == 10
+
+    def test_exportar_e_importar(self):
+        livro = LivroPontos()
+        livro.creditar_lote([("u1", "s1", 10), ("u2", "s2", 20), ("u1", "s3", 1)])
+        copia = LivroPontos()
+        copia.importar_estado(livro.exportar_estado())
+        assert copia.saldo("u1") == 11
+        assert copia.creditada("s2")
+        assert [l.id_solicitacao for l in copia.extrato("u1")] == ["s3", "s1"]
+
+
+class TestCreditoPorTransicao:
+
+    def test_cidadao_pontua_ao_reciclar_ou_reutilizar(self):
+        livro = LivroPontos()
+        servico = ServicoDescarte()
+        servico.adicionar_observador(livro.ao_transicionar)
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+
+        reciclada = _concluir(servico, cidadao, 2.0)
+        _concluir(servico, cidadao, 1.0, metodo="reuso")
+        _concluir(servico, cidadao, 5.0, metodo="descarte_controlado")
+
+        assert livro.saldo("c1") == 3 * PONTOS_POR_KG
+        assert livro.creditada(reciclada.id)
+
+    def test_empresa_nao_pontua(self):
+        livro = LivroPontos()
+        servico = ServicoDescarte()
+        servico.adicionar_observador(livro.ao_transicionar)
+        empresa = Empresa("e1", "Empresa X", "x@x.com", "12345678000190", "X LTDA")
+        _concluir(servico, empresa, 2.0)
+        assert livro.saldo("e1") == 0
+
+    def test_observador_recebe_cancelamento(self):
+        transicoes = []
+        servico = ServicoDescarte()
+        servico.adicionar_observador(lambda s, a, n: transicoes.append((a.obter_nome(), n.obter_nome())))
+        cidadao = Cidadao("c1", "Joao", "joao@example.com", "12345678901")
+        servico.cancelar_solicitacao(servico.criar_solicitacao(cidadao), "desistiu")
+        assert transicoes == [("Solicitado", "Cancelado")]
@@ -0,0 +1,119 @@
+import pytest
+from ecotech.application.processamento import FilaSolicitacoes, validar_dados_solicitacao
+from ecotech.application.services import ServicoDescarte
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+
+class TestValidacaoFormulario:
+
+    def test_dados_validos(self):
+        dados = validar_dados_solicitacao({
+            "tipo_dispositivo": "Celular",
+            "nome": "iPhone 11",
+            "peso_kg": "0.2",
+            "quantidade": "2"
+        })
+        assert dados["tipo_dispositivo"] == "celular"
+        assert dados["peso_kg"] == 0.2
+        assert dados["quantidade"] == 2
+        assert dados["ponto_coleta"] is None
+
+    def test_tipo_invalido(self):
+        with pytest.raises(ValueError, match="tipo de dispositivo invalido"):
+            validar_dados_solicitacao({"tipo_dispositivo": "geladeira", "nome": "x", "peso_kg": "1"})
+
+    def test_peso_invalido(self):
+        with pytest.raises(ValueError, match="peso"):
+            validar_dados_solicitacao({"tipo_dispositivo": "celular", "nome": "x", "peso_kg": "abc"})
+
+
+class TestFilaSolicitacoes:
+
+    def setup_method(self):
+        self.servico = ServicoDescarte()
+        self.cidadao = Cidadao("1", "João", "joao@test.com", "12345678901")
+        self.fila = FilaSolicitacoes(self.servico, num_workers=2, tamanho_lote=8)
+        self.fila.iniciar()
+
+    def teardown_method(self):
+        self.fila.parar(timeout=5)
+
+    def test_enfileirar_retorna_id_e_processa(self):
+        id_solicitacao = self.fila.enfileirar(
+            self.cidadao, "celular", {"nome": "iPhone", "peso_kg": 0.2}, 2
+        )
+        assert self.fila.obter_status(id_solicitacao) is not None
+
+        self.fila.aguardar()
+
+        assert self.fila.obter_status(id_solicitacao) == FilaSolicitacoes.PROCESSADO
+        solicitacao = self.servico.obter_solicitacao(id_solicitacao)
+        assert solicitacao is not None
+        assert solicitacao.calcular_peso_total() == pytest.approx(0.4)
+        assert len(self.cidadao.notificacoes) >= 1
+
+    def test_reserva_capacidade_do_ponto(self):
+        ponto = PontoColeta("p1", "Ponto", "Rua A", -7.2, -39.3, 100.0)
+        id_solicitacao = self.fila.enfileirar(
+            self.cidadao, "computador", {"nome": "Dell", "peso_kg": 10.0}, 1, "", ponto
+        )
+        self.fila.aguardar()
+
+        assert self.servico.obter_solicitacao(id_solicitacao).ponto_coleta is ponto
+        assert ponto.ocupacao_atual_kg == 10.0
+
+    def test_erro_de_dispositivo_fica_no_status(self):
+        id_solicitacao = self.fila.enfileirar(
+            self.cidadao, "celular", {"nome": "iPhone", "peso_kg": -1}
+        )
+        self.fila.aguardar()
+
+        assert self.fila.obter_status(id_solicitacao) == FilaSolicitacoes.ERRO
+        assert "peso" in self.fila.obter_erro(id_solicitacao)
+        assert self.servico.obter_solicitacao(id_solicitacao) is None
+
+    def test_muitos_pedidos_em_lote(self):
+        ids = [
+            self.fila.enfileirar(self.cidadao, "celular", {"nome": "Moto", "peso_kg": 0.1})
+            for _ in range(50)
+        ]
+        self.fila.aguardar()
+
+        assert all(self.fila.obter_status(i) == FilaSolicitacoes.PROCESSADO for i in ids)
+        assert len(self.servico.listar_solicitacoes()) == 50
+
+    def test_workers_nao_reservam_alem_da_capacidade(self):
+        ponto = PontoColeta("p1", "Ponto", "Rua A", -7.2, -39.3, 100.0)
+        ids = [
+            self.fila.enfileirar(self.cidadao, "computador", {"nome": "Dell", "peso_kg": 10.0}, 1, "", ponto)
+            for _ in range(30)
+        ]
+        self.fila.aguardar()
+
+        no_ponto = [i for i in ids if self.servico.obter_solicitacao(i).ponto_coleta is ponto]
+        assert len(no_ponto) == 10
+        assert ponto.ocupacao_atual_kg == 100.0
+
+    def test_dono_do_pedido(self):
+        id_solicitacao = self.fila.enfileirar(self.cidadao, "celular", {"nome": "Moto", "peso_kg": 0.1})
+        assert self.fila.obter_dono(id_solicitacao) == self.cidadao.id
+
+
+class TestLimiteStatus:
+
+    def test_esquece_os_concluidos_mais_antigos(self):
+        servico = ServicoDescarte()
+        cidadao = Cidadao("1", "João", "joao@test.com", "12345678901")
+        fila = FilaSolicitacoes(servico, num_workers=1, tamanho_lote=4, limite_status=5)
+        fila.iniciar()
+        try:
+            ids = [fila.enfileirar(cidadao, "celular", {"nome": "Moto", "peso_kg": -1}) for _ in range(12)]
+            fila.aguardar()
+        finally:
+            fila.parar(timeout=5)
+
+        assert [fila.obter_status(i) for i in ids[:7]] == [None] * 7
+        assert all(fila.obter_status(i) == FilaSolicitacoes.ERRO for i in ids[7:])
+        assert fila.obter_erro(ids[0]) is None and fila.obter_dono(ids[0]) is None
+        assert len(fila._erros) == 5
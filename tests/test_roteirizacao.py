@@ -0,0 +1,140 @@
+import pytest
+from datetime import datetime, timedelta
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.roteirizacao import RoteirizadorColetas, agendar_rotas, distancia_km
+from ecotech.domain.descarte import ItemDescarte, PontoColeta, SolicitacaoDescarte
+from ecotech.domain.usuarios import Cidadao
+
+INICIO = datetime(2026, 3, 2, 8, 0)
+FIM = datetime(2026, 3, 2, 17, 0)
+DEPOSITO = (-23.55, -46.63)
+
+
+def _solicitacao(id, ponto, peso_kg=5.0):
+    usuario = Cidadao("u1", "Joao", "joao@example.com", "12345678900")
+    solicitacao = SolicitacaoDescarte(id, usuario, ponto)
+    dispositivo = DispositivoFactory.criar_dispositivo(
+        "celular", {"id": f"D{id}", "nome": "Celular", "peso_kg": peso_kg}
+    )
+    solicitacao.adicionar_item(ItemDescarte(dispositivo))
+    return solicitacao
+
+
+def _ponto(id, lat, lon):
+    return PontoColeta(id, f"Ponto {id}", "Rua X", lat, lon, capacidade_kg=10000.0)
+
+
+class TestRoteirizador:
+
+    def test_distancia_haversine(self):
+        # um grau de latitude tem ~111 km
+        assert distancia_km(0.0, 0.0, 1.0, 0.0) == pytest.approx(111.2, abs=0.1)
+
+    def test_agrupa_solicitacoes_do_mesmo_ponto(self):
+        ponto = _ponto("P1", -23.56, -46.64)
+        solicitacoes = [_solicitacao(f"S{i}", ponto) for i in range(3)]
+        roteirizador = RoteirizadorColetas(*DEPOSITO)
+
+        rotas = roteirizador.planejar(solicitacoes, INICIO, FIM)
+        assert len(rotas) == 1
+        assert len(rotas[0].paradas) == 1
+        assert len(rotas[0].paradas[0].solicitacoes) == 3
+        assert rotas[0].peso_kg == pytest.approx(15.0)
+
+    def test_ignora_solicitacoes_fora_de_solicitado(self):
+        ponto = _ponto("P1", -23.56, -46.64)
+        coletada = _solicitacao("S1", ponto)
+        coletada.avancar_estado()
+        sem_ponto = _solicitacao("S2", None)
+        roteirizador = RoteirizadorColetas(*DEPOSITO)
+        assert roteirizador.planejar([coletada, sem_ponto], INICIO, FIM) == []
+
+    def test_respeita_capacidade_do_veiculo(self):
+        pontos = [_ponto(f"P{i}", -23.55 + i * 0.01, -46.63) for i in range(1, 5)]
+        solicitacoes = [_solicitacao(f"S{i}", ponto, peso_kg=40.0) for i, ponto in enumerate(pontos)]
+        roteirizador = RoteirizadorColetas(*DEPOSITO, capacidade_veiculo_kg=100.0)
+
+        rotas = roteirizador.planejar(solicitacoes, INICIO, FIM)
+        assert len(rotas) == 2
+        assert all(rota.peso_kg <= 100.0 for rota in rotas)
+        assert sum(len(rota.paradas) for rota in rotas) == 4
+
+    def test_ponto_mais_pesado_que_o_veiculo_vira_varias_paradas(self):
+        ponto = _ponto("P1", -23.56, -46.64)
+        solicitacoes = [_solicitacao(f"S{i}", ponto, peso_kg=30.0) for i in range(5)]
+        roteirizador = RoteirizadorColetas(*DEPOSITO, capacidade_veiculo_kg=100.0)
+
+        paradas = roteirizador.montar_paradas(solicitacoes, FIM)
+        assert [len(parada.solicitacoes) for parada in paradas] == [3, 2]
+
+    def test_respeita_janela_do_turno(self):
+        # ponto a ~110 km: ida e volta nao cabem num turno de 2 horas a 30 km/h
+        longe = _ponto("P1", -22.55, -46.63)
+        perto = _ponto("P2", -23.56, -46.63)
+        solicitacoes = [_solicitacao("S1", longe), _solicitacao("S2", perto)]
+        roteirizador = RoteirizadorColetas(*DEPOSITO)
+
+        rotas = roteirizador.planejar(solicitacoes, INICIO, INICIO + timedelta(hours=2))
+        assert len(rotas) == 1
+        assert [parada.ponto.id for parada in rotas[0].paradas] == ["P2"]
+        assert rotas[0].retorno <= INICIO + timedelta(hours=2)
+
+    def test_agendamento_e_o_horario_minimo_de_coleta(self):
+        ponto = _ponto("P1", -23.56, -46.64)
+        solicitacao = _solicitacao("S1", ponto)
+        solicitacao.data_agendamento = INICIO + timedelta(hours=3)
+        depois_do_turno = _solicitacao("S2", _ponto("P2", -23.57, -46.64))
+        depois_do_turno.data_agendamento = FIM + timedelta(days=1)
+        roteirizador = RoteirizadorColetas(*DEPOSITO)
+
+        rotas = roteirizador.planejar([solicitacao, depois_do_turno], INICIO, FIM)
+        assert len(rotas) == 1
+        assert rotas[0].paradas[0].chegada == INICIO + timedelta(hours=3)
+
+        agendar_rotas(rotas)
+        assert solicitacao.data_agendamento == INICIO + timedelta(hours=3)
+
+    def test_dois_opt_nao_piora_a_rota(self):
+        # pontos em zigue-zague numa linha: a rota final deve ser aproximadamente ida e volta
+        pontos = [_ponto(f"P{i}", -23.55 + (i % 2) * 0.0001, -46.63 + i * 0.01) for i in range(1, 11)]
+        solicitacoes = [_solicitacao(f"S{i}", ponto) for i, ponto in enumerate(pontos)]
+        roteirizador = RoteirizadorColetas(*DEPOSITO)
+
+        rotas = roteirizador.planejar(solicitacoes, INICIO, FIM)
+        assert len(rotas) == 1
+        ida = distancia_km(*DEPOSITO, -23.55, -46.63 + 0.10)
+        assert rotas[0].distancia_km == pytest.approx(2 * ida, rel=0.01)
+
+    def test_parametros_invalidos(self):
+        with pytest.raises(ValueError):
+            RoteirizadorColetas(*DEPOSITO, capacidade_veiculo_kg=0)
+        with pytest.raises(ValueError):
+            RoteirizadorColetas(*DEPOSITO).planejar([], FIM, INICIO)
+
+
+class TestPlanejamentoServico:
+
+    def test_agenda_as_pendentes_nos_pontos(self):
+        from ecotech.application.services import ServicoDescarte
+
+        servico = ServicoDescarte()
+        usuario = Cidadao("u1", "Joao", "joao@example.com", "12345678900")
+        pontos = [_ponto("P1", -23.56, -46.64), _ponto("P2", -23.54, -46.62)]
+        agendadas = []
+        for ponto in pontos:
+            solicitacao = servico.criar_solicitacao(usuario)
+            servico.adicionar_item_solicitacao(solicitacao, DispositivoFactory.criar_dispositivo(
+                "celular", {"id": f"D{ponto.id}", "nome": "Celular", "peso_kg": 5.0}
+            ))
+            servico.definir_ponto_coleta(solicitacao, ponto)
+            agendadas.append(solicitacao)
+        sem_ponto = servico.criar_solicitacao(usuario)
+        versao = servico.versao
+
+        rotas = servico.planejar_coletas(RoteirizadorColetas(*DEPOSITO), INICIO, FIM)
+
+        assert len(rotas) == 1
+        assert {p.ponto.id for p in rotas[0].paradas} == {"P1", "P2"}
+        assert all(INICIO <= s.data_agendamento <= FIM for s in agendadas)
+        assert sem_ponto.data_agendamento is None
+        assert {s.id for s in servico.listar_alteradas_desde(versao)} == {s.id for s in agendadas}
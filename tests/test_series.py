@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta
+from ecotech.application.factories import DispositivoFactory
+from ecotech.application.series import SerieTemporal, SeriesPontos
+from ecotech.application.services import ServicoDescarte, ServicoPontoColeta
+from ecotech.domain.descarte import PontoColeta
+from ecotech.domain.usuarios import Cidadao
+
+BASE = datetime(2026, 3, 1, 0, 0)
+
+
+class TestSerieTemporal:
+
+    def test_buckets_horarios(self):
+        serie = SerieTemporal(horas_retencao=24)
+        serie.registrar(5.0, BASE + timedelta(minutes=10))
+        serie.registrar(3.0, BASE + timedelta(minutes=50))
+        serie.registrar(2.0, BASE + timedelta(hours=2))
+
+        pontos = serie.consultar(BASE, BASE + timedelta(hours=3))
+        assert [kg for _, kg in pontos] == [8.0, 0.0, 2.0]
+
+    def test_horas_antigas_descem_para_o_dia(self):
+        serie = SerieTemporal(horas_retencao=24, dias_retencao=30)
+        serie.registrar(4.0, BASE + timedelta(hours=1))
+        serie.registrar(6.0, BASE + timedelta(hours=5))
+        serie.registrar(1.0, BASE + timedelta(days=3))
+
+        # o dia 1 inteiro ja saiu da janela horaria e virou um bucket diario
+        pontos = serie.consultar(BASE, BASE + timedelta(days=1))
+        assert pontos == [(BASE, 10.0)]
+        assert serie.total(BASE, BASE + timedelta(days=4)) == pytest.approx(11.0)
+
+    def test_retencao_diaria_descarta_o_mais_antigo(self):
+        serie = SerieTemporal(horas_retencao=24, dias_retencao=2)
+        serie.registrar(4.0, BASE)
+        serie.registrar(1.0, BASE + timedelta(days=10))
+        assert serie.total(BASE, BASE + timedelta(days=11)) == pytest.approx(1.0)
+
+
+    def test_registros_concorrentes_nao_se_perdem(self):
+        import threading
+
+        serie = SerieTemporal()
+        agora = datetime(2026, 3, 10, 12)
+
+        def registrar():
+            for _ in range(5000):
+                serie.registrar(1.0, agora)
+
+        threads = [threading.Thread(target=registrar) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert serie.total(agora, agora + timedelta(hours=1)) == 20000.0
+
+    def test_pickle_sem_o_lock(self):
+        import pickle
+
+        serie = SerieTemporal()
+        agora = datetime(2026, 3, 10, 12)
+        serie.registrar(2.5, agora)
+        copia = pickle.loads(pickle.dumps(serie))
+        copia.registrar(1.0, agora)
+        assert copia.total(agora, agora + timedelta(hours=1)) == 3.5
+
+
+class TestPrevisaoSaturacao:
+
+    def test_previsao_pela_taxa_liquida(self):
+        series = SeriesPontos()
+        ponto = PontoColeta("p1", "Ponto", "Rua A", -7.2, -39.3, 100.0)
+        agora = BASE + timedelta(days=5)
+        for hora in range(72):
+            series.registrar_recebimento(ponto, 1.0, agora - timedelta(hours=hora))
+        ponto.adicionar_ocupacao(28.0)
+
+        # 1 kg/h e 72 kg livres
+        previsao = series.prever_saturacao(ponto, janela_horas=72, agora=agora)
+        assert previsao == agora + timedelta(hours=72)
+
+    def test_sem_enchimento_sem_previsao(self):
+        series = SeriesPontos()
+        ponto = PontoColeta("p1", "Ponto", "Rua A", -7.2, -39.3, 100.0)
+        assert series.prever_saturacao(ponto) is None
+
+
+class TestIntegracaoServicos:
+
+    def test_recebimento_e_coleta_alimentam_as_series(self):
+        servico_ponto = ServicoPontoColeta()
+        servico = ServicoDescarte(series=servico_ponto.series)
+        ponto = servico_ponto.criar_ponto_coleta("Ponto", "Rua A", -7.2, -39.3, 100.0)
+        cidadao = Cidadao("1", "João", "joao@test.com", "12345678901")
+
+        solicitacao = servico.criar_solicitacao(cidadao)
+        servico.adicionar_item_solicitacao(
+            solicitacao,
+            DispositivoFactory.criar_dispositivo("computador", {"id": "1", "nome": "Dell", "peso_kg": 10.0})
+        )
+        servico.definir_ponto_coleta(solicitacao, ponto)
+        assert ponto.ocupacao_atual_kg == 10.0
+
+        servico.avancar_estado_solicitacao(solicitacao)
+        assert ponto.ocupacao_atual_kg == 0.0
+
+        agora = datetime.now()
+        inicio, fim = agora - timedelta(hours=1), agora + timedelta(hours=1)
+        assert servico_ponto.series.consultar_recebido(ponto.id, inicio, fim)[-1][1] == 10.0
+        assert servico_ponto.series.consultar_coletado(ponto.id, inicio, fim)[-1][1] == 10.0
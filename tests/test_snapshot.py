@@ -0,0 +1,187 @@
+import pickle
+import zlib
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from ecotech.application.carteira import Entrega
+from ecotech.application.factories import DispositivoFactory, MetodoTratamentoFactory
+from ecotech.application.services import ServicoDescarte, ServicoPontoColeta, ServicoRelatorio, ServicoUsuario
+from ecotech.application.snapshot import (
+    MAGICO,
+    _CABECALHO,
+    carregar_snapshot,
+    salvar_snapshot,
+)
+
+
+def criar_servicos():
+    return ServicoUsuario(), ServicoPontoColeta(), ServicoDescarte()
+
+
+def gravar_versao(caminho, versao, estado):
+    corpo = pickle.dumps(estado, protocol=5)
+    caminho.write_bytes(_CABECALHO.pack(MAGICO, versao, 0, len(corpo), zlib.crc32(corpo)) + corpo)
+
+
+def entrega_v1(id_solicitacao, id_usuario, valor):
+    # Entrega como era gravada na v1: valor em reais (float) em _valor
+    entrega = Entrega.__new__(Entrega)
+    entrega.__dict__.update({
+        "_id_solicitacao": id_solicitacao,
+        "_id_usuario": id_usuario,
+        "_valor": valor,
+        "_local": "Centro",
+        "_status": "finalizado",
+        "_data": datetime(2025, 12, 1, 10, 0),
+    })
+    return entrega
+
+
+def popular(servico_usuario, servico_ponto, servico_descarte):
+    cidadao = servico_usuario.criar_usuario("cidadao", {
+        "nome": "João Silva",
+        "email": "joao@example.com",
+        "cpf": "12345678900"
+    })
+    ponto = servico_ponto.criar_ponto_coleta("Ponto", "Rua A", -7.2, -39.3, 500.0)
+    solicitacao = servico_descarte.criar_solicitacao(cidadao)
+    dispositivo = DispositivoFactory.criar_dispositivo(
+        "computador", {"id": "d1", "nome": "Dell", "peso_kg": 8.0}
+    )
+    servico_descarte.adicionar_item_solicitacao(solicitacao, dispositivo, 2)
+    servico_descarte.definir_ponto_coleta(solicitacao, ponto)
+    servico_descarte.definir_metodo_tratamento(
+        solicitacao, MetodoTratamentoFactory.criar_metodo("reciclagem")
+    )
+    servico_descarte.avancar_estado_solicitacao(solicitacao)
+    return solicitacao
+
+
+class TestSnapshot:
+
+    @pytest.mark.parametrize("comprimir", [False, True])
+    def test_salvar_e_restaurar(self, tmp_path, comprimir):
+        origem = criar_servicos()
+        solicitacao = popular(*origem)
+        caminho = str(tmp_path / "estado.snap")
+
+        salvar_snapshot(caminho, *origem, comprimir=comprimir)
+        servico_usuario, servico_ponto, servico_descarte = criar_servicos()
+        carregar_snapshot(caminho, servico_usuario, servico_ponto, servico_descarte)
+
+        restaurada = servico_descarte.obter_solicitacao(solicitacao.id)
+        assert restaurada.estado.obter_nome() == "Coletado"
+        assert restaurada.calcular_peso_total() == 16.0
+        assert restaurada.metodo_tratamento.obter_nome() == "Reciclagem"
+        # referencias compartilhadas continuam compartilhadas
+        assert restaurada.usuario is servico_usuario.autenticar_usuario("joao@example.com")
+        assert restaurada.ponto_coleta is servico_ponto.listar_pontos()[0]
+        # a ocupacao foi liberada quando a solicitacao foi coletada
+        assert restaurada.ponto_coleta.ocupacao_atual_kg == 0.0
+        assert servico_ponto.prever_saturacao(restaurada.ponto_coleta.id) is None
+
+    def test_versao_dos_dados_continua_depois_do_snapshot(self, tmp_path):
+        origem = criar_servicos()
+        solicitacao = popular(*origem)
+        versao = origem[2].versao
+        caminho = str(tmp_path / "estado.snap")
+        salvar_snapshot(caminho, *origem)
+
+        servico_usuario, servico_ponto, servico_descarte = criar_servicos()
+        carregar_snapshot(caminho, servico_usuario, servico_ponto, servico_descarte)
+        assert servico_descarte.versao == versao
+        assert servico_descarte.listar_alteradas_desde(versao) == []
+
+        restaurada = servico_descarte.obter_solicitacao(solicitacao.id)
+        servico_descarte.avancar_estado_solicitacao(restaurada)
+        assert servico_descarte.versao > versao
+        assert [s.id for s in servico_descarte.listar_alteradas_desde(versao)] == [solicitacao.id]
+
+    def test_cubo_e_esbocos_vao_no_snapshot(self, tmp_path, monkeypatch):
+        origem = criar_servicos()
+        relatorio = ServicoRelatorio()
+        origem[2].adicionar_observador(relatorio.cubo.ao_transicionar)
+        origem[2].adicionar_observador(relatorio.esbocos.ao_transicionar)
+        solicitacao = popular(*origem)
+        for _ in range(2):
+            origem[2].avancar_estado_solicitacao(solicitacao)
+        caminho = str(tmp_path / "estado.snap")
+        salvar_snapshot(caminho, *origem, servico_relatorio=relatorio)
+
+        destino = criar_servicos()
+        restaurado = ServicoRelatorio()
+        # o historico nao e relido no carregamento
+        monkeypatch.setattr(destino[2], "listar_solicitacoes", None)
+        carregar_snapshot(caminho, *destino, servico_relatorio=restaurado)
+        assert restaurado.cubo.totais() == relatorio.cubo.totais()
+        assert restaurado.cubo.totais()["itens"] == 1
+        assert restaurado.esbocos.usuarios_distintos() == 1
+        assert restaurado.esbocos.quantis_peso((0.5,)) == [16.0]
+        # continua somando so na entrada do estado final
+        restaurado.cubo.ao_transicionar(solicitacao, solicitacao.estado, solicitacao.estado)
+        assert restaurado.cubo.totais() == relatorio.cubo.totais()
+
+    def test_snapshot_sem_relatorio_reconstroi(self, tmp_path):
+        origem = criar_servicos()
+        solicitacao = popular(*origem)
+        for _ in range(2):
+            origem[2].avancar_estado_solicitacao(solicitacao)
+        caminho = str(tmp_path / "estado.snap")
+        salvar_snapshot(caminho, *origem)
+
+        restaurado = ServicoRelatorio()
+        carregar_snapshot(caminho, *criar_servicos(), servico_relatorio=restaurado)
+        assert restaurado.cubo.totais()["peso_kg"] == 16.0
+        assert restaurado.esbocos.usuarios_distintos() == 1
+
+    def test_arquivo_invalido(self, tmp_path):
+        caminho = tmp_path / "estado.snap"
+        caminho.write_bytes(b"nao e snapshot" * 10)
+        with pytest.raises(ValueError, match="nao e um snapshot"):
+            carregar_snapshot(str(caminho), *criar_servicos())
+
+    def test_snapshot_corrompido(self, tmp_path):
+        origem = criar_servicos()
+        popular(*origem)
+        caminho = tmp_path / "estado.snap"
+        salvar_snapshot(str(caminho), *origem)
+
+        dados = bytearray(caminho.read_bytes())
+        dados[-5] ^= 0xFF
+        caminho.write_bytes(bytes(dados))
+
+        with pytest.raises(ValueError, match="corrompido"):
+            carregar_snapshot(str(caminho), *criar_servicos())
+
+    def test_carrega_snapshot_v1_com_carteira_em_reais(self, tmp_path):
+        servico_usuario, servico_ponto, servico_descarte = criar_servicos()
+        estado = {
+            "usuarios": servico_usuario.exportar_estado(),
+            "pontos": servico_ponto.exportar_estado(),
+            "descarte": servico_descarte.exportar_estado(),
+        }
+        paga = entrega_v1("s1", "u1", 10.05)
+        estado["usuarios"]["carteira"] = {
+            "saldos": {"u1": 10.05},
+            "historico": {"u1": [paga]},
+            "liquidadas": {"s1": "rodada-1"},
+            "pendentes": [entrega_v1("s2", "u1", 0.1 + 0.2)],
+        }
+        caminho = tmp_path / "v1.snap"
+        gravar_versao(caminho, 1, estado)
+
+        servico_usuario, servico_ponto, servico_descarte = criar_servicos()
+        carregar_snapshot(str(caminho), servico_usuario, servico_ponto, servico_descarte)
+
+        carteira = servico_usuario.carteira
+        assert carteira.saldo_centavos("u1") == 1005
+        assert carteira.listar_entregas("u1").entregas[0].valor == Decimal("10.05")
+        assert carteira.listar_pendentes("u1")[0].valor_centavos == 30
+        carteira.liquidar()
+        assert carteira.saldo_centavos("u1") == 1035
+
+    def test_versao_futura_e_recusada(self, tmp_path):
+        caminho = tmp_path / "futuro.snap"
+        gravar_versao(caminho, 99, {})
+        with pytest.raises(ValueError, match="nao suportada"):
+            carregar_snapshot(str(caminho), *criar_servicos())
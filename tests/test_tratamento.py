@@ -1,5 +1,11 @@
 import pytest
-from ecotech.domain.tratamento import Reciclagem, Reuso, DescarteControlado
+from ecotech.domain.tratamento import (
+    DescarteControlado,
+    RastreamentoMetodo,
+    Reciclagem,
+    RelatorioImpactoPorMetodo,
+    Reuso,
+)
 from ecotech.domain.dispositivos import Celular
 
 # TODO: adicionar testes de impacto ambiental
@@ -34,3 +40,21 @@ class TestTratamento:
         impacto = reuso.calcular_impacto_ambiental(dispositivos)
         assert impacto > 0
 
+
+
+class TestCustoEmCentavos:
+
+    def test_custo_arredonda_uma_vez(self):
+        # 0.1 + 0.2 kg a R$ 15/kg: em float o peso vira 0.30000000000000004
+        dispositivos = [Celular("1", "A", 0.1), Celular("2", "B", 0.2)]
+        assert Reciclagem().calcular_custo_centavos(dispositivos) == 450
+        assert Reciclagem().calcular_custo(dispositivos) == 4.5
+
+    def test_relatorio_soma_centavos_por_metodo(self):
+        relatorio = RelatorioImpactoPorMetodo()
+        reuso = Reuso(custo_base_por_kg=0.07)
+        for i in range(1000):
+            relatorio.adicionar_rastreamento(RastreamentoMetodo(str(i), reuso, 0.15))
+        # cada aplicacao custa 1,05 centavo -> 1 centavo; o total e a soma exata
+        assert relatorio.calcular_custo_total_centavos_por_metodo() == {"Reuso": 1000}
+        assert relatorio.calcular_custo_total_por_metodo() == {"Reuso": 10.0}
@@ -83,6 +83,46 @@ def test_historico_registra_acoes():
 
     assert len(usuario.historico_acoes) > tamanho_inicial
 
+def test_visoes_reaproveitadas_ate_mudar():
+    usuario = Cidadao(
+        id="1",
+        nome="Maria",
+        email="maria@email.com",
+        cpf="12345678901"
+    )
+
+    usuario.adicionar_notificacao("Primeira")
+    notificacoes = usuario.notificacoes
+    historico = usuario.historico_acoes
+
+    assert usuario.notificacoes is notificacoes
+    assert usuario.historico_acoes is historico
+    with pytest.raises(AttributeError):
+        notificacoes.append("fora do dominio")
+
+    usuario.adicionar_notificacao("Segunda")
+
+    assert len(notificacoes) == 1
+    assert len(usuario.notificacoes) == 2
+    assert len(usuario.historico_acoes) == len(historico) + 1
+
+def test_visoes_nao_vao_para_o_snapshot():
+    import pickle
+
+    usuario = Cidadao(
+        id="1",
+        nome="Maria",
+        email="maria@email.com",
+        cpf="12345678901"
+    )
+    usuario.adicionar_notificacao("Teste")
+    usuario.notificacoes
+
+    copia = pickle.loads(pickle.dumps(usuario))
+
+    assert copia._visao_notificacoes is None
+    assert copia.notificacoes == usuario.notificacoes
+
 # ---------------
 # TESTES CIDADAO
 # ---------------